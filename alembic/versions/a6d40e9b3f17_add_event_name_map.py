@@ -0,0 +1,44 @@
+"""Add the event_name_map table
+
+Revision ID: a6d40e9b3f17
+Revises: f3a9c61d8e52
+Create Date: 2026-10-19 15:02:48.770391
+
+Raw event name -> standardized game, format and name, filled by
+utils.event_standardizer.EventNameMap during normalization. Databases that
+already ran a normalization have the table, so it is only created when
+missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d40e9b3f17'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c61d8e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'event_name_map'  # EventNameMap.TABLE
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        op.create_table(
+            TABLE,
+            sa.Column('raw_name', sa.Text(), nullable=False),
+            sa.Column('game', sa.Text(), nullable=False),
+            sa.Column('format', sa.Text(), nullable=False),
+            sa.Column('is_special', sa.Integer(), nullable=False),
+            sa.Column('standard_name', sa.Text(), nullable=False),
+            sa.Column('rules_version', sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint('raw_name'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table(TABLE)
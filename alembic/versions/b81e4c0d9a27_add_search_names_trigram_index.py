@@ -0,0 +1,51 @@
+"""Add the search_names trigram index
+
+Revision ID: b81e4c0d9a27
+Revises: e5d2f08a7c14
+Create Date: 2026-10-19 09:21:37.604118
+
+FTS5 table (trigram tokenizer) of player, organization and venue names,
+kept in sync by triggers on players, organizations and tournaments (see
+search.name_index). SQLite only, and only where this SQLite build has the
+trigram tokenizer: once the triggers exist every writer of those tables
+needs FTS5, so databases without it are left unchanged and keep the LIKE
+searches.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from search.name_index import INDEX_TABLE, create_statements, drop_statements, fill_statements, trigram_supported
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4c0d9a27'
+down_revision: Union[str, Sequence[str], None] = 'e5d2f08a7c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    if not trigram_supported(bind.connection.driver_connection):
+        print(f"⚠️  SQLite has no FTS5 trigram tokenizer; {INDEX_TABLE} not created (name search uses LIKE)")
+        return
+    tables = set(sa.inspect(bind).get_table_names())
+    for sql in create_statements(tables):
+        op.execute(sql)
+    if INDEX_TABLE not in tables:
+        for sql in fill_statements(tables):
+            op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for sql in drop_statements(sa.inspect(bind).get_table_names()):
+        op.execute(sql)
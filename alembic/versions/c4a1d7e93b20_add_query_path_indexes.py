@@ -0,0 +1,62 @@
+"""Add indexes for the hot query paths
+
+Revision ID: c4a1d7e93b20
+Revises: 82c3ae35e0e3
+Create Date: 2026-10-18 10:12:41.508213
+
+Composite and covering indexes for the DatabaseService, UnifiedTabulator and
+editor queries (see tests/test_query_plans.py for the plans they produce).
+Databases built with Base.metadata.create_all() already have them, so only
+missing indexes are created.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a1d7e93b20'
+down_revision: Union[str, Sequence[str], None] = '82c3ae35e0e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOCATED = 'lat IS NOT NULL AND lng IS NOT NULL'
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    # Recent/upcoming listings: ordered by start_at, end_at filtered inside the index
+    ('ix_tournaments_start_at', 'tournaments', ['start_at', 'end_at'], None),
+    ('ix_tournaments_primary_contact', 'tournaments', ['primary_contact'], None),
+    # Organization rankings count and sum attendance per owner without touching rows
+    ('ix_tournaments_owner_name', 'tournaments', ['owner_name', 'num_attendees'], None),
+    ('ix_tournaments_num_attendees', 'tournaments', ['num_attendees'], None),
+    ('ix_tournaments_lat_lng', 'tournaments', ['lat', 'lng'], LOCATED),
+    # Player rankings and tabulation: per-player placements, covering placement <= N
+    ('ix_tournament_placements_player_placement', 'tournament_placements', ['player_id', 'placement'], None),
+    ('ix_tournament_placements_event_placement', 'tournament_placements', ['event_name', 'placement'], None),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = {table: _existing_indexes(table) for table in {table for _, table, _, _ in INDEXES}}
+    for name, table, columns, where in INDEXES:
+        if name in existing[table]:
+            continue
+        kwargs = {}
+        if where:
+            kwargs = {'sqlite_where': sa.text(where), 'postgresql_where': sa.text(where)}
+        op.create_index(name, table, columns, unique=False, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = {table: _existing_indexes(table) for table in {table for _, table, _, _ in INDEXES}}
+    for name, table, _, _ in reversed(INDEXES):
+        if name in existing[table]:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,43 @@
+"""Add the attendance_monthly rollup
+
+Revision ID: e5d2f08a7c14
+Revises: c4a1d7e93b20
+Create Date: 2026-10-18 15:40:12.118406
+
+Per-month tournament count and attendance by organization and region,
+maintained by database.attendance_rollup and filled here with one
+GROUP BY over tournaments.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.attendance_rollup import TABLE, rebuild
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d2f08a7c14'
+down_revision: Union[str, Sequence[str], None] = 'c4a1d7e93b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        op.create_table(
+            TABLE,
+            sa.Column('month', sa.String(), nullable=False),
+            sa.Column('organization', sa.String(), nullable=False),
+            sa.Column('region', sa.String(), nullable=False),
+            sa.Column('tournament_count', sa.Integer(), nullable=False),
+            sa.Column('total_attendance', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('month', 'organization', 'region'),
+        )
+    rebuild(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table(TABLE)
@@ -0,0 +1,40 @@
+"""Add an index on tournaments.short_slug
+
+Revision ID: f3a9c61d8e52
+Revises: b81e4c0d9a27
+Create Date: 2026-10-19 14:06:12.318840
+
+The WebDAV browser resolves tournament_<slug> folders by short_slug (see
+services.webdav_database_browser.MEMBER_KEYS). Databases built with
+Base.metadata.create_all() already have the index, so it is only created
+when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c61d8e52'
+down_revision: Union[str, Sequence[str], None] = 'b81e4c0d9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_tournaments_short_slug'
+
+
+def _has_index() -> bool:
+    return INDEX in {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('tournaments')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_index():
+        op.create_index(INDEX, 'tournaments', ['short_slug'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_index():
+        op.drop_index(INDEX, table_name='tournaments')
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+attendance_rollup.py - The attendance_monthly rollup behind the timeline endpoints
+
+One row per (month, organization, region) with tournament_count and
+total_attendance, for tournaments with attendance and a start date.
+Months are UTC ("YYYY-MM"), organization is the tournament owner_name
+('' when unknown) and region is socal, norcal or other.
+
+- Incremental: session flush hooks turn every ORM insert, update and delete
+  of a Tournament into +/- deltas, upserted in the same transaction
+  (skipped, with a warning, on databases the migration has not reached yet;
+  the migration fills the table from scratch)
+- Rebuild: one INSERT ... SELECT ... GROUP BY strftime over tournaments
+  (needed after bulk UPDATEs or raw SQL, which bypass the ORM hooks)
+- Check: compares the rollup with a fresh GROUP BY over the raw table
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+TABLE = 'attendance_monthly'
+
+# Same boxes as LocationMixin.is_in_socal / is_in_norcal
+REGIONS = (
+    ('socal', (32.5, 34.5, -119.0, -116.0)),
+    ('norcal', (36.0, 39.0, -123.0, -120.0)),
+)
+
+# Tournament columns that move a row between rollup buckets or change its weight
+TRACKED = ('start_at', 'num_attendees', 'owner_name', 'lat', 'lng')
+
+_DELTAS = 'attendance_monthly_deltas'
+
+# Database URLs known to have the rollup table / already warned about lacking it
+_READY = set()
+_WARNED = set()
+
+Key = Tuple[str, str, str]
+
+
+# ============================================================================
+# Python side: which bucket a tournament belongs to
+# ============================================================================
+
+def region_of(lat: Optional[float], lng: Optional[float]) -> str:
+    if lat is not None and lng is not None:
+        for name, (lat_min, lat_max, lng_min, lng_max) in REGIONS:
+            if lat_min <= lat <= lat_max and lng_min <= lng <= lng_max:
+                return name
+    return 'other'
+
+
+def month_of(start_at) -> Optional[str]:
+    if isinstance(start_at, datetime):
+        start_at = start_at.timestamp()
+    if not start_at or start_at <= 0:
+        return None
+    return datetime.fromtimestamp(start_at, timezone.utc).strftime('%Y-%m')
+
+
+def contribution(values: Dict[str, Any]) -> Optional[Tuple[Key, int]]:
+    """(bucket, attendance) a tournament adds to the rollup, or None"""
+    attendees = values.get('num_attendees') or 0
+    month = month_of(values.get('start_at'))
+    if attendees <= 0 or month is None:
+        return None
+    return (month, values.get('owner_name') or '', region_of(values.get('lat'), values.get('lng'))), attendees
+
+
+# ============================================================================
+# Incremental maintenance (ORM flush hooks)
+# ============================================================================
+
+def _is_tournament(obj) -> bool:
+    return getattr(obj, '__tablename__', None) == 'tournaments'
+
+
+def _values(session, obj, before: bool) -> Dict[str, Any]:
+    """Tracked column values as stored in the database (before) or as about to be flushed"""
+    state = inspect(obj)
+    if not before:
+        return {column: getattr(obj, column) for column in TRACKED}
+    values = {}
+    for column in TRACKED:
+        history = state.attrs[column].history
+        if history.deleted:
+            values[column] = history.deleted[0]
+        elif history.added:
+            # Set while expired: the old value was never loaded, so read it
+            row = session.connection().execute(
+                text(f"SELECT {', '.join(TRACKED)} FROM tournaments WHERE id = :id"), {'id': obj.id}
+            ).mappings().first()
+            return dict(row) if row else {}
+        else:
+            values[column] = getattr(obj, column)
+    return values
+
+
+def _add(deltas: Dict[Key, List[int]], change: Optional[Tuple[Key, int]], sign: int):
+    if change:
+        key, attendees = change
+        deltas[key][0] += sign
+        deltas[key][1] += sign * attendees
+
+
+def _collect(session, flush_context, instances):
+    deltas = session.info.setdefault(_DELTAS, defaultdict(lambda: [0, 0]))
+    for obj in session.new:
+        if _is_tournament(obj):
+            _add(deltas, contribution(_values(session, obj, before=False)), +1)
+    for obj in session.deleted:
+        if _is_tournament(obj) and inspect(obj).persistent:
+            _add(deltas, contribution(_values(session, obj, before=True)), -1)
+    for obj in session.dirty:
+        if _is_tournament(obj) and session.is_modified(obj, include_collections=False):
+            state = inspect(obj)
+            if not any(state.attrs[column].history.has_changes() for column in TRACKED):
+                continue
+            _add(deltas, contribution(_values(session, obj, before=True)), -1)
+            _add(deltas, contribution(_values(session, obj, before=False)), +1)
+
+
+def _has_rollup(connection) -> bool:
+    """attendance_monthly exists here; until it does (migration e5d2f08a7c14 not run) writes skip it"""
+    url = str(connection.engine.url)
+    if url in _READY:
+        return True
+    if inspect(connection).has_table(TABLE):
+        _READY.add(url)
+        return True
+    if url not in _WARNED:
+        _WARNED.add(url)
+        print(f"⚠️  No {TABLE} table in {connection.engine.url!r}: the timeline rollup is not maintained "
+              "until `alembic upgrade head` creates and fills it")
+    return False
+
+
+def _apply(session, flush_context):
+    deltas = session.info.pop(_DELTAS, None)
+    changes = [(key, count, attendance) for key, (count, attendance) in (deltas or {}).items()
+               if count or attendance]
+    if changes and _has_rollup(session.connection()):
+        apply_deltas(session.connection(), changes)
+
+
+def _discard(session, previous_transaction=None):
+    session.info.pop(_DELTAS, None)
+
+
+def apply_deltas(connection, changes: List[Tuple[Key, int, int]]):
+    """Upsert (bucket, count delta, attendance delta) rows, dropping emptied buckets"""
+    connection.execute(text(
+        f"INSERT INTO {TABLE} (month, organization, region, tournament_count, total_attendance) "
+        "VALUES (:month, :organization, :region, :count, :attendance) "
+        "ON CONFLICT (month, organization, region) DO UPDATE SET "
+        f"tournament_count = {TABLE}.tournament_count + excluded.tournament_count, "
+        f"total_attendance = {TABLE}.total_attendance + excluded.total_attendance"
+    ), [{'month': month, 'organization': organization, 'region': region, 'count': count, 'attendance': attendance}
+        for (month, organization, region), count, attendance in changes])
+    connection.execute(text(f"DELETE FROM {TABLE} WHERE tournament_count <= 0"))
+
+
+def install_rollup_listeners():
+    """Keep attendance_monthly in step with every ORM Session (idempotent)"""
+    for name, listener in (('before_flush', _collect), ('after_flush', _apply),
+                           ('after_soft_rollback', _discard)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+
+# ============================================================================
+# Rebuild, check and read
+# ============================================================================
+
+def _dialect(executor) -> str:
+    """Dialect name of a Session or Connection"""
+    bind = executor.get_bind() if hasattr(executor, 'get_bind') else executor
+    return bind.dialect.name
+
+
+def _month_sql(dialect: str) -> str:
+    if dialect == 'postgresql':
+        return "to_char(to_timestamp(start_at) AT TIME ZONE 'UTC', 'YYYY-MM')"
+    return "strftime('%Y-%m', start_at, 'unixepoch')"
+
+
+def _region_sql() -> str:
+    cases = ' '.join(f"WHEN lat BETWEEN {lat_min} AND {lat_max} AND lng BETWEEN {lng_min} AND {lng_max} "
+                     f"THEN '{name}'" for name, (lat_min, lat_max, lng_min, lng_max) in REGIONS)
+    return f"CASE {cases} ELSE 'other' END"
+
+
+def rollup_select(dialect: str = 'sqlite') -> str:
+    """The rollup computed from scratch: one GROUP BY over tournaments"""
+    return (f"SELECT {_month_sql(dialect)} AS month, COALESCE(owner_name, '') AS organization, "
+            f"{_region_sql()} AS region, COUNT(*) AS tournament_count, SUM(num_attendees) AS total_attendance "
+            "FROM tournaments WHERE num_attendees > 0 AND start_at > 0 "
+            "GROUP BY 1, 2, 3")
+
+
+def rebuild(session) -> int:
+    """Recompute attendance_monthly from tournaments (Session or Connection); returns the bucket count"""
+    dialect = _dialect(session)
+    session.execute(text(f"DELETE FROM {TABLE}"))
+    session.execute(text(f"INSERT INTO {TABLE} (month, organization, region, tournament_count, total_attendance) "
+                         f"{rollup_select(dialect)}"))
+    return session.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+
+
+def check(session) -> Dict[str, Any]:
+    """Compare the rollup with the raw table; lists every bucket that differs"""
+    dialect = _dialect(session)
+    read = lambda sql: {(r[0], r[1], r[2]): (r[3], r[4]) for r in session.execute(text(sql))}
+    expected = read(rollup_select(dialect))
+    actual = read(f"SELECT month, organization, region, tournament_count, total_attendance FROM {TABLE}")
+    differences = [
+        {'month': key[0], 'organization': key[1], 'region': key[2],
+         'expected': expected.get(key, (0, 0)), 'actual': actual.get(key, (0, 0))}
+        for key in sorted(set(expected) | set(actual)) if expected.get(key) != actual.get(key)
+    ]
+    return {'consistent': not differences, 'buckets': len(expected), 'differences': differences}
+
+
+def monthly_totals(session, organization: Optional[str] = None, region: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per-month tournament count and attendance, optionally for one organization/region"""
+    conditions, params = [], {}
+    for column, value, op in (('organization', organization, '='), ('region', region, '='),
+                              ('month', since, '>='), ('month', until, '<=')):
+        if value is not None:
+            conditions.append(f"{column} {op} :{column}_{len(params)}")
+            params[f"{column}_{len(params)}"] = value
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+    rows = session.execute(text(
+        f"SELECT month, SUM(tournament_count), SUM(total_attendance) FROM {TABLE} {where}"
+        "GROUP BY month ORDER BY month"), params)
+    return [{'month': month, 'tournament_count': int(count), 'total_attendance': int(attendance)}
+            for month, count, attendance in rows]
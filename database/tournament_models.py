@@ -11,7 +11,7 @@ from functools import cached_property
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, Float, Boolean, func, desc, asc, JSON
 from sqlalchemy.orm import declarative_base, relationship, Query
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 # Import centralized session management
 from utils.database import Session, get_session
@@ -551,6 +551,18 @@ class Tournament(Base, BaseModel, LocationMixin, TimestampMixin, AnnouncerMixin)
     # Relationships
     placements = relationship("TournamentPlacement", back_populates="tournament", cascade="all, delete-orphan")
     
+    # Query-path indexes (alembic revisions c4a1d7e93b20, f3a9c61d8e52)
+    __table_args__ = (
+        Index('ix_tournaments_start_at', 'start_at', 'end_at'),
+        Index('ix_tournaments_short_slug', 'short_slug'),
+        Index('ix_tournaments_primary_contact', 'primary_contact'),
+        Index('ix_tournaments_owner_name', 'owner_name', 'num_attendees'),
+        Index('ix_tournaments_num_attendees', 'num_attendees'),
+        Index('ix_tournaments_lat_lng', 'lat', 'lng',
+              sqlite_where=text('lat IS NOT NULL AND lng IS NOT NULL'),
+              postgresql_where=text('lat IS NOT NULL AND lng IS NOT NULL')),
+    )
+    
     def __repr__(self):
         return f"<Tournament(id='{self.id}', name='{self.name}', attendees={self.num_attendees})>"
     
@@ -2305,6 +2317,8 @@ class TournamentPlacement(Base, BaseModel):
     # Unique constraint per event
     __table_args__ = (
         Index('ix_tournament_player_event', tournament_id, player_id, event_id, unique=True),
+        Index('ix_tournament_placements_player_placement', player_id, placement),
+        Index('ix_tournament_placements_event_placement', event_name, placement),
     )
     
     def __repr__(self):
@@ -2906,4 +2920,25 @@ class ServiceState(Base, BaseModel, TimestampMixin):
             'uptime_seconds': self.get_uptime().total_seconds() if self.get_uptime() else None,
             'is_running': self.is_running(),
             'data': self.data or {}
-        }
\ No newline at end of file
+        }
+# ============================================================================
+# ATTENDANCE ROLLUP - Monthly attendance kept in step with tournaments
+# ============================================================================
+
+class AttendanceMonthly(Base):
+    """Per-month attendance by organization and region (see database.attendance_rollup)"""
+    __tablename__ = 'attendance_monthly'
+    
+    month = Column(String, primary_key=True)  # UTC "YYYY-MM"
+    organization = Column(String, primary_key=True, default='')  # Tournament owner_name
+    region = Column(String, primary_key=True, default='other')  # socal, norcal or other
+    tournament_count = Column(Integer, nullable=False, default=0)
+    total_attendance = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return (f"<AttendanceMonthly(month='{self.month}', organization='{self.organization}', "
+                f"region='{self.region}', tournaments={self.tournament_count}, attendance={self.total_attendance})>")
+
+
+from database.attendance_rollup import install_rollup_listeners
+install_rollup_listeners()
@@ -22,6 +22,12 @@ from capability_announcer import announcer
 from continuous_stream_service import get_stream_service
 from bonjour_audio_detector import get_detector
 
+try:
+    from realtime_mixer import RealtimeMixer, DetectionTap
+    HAS_REALTIME_MIXER = True
+except ImportError:  # numpy missing - fall back to per-utterance ffmpeg
+    HAS_REALTIME_MIXER = False
+
 class AudioService:
     """
     Unified audio service - handles all audio needs polymorphically
@@ -72,6 +78,10 @@ class AudioService:
         # Get the audio detector for transcription
         self.audio_detector = get_detector()
         
+        # Long-running mixer: background decoded once, reused for every utterance
+        self._mixer = None
+        self._mixer_lock = threading.Lock()
+        
         # Check for background music files
         if os.path.exists("game.wav"):
             self.background_music_path = "game.wav"
@@ -91,6 +101,8 @@ class AudioService:
             return f"Background music: {self.background_music_path or 'Not configured'}"
         
         if "mix" in q:
+            if HAS_REALTIME_MIXER:
+                return "I mix audio in real-time in-process (NumPy), ffmpeg as fallback"
             return "I can mix audio using ffmpeg or pydub"
         
         if "tts" in q or "speech" in q:
@@ -190,10 +202,68 @@ class AudioService:
         except Exception as e:
             announcer.announce("AudioService.ERROR", [f"Stream failed: {e}"])
     
+    def _get_mixer(self, background_music, acquire=False):
+        """
+        Get the long-running mixer for this background track (decodes once).
+        With acquire=True it is also acquired for one stream under the lock,
+        so it cannot be retired in between: the caller must release() it
+        """
+        if not HAS_REALTIME_MIXER:
+            return None
+        with self._mixer_lock:
+            if self._mixer is None or self._mixer.background_music != background_music:
+                try:
+                    old, self._mixer = self._mixer, RealtimeMixer(background_music)
+                except Exception as e:
+                    announcer.announce("AudioService.ERROR", [f"Realtime mixer unavailable: {e}"])
+                    return None
+                if old:
+                    old.close()  # closes once its last stream finishes
+            if acquire:
+                self._mixer.acquire()
+            return self._mixer
+    
+    def _stream_through_mixer(self, background_music, mix, fallback):
+        """
+        Stream mix(mixer) output, feeding the detector in batches; speech only if mixing fails.
+        The mixer is acquired once iteration starts, so a stream dropped unread holds nothing
+        """
+        mixer = self._get_mixer(background_music, acquire=True)
+        if mixer is None:
+            for chunk in fallback():
+                yield chunk
+            return
+        tap = DetectionTap(self.audio_detector.detection_queue)
+        try:
+            for chunk in mix(mixer):
+                tap.push(chunk)
+                yield chunk
+        except Exception as e:
+            announcer.announce("AudioService.ERROR", [f"Realtime mixing failed: {e}"])
+            # Fallback to just the speech
+            for chunk in fallback():
+                yield chunk
+        finally:
+            tap.flush()
+            mixer.release()
+    
     def _stream_mixed_tts(self, tts_generator, background_music,
                          music_offset=0.0, ducking=True, duck_level=0.15):
         """
         Stream mixed TTS generator with background music in real-time
+        Uses the in-process mixer; per-utterance ffmpeg only as a fallback
+        """
+        if self._get_mixer(background_music) is None:
+            return self._stream_mixed_tts_ffmpeg(tts_generator, background_music,
+                                                 music_offset, ducking, duck_level)
+        return self._stream_through_mixer(background_music, lambda mixer: mixer.mix_wav_stream(
+            tts_generator, music_offset=music_offset, ducking=ducking, duck_level=duck_level),
+            fallback=lambda: tts_generator)
+    
+    def _stream_mixed_tts_ffmpeg(self, tts_generator, background_music,
+                                 music_offset=0.0, ducking=True, duck_level=0.15):
+        """
+        Stream mixed TTS generator with background music in real-time
         NO TEMPORARY FILES - everything streams!
         """
         import subprocess
@@ -276,6 +346,19 @@ class AudioService:
     def _stream_mixed_audio(self, speech_audio, background_music, 
                            music_offset=0.0, ducking=True, duck_level=0.15):
         """
+        Stream mixed audio in real-time
+        Uses the in-process mixer; per-utterance ffmpeg only as a fallback
+        """
+        if self._get_mixer(background_music) is None:
+            return self._stream_mixed_audio_ffmpeg(speech_audio, background_music,
+                                                   music_offset, ducking, duck_level)
+        return self._stream_through_mixer(background_music, lambda mixer: mixer.mix_file(
+            speech_audio, music_offset=music_offset, ducking=ducking, duck_level=duck_level),
+            fallback=lambda: self._stream_file(speech_audio))
+    
+    def _stream_mixed_audio_ffmpeg(self, speech_audio, background_music, 
+                                   music_offset=0.0, ducking=True, duck_level=0.15):
+        """
         Stream mixed audio in real-time using ffmpeg pipes
         NO TEMPORARY FILES - direct streaming only!
         """
@@ -628,6 +711,10 @@ class AudioService:
     def cleanup(self):
         """Clean up temporary files"""
         import shutil
+        with self._mixer_lock:
+            if self._mixer:
+                self._mixer.close()  # streams still playing keep it until they finish
+                self._mixer = None
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
 
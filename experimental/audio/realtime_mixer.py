@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+realtime_mixer.py - Long-running in-process mixer for speech over background music
+
+The background track is decoded ONCE into a shared memory-mapped PCM buffer
+(anonymous mmap - nothing is written to disk). Speech frames are mixed and
+ducked in NumPy as they arrive, so there is no ffmpeg startup per utterance
+and no re-opening/seeking of the music file.
+
+⚠️ WARNING: DO NOT RECORD OR SAVE MIXED FILES! ⚠️
+- The mix is produced chunk by chunk and streamed straight out
+- The only buffer is the decoded background track, held in memory
+"""
+
+import io
+import mmap
+import wave
+import struct
+import subprocess
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from capability_announcer import announcer
+
+OUTPUT_RATE = 8000          # phone quality, same as the ffmpeg path
+FRAME_MS = 20               # ducking decisions are made per 20ms frame
+CHUNK_BYTES = 4096          # output chunk size, same as the ffmpeg path
+
+
+def wav_header(sample_rate: int = OUTPUT_RATE, data_size: int = 0xFFFFFFFF) -> bytes:
+    """Mono 16-bit WAV header (open-ended by default, like ffmpeg pipe output)"""
+    riff_size = 0xFFFFFFFF if data_size == 0xFFFFFFFF else 36 + data_size
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE', b'fmt ', 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b'data', data_size
+    )
+
+
+class StreamingResampler:
+    """Stateful linear resampler for int16 mono chunks"""
+
+    def __init__(self, src_rate: int, dst_rate: int = OUTPUT_RATE):
+        self.step = src_rate / dst_rate
+        self.pos = 0.0                      # next output position, in source samples
+        self.tail = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.step == 1.0:
+            return samples.astype(np.float32)
+        data = np.concatenate([self.tail, samples.astype(np.float32)])
+        if len(data) < 2:
+            self.tail = data
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(self.pos, len(data) - 1, self.step)
+        out = np.interp(positions, np.arange(len(data)), data).astype(np.float32)
+        next_pos = self.pos + len(positions) * self.step
+        keep_from = min(int(next_pos), len(data))
+        self.tail = data[keep_from:]
+        self.pos = next_pos - keep_from
+        return out
+
+
+class WavStreamDecoder:
+    """
+    Incremental WAV parser: feed raw bytes (e.g. espeak --stdout chunks),
+    get mono float32 samples at OUTPUT_RATE back.
+    """
+
+    def __init__(self):
+        self._pending = b''
+        self._in_data = False
+        self._channels = 1
+        self._resampler: Optional[StreamingResampler] = None
+        self._odd = b''
+
+    def feed(self, chunk: bytes) -> np.ndarray:
+        if not self._in_data:
+            self._pending += chunk
+            if not self._parse_header():
+                return np.zeros(0, dtype=np.float32)
+            chunk, self._pending = self._pending, b''
+        chunk = self._odd + chunk
+        frame_bytes = 2 * self._channels
+        usable = len(chunk) - (len(chunk) % frame_bytes)
+        self._odd = chunk[usable:]
+        samples = np.frombuffer(chunk[:usable], dtype='<i2')
+        if self._channels > 1:
+            samples = samples.reshape(-1, self._channels).mean(axis=1)
+        return self._resampler.process(samples)
+
+    def _parse_header(self) -> bool:
+        buf = self._pending
+        if len(buf) < 12:
+            return False
+        if buf[:4] != b'RIFF':
+            # Headerless input - assume 16-bit mono at output rate
+            self._resampler = StreamingResampler(OUTPUT_RATE)
+            self._in_data = True
+            return True
+        offset = 12
+        sample_rate = OUTPUT_RATE
+        while offset + 8 <= len(buf):
+            chunk_id, size = struct.unpack('<4sI', buf[offset:offset + 8])
+            if chunk_id == b'fmt ':
+                if offset + 8 + 16 > len(buf):
+                    return False
+                _, self._channels, sample_rate = struct.unpack('<HHI', buf[offset + 8:offset + 16])
+                offset += 8 + size
+            elif chunk_id == b'data':
+                self._resampler = StreamingResampler(sample_rate)
+                self._in_data = True
+                self._pending = buf[offset + 8:]
+                return True
+            else:
+                offset += 8 + size
+        return False
+
+
+def decode_to_pcm(path: str, sample_rate: int = OUTPUT_RATE) -> np.ndarray:
+    """
+    Decode an audio file to mono int16 at sample_rate.
+    WAV files are read directly; anything else goes through ONE ffmpeg run.
+    """
+    if path.lower().endswith('.wav'):
+        try:
+            with wave.open(path, 'rb') as wf:
+                if wf.getsampwidth() == 2:
+                    raw = wf.readframes(wf.getnframes())
+                    samples = np.frombuffer(raw, dtype='<i2')
+                    if wf.getnchannels() > 1:
+                        samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+                    resampled = StreamingResampler(wf.getframerate(), sample_rate).process(samples)
+                    return np.clip(resampled, -32768, 32767).astype(np.int16)
+        except wave.Error:
+            pass  # compressed/odd WAV - let ffmpeg handle it
+
+    cmd = ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le",
+           "-ac", "1", "-ar", str(sample_rate), "pipe:1"]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    return np.frombuffer(result.stdout, dtype='<i2').copy()
+
+
+class SharedPCMBuffer:
+    """Decoded background track held in an anonymous shared mmap"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = OUTPUT_RATE):
+        self.sample_rate = sample_rate
+        self.length = max(len(samples), 1)
+        self._mmap = mmap.mmap(-1, self.length * 2)
+        view = np.frombuffer(self._mmap, dtype=np.int16)
+        view[:len(samples)] = samples
+        del view
+        # Read-only view shared by every mix
+        self.samples = np.frombuffer(self._mmap, dtype=np.int16)
+        self.samples.flags.writeable = False
+
+    @classmethod
+    def from_file(cls, path: str, sample_rate: int = OUTPUT_RATE) -> "SharedPCMBuffer":
+        return cls(decode_to_pcm(path, sample_rate), sample_rate)
+
+    @property
+    def duration(self) -> float:
+        return self.length / self.sample_rate
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Read count samples from start, wrapping around (music loops)"""
+        start %= self.length
+        end = start + count
+        if end <= self.length:
+            return self.samples[start:end]
+        out = np.empty(count, dtype=np.int16)
+        first = self.length - start
+        out[:first] = self.samples[start:]
+        remaining = count - first
+        pos = 0
+        while remaining > 0:
+            take = min(remaining, self.length)
+            out[first + pos:first + pos + take] = self.samples[:take]
+            pos += take
+            remaining -= take
+        return out
+
+    def close(self):
+        """Unmap the track; only once no stream reads it (RealtimeMixer.release)"""
+        self.samples = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # a stray array view (e.g. held by a traceback) keeps the pages until collected
+
+
+class RealtimeMixer:
+    """
+    Mixes speech over a pre-decoded background track with envelope ducking.
+
+    Music sits at music_level between words and dips to duck_level while
+    speech is present; gain changes are ramped per frame to avoid clicks.
+
+    Streams hold the mixer with acquire()/release(); close() retires it and
+    the decoded track is unmapped when the last stream releases it.
+    """
+
+    def __init__(self, background_music: str, music_level: float = 0.35,
+                 speech_threshold: float = 300.0, release_frames: int = 8):
+        self.background_music = background_music
+        self.music_level = music_level
+        self.speech_threshold = speech_threshold
+        self.release_frames = release_frames
+        self.frame_samples = OUTPUT_RATE * FRAME_MS // 1000
+        self.buffer = SharedPCMBuffer.from_file(background_music)
+        self.lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+
+        announcer.announce("RealtimeMixer", [
+            f"Decoded '{background_music}' once ({self.buffer.duration:.1f}s, {OUTPUT_RATE}Hz)",
+            "Background held in shared memory - no per-utterance ffmpeg",
+            "Speech mixed and ducked in NumPy, streamed in real-time"
+        ])
+
+    def mix_stream(self, speech_chunks: Iterable[np.ndarray], music_offset: float = 0.0,
+                   ducking: bool = True, duck_level: float = 0.15,
+                   include_header: bool = True) -> Iterator[bytes]:
+        """
+        Mix float32 speech sample chunks (OUTPUT_RATE, mono) with the background.
+        Output ends with the speech (like amix duration=first).
+        """
+        if include_header:
+            yield wav_header()
+
+        music_pos = int(music_offset * OUTPUT_RATE)
+        gain = self.music_level
+        quiet_frames = self.release_frames
+        carry = np.zeros(0, dtype=np.float32)
+        out_buf = bytearray()
+
+        for speech in speech_chunks:
+            if len(speech) == 0:
+                continue
+            carry = np.concatenate([carry, speech]) if len(carry) else speech
+            whole = len(carry) - (len(carry) % self.frame_samples)
+            if whole == 0:
+                continue
+            block, carry = carry[:whole], carry[whole:]
+            mixed, music_pos, gain, quiet_frames = self._mix_block(
+                block, music_pos, gain, quiet_frames, ducking, duck_level)
+            out_buf += mixed
+            while len(out_buf) >= CHUNK_BYTES:
+                yield bytes(out_buf[:CHUNK_BYTES])
+                del out_buf[:CHUNK_BYTES]
+
+        if len(carry):
+            mixed, music_pos, gain, quiet_frames = self._mix_block(
+                carry, music_pos, gain, quiet_frames, ducking, duck_level)
+            out_buf += mixed
+        while out_buf:
+            yield bytes(out_buf[:CHUNK_BYTES])
+            del out_buf[:CHUNK_BYTES]
+
+    def _mix_block(self, speech: np.ndarray, music_pos: int, gain: float, quiet_frames: int,
+                   ducking: bool, duck_level: float) -> Tuple[bytes, int, float, int]:
+        n = len(speech)
+        music = self.buffer.read(music_pos, n).astype(np.float32)
+
+        if ducking:
+            frames = -(-n // self.frame_samples)
+            gains = np.empty(n, dtype=np.float32)
+            padded = np.zeros(frames * self.frame_samples, dtype=np.float32)
+            padded[:n] = speech
+            rms = np.sqrt(np.mean(padded.reshape(frames, -1) ** 2, axis=1))
+            for i in range(frames):
+                if rms[i] > self.speech_threshold:
+                    quiet_frames = 0
+                else:
+                    quiet_frames += 1
+                # Duck immediately on speech, hold through short pauses, then release
+                target = duck_level if quiet_frames < self.release_frames else self.music_level
+                start = i * self.frame_samples
+                stop = min(start + self.frame_samples, n)
+                gains[start:stop] = np.linspace(gain, target, stop - start, endpoint=False)
+                gain = target
+        else:
+            gains = self.music_level
+
+        mixed = np.clip(speech + music * gains, -32768, 32767).astype('<i2')
+        return mixed.tobytes(), music_pos + n, gain, quiet_frames
+
+    def mix_wav_stream(self, wav_chunks: Iterable[bytes], **kwargs) -> Iterator[bytes]:
+        """Mix a WAV byte stream (e.g. the TTS generator)"""
+        decoder = WavStreamDecoder()
+        return self.mix_stream((decoder.feed(chunk) for chunk in wav_chunks), **kwargs)
+
+    def mix_file(self, speech_audio: str, **kwargs) -> Iterator[bytes]:
+        """Mix a speech file (decoded in-process when it is a WAV)"""
+        speech = decode_to_pcm(speech_audio).astype(np.float32)
+        step = self.frame_samples * 25
+        return self.mix_stream((speech[i:i + step] for i in range(0, len(speech), step)), **kwargs)
+
+    def acquire(self) -> bool:
+        """Register a stream reading the track; False once the mixer is retired"""
+        with self.lock:
+            if self._retired:
+                return False
+            self._users += 1
+            return True
+
+    def release(self):
+        """A stream finished; the last one out of a retired mixer closes it"""
+        with self.lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self.buffer.close()
+
+    def close(self):
+        """Retire the mixer: closes now if idle, else when the last stream releases it"""
+        with self.lock:
+            if self._retired:
+                return
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self.buffer.close()
+
+
+class DetectionTap:
+    """
+    Forwards mixed audio to the detector in ~1s batches instead of per 4KB
+    chunk. Every batch is queued (waiting if the queue is bounded and full);
+    with max_backlog set, batches are dropped instead while the detector has
+    that many waiting.
+    """
+
+    def __init__(self, detection_queue, batch_bytes: int = OUTPUT_RATE * 2,
+                 max_backlog: Optional[int] = None):
+        self.detection_queue = detection_queue
+        self.batch_bytes = batch_bytes
+        self.max_backlog = max_backlog
+        self._buf = io.BytesIO()
+        self.dropped = 0
+
+    def push(self, chunk: bytes):
+        self._buf.write(chunk)
+        if self._buf.tell() >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        data = self._buf.getvalue()
+        self._buf = io.BytesIO()
+        if not data:
+            return
+        if self.max_backlog is not None and self.detection_queue.qsize() >= self.max_backlog:
+            self.dropped += 1
+            return
+        self.detection_queue.put(data)
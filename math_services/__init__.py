@@ -37,6 +37,7 @@ announcer.announce(
     [
         "Advanced statistical mathematical operations",
         "Gaussian kernel density estimation (KDE)",
+        "Gridded heatmap density via binned FFT KDE",
         "Statistical distributions and analysis", 
         "Data clustering algorithms",
         "Polymorphic ask/tell/do interface"
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Density Engine - Binned FFT kernel density estimation for heatmaps
+
+Handles:
+- Weighted 2D Gaussian KDE over a regular lat/lng grid
+- Scott / Silverman bandwidths measured in km (haversine-aware)
+- Fixed ground bandwidths (bandwidth_km) that stay circular on the map
+
+Points are linearly binned onto the grid nodes and convolved with a sampled
+Gaussian kernel via FFT, so cost is O(points + cells log cells) instead of
+gaussian_kde's O(points x cells). The grid is padded by the kernel radius so
+points just outside the map still bleed into it, as they do with gaussian_kde.
+
+Output matches the renderers' existing convention:
+
+    xx, yy = np.mgrid[lng_min:lng_max:100j, lat_min:lat_max:100j]
+    density = kernel(np.vstack([xx.ravel(), yy.ravel()])).T.reshape(xx.shape)
+
+i.e. density[i, j] is the value at (lng_i, lat_j), in units of 1/degree^2.
+"""
+
+import math
+from typing import Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from math_services.spatial_index import EARTH_RADIUS_KM
+
+try:
+    from scipy.signal import fftconvolve
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+# Kernel is truncated at this many standard deviations
+KERNEL_SIGMAS = 4.0
+# Never pad the grid by more than this many grid widths per side
+MAX_PAD_FACTOR = 4
+
+
+def km_per_degree(lat: float) -> Tuple[float, float]:
+    """(km per degree of longitude, km per degree of latitude) at a latitude"""
+    return KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6), KM_PER_DEGREE
+
+
+def _weighted_points(lats: Any, lngs: Any, weights: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lats = np.asarray(lats, dtype=float).ravel()
+    lngs = np.asarray(lngs, dtype=float).ravel()
+    if weights is None:
+        weights = np.ones(len(lats))
+    weights = np.asarray(weights, dtype=float).ravel()
+    ok = np.isfinite(lats) & np.isfinite(lngs) & np.isfinite(weights) & (weights > 0)
+    return lats[ok], lngs[ok], weights[ok]
+
+
+def select_bandwidth(lats: Any, lngs: Any, weights: Any = None, bw_method: Union[str, float] = 'scott',
+                     bandwidth_km: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Kernel standard deviation in km as (east-west, north-south).
+
+    Without bandwidth_km the spread of the points is measured in km along each
+    axis (longitude scaled by cos(latitude)) and shrunk by the Scott or
+    Silverman factor on the effective sample size - the same rule
+    gaussian_kde applies to the diagonal of its covariance.
+    A numeric bw_method is used directly as that factor.
+    """
+    if bandwidth_km is not None:
+        return float(bandwidth_km), float(bandwidth_km)
+
+    lats, lngs, weights = _weighted_points(lats, lngs, weights)
+    if len(lats) == 0:
+        return 0.0, 0.0
+    w = weights / weights.sum()
+    n_eff = 1.0 / np.sum(w ** 2)
+    if bw_method == 'scott':
+        factor = n_eff ** (-1.0 / 6.0)
+    elif bw_method == 'silverman':
+        factor = (n_eff * (2 + 2) / 4.0) ** (-1.0 / 6.0)
+    else:
+        factor = float(bw_method)
+
+    mean_lat = float(np.sum(w * lats))
+    km_x, km_y = km_per_degree(mean_lat)
+    x = (lngs - np.sum(w * lngs)) * km_x
+    y = (lats - mean_lat) * km_y
+    # Unbiased weighted variance, as numpy.cov(aweights=...) computes it
+    denom = max(1.0 - np.sum(w ** 2), 1e-12)
+    std_x = math.sqrt(np.sum(w * x ** 2) / denom)
+    std_y = math.sqrt(np.sum(w * y ** 2) / denom)
+    return std_x * factor, std_y * factor
+
+
+def _linear_bin(u: np.ndarray, v: np.ndarray, weights: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Spread each weight over its four surrounding grid nodes"""
+    nx, ny = shape
+    i0 = np.clip(np.floor(u).astype(np.int64), 0, nx - 2)
+    j0 = np.clip(np.floor(v).astype(np.int64), 0, ny - 2)
+    fu = u - i0
+    fv = v - j0
+    flat = i0 * ny + j0
+    grid = np.bincount(flat, weights * (1 - fu) * (1 - fv), minlength=nx * ny)
+    grid += np.bincount(flat + ny, weights * fu * (1 - fv), minlength=nx * ny)
+    grid += np.bincount(flat + 1, weights * (1 - fu) * fv, minlength=nx * ny)
+    grid += np.bincount(flat + ny + 1, weights * fu * fv, minlength=nx * ny)
+    return grid.reshape(shape)
+
+
+def _gaussian_kernel(half_x: int, half_y: int, sigma_x: float, sigma_y: float) -> np.ndarray:
+    """Sampled 2D Gaussian (in grid cells), normalised to sum to 1"""
+    ax = np.arange(-half_x, half_x + 1) / sigma_x
+    ay = np.arange(-half_y, half_y + 1) / sigma_y
+    kernel = np.outer(np.exp(-0.5 * ax ** 2), np.exp(-0.5 * ay ** 2))
+    return kernel / kernel.sum()
+
+
+def _fft_convolve_valid(grid: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    if HAS_SCIPY:
+        return fftconvolve(grid, kernel, mode='valid')
+    full = (grid.shape[0] + kernel.shape[0] - 1, grid.shape[1] + kernel.shape[1] - 1)
+    out = np.fft.irfft2(np.fft.rfft2(grid, full) * np.fft.rfft2(kernel, full), full)
+    sx, sy = kernel.shape[0] - 1, kernel.shape[1] - 1
+    return out[sx:grid.shape[0], sy:grid.shape[1]]
+
+
+def density_grid(lats: Any, lngs: Any, weights: Any = None,
+                 lat_range: Tuple[float, float] = (32.5, 34.5),
+                 lng_range: Tuple[float, float] = (-119.0, -116.0),
+                 size: Union[int, Sequence[int]] = 100,
+                 bw_method: Union[str, float] = 'scott',
+                 bandwidth_km: Optional[float] = None) -> np.ndarray:
+    """
+    Weighted Gaussian KDE evaluated on the mgrid nodes spanning lng_range x
+    lat_range. size is the node count per axis, or (n_lng, n_lat).
+    Returns an (n_lng, n_lat) array laid out like the mgrid (see module doc).
+    """
+    nx, ny = (size, size) if np.isscalar(size) else (int(size[0]), int(size[1]))
+    nx, ny = max(int(nx), 2), max(int(ny), 2)
+    lng_min, lng_max = map(float, lng_range)
+    lat_min, lat_max = map(float, lat_range)
+    dx = (lng_max - lng_min) / (nx - 1)
+    dy = (lat_max - lat_min) / (ny - 1)
+
+    lats, lngs, weights = _weighted_points(lats, lngs, weights)
+    total = float(weights.sum())
+    if total <= 0:
+        return np.zeros((nx, ny))
+
+    # Bandwidth: km -> degrees (cos(lat) at the centre of the points) -> grid cells
+    sigma_km_x, sigma_km_y = select_bandwidth(lats, lngs, weights, bw_method, bandwidth_km)
+    km_x, km_y = km_per_degree(float(np.average(lats, weights=weights)))
+    # Degenerate spread (one point, or all co-located): fall back to one cell
+    sigma_x = max(sigma_km_x / km_x / dx, 1.0) if sigma_km_x > 0 else 1.0
+    sigma_y = max(sigma_km_y / km_y / dy, 1.0) if sigma_km_y > 0 else 1.0
+
+    pad_x = min(int(math.ceil(KERNEL_SIGMAS * sigma_x)), MAX_PAD_FACTOR * nx)
+    pad_y = min(int(math.ceil(KERNEL_SIGMAS * sigma_y)), MAX_PAD_FACTOR * ny)
+    shape = (nx + 2 * pad_x, ny + 2 * pad_y)
+
+    # Grid coordinates in cells, relative to the padded origin
+    u = (lngs - lng_min) / dx + pad_x
+    v = (lats - lat_min) / dy + pad_y
+    inside = (u >= 0) & (u <= shape[0] - 1) & (v >= 0) & (v <= shape[1] - 1)
+    binned = _linear_bin(u[inside], v[inside], weights[inside], shape)
+
+    kernel = _gaussian_kernel(pad_x, pad_y, sigma_x, sigma_y)
+    density = _fft_convolve_valid(binned, kernel)
+    # FFT round-off can leave tiny negatives in empty regions
+    np.maximum(density, 0.0, out=density)
+    return density / (total * dx * dy)
+
+
+def density_from_points(points: Sequence[Sequence[float]], **kwargs) -> np.ndarray:
+    """density_grid for [(lat, lng), ...] or [(lat, lng, weight), ...]"""
+    arr = np.asarray(points, dtype=float)
+    if arr.ndim != 2 or arr.shape[0] == 0:
+        size = kwargs.get('size', 100)
+        nx, ny = (size, size) if np.isscalar(size) else size
+        return np.zeros((int(nx), int(ny)))
+    weights = arr[:, 2] if arr.shape[1] > 2 else None
+    return density_grid(arr[:, 0], arr[:, 1], weights, **kwargs)
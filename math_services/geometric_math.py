@@ -7,6 +7,9 @@ Handles:
 - Spatial relationships and proximity
 - Geographic coordinate transformations
 - Geometric shape analysis
+
+Proximity queries and clustering go through SpatialIndex (KD-tree / grid),
+so they scale to tens of thousands of venue coordinates.
 """
 
 import sys
@@ -17,6 +20,7 @@ import json
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from polymorphic_core import announcer
+from math_services.spatial_index import SpatialIndex, labels_to_clusters
 
 
 class GeometricMathService:
@@ -91,6 +95,10 @@ class GeometricMathService:
             return self._find_nearest(data, **kwargs)
         elif 'cluster' in action_lower:
             return self._spatial_clustering(data, **kwargs)
+        elif 'index' in action_lower:
+            # Prebuilt index, reusable via ask(..., index=...)
+            points, _ = self._extract_points(data)
+            return SpatialIndex(points, metric=kwargs.get('metric', 'haversine'))
         else:
             return f"Unknown geometric action: {action}"
     
@@ -161,8 +169,35 @@ class GeometricMathService:
             'method': 'haversine'
         }
     
+    def _extract_points(self, data: Any) -> Tuple[List[Tuple[float, float]], List[int]]:
+        """Coordinates from tuples or objects with lat/lng, plus their positions in data"""
+        points, positions = [], []
+        for i, item in enumerate(data or []):
+            if isinstance(item, (list, tuple)) and len(item) >= 2:
+                points.append((float(item[0]), float(item[1])))
+                positions.append(i)
+            elif hasattr(item, 'lat') and hasattr(item, 'lng'):
+                if item.lat is not None and item.lng is not None:
+                    points.append((float(item.lat), float(item.lng)))
+                    positions.append(i)
+        return points, positions
+    
+    def _get_index(self, data: Any, metric: str,
+                   index: Optional[SpatialIndex] = None) -> Tuple[Optional[SpatialIndex], List[int]]:
+        """Use a prebuilt index when given, otherwise build one for this call"""
+        points, positions = self._extract_points(data)
+        if index is not None and index.metric == metric and len(index) == len(points):
+            return index, positions
+        if not points:
+            return None, positions
+        return SpatialIndex(points, metric=metric), positions
+    
     def _find_nearest(self, data: Any, **kwargs) -> Dict[str, Any]:
-        """Find nearest points to a reference point"""
+        """
+        Find the k nearest points to a reference point.
+        metric='haversine' (default): lat/lng degrees, distance in km
+        metric='euclidean': distance in coordinate units
+        """
         if not data:
             return {}
         
@@ -170,94 +205,80 @@ class GeometricMathService:
         if not reference:
             return {'error': 'No reference point provided'}
         
-        distances = []
-        for i, point in enumerate(data):
-            if isinstance(point, (list, tuple)) and len(point) >= 2:
-                dist = self._euclidean_distance([reference, point[:2]])
-                distances.append((i, point, dist))
-        
-        # Sort by distance
-        distances.sort(key=lambda x: x[2])
-        
+        metric = kwargs.get('metric', 'haversine')
         count = kwargs.get('count', 5)  # Return top 5 by default
-        nearest = distances[:count]
+        
+        index, positions = self._get_index(data, metric, kwargs.get('index'))
+        nearest = []
+        if index is not None:
+            idx, dist = index.nearest(reference, count)
+            nearest = [{'index': positions[i], 'point': data[positions[i]], 'distance': float(d)}
+                       for i, d in zip(idx.tolist(), dist.tolist())]
         
         return {
             'reference': reference,
-            'nearest': [{'index': i, 'point': pt, 'distance': dist} for i, pt, dist in nearest],
+            'nearest': nearest,
+            'metric': metric,
+            'unit': 'km' if metric == 'haversine' else 'coordinate',
             'total_analyzed': len(data)
         }
     
     def _within_radius(self, data: Any, **kwargs) -> List[Dict[str, Any]]:
-        """Find points within a specified radius"""
+        """
+        Find points within a radius of a center point, nearest first.
+        metric='haversine' (default): radius in km
+        metric='euclidean': radius in coordinate units
+        """
         if not data:
             return []
         
         center = kwargs.get('center') or kwargs.get('reference')
         radius = kwargs.get('radius', 1.0)
+        metric = kwargs.get('metric', 'haversine')
         
         if not center:
             return []
         
-        within = []
-        for i, point in enumerate(data):
-            if isinstance(point, (list, tuple)) and len(point) >= 2:
-                dist = self._euclidean_distance([center, point[:2]])
-                if dist <= radius:
-                    within.append({
-                        'index': i,
-                        'point': point,
-                        'distance': dist
-                    })
-        
-        return within
+        index, positions = self._get_index(data, metric, kwargs.get('index'))
+        if index is None:
+            return []
+        
+        idx, dist = index.within(center, radius)
+        return [{'index': positions[i], 'point': data[positions[i]], 'distance': float(d)}
+                for i, d in zip(idx.tolist(), dist.tolist())]
     
     def _spatial_clustering(self, data: Any, **kwargs) -> Dict[str, Any]:
-        """Simple spatial clustering based on proximity"""
+        """
+        DBSCAN-style proximity clustering.
+        Points within threshold of each other share a cluster (transitively through
+        core points with >= min_samples neighbours). With metric='haversine' the
+        threshold is in km; by default it is in coordinate units.
+        """
         if not data:
             return {'clusters': []}
         
         threshold = kwargs.get('threshold', 0.1)  # Distance threshold
-        points = []
+        metric = kwargs.get('metric', 'euclidean')
+        min_samples = kwargs.get('min_samples', 1)
         
-        # Extract points
-        for item in data:
-            if isinstance(item, (list, tuple)) and len(item) >= 2:
-                points.append((float(item[0]), float(item[1])))
-            elif hasattr(item, 'lat') and hasattr(item, 'lng'):
-                points.append((float(item.lat), float(item.lng)))
-        
-        if not points:
+        index, positions = self._get_index(data, metric, kwargs.get('index'))
+        if index is None:
             return {'clusters': []}
         
-        clusters = []
-        used = [False] * len(points)
-        
-        for i, point in enumerate(points):
-            if used[i]:
-                continue
-            
-            # Start new cluster
-            cluster = [i]
-            used[i] = True
-            
-            # Find nearby points
-            for j, other_point in enumerate(points):
-                if used[j]:
-                    continue
-                
-                dist = self._euclidean_distance([point, other_point])
-                if dist <= threshold:
-                    cluster.append(j)
-                    used[j] = True
-            
-            clusters.append(cluster)
+        clusters, noise = labels_to_clusters(index.cluster(threshold, min_samples))
+        # Positions in the caller's data, as _find_nearest and _within_radius report them
+        clusters = [[positions[i] for i in cluster] for cluster in clusters]
+        noise = [positions[i] for i in noise]
         
         return {
             'clusters': clusters,
+            'noise': noise,
             'cluster_count': len(clusters),
-            'points_analyzed': len(points),
-            'method': 'proximity',
+            'points_analyzed': len(index),
+            'method': 'dbscan',
+            'backend': index.backend,
+            'metric': metric,
+            'min_samples': min_samples,
             'threshold': threshold
         }
     
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Spatial Index - Sub-quadratic proximity queries over coordinate arrays
+
+Handles:
+- Radius queries and k-nearest neighbours
+- DBSCAN-style proximity clustering
+- Haversine space (lat/lng in degrees, distances in km) or plain Euclidean
+
+Backed by scipy's cKDTree when available, otherwise a uniform grid in NumPy.
+Haversine points are mapped onto the unit sphere, where straight-line (chord)
+distance is monotonic in great-circle distance, so both backends stay exact.
+"""
+
+import math
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+try:
+    from scipy.spatial import cKDTree
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+def to_unit_sphere(latlng: np.ndarray) -> np.ndarray:
+    """(n, 2) lat/lng degrees -> (n, 3) unit vectors"""
+    lat = np.radians(latlng[:, 0])
+    lng = np.radians(latlng[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def km_to_chord(km: float) -> float:
+    """Great-circle distance (km) -> chord length on the unit sphere"""
+    return 2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Vectorised haversine distance in km"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class _GridBackend:
+    """Uniform grid over the embedded points (NumPy-only fallback for cKDTree)"""
+
+    def __init__(self, coords: np.ndarray, cell_size: Optional[float] = None):
+        self.coords = coords
+        n, dims = coords.shape
+        self.origin = coords.min(axis=0) if n else np.zeros(dims)
+        if cell_size is None:
+            extent = float(np.max(coords.max(axis=0) - self.origin)) if n else 1.0
+            # ~2 points per cell along the populated dimensions
+            cell_size = max(extent / max(n ** (1.0 / dims) / 2.0, 1.0), 1e-9)
+        self.cell_size = cell_size
+        self._cells = self._bucket(cell_size)
+
+    def _bucket(self, cell_size: float):
+        keys = np.floor((self.coords - self.origin) / cell_size).astype(np.int64)
+        order = np.lexsort(keys.T[::-1])
+        sorted_keys = keys[order]
+        cells = {}
+        if len(order):
+            breaks = np.flatnonzero(np.any(np.diff(sorted_keys, axis=0) != 0, axis=1)) + 1
+            starts = np.concatenate(([0], breaks))
+            ends = np.concatenate((breaks, [len(order)]))
+            for s, e in zip(starts, ends):
+                cells[tuple(sorted_keys[s])] = order[s:e]
+        return cells
+
+    def _cells_near(self, center: np.ndarray, r: float, cells=None, cell_size=None):
+        cells = self._cells if cells is None else cells
+        cell_size = self.cell_size if cell_size is None else cell_size
+        lo = np.floor((center - r - self.origin) / cell_size).astype(np.int64)
+        hi = np.floor((center + r - self.origin) / cell_size).astype(np.int64)
+        span = int(np.prod(hi - lo + 1))
+        if span > len(cells):
+            # Query box covers more cells than exist - just walk the occupied ones
+            return [idx for key, idx in cells.items()
+                    if np.all(np.asarray(key) >= lo) and np.all(np.asarray(key) <= hi)]
+        grids = np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(lo, hi)], indexing='ij')
+        found = []
+        for key in zip(*(g.ravel() for g in grids)):
+            idx = cells.get(tuple(int(k) for k in key))
+            if idx is not None:
+                found.append(idx)
+        return found
+
+    def query_ball_point(self, center: np.ndarray, r: float) -> np.ndarray:
+        groups = self._cells_near(center, r)
+        if not groups:
+            return np.zeros(0, dtype=np.int64)
+        candidates = np.concatenate(groups)
+        d = np.linalg.norm(self.coords[candidates] - center, axis=1)
+        return candidates[d <= r]
+
+    def query(self, center: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(self.coords)
+        k = min(k, n)
+        r = self.cell_size
+        while True:
+            idx = self.query_ball_point(center, r)
+            if len(idx) >= k or len(idx) == n:
+                d = np.linalg.norm(self.coords[idx] - center, axis=1)
+                top = np.argsort(d, kind='stable')[:k]
+                return d[top], idx[top]
+            r *= 2.0
+
+    def query_pairs(self, r: float) -> np.ndarray:
+        """All (i, j), i < j, with distance <= r - neighbouring cells only"""
+        cells = self._bucket(max(r, 1e-12))
+        dims = self.coords.shape[1]
+        offsets = np.array(np.meshgrid(*[[-1, 0, 1]] * dims, indexing='ij')).reshape(dims, -1).T
+        pairs = []
+        for key, idx in cells.items():
+            base = np.asarray(key)
+            for off in offsets:
+                other_key = tuple(int(v) for v in base + off)
+                if other_key < key:
+                    continue  # each cell pair handled once
+                other = cells.get(other_key)
+                if other is None:
+                    continue
+                d = np.linalg.norm(self.coords[idx][:, None, :] - self.coords[other][None, :, :], axis=2)
+                ii, jj = np.nonzero(d <= r)
+                a, b = idx[ii], other[jj]
+                keep = a < b if other_key == key else a != b
+                a, b = a[keep], b[keep]
+                pairs.append(np.column_stack((np.minimum(a, b), np.maximum(a, b))))
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+
+def _components(n: int, edges: np.ndarray) -> np.ndarray:
+    """Connected component label per node"""
+    if HAS_SCIPY:
+        graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(n, n))
+        return connected_components(graph, directed=False)[1]
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in edges:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.array([find(i) for i in range(n)])
+
+
+class SpatialIndex:
+    """
+    Proximity index over (lat, lng) or (x, y) points.
+
+    metric='haversine': inputs are degrees, radii/distances are km
+    metric='euclidean': radii/distances are in the input units
+    """
+
+    def __init__(self, points: Any, metric: str = 'haversine', backend: Optional[str] = None):
+        coords = np.asarray(points, dtype=float).reshape(-1, 2) if len(points) else np.zeros((0, 2))
+        self.points = coords
+        self.metric = metric
+        self._embedded = to_unit_sphere(coords) if metric == 'haversine' else coords
+        backend = backend or ('kdtree' if HAS_SCIPY else 'grid')
+        self.backend = backend
+        if backend == 'kdtree':
+            self._tree = cKDTree(self._embedded)
+        else:
+            self._tree = _GridBackend(self._embedded)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _to_internal(self, distance: float) -> float:
+        return km_to_chord(distance) if self.metric == 'haversine' else distance
+
+    def _from_internal(self, distances: np.ndarray) -> np.ndarray:
+        return chord_to_km(distances) if self.metric == 'haversine' else distances
+
+    def _embed(self, center: Sequence[float]) -> np.ndarray:
+        c = np.asarray(center, dtype=float)[:2].reshape(1, 2)
+        return (to_unit_sphere(c) if self.metric == 'haversine' else c)[0]
+
+    def within(self, center: Sequence[float], radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of points within radius, nearest first"""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        c = self._embed(center)
+        idx = np.asarray(self._tree.query_ball_point(c, self._to_internal(radius)), dtype=np.int64)
+        d = np.linalg.norm(self._embedded[idx] - c, axis=1)
+        order = np.argsort(d, kind='stable')
+        return idx[order], self._from_internal(d[order])
+
+    def nearest(self, center: Sequence[float], k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest points as (indices, distances)"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        d, idx = self._tree.query(self._embed(center), k=k)
+        idx = np.atleast_1d(np.asarray(idx, dtype=np.int64))
+        d = np.atleast_1d(np.asarray(d, dtype=float))
+        return idx, self._from_internal(d)
+
+    def pairs(self, radius: float) -> np.ndarray:
+        """(m, 2) array of index pairs i < j within radius of each other"""
+        if len(self) < 2:
+            return np.zeros((0, 2), dtype=np.int64)
+        r = self._to_internal(radius)
+        if self.backend == 'kdtree':
+            return self._tree.query_pairs(r, output_type='ndarray').astype(np.int64)
+        return self._tree.query_pairs(r)
+
+    def cluster(self, eps: float, min_samples: int = 1) -> np.ndarray:
+        """
+        DBSCAN-style labels: points within eps are neighbours, clusters grow
+        through core points (>= min_samples neighbours incl. self). Noise is -1.
+        Labels are numbered in order of each cluster's lowest index.
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        edges = self.pairs(eps)
+        counts = np.bincount(edges.ravel(), minlength=n) + 1
+        core = counts >= min_samples
+
+        core_edges = edges[core[edges[:, 0]] & core[edges[:, 1]]]
+        comp = _components(n, core_edges)
+        labels = np.where(core, comp, -1)
+
+        # Border points join the cluster of their first core neighbour
+        border = edges[core[edges[:, 0]] ^ core[edges[:, 1]]]
+        if len(border):
+            core_side = np.where(core[border[:, 0]], border[:, 0], border[:, 1])
+            other_side = np.where(core[border[:, 0]], border[:, 1], border[:, 0])
+            order = np.lexsort((core_side, other_side))
+            other_sorted, core_sorted = other_side[order], core_side[order]
+            first = np.concatenate(([True], other_sorted[1:] != other_sorted[:-1]))
+            labels[other_sorted[first]] = comp[core_sorted[first]]
+
+        # Renumber 0..k-1 by first appearance
+        valid = labels >= 0
+        if not valid.any():
+            return labels
+        uniq, first_pos = np.unique(labels[valid], return_index=True)
+        rank = np.empty(len(uniq), dtype=np.int64)
+        rank[np.argsort(first_pos)] = np.arange(len(uniq))
+        out = np.full(n, -1, dtype=np.int64)
+        out[valid] = rank[np.searchsorted(uniq, labels[valid])]
+        return out
+
+
+def labels_to_clusters(labels: np.ndarray) -> Tuple[list, list]:
+    """Labels -> ([[indices of cluster 0], ...], [noise indices])"""
+    clusters = [[] for _ in range(int(labels.max()) + 1 if len(labels) and labels.max() >= 0 else 0)]
+    noise = []
+    for i, label in enumerate(labels.tolist()):
+        if label < 0:
+            noise.append(i)
+        else:
+            clusters[label].append(i)
+    return clusters, noise
@@ -4,6 +4,7 @@ Statistical Math Service - Advanced statistical operations
 
 Handles:
 - Gaussian kernel density estimation (KDE)
+- Gridded heatmap density (binned FFT KDE)
 - Statistical distributions and analysis
 - Clustering algorithms
 - Regression analysis
@@ -28,8 +29,12 @@ class StatisticalMathService:
         """Process statistical queries"""
         query_lower = query.lower().strip()
         
+        # Gridded density for heatmaps
+        if 'density' in query_lower and 'grid' in query_lower:
+            return self._density_grid(data, **kwargs)
+        
         # Gaussian KDE operations
-        if 'gaussian' in query_lower and 'kde' in query_lower:
+        elif 'gaussian' in query_lower and 'kde' in query_lower:
             return self._gaussian_kde(data, **kwargs)
         elif 'kde' in query_lower:
             return self._gaussian_kde(data, **kwargs)
@@ -71,7 +76,9 @@ class StatisticalMathService:
         action_lower = action.lower().strip()
         
         if 'calculate' in action_lower:
-            if 'kde' in action_lower:
+            if 'density' in action_lower and 'grid' in action_lower:
+                return self._density_grid(data, **kwargs)
+            elif 'kde' in action_lower:
                 return self._gaussian_kde(data, **kwargs)
             elif 'distribution' in action_lower:
                 return self._analyze_distribution(data, **kwargs)
@@ -119,6 +126,19 @@ class StatisticalMathService:
         # Return the KDE object for further use
         return kde
     
+    def _density_grid(self, data: Any, **kwargs) -> Any:
+        """
+        Heatmap density on a regular lat/lng grid.
+        data: [(lat, lng), ...] or [(lat, lng, weight), ...]
+        kwargs: lat_range, lng_range, size, bw_method, bandwidth_km
+        Returns an (n_lng, n_lat) numpy array laid out like np.mgrid[lng, lat].
+        """
+        from math_services.density_engine import density_from_points
+        
+        if not data:
+            return None
+        return density_from_points(data, **kwargs)
+    
     def _cluster_data(self, data: Any, **kwargs) -> Dict[str, Any]:
         """
         Simple clustering analysis.
@@ -138,39 +158,22 @@ class StatisticalMathService:
         return {'clusters': [], 'method': 'simple'}
     
     def _simple_2d_clustering(self, points: List[Tuple[float, float]], **kwargs) -> Dict[str, Any]:
-        """Simple 2D clustering algorithm"""
+        """Proximity clustering of 2D points via the shared spatial index"""
         if not points:
             return {'clusters': []}
         
+        from math_services.spatial_index import SpatialIndex, labels_to_clusters
+        
         threshold = kwargs.get('threshold', 0.1)  # Distance threshold
-        clusters = []
-        used = [False] * len(points)
-        
-        for i, point in enumerate(points):
-            if used[i]:
-                continue
-                
-            # Start new cluster
-            cluster = [i]
-            used[i] = True
-            
-            # Find nearby points
-            for j, other_point in enumerate(points):
-                if used[j]:
-                    continue
-                    
-                # Simple Euclidean distance
-                dist = ((point[0] - other_point[0])**2 + (point[1] - other_point[1])**2)**0.5
-                if dist < threshold:
-                    cluster.append(j)
-                    used[j] = True
-            
-            clusters.append(cluster)
+        metric = kwargs.get('metric', 'euclidean')
+        index = SpatialIndex([p[:2] for p in points], metric=metric)
+        clusters, noise = labels_to_clusters(index.cluster(threshold, kwargs.get('min_samples', 1)))
         
         return {
             'clusters': clusters,
+            'noise': noise,
             'cluster_count': len(clusters),
-            'method': 'simple_distance',
+            'method': 'dbscan',
             'threshold': threshold
         }
     
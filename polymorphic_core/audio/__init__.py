@@ -9,6 +9,7 @@ from .audio_request import PolymorphicAudioRequest
 from .opus_decoder import PolymorphicOpusDecoder
 from .transcription import PolymorphicTranscription
 from .tts_service import PolymorphicTTSService
+from .tts_engine import TTSEngine, get_tts_engine
 
 __all__ = [
     'PolymorphicAudioPlayer',
@@ -16,5 +17,7 @@ __all__ = [
     'PolymorphicAudioRequest',
     'PolymorphicOpusDecoder',
     'PolymorphicTranscription',
-    'PolymorphicTTSService'
+    'PolymorphicTTSService',
+    'TTSEngine',
+    'get_tts_engine'
 ]
\ No newline at end of file
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+tts_engine.py - Persistent TTS engine with an on-disk phrase cache
+
+Bot responses repeat a lot ("Tournament tracker ready!", top-8 readouts), so:
+- Phrase cache: content-addressed (text + voice + format) audio on disk, LRU by bytes
+- Worker pool: long-lived synthesis workers instead of one espeak fork per utterance
+- Streaming: chunks are yielded as they are synthesized, so the first frame
+  goes out before the whole utterance is done
+
+Backends:
+- libespeak-ng / libespeak loaded in-process via ctypes (no fork per call)
+- espeak CLI streamed through a pipe (fallback when the library is missing)
+"""
+
+import os
+import io
+import time
+import queue
+import struct
+import ctypes
+import ctypes.util
+import hashlib
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import audioop  # stdlib until 3.13, used for µ-law conversion
+    HAS_AUDIOOP = True
+except ImportError:
+    HAS_AUDIOOP = False
+
+
+# espeak CLI flags per voice type: -s speed, -p pitch, -g word gap (10ms units)
+VOICE_PARAMS = {
+    'normal': {'rate': 175, 'pitch': 50, 'gap': 2},
+    'robot': {'rate': 160, 'pitch': 35, 'gap': 5},
+    'excited': {'rate': 190, 'pitch': 60, 'gap': 1},
+    'calm': {'rate': 150, 'pitch': 40, 'gap': 3},
+}
+
+ESPEAK_SAMPLE_RATE = 22050   # espeak native output, 16-bit mono
+ULAW_SAMPLE_RATE = 8000      # telephony (Twilio IVR)
+FORMATS = ('wav', 'pcm', 'ulaw')
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'cache', 'tts'
+)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_SIZE = 4096
+
+
+def voice_params(voice_type: str) -> Dict[str, int]:
+    """Resolve a voice type to espeak parameters (unknown voices fall back to normal)"""
+    return VOICE_PARAMS.get((voice_type or 'normal').lower(), VOICE_PARAMS['normal'])
+
+
+def wav_header(data_size: int, sample_rate: int = ESPEAK_SAMPLE_RATE,
+               channels: int = 1, bits: int = 16, audio_format: int = 1) -> bytes:
+    """Build a RIFF/WAVE header. Use data_size=0xFFFFFFFF for open-ended streams."""
+    block_align = channels * bits // 8
+    riff_size = 0xFFFFFFFF if data_size == 0xFFFFFFFF else 36 + data_size
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, audio_format, channels, sample_rate,
+        sample_rate * block_align, block_align, bits,
+        b'data', data_size
+    )
+
+
+class TTSPhraseCache:
+    """
+    Content-addressed on-disk audio cache, evicted LRU by total bytes.
+
+    Entries live at <cache_dir>/<key[:2]>/<key> (no extension: the format is
+    part of the key); the key is the SHA-256 of text + voice + format, so
+    identical phrases are synthesized once.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice_type: str, fmt: str) -> str:
+        payload = f"{(voice_type or 'normal').lower()}\x00{fmt}\x00{text}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk (oldest mtime first)"""
+        found = []
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith('.tmp'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(shard_dir, name))
+                except OSError:
+                    continue
+                found.append((st.st_mtime, name, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return the file path for a cached entry and mark it recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path, None)  # keeps LRU order across restarts
+        except OSError:
+            pass
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def put(self, key: str, data: bytes):
+        """Store an entry atomically (write to .tmp, then rename)"""
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._entries)
+            for key in list(self._entries):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total * 100) if total else 0.0,
+                'cache_dir': self.cache_dir
+            }
+
+
+class _LibEspeakBackend:
+    """
+    In-process espeak via ctypes. The library keeps global state, so one
+    process-wide lock serializes synthesis; no fork happens per utterance.
+    """
+
+    AUDIO_OUTPUT_SYNCHRONOUS = 2
+    POS_CHARACTER = 1
+    ESPEAK_CHARS_UTF8 = 1
+    ESPEAK_RATE, ESPEAK_PITCH, ESPEAK_WORDGAP = 1, 3, 7
+
+    _lib = None
+    _sample_rate = ESPEAK_SAMPLE_RATE
+    _load_lock = threading.Lock()
+    _synth_lock = threading.Lock()
+    _callback = None
+    _emit: Optional[Callable[[bytes], None]] = None
+
+    SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short),
+                                      ctypes.c_int, ctypes.c_void_p)
+
+    name = 'libespeak'
+
+    @classmethod
+    def load(cls) -> bool:
+        """Load and initialize the library once per process"""
+        with cls._load_lock:
+            if cls._lib is not None:
+                return True
+            for libname in ('espeak-ng', 'espeak'):
+                path = ctypes.util.find_library(libname)
+                if not path:
+                    continue
+                try:
+                    lib = ctypes.CDLL(path)
+                    rate = lib.espeak_Initialize(cls.AUDIO_OUTPUT_SYNCHRONOUS, 100, None, 0)
+                except (OSError, AttributeError):
+                    continue
+                if rate <= 0:
+                    continue
+                cls._callback = cls.SYNTH_CALLBACK(cls._on_samples)
+                lib.espeak_SetSynthCallback(cls._callback)
+                lib.espeak_Synth.argtypes = [
+                    ctypes.c_char_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+                    ctypes.c_uint, ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p
+                ]
+                cls._lib = lib
+                cls._sample_rate = rate
+                return True
+            return False
+
+    @classmethod
+    def _on_samples(cls, wav, num_samples, events):
+        if wav and num_samples > 0 and cls._emit is not None:
+            cls._emit(ctypes.string_at(wav, num_samples * 2))
+        return 0
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    def synthesize(self, text: str, params: Dict[str, int], emit: Callable[[bytes], None]):
+        lib = self._lib
+        encoded = text.encode('utf-8') + b'\x00'
+        with self._synth_lock:
+            lib.espeak_SetParameter(self.ESPEAK_RATE, params['rate'], 0)
+            lib.espeak_SetParameter(self.ESPEAK_PITCH, params['pitch'], 0)
+            lib.espeak_SetParameter(self.ESPEAK_WORDGAP, params['gap'], 0)
+            type(self)._emit = emit
+            try:
+                lib.espeak_Synth(encoded, len(encoded), 0, self.POS_CHARACTER, 0,
+                                 self.ESPEAK_CHARS_UTF8, None, None)
+            finally:
+                type(self)._emit = None
+
+
+class _SubprocessEspeakBackend:
+    """Fallback: espeak CLI with stdout read incrementally (header stripped)"""
+
+    name = 'espeak-cli'
+    sample_rate = ESPEAK_SAMPLE_RATE
+
+    def synthesize(self, text: str, params: Dict[str, int], emit: Callable[[bytes], None]):
+        cmd = ['espeak', '-s', str(params['rate']), '-p', str(params['pitch']),
+               '-g', str(params['gap']), '--stdout', text]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            header = proc.stdout.read(44)
+            if len(header) == 44 and header[:4] == b'RIFF':
+                self.sample_rate = struct.unpack('<I', header[24:28])[0]
+            elif header:
+                emit(header)
+            while True:
+                chunk = proc.stdout.read1(STREAM_CHUNK_SIZE) if hasattr(proc.stdout, 'read1') \
+                    else proc.stdout.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                emit(chunk)
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(f"espeak exited with {proc.returncode}")
+
+
+def _make_backend():
+    if _LibEspeakBackend.load():
+        return _LibEspeakBackend()
+    return _SubprocessEspeakBackend()
+
+
+_DONE = object()
+
+
+class SynthesisWorkerPool:
+    """
+    Long-lived synthesis workers. Each job streams raw 16-bit PCM chunks into
+    its own queue, terminated by _DONE (or an Exception instance).
+
+    With the libespeak backend the workers only overlap queueing and
+    encoding: the library has global state, so _LibEspeakBackend._synth_lock
+    lets one utterance synthesize at a time, process-wide. The espeak CLI
+    fallback runs a process per job and does synthesize in parallel.
+    """
+
+    def __init__(self, workers: int = 2, backend_factory: Callable[[], Any] = _make_backend):
+        self.workers = max(1, workers)
+        self._backend_factory = backend_factory
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.backend_name = None
+        self._sample_rate = None  # as reported by the backends (the CLI parses it from the WAV header)
+        self.completed = 0
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker_loop, name=f"tts-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def shutdown(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            for _ in self._threads:
+                self._jobs.put(None)
+            threads, self._threads = self._threads, []
+        for t in threads:
+            t.join(timeout=5)
+
+    def submit(self, text: str, params: Dict[str, int]) -> "queue.Queue":
+        self.start()
+        out: "queue.Queue" = queue.Queue()
+        self._jobs.put((text, params, out))
+        return out
+
+    def _worker_loop(self):
+        backend = self._backend_factory()  # one backend for the worker's lifetime
+        self.backend_name = getattr(backend, 'name', type(backend).__name__)
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            text, params, out = job
+
+            def emit(chunk, out=out):
+                self._sample_rate = backend.sample_rate
+                out.put(chunk)
+
+            try:
+                backend.synthesize(text, params, emit)
+                out.put(_DONE)
+            except Exception as e:
+                out.put(e)
+            self.completed += 1
+
+    @property
+    def sample_rate(self) -> int:
+        """Rate of the PCM the backends produce (known once one has emitted audio)"""
+        if self._sample_rate:
+            return self._sample_rate
+        if _LibEspeakBackend._lib is not None:
+            return _LibEspeakBackend._sample_rate
+        return ESPEAK_SAMPLE_RATE
+
+
+class TTSEngine:
+    """
+    Cache-first streaming synthesis.
+
+    stream() yields encoded audio chunks: cache hits are read back from disk,
+    misses are streamed from a worker while being recorded into the cache.
+    Formats: 'wav' (header + pcm), 'pcm' (s16le mono), 'ulaw' (8kHz µ-law).
+    """
+
+    def __init__(self, cache: Optional[TTSPhraseCache] = None,
+                 pool: Optional[SynthesisWorkerPool] = None):
+        self.cache = cache or TTSPhraseCache(
+            os.environ.get('TTS_CACHE_DIR', DEFAULT_CACHE_DIR),
+            int(os.environ.get('TTS_CACHE_BYTES', DEFAULT_CACHE_BYTES))
+        )
+        self.pool = pool or SynthesisWorkerPool(int(os.environ.get('TTS_WORKERS', '2')))
+
+    def _cache_format(self, fmt: str) -> str:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown audio format '{fmt}', expected one of {FORMATS}")
+        # wav is pcm plus a header, so both share the same cache entry
+        return 'ulaw' if fmt == 'ulaw' else 'pcm'
+
+    def _sample_rate_for(self, fmt: str) -> int:
+        return ULAW_SAMPLE_RATE if fmt == 'ulaw' else self.pool.sample_rate
+
+    def stream(self, text: str, voice_type: str = 'normal', fmt: str = 'wav',
+               chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield audio chunks for text, starting before synthesis finishes"""
+        cache_fmt = self._cache_format(fmt)
+        key = TTSPhraseCache.make_key(text, voice_type, cache_fmt)
+
+        path = self.cache.get_path(key)
+        if path is not None:
+            size = os.path.getsize(path)
+            if fmt == 'wav':
+                yield wav_header(size, self._sample_rate_for(fmt))
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            return
+
+        recorded = io.BytesIO()
+        ratecv_state = None
+        header_sent = fmt != 'wav'
+        out = self.pool.submit(text, voice_params(voice_type))
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if not header_sent:
+                # Size is unknown until synthesis ends - open-ended streaming header, sent
+                # with the first chunk so it carries the rate the backend reported
+                yield wav_header(0xFFFFFFFF, self._sample_rate_for(fmt))
+                header_sent = True
+            if cache_fmt == 'ulaw':
+                item, ratecv_state = self._to_ulaw(item, ratecv_state)
+                if not item:
+                    continue
+            recorded.write(item)
+            yield item
+
+        self.cache.put(key, recorded.getvalue())
+
+    def _to_ulaw(self, pcm: bytes, state):
+        if not HAS_AUDIOOP:
+            raise RuntimeError("µ-law output needs the audioop module")
+        if len(pcm) % 2:
+            pcm = pcm[:-1]
+        resampled, state = audioop.ratecv(pcm, 2, 1, self.pool.sample_rate, ULAW_SAMPLE_RATE, state)
+        return audioop.lin2ulaw(resampled, 2), state
+
+    def synthesize(self, text: str, voice_type: str = 'normal', fmt: str = 'wav') -> bytes:
+        """Whole-utterance synthesis; wav output always carries exact sizes"""
+        if fmt == 'wav':
+            pcm = b''.join(self.stream(text, voice_type, 'pcm'))
+            return wav_header(len(pcm), self.pool.sample_rate) + pcm if pcm else b''
+        return b''.join(self.stream(text, voice_type, fmt))
+
+    def warm(self, phrases: List[str], voice_type: str = 'normal', fmt: str = 'pcm') -> int:
+        """Pre-synthesize common phrases into the cache"""
+        for phrase in phrases:
+            for _ in self.stream(phrase, voice_type, fmt):
+                pass
+        return len(phrases)
+
+    def time_to_first_byte(self, text: str, voice_type: str = 'normal', fmt: str = 'pcm') -> Dict[str, float]:
+        """Measure TTFB and total time (ms) for one utterance"""
+        start = time.perf_counter()
+        first = None
+        total_bytes = 0
+        for chunk in self.stream(text, voice_type, fmt):
+            if first is None:
+                first = time.perf_counter()
+            total_bytes += len(chunk)
+        end = time.perf_counter()
+        return {
+            'ttfb_ms': ((first or end) - start) * 1000,
+            'total_ms': (end - start) * 1000,
+            'bytes': total_bytes
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.pool.backend_name,
+            'workers': self.pool.workers,
+            'synthesized': self.pool.completed,
+            'cache': self.cache.stats()
+        }
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_tts_engine() -> TTSEngine:
+    """Get the process-wide TTS engine (created on first use)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TTSEngine()
+        return _engine
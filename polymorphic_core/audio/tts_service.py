@@ -4,11 +4,10 @@ polymorphic_tts_service.py - Pure Streaming TTS Service
 Converts text to audio and streams directly to mixer - NO FILE CREATION
 """
 
-import subprocess
-import io
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from polymorphic_core.local_bonjour import local_announcer
 from polymorphic_core import register_capability
+from polymorphic_core.audio.tts_engine import get_tts_engine
 
 class PolymorphicTTSService:
     """Pure streaming TTS service - no file creation, direct mixer output"""
@@ -27,6 +26,9 @@ class PolymorphicTTSService:
         
         print("🔊 [DEBUG] PolymorphicTTSService initializing...")
         
+        # Persistent synthesis workers + on-disk phrase cache
+        self.engine = get_tts_engine()
+        
         self.start_listening()
         
         # Announce our streaming capabilities
@@ -37,6 +39,8 @@ class PolymorphicTTSService:
                 "No file creation - pure streaming audio",
                 "Multiple voice types (normal, robot, excited)", 
                 "Real-time audio synthesis",
+                "Phrase cache: repeated responses are served from disk",
+                "Chunked streaming (wav, pcm, ulaw for IVR)",
                 "Integrates with BonjourAudioMixer"
             ],
             [
@@ -107,32 +111,22 @@ class PolymorphicTTSService:
                 )
     
     def generate_audio_stream(self, text: str, voice_type: str = "normal") -> bytes:
-        """Generate audio stream directly - no file creation"""
+        """Generate audio stream directly - no file creation (served from the phrase cache when possible)"""
         try:
-            # Choose TTS parameters based on voice type
-            if voice_type == "robot":
-                cmd = ['espeak', '-s', '160', '-p', '35', '-g', '5', '--stdout', text]
-            elif voice_type == "excited":
-                cmd = ['espeak', '-s', '190', '-p', '60', '-g', '1', '--stdout', text] 
-            elif voice_type == "calm":
-                cmd = ['espeak', '-s', '150', '-p', '40', '-g', '3', '--stdout', text]
-            else:  # normal
-                cmd = ['espeak', '-s', '175', '-p', '50', '-g', '2', '--stdout', text]
-            
-            # Execute espeak and capture stdout as audio stream
-            result = subprocess.run(cmd, capture_output=True, check=False)
-            
-            if result.returncode == 0 and result.stdout:
-                print(f"🔊 [TTS] Generated {len(result.stdout)} bytes of audio")
-                return result.stdout
+            audio = self.engine.synthesize(text, voice_type, 'wav')
+            if audio:
+                print(f"🔊 [TTS] Generated {len(audio)} bytes of audio")
             else:
-                print(f"🔊 [TTS] Error: {result.stderr.decode() if result.stderr else 'Unknown error'}")
-                return b''
-                
+                print("🔊 [TTS] Error: no audio produced")
+            return audio
         except Exception as e:
             print(f"🔊 [TTS] Exception: {e}")
             return b''
     
+    def stream_audio_chunks(self, text: str, voice_type: str = "normal", fmt: str = "wav") -> Iterator[bytes]:
+        """Yield audio chunks as they are synthesized ('wav', 'pcm' or 'ulaw' for IVR)"""
+        return self.engine.stream(text, voice_type, fmt)
+    
     def ask(self, query: str) -> Any:
         """Handle queries about TTS service"""
         query_lower = query.lower().strip()
@@ -143,8 +137,11 @@ class PolymorphicTTSService:
                 'mode': 'streaming',
                 'file_creation': False,
                 'voices': ['normal', 'robot', 'excited', 'calm'],
-                'output': 'direct_to_mixer'
+                'output': 'direct_to_mixer',
+                'engine': self.engine.stats()
             }
+        elif query_lower in ['cache', 'cache stats']:
+            return self.engine.cache.stats()
         elif query_lower in ['voices', 'voice types']:
             return ['normal', 'robot', 'excited', 'calm']
         elif query_lower.startswith('speak '):
@@ -153,7 +150,7 @@ class PolymorphicTTSService:
             self.on_tts_request([f"TEXT: {text}", "VOICE: normal"])
             return f"Speaking: {text}"
         else:
-            return "TTS Service - use 'status', 'voices', or 'speak <text>'"
+            return "TTS Service - use 'status', 'voices', 'cache', or 'speak <text>'"
     
     def tell(self, format: str, data: Any = None) -> str:
         """Format TTS service information"""
@@ -178,8 +175,16 @@ class PolymorphicTTSService:
             text = action[6:]
             self.on_tts_request([f"TEXT: {text}", "VOICE: robot"])
             return f"Robot voice: {text}"
+        elif action_lower.startswith('warm '):
+            # Pre-synthesize phrases separated by '|'
+            phrases = [p.strip() for p in action[5:].split('|') if p.strip()]
+            count = self.engine.warm(phrases)
+            return f"Warmed {count} phrases"
+        elif action_lower in ['clear cache', 'clear']:
+            removed = self.engine.cache.clear()
+            return f"Cleared {removed} cached phrases"
         else:
-            return "Use 'speak <text>' or 'robot <text>'"
+            return "Use 'speak <text>', 'robot <text>', 'warm <a|b|c>' or 'clear cache'"
 
 # Global instance
 _tts_service = PolymorphicTTSService()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+blob_store.py - Content-addressed blob store behind PolymorphicStorage
+
+Every blob is saved once, as objects/<ab>/<cd>/<sha256> under the store
+root, however many times it is stored. A small SQLite index next to the
+objects keeps a reference count per blob:
+
+- put() / put_stream() hash while writing to a temp file, then either
+  rename it into place or, if the content is already there, drop it
+- release() decrements; gc() deletes blobs nobody references any more
+  (after a grace period) plus leftovers from interrupted writes
+- read_range() / view() map large blobs with mmap, so a slice of a long
+  recording costs only the pages it touches
+"""
+
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = int(os.getenv('BLOB_MMAP_THRESHOLD', str(256 * 1024)))
+GC_GRACE_SECONDS = int(os.getenv('BLOB_GC_GRACE', '3600'))
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """A stored blob: its address, its size and whether this put wrote it"""
+    sha256: str
+    size: int
+    created: bool
+
+
+class BlobStore:
+    """SHA-256 addressed files in sharded directories, with reference counts"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False,
+                                      isolation_level=None)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.execute("CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                            "refcount INTEGER NOT NULL, updated_at REAL NOT NULL)")
+
+    # ============= Addresses =============
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path(sha256))
+
+    def size(self, sha256: str) -> int:
+        return os.path.getsize(self.path(sha256))
+
+    # ============= Writing =============
+
+    def put(self, data: Union[bytes, str]) -> BlobRef:
+        """Store bytes (or UTF-8 text) and take a reference"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return self.put_stream([data])
+
+    def put_stream(self, source: Union[Iterable[bytes], BinaryIO]) -> BlobRef:
+        """Store chunks or a file object without holding it all in memory"""
+        if hasattr(source, 'read'):
+            reader = source
+            source = iter(lambda: reader.read(CHUNK_SIZE), b'')
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, prefix='put-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in source:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            return self._commit(tmp_path, digest.hexdigest(), size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _commit(self, tmp_path: str, sha256: str, size: int) -> BlobRef:
+        target = self.path(sha256)
+        with self._lock:
+            created = not os.path.exists(target)
+            if created:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+            else:
+                os.remove(tmp_path)  # already stored: deduplicated
+            self._index.execute(
+                "INSERT INTO blobs (sha256, size, refcount, updated_at) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (sha256) DO UPDATE SET refcount = refcount + 1, updated_at = excluded.updated_at",
+                (sha256, size, time.time()))
+        return BlobRef(sha256, size, created)
+
+    # ============= References =============
+
+    def incref(self, sha256: str) -> int:
+        """Take another reference to a stored blob"""
+        with self._lock:
+            if not os.path.exists(self.path(sha256)):
+                raise KeyError(sha256)
+            self._index.execute("UPDATE blobs SET refcount = refcount + 1, updated_at = ? WHERE sha256 = ?",
+                                (time.time(), sha256))
+            return self._refcount(sha256)
+
+    def release(self, sha256: str) -> int:
+        """Drop a reference; the blob stays until gc() finds it unreferenced"""
+        with self._lock:
+            self._index.execute("UPDATE blobs SET refcount = MAX(refcount - 1, 0), updated_at = ? WHERE sha256 = ?",
+                                (time.time(), sha256))
+            return self._refcount(sha256)
+
+    def refcount(self, sha256: str) -> int:
+        with self._lock:
+            return self._refcount(sha256)
+
+    def _refcount(self, sha256: str) -> int:
+        row = self._index.execute("SELECT refcount FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else 0
+
+    def reconcile(self, references: Dict[str, int]) -> int:
+        """Reset every count to the given truth (e.g. rows per blob); returns how many changed"""
+        now = time.time()
+        with self._lock:
+            current = dict(self._index.execute("SELECT sha256, refcount FROM blobs"))
+            changed = [(references.get(sha, 0), now, sha) for sha, count in current.items()
+                       if references.get(sha, 0) != count]
+            self._index.executemany("UPDATE blobs SET refcount = ?, updated_at = ? WHERE sha256 = ?", changed)
+            for sha, count in references.items():
+                if sha not in current and os.path.exists(self.path(sha)):
+                    self._index.execute("INSERT INTO blobs (sha256, size, refcount, updated_at) VALUES (?, ?, ?, ?)",
+                                        (sha, os.path.getsize(self.path(sha)), count, now))
+                    changed.append((count, now, sha))
+        return len(changed)
+
+    # ============= Reading =============
+
+    def read(self, sha256: str) -> bytes:
+        with open(self.path(sha256), 'rb') as f:
+            return f.read()
+
+    def iter_chunks(self, sha256: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.path(sha256), 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b'')
+
+    @contextmanager
+    def view(self, sha256: str) -> Iterator[memoryview]:
+        """Zero-copy read-only view of a blob (mmap for large ones)"""
+        with open(self.path(sha256), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < MMAP_THRESHOLD:
+                yield memoryview(f.read())
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                mapped.close()
+
+    def read_range(self, sha256: str, start: int, length: Optional[int] = None) -> bytes:
+        """Bytes [start, start + length) of a blob, touching only those pages"""
+        with self.view(sha256) as view:
+            end = len(view) if length is None else min(len(view), start + length)
+            return bytes(view[start:end])
+
+    def verify(self, sha256: str) -> bool:
+        """Does the stored content still hash to its address?"""
+        digest = hashlib.sha256()
+        for chunk in self.iter_chunks(sha256):
+            digest.update(chunk)
+        return digest.hexdigest() == sha256
+
+    # ============= Garbage collection =============
+
+    def gc(self, grace_seconds: int = GC_GRACE_SECONDS) -> Dict[str, int]:
+        """Delete unreferenced blobs idle for grace_seconds, orphan objects and stale temp files"""
+        cutoff = time.time() - grace_seconds
+        removed = freed = 0
+        with self._lock:
+            dead = self._index.execute("SELECT sha256, size FROM blobs WHERE refcount <= 0 AND updated_at <= ?",
+                                       (cutoff,)).fetchall()
+            for sha, size in dead:
+                if os.path.exists(self.path(sha)):
+                    os.remove(self.path(sha))
+                    removed, freed = removed + 1, freed + size
+            self._index.executemany("DELETE FROM blobs WHERE sha256 = ?", [(sha,) for sha, _ in dead])
+
+            indexed = {sha for (sha,) in self._index.execute("SELECT sha256 FROM blobs")}
+            for directory, _, files in os.walk(self.objects_dir):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if name not in indexed and os.path.getmtime(path) <= cutoff:
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        removed += 1
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            if os.path.getmtime(path) <= cutoff:
+                os.remove(path)
+        return {'removed': removed, 'bytes_freed': freed}
+
+    def stats(self) -> Dict[str, int]:
+        """Blobs and bytes on disk vs bytes referenced (the deduplication win)"""
+        with self._lock:
+            blobs, stored, logical, refs = self._index.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * refcount), 0), "
+                "COALESCE(SUM(refcount), 0) FROM blobs").fetchone()
+        return {'blobs': blobs, 'references': refs, 'stored_bytes': stored, 'referenced_bytes': logical}
+
+    def close(self):
+        self._index.close()
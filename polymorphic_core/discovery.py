@@ -7,6 +7,8 @@ import inspect
 import sys
 from typing import Dict, List, Any
 
+from .metrics import instrument
+
 class CapabilityRegistry:
     """
     Registry where modules/models report their capabilities.
@@ -174,7 +176,7 @@ def register_capability(service_name: str, service_getter):
 def discover_capability(service_name: str):
     """Discover and get a registered service by name."""
     if service_name in capability_registry.services:
-        return capability_registry.services[service_name]()
+        return instrument(capability_registry.services[service_name](), service_name)
     return None
 
 
@@ -43,13 +43,15 @@ class LocalBonjourAnnouncer:
         """Announce a service locally within this process AND create HTTPS server"""
         # Auto-create HTTPS server for every service
         https_port = None
+        https_path = ''
         if service_instance and hasattr(service_instance, 'ask'):
             try:
                 from .network_service_wrapper import wrap_service
                 wrapped = wrap_service(service_instance, service_name, auto_start=True)
                 https_port = wrapped.port
+                https_path = wrapped.path  # set when mounted on the shared gateway
                 if not self._quiet_mode:
-                    print(f"🔐 Auto-created HTTPS server for {service_name} on port {https_port}")
+                    print(f"🔐 Auto-created HTTPS server for {service_name} on port {https_port}{https_path}")
             except Exception as e:
                 if not self._quiet_mode:
                     print(f"⚠️  Could not create HTTPS server for {service_name}: {e}")
@@ -61,7 +63,8 @@ class LocalBonjourAnnouncer:
                 'examples': examples or [],
                 'announced_at': time.time(),
                 'pid': threading.current_thread().ident,
-                'https_port': https_port
+                'https_port': https_port,
+                'https_path': https_path
             }
 
             self.services[service_name] = service_info
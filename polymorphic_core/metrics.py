@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+metrics.py - Per-call latency metrics for ask/tell/do services
+
+instrument(service, name) wraps a service's ask/tell/do so every call
+records its latency, errors and calls in flight, labeled by service,
+method and a normalized query pattern ("player 1234 stats" becomes
+"player N stats"). Services reached through get_service(),
+discover_capability() or wrap_service() are instrumented automatically
+(SERVICE_METRICS=0 turns it off).
+
+Latencies go into HDR-style log-linear histograms: exact below 32ns,
+then 32 linear sub-buckets per power of two (about 3% relative error)
+up to hours, kept as one flat list of counts so recording is a couple
+of integer operations. Prometheus buckets and quantiles are derived
+from it at scrape time.
+
+    service_metrics.tell("prometheus")   # text for a /metrics endpoint
+    service_metrics.ask("slowest")       # series by p99
+    service_metrics.do("reset")
+"""
+
+import os
+import re
+import time
+import inspect
+import functools
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+ENABLED = os.getenv('SERVICE_METRICS', '1') != '0'
+PATTERN_WORDS = int(os.getenv('METRICS_PATTERN_WORDS', '4'))
+MAX_PATTERNS = int(os.getenv('METRICS_MAX_PATTERNS', '64'))  # per service and method, then "(other)"
+
+METHODS = ('ask', 'tell', 'do')
+OTHER_PATTERN = '(other)'
+
+SUB_BITS = 5
+SUB_COUNT = 1 << SUB_BITS
+MAX_BITS = 44  # ~4.9 hours in nanoseconds; longer calls land in the top bucket
+BUCKETS = (MAX_BITS - SUB_BITS + 1) * SUB_COUNT
+
+# Prometheus histogram bounds (seconds)
+PROMETHEUS_BOUNDS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_WORD = re.compile(r"[^\w\s-]")
+_PATTERN_CACHE: Dict[str, str] = {}
+_PATTERN_CACHE_SIZE = 4096
+
+
+def _bucket(value: int) -> int:
+    """Histogram index of a duration in ns"""
+    if value < SUB_COUNT:
+        return value
+    exponent = value.bit_length() - SUB_BITS - 1
+    index = (exponent << SUB_BITS) + (value >> exponent)
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """[lowest, highest] ns values that land in a bucket"""
+    if index < SUB_COUNT:
+        return index, index
+    exponent = (index >> SUB_BITS) - 1
+    low = (SUB_COUNT + (index & (SUB_COUNT - 1))) << exponent
+    return low, low + (1 << exponent) - 1
+
+
+def normalize_pattern(query: Any) -> str:
+    """A low-cardinality label for a query: first words, numbers and quoted text replaced"""
+    if not isinstance(query, str):
+        return '' if query is None else type(query).__name__
+    cached = _PATTERN_CACHE.get(query)
+    if cached is not None:
+        return cached
+    words = []
+    for word in _WORD.sub(' ', _QUOTED.sub(' S ', query.lower())).split()[:PATTERN_WORDS]:
+        if any(ch.isdigit() for ch in word):
+            words.append('N')
+        else:
+            words.append(word.strip('-'))
+    pattern = ' '.join(word for word in words if word)
+    if len(_PATTERN_CACHE) >= _PATTERN_CACHE_SIZE:
+        _PATTERN_CACHE.clear()
+    _PATTERN_CACHE[query] = pattern
+    return pattern
+
+
+class CallSeries:
+    """Latency histogram, error count and in-flight gauge for one label set"""
+
+    __slots__ = ('labels', 'counts', 'count', 'total_ns', 'max_ns', 'errors', 'in_flight', 'lock')
+
+    def __init__(self, labels: Tuple[str, str, str]):
+        self.labels = labels
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.counts = [0] * BUCKETS
+            self.count = self.total_ns = self.max_ns = self.errors = 0
+
+    def quantile(self, q: float) -> float:
+        """Latency in seconds at quantile q (bucket midpoint)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= rank:
+                    low, high = _bucket_bounds(index)
+                    return min((low + high) / 2, self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def cumulative(self, bounds: Iterable[float]) -> List[int]:
+        """Calls at or under each bound (seconds), by bucket upper edge"""
+        result, seen, index = [], 0, 0
+        for bound in bounds:
+            limit = bound * 1e9
+            while index < BUCKETS and _bucket_bounds(index)[1] <= limit:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        service, method, pattern = self.labels
+        return {
+            "service": service, "method": method, "pattern": pattern,
+            "calls": self.count, "errors": self.errors, "in_flight": self.in_flight,
+            "mean_ms": round(self.total_ns / self.count / 1e6, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max_ns / 1e6, 3),
+        }
+
+
+class ServiceMetrics:
+    """Registry of call series, with the 3-method pattern"""
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str, str], CallSeries] = {}
+        self._patterns: Dict[Tuple[str, str], set] = {}
+        self._lock = threading.Lock()
+
+    # ============= Recording =============
+
+    def series(self, service: str, method: str, pattern: str) -> CallSeries:
+        key = (service, method, pattern)
+        found = self._series.get(key)
+        if found is not None:
+            return found
+        with self._lock:
+            seen = self._patterns.setdefault((service, method), set())
+            if pattern not in seen and len(seen) >= MAX_PATTERNS:
+                pattern = OTHER_PATTERN
+                key = (service, method, pattern)
+            seen.add(pattern)
+            if key not in self._series:
+                self._series[key] = CallSeries(key)
+            return self._series[key]
+
+    def instrument(self, service: Any, service_name: str) -> Any:
+        """Wrap service.ask/tell/do in place (once); returns the service"""
+        if not ENABLED or service is None or service is self:
+            return service
+        for method in METHODS:
+            function = getattr(service, method, None)
+            if not callable(function) or getattr(function, '__metrics_series__', None) is not None:
+                continue
+            try:
+                setattr(service, method, self._wrap(service_name, method, function))
+            except (AttributeError, TypeError):
+                continue  # slots, builtins, read-only modules: leave unmeasured
+        return service
+
+    def _wrap(self, service_name: str, method: str, function):
+        series_for = self.series
+        clock = time.perf_counter_ns
+        patterns: Dict[str, CallSeries] = {}  # exact query -> series, skips normalizing
+
+        def lookup(args) -> CallSeries:
+            query = args[0] if args else None
+            if type(query) is not str:
+                return series_for(service_name, method, normalize_pattern(query))
+            series = patterns.get(query)
+            if series is None:
+                series = series_for(service_name, method, normalize_pattern(query))
+                if len(patterns) < _PATTERN_CACHE_SIZE:
+                    patterns[query] = series
+            return series
+
+        def finish(series: CallSeries, elapsed: int, failed: bool):
+            with series.lock:
+                series.in_flight -= 1
+                series.counts[_bucket(elapsed)] += 1
+                series.count += 1
+                series.total_ns += elapsed
+                if elapsed > series.max_ns:
+                    series.max_ns = elapsed
+                if failed:
+                    series.errors += 1
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                series = lookup(args)
+                with series.lock:
+                    series.in_flight += 1
+                start = clock()
+                failed = True
+                try:
+                    result = await function(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    finish(series, clock() - start, failed)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                series = lookup(args)
+                with series.lock:
+                    series.in_flight += 1
+                start = clock()
+                failed = True
+                try:
+                    result = function(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    finish(series, clock() - start, failed)
+
+        wrapper.__metrics_series__ = (service_name, method)
+        return wrapper
+
+    # ============= 3-method pattern =============
+
+    def ask(self, query: str, **kwargs) -> Any:
+        """ask("summary"), ask("slowest"), ask("errors"), ask("<service> summary")"""
+        query = query.lower().strip()
+        rows = [series.summary() for series in list(self._series.values()) if series.count or series.in_flight]
+        services = {row["service"] for row in rows}
+        named = [name for name in services if name.lower() in query]
+        if named:
+            rows = [row for row in rows if row["service"] in named]
+        if "slow" in query or "p99" in query:
+            return sorted(rows, key=lambda row: row["p99_ms"], reverse=True)[:kwargs.get('limit', 10)]
+        if "error" in query:
+            return sorted((row for row in rows if row["errors"]), key=lambda row: row["errors"], reverse=True)
+        if "in flight" in query or "in-flight" in query:
+            return {f"{row['service']}.{row['method']}": row["in_flight"] for row in rows if row["in_flight"]}
+        return sorted(rows, key=lambda row: (row["service"], row["method"], row["pattern"]))
+
+    def tell(self, format: str, data: Any = None) -> str:
+        format = format.lower().strip()
+        if format in ("prometheus", "metrics", "openmetrics"):
+            return self._prometheus()
+        rows = data if data is not None else self.ask("slowest")
+        if format in ("discord", "text"):
+            lines = ["⏱️ **Service call latency**"]
+            for row in rows:
+                lines.append(f"• {row['service']}.{row['method']}({row['pattern'] or '-'}): {row['calls']} calls, "
+                             f"p50 {row['p50_ms']}ms, p99 {row['p99_ms']}ms"
+                             + (f", ❌ {row['errors']} errors" if row['errors'] else ""))
+            return "\n".join(lines)
+        return str(rows)
+
+    def do(self, action: str, **kwargs) -> Any:
+        action = action.lower().strip()
+        if "reset" in action or "clear" in action:
+            # Series are zeroed, not dropped: wrapped methods keep references to them
+            series_list = list(self._series.values())
+            for series in series_list:
+                series.reset()
+            return f"Reset {len(series_list)} metric series"
+        if action.startswith("instrument") and kwargs.get('service') is not None:
+            return self.instrument(kwargs['service'], kwargs.get('name') or action[len("instrument"):].strip())
+        return f"Unknown metrics action: {action}"
+
+    # ============= Prometheus text format =============
+
+    @staticmethod
+    def _labels(series: CallSeries, extra: str = "") -> str:
+        escaped = [value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in series.labels]
+        text = f'service="{escaped[0]}",method="{escaped[1]}",pattern="{escaped[2]}"'
+        return "{" + text + (("," + extra) if extra else "") + "}"
+
+    def _prometheus(self) -> str:
+        series_list = sorted(list(self._series.values()), key=lambda series: series.labels)
+        lines = [
+            "# HELP polymorphic_call_duration_seconds Latency of ask/tell/do calls",
+            "# TYPE polymorphic_call_duration_seconds histogram",
+        ]
+        snapshots = []
+        for series in series_list:
+            with series.lock:
+                snapshot = CallSeries(series.labels)
+                snapshot.counts = list(series.counts)
+                snapshot.count, snapshot.total_ns, snapshot.max_ns = series.count, series.total_ns, series.max_ns
+                snapshot.errors, snapshot.in_flight = series.errors, series.in_flight
+            snapshots.append(snapshot)
+        for series in snapshots:
+            for bound, count in zip(PROMETHEUS_BOUNDS, series.cumulative(PROMETHEUS_BOUNDS)):
+                labels = self._labels(series, 'le="%g"' % bound)
+                lines.append(f"polymorphic_call_duration_seconds_bucket{labels} {count}")
+            labels = self._labels(series, 'le="+Inf"')
+            lines.append(f"polymorphic_call_duration_seconds_bucket{labels} {series.count}")
+            lines.append(f"polymorphic_call_duration_seconds_sum{self._labels(series)} {series.total_ns / 1e9:.9f}")
+            lines.append(f"polymorphic_call_duration_seconds_count{self._labels(series)} {series.count}")
+        lines += ["# HELP polymorphic_call_duration_quantile_seconds Latency quantiles from the HDR histogram",
+                  "# TYPE polymorphic_call_duration_quantile_seconds gauge"]
+        for series in snapshots:
+            for q in QUANTILES:
+                labels = self._labels(series, 'quantile="%g"' % q)
+                lines.append(f"polymorphic_call_duration_quantile_seconds{labels} {series.quantile(q):.9f}")
+        lines += ["# HELP polymorphic_call_errors_total Calls that raised",
+                  "# TYPE polymorphic_call_errors_total counter"]
+        lines += [f"polymorphic_call_errors_total{self._labels(series)} {series.errors}" for series in snapshots]
+        lines += ["# HELP polymorphic_calls_in_flight Calls currently running",
+                  "# TYPE polymorphic_calls_in_flight gauge"]
+        lines += [f"polymorphic_calls_in_flight{self._labels(series)} {series.in_flight}" for series in snapshots]
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+service_metrics = ServiceMetrics()
+
+
+def instrument(service: Any, service_name: str) -> Any:
+    """Measure a service's ask/tell/do calls"""
+    return service_metrics.instrument(service, service_name)
+
+
+def prometheus_text() -> str:
+    """Everything recorded so far, in Prometheus text format"""
+    return service_metrics.tell("prometheus")
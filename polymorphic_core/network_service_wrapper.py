@@ -19,23 +19,67 @@ Usage:
     wrapped_db = wrap_service(database_service, "database", port=8090)
     
     # Now other machines can access it via mDNS discovery
+
+Gateway mode (SERVICE_GATEWAY=1): services wrapped without an explicit port
+are mounted on one shared HTTPS server at /{service-name}/ask|tell|do
+instead of each getting their own FastAPI app, uvicorn thread, port and TLS
+context. Calls run in worker threads, at most SERVICE_GATEWAY_CONCURRENCY
+at a time per service, so one slow service can't stall the others.
 """
 
 import asyncio
+import functools
 import json
+import re
 import threading
 import ssl
 import os
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, Optional, Callable, Tuple
 from dataclasses import dataclass
+import anyio
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from .real_bonjour import announcer
 from .local_bonjour import local_announcer
 from .polymorphic_response import create_polymorphic_handler
+from .metrics import instrument, prometheus_text
+
+# Shared gateway configuration
+GATEWAY_ENABLED = os.getenv('SERVICE_GATEWAY', '0') == '1'
+GATEWAY_PORT = int(os.getenv('SERVICE_GATEWAY_PORT', '9443'))
+GATEWAY_CONCURRENCY = int(os.getenv('SERVICE_GATEWAY_CONCURRENCY', '4'))  # calls in flight per service
+
+PUBLIC_HOST = "tournaments.zilogo.com"
+
+
+def _ssl_paths() -> Tuple[str, str]:
+    """Wildcard certificate and key - HTTPS ONLY, no HTTP fallback"""
+    ssl_cert_path = os.path.join(os.path.dirname(__file__), "..", "services", "wildcard_certificate.pem")
+    ssl_key_path = os.path.join(os.path.dirname(__file__), "..", "services", "wildcard_private.key")
+    if not os.path.exists(ssl_cert_path) or not os.path.exists(ssl_key_path):
+        raise FileNotFoundError(f"SSL certificates required: {ssl_cert_path}, {ssl_key_path}")
+    return ssl_cert_path, ssl_key_path
+
+
+def _add_metrics(app: FastAPI):
+    """GET /metrics: ask/tell/do latency for every instrumented service in this process"""
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(prometheus_text(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _add_cors(app: FastAPI):
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 class ServiceRequest(BaseModel):
     """Request model for service calls"""
@@ -64,6 +108,85 @@ class NetworkService:
     capabilities: list
     polymorphic_handler: Any = None
     server_thread: Optional[threading.Thread] = None
+    path: str = ""              # URL prefix on the shared gateway ("" = own server)
+    concurrency: int = 0        # max calls in flight (0 = run inline on the event loop)
+    limiter: Any = None         # anyio.CapacityLimiter, created on the first call
+
+    @property
+    def base_url(self) -> str:
+        return f"https://{PUBLIC_HOST}:{self.port}{self.path}"
+
+
+class ServiceGateway:
+    """
+    One HTTPS server for every gateway-mode service.
+    
+    Each service gets its own APIRouter mounted under /{slug}; the gateway
+    owns the only FastAPI app, uvicorn server, thread and TLS context.
+    """
+    
+    def __init__(self, port: int = GATEWAY_PORT, host: str = "0.0.0.0"):
+        self.port = port
+        self.host = host
+        self.app = FastAPI(title="Service Gateway")
+        _add_cors(self.app)
+        _add_metrics(self.app)
+        self.mounts = {}  # slug -> service_name
+        self.server: Optional[uvicorn.Server] = None
+        self.server_thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        
+        @self.app.get("/")
+        async def gateway_info():
+            """Services mounted on this gateway"""
+            return {"services": {name: f"/{slug}" for slug, name in self.mounts.items()}}
+    
+    def mount(self, router: APIRouter, service_name: str) -> str:
+        """Mount a service's router; returns its URL prefix"""
+        with self.lock:
+            base = re.sub(r'[^a-z0-9]+', '-', service_name.lower()).strip('-') or 'service'
+            slug, n = base, 2
+            while slug in self.mounts:
+                slug, n = f"{base}-{n}", n + 1
+            self.mounts[slug] = service_name
+            self.app.include_router(router, prefix=f"/{slug}")
+        return f"/{slug}"
+    
+    def unmount(self, path: str):
+        """Drop a service's routes"""
+        with self.lock:
+            self.mounts.pop(path.lstrip('/'), None)
+            self.app.router.routes[:] = [
+                route for route in self.app.router.routes
+                if not (getattr(route, 'path', '') == path or getattr(route, 'path', '').startswith(path + '/'))
+            ]
+    
+    def start(self):
+        """Start the shared server once"""
+        with self.lock:
+            if self.server_thread:
+                return
+            ssl_cert_path, ssl_key_path = _ssl_paths()
+            config = uvicorn.Config(
+                self.app,
+                host=self.host,
+                port=self.port,
+                log_level="warning",
+                ssl_certfile=ssl_cert_path,
+                ssl_keyfile=ssl_key_path
+            )
+            self.server = uvicorn.Server(config)
+            self.server_thread = threading.Thread(target=self.server.run, daemon=True, name="service-gateway")
+            self.server_thread.start()
+        print(f"🌐 Service gateway listening on port {self.port}")
+    
+    @property
+    def started(self) -> bool:
+        return bool(self.server and self.server.started)
+    
+    def stop(self):
+        if self.server:
+            self.server.should_exit = True
 
 class NetworkServiceWrapper:
     """
@@ -78,13 +201,22 @@ class NetworkServiceWrapper:
     
     def __init__(self):
         self.wrapped_services = {}  # service_name -> NetworkService
+        self._gateway: Optional[ServiceGateway] = None
+    
+    @property
+    def gateway(self) -> ServiceGateway:
+        """The shared gateway, created on first use"""
+        if self._gateway is None:
+            self._gateway = ServiceGateway()
+        return self._gateway
         
     def wrap_service(self, 
                     service: Any, 
                     service_name: str, 
                     port: int = None,
                     capabilities: list = None,
-                    auto_start: bool = True) -> NetworkService:
+                    auto_start: bool = True,
+                    gateway: Optional[bool] = None) -> NetworkService:
         """
         Wrap a Python service to make it network-accessible.
         
@@ -94,11 +226,24 @@ class NetworkServiceWrapper:
             port: Port to run on (auto-assigned if None)
             capabilities: List of capabilities (auto-detected if None)
             auto_start: Whether to start the server immediately
+            gateway: Mount on the shared gateway (default: SERVICE_GATEWAY);
+                services asking for an explicit port keep their own server
             
         Returns:
             NetworkService wrapper object
         """
         
+        # Auto-detect capabilities if needed
+        if capabilities is None:
+            capabilities = self._detect_capabilities(service, service_name)
+        
+        # Time every ask/tell/do, whether called over HTTP or in-process
+        instrument(service, service_name)
+        
+        use_gateway = GATEWAY_ENABLED if gateway is None else gateway
+        if use_gateway and port is None:
+            return self._wrap_on_gateway(service, service_name, capabilities, auto_start)
+        
         # Auto-assign port if needed
         if port is None:
             import socket
@@ -107,21 +252,12 @@ class NetworkServiceWrapper:
             port = sock.getsockname()[1]
             sock.close()
         
-        # Auto-detect capabilities if needed
-        if capabilities is None:
-            capabilities = self._detect_capabilities(service, service_name)
-        
         # Create FastAPI app for this service
         app = FastAPI(title=f"{service_name} Network Service")
         
         # Add CORS middleware
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+        _add_cors(app)
+        _add_metrics(app)
         
         # Create polymorphic response handler
         polymorphic_handler = create_polymorphic_handler(service_name, capabilities)
@@ -148,6 +284,44 @@ class NetworkServiceWrapper:
             
         return network_service
     
+    def _wrap_on_gateway(self, service: Any, service_name: str, capabilities: list,
+                         auto_start: bool) -> NetworkService:
+        """Mount a service on the shared gateway under its own router"""
+        if service_name in self.wrapped_services:
+            self.stop_service(service_name)
+        
+        router = APIRouter()
+        network_service = NetworkService(
+            service=service,
+            name=service_name,
+            port=self.gateway.port,
+            app=self.gateway.app,
+            capabilities=capabilities,
+            polymorphic_handler=create_polymorphic_handler(service_name, capabilities),
+            concurrency=GATEWAY_CONCURRENCY
+        )
+        self._add_service_routes(router, service, service_name)
+        self.wrapped_services[service_name] = network_service
+        network_service.path = self.gateway.mount(router, service_name)
+        
+        if auto_start:
+            self.start_service(service_name)
+        
+        return network_service
+    
+    async def _call(self, service_name: str, method: Callable, *args, **kwargs) -> Any:
+        """
+        Run a service method. Gateway services run in worker threads behind a
+        per-service limiter; others run inline as before.
+        """
+        network_service = self.wrapped_services.get(service_name)
+        if not network_service or not network_service.concurrency:
+            return method(*args, **kwargs)
+        if network_service.limiter is None:
+            network_service.limiter = anyio.CapacityLimiter(network_service.concurrency)
+        return await anyio.to_thread.run_sync(functools.partial(method, *args, **kwargs),
+                                              limiter=network_service.limiter)
+    
     def _detect_capabilities(self, service: Any, service_name: str) -> list:
         """Auto-detect service capabilities by introspection"""
         capabilities = []
@@ -172,8 +346,8 @@ class NetworkServiceWrapper:
             
         return capabilities
     
-    def _add_service_routes(self, app: FastAPI, service: Any, service_name: str):
-        """Add HTTP routes for the service"""
+    def _add_service_routes(self, app, service: Any, service_name: str):
+        """Add HTTP routes for the service (to its own app or its gateway router)"""
         
         @app.get("/")
         async def service_info(request: Request):
@@ -211,7 +385,7 @@ class NetworkServiceWrapper:
                 if not hasattr(service, 'ask'):
                     raise HTTPException(status_code=404, detail="ask method not available")
                 
-                result = service.ask(request.query, **request.kwargs or {})
+                result = await self._call(service_name, service.ask, request.query, **request.kwargs or {})
                 return ServiceResponse(
                     result=result,
                     service_name=service_name,
@@ -233,7 +407,8 @@ class NetworkServiceWrapper:
                 if not hasattr(service, 'tell'):
                     raise HTTPException(status_code=404, detail="tell method not available")
                 
-                result = service.tell(request.format, request.data, **request.kwargs or {})
+                result = await self._call(service_name, service.tell, request.format, request.data,
+                                          **request.kwargs or {})
                 return ServiceResponse(
                     result=result,
                     service_name=service_name,
@@ -255,7 +430,7 @@ class NetworkServiceWrapper:
                 if not hasattr(service, 'do'):
                     raise HTTPException(status_code=404, detail="do method not available")
                 
-                result = service.do(request.action, **request.kwargs or {})
+                result = await self._call(service_name, service.do, request.action, **request.kwargs or {})
                 return ServiceResponse(
                     result=result,
                     service_name=service_name,
@@ -284,7 +459,7 @@ class NetworkServiceWrapper:
                 # Call the method with provided args/kwargs
                 args = request.args or []
                 kwargs = request.kwargs or {}
-                result = method(*args, **kwargs)
+                result = await self._call(service_name, method, *args, **kwargs)
                 
                 return ServiceResponse(
                     result=result,
@@ -313,22 +488,23 @@ class NetworkServiceWrapper:
             service_name,
             network_service.capabilities,
             [
-                f"Access via HTTPS at https://tournaments.zilogo.com:{network_service.port}",
-                f"ask: POST /{network_service.port}/ask",
-                f"tell: POST /{network_service.port}/tell",
-                f"do: POST /{network_service.port}/do"
+                f"Access via HTTPS at {network_service.base_url}",
+                f"ask: POST {network_service.path}/ask",
+                f"tell: POST {network_service.path}/tell",
+                f"do: POST {network_service.path}/do"
             ]
         )
         
+        # Gateway services share the one server
+        if network_service.path:
+            self.gateway.start()
+            network_service.server_thread = self.gateway.server_thread
+            print(f"🌐 Mounted network service '{service_name}' at {network_service.base_url}")
+            return
+        
         # Start the server in a background thread
         def run_server():
-            # SSL configuration using wildcard cert - HTTPS ONLY
-            ssl_cert_path = os.path.join(os.path.dirname(__file__), "..", "services", "wildcard_certificate.pem")
-            ssl_key_path = os.path.join(os.path.dirname(__file__), "..", "services", "wildcard_private.key")
-
-            # SSL certs are required - no HTTP fallback
-            if not os.path.exists(ssl_cert_path) or not os.path.exists(ssl_key_path):
-                raise FileNotFoundError(f"SSL certificates required: {ssl_cert_path}, {ssl_key_path}")
+            ssl_cert_path, ssl_key_path = _ssl_paths()
 
             uvicorn.run(
                 network_service.app,
@@ -351,7 +527,9 @@ class NetworkServiceWrapper:
             # Note: uvicorn doesn't have a clean shutdown API from threads
             # In production, you'd use proper process management
             print(f"🛑 Stopping network service '{service_name}'")
-            del self.wrapped_services[service_name]
+            network_service = self.wrapped_services.pop(service_name)
+            if network_service.path:
+                self.gateway.unmount(network_service.path)
     
     def list_services(self) -> Dict[str, Dict]:
         """List all wrapped network services"""
@@ -359,6 +537,8 @@ class NetworkServiceWrapper:
         for name, network_service in self.wrapped_services.items():
             result[name] = {
                 "port": network_service.port,
+                "path": network_service.path,
+                "concurrency": network_service.concurrency,
                 "capabilities": network_service.capabilities,
                 "status": "running" if network_service.server_thread else "stopped"
             }
@@ -372,9 +552,10 @@ def wrap_service(service: Any,
                 service_name: str, 
                 port: int = None,
                 capabilities: list = None,
-                auto_start: bool = True) -> NetworkService:
+                auto_start: bool = True,
+                gateway: Optional[bool] = None) -> NetworkService:
     """Wrap a service for network access"""
-    return network_wrapper.wrap_service(service, service_name, port, capabilities, auto_start)
+    return network_wrapper.wrap_service(service, service_name, port, capabilities, auto_start, gateway)
 
 def start_service(service_name: str):
     """Start a wrapped network service"""
@@ -24,6 +24,7 @@ import importlib
 import sys
 from typing import Any, Dict, Optional, Callable, Union
 from .real_bonjour import announcer
+from .metrics import instrument
 
 class ServiceLocator:
     """
@@ -128,8 +129,8 @@ class ServiceLocator:
                 module = importlib.import_module(module_name)
                 service = getattr(module, attr_name)
             
-            # Cache and return
-            self.local_cache[capability_name] = service
+            # Cache and return (ask/tell/do timed from here on)
+            self.local_cache[capability_name] = instrument(service, capability_name)
             return service
             
         except (ImportError, AttributeError, ModuleNotFoundError) as e:
@@ -161,7 +162,7 @@ class ServiceLocator:
         )
         
         # Cache and return
-        self.network_cache[capability_name] = network_service
+        self.network_cache[capability_name] = instrument(network_service, f"{capability_name} (network)")
         return network_service
     
     def register_capability(self, capability_name: str, module_path: str):
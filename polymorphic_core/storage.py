@@ -3,18 +3,28 @@
 polymorphic_storage.py - Polymorphic storage service that accepts ANY data
 Announces via Bonjour, stores objects/files/data polymorphically
 Has its own database table, uses existing database functions
+
+Small content lives in the content_blob column; anything larger than
+INLINE_LIMIT goes to a content-addressed BlobStore (storage/blobs), so
+the same recording or document is kept once however often it is stored.
 """
 
-from capability_announcer import announcer
-from capability_discovery import register_capability
-from database import get_session, Base
-from sqlalchemy import Column, Integer, String, Text, LargeBinary, DateTime
+from polymorphic_core.local_bonjour import local_announcer
+from polymorphic_core.discovery import register_capability
+from polymorphic_core.blob_store import BlobStore
+from database.tournament_models import Base
+from utils.database import engine, session_scope, read_session_scope
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, DateTime, inspect, text
 from sqlalchemy.sql import func
 from datetime import datetime
 import os
 import json
-import tempfile
-from typing import Any, Optional, Dict
+from typing import Any, Iterable, Optional, Dict, Union
+
+STORAGE_DIR = os.getenv('STORAGE_DIR', '/home/ubuntu/claude/tournament_tracker/storage')
+
+# Content up to this size stays in the database row
+INLINE_LIMIT = int(os.getenv('STORAGE_INLINE_LIMIT', '10000'))
 
 class StorageContent(Base):
     """Storage table - ONLY table this service can access"""
@@ -24,8 +34,10 @@ class StorageContent(Base):
     content_type = Column(String(50))  # 'audio', 'text', 'json', 'binary', etc.
     source = Column(String(100))  # Who stored it (e.g., 'discord_voice')
     content_metadata = Column(Text)  # JSON metadata about the content
-    file_path = Column(String(500))  # Path if stored as file
+    file_path = Column(String(500))  # Path if stored as file (legacy rows)
     content_blob = Column(LargeBinary)  # Small content stored directly
+    blob_sha256 = Column(String(64), index=True)  # Large content in the blob store
+    content_size = Column(Integer)
     created_at = Column(DateTime, server_default=func.now())
     
     def tell(self, format: str = "brief") -> str:
@@ -40,7 +52,11 @@ class StorageContent(Base):
     def ask(self, question: str) -> Any:
         """Polymorphic ask method"""
         if "path" in question.lower():
+            if self.blob_sha256:
+                return get_storage().blobs.path(self.blob_sha256)
             return self.file_path
+        elif "hash" in question.lower() or "sha" in question.lower():
+            return self.blob_sha256
         elif "type" in question.lower():
             return self.content_type
         elif "when" in question.lower():
@@ -52,10 +68,11 @@ class StorageContent(Base):
     def do(self, action: str) -> Any:
         """Polymorphic do method"""
         if action == "delete":
-            if self.file_path and os.path.exists(self.file_path):
-                os.remove(self.file_path)
-            return True
+            # Row and blob reference go together, so the reference is released exactly once
+            return get_storage().delete(self.id)
         elif action == "read":
+            if self.blob_sha256:
+                return get_storage().blobs.read(self.blob_sha256)
             if self.file_path and os.path.exists(self.file_path):
                 with open(self.file_path, 'rb') as f:
                     return f.read()
@@ -86,24 +103,43 @@ class PolymorphicStorage:
                 "I announce when content is stored",
                 "I provide storage IDs for retrieval",
                 "I use my own database table",
+                "I keep large content once, by SHA-256, however often it is stored",
                 "Methods: store(content, type, source, metadata)",
+                "Methods: read_range(id, start, length), delete(id), collect_garbage()",
                 "I figure out how to store based on content type"
             ]
         )
         
         # Create storage directory
-        self.storage_dir = "/home/ubuntu/claude/tournament_tracker/storage"
+        self.storage_dir = STORAGE_DIR
         os.makedirs(self.storage_dir, exist_ok=True)
+        self.blobs = BlobStore(os.path.join(self.storage_dir, 'blobs'))
         
         # Create table if needed
         self._ensure_table()
     
     def _ensure_table(self):
         """Ensure our storage table exists"""
-        from database import engine
         Base.metadata.create_all(bind=engine, tables=[StorageContent.__table__])
+        # Tables created before the blob store lack its columns
+        existing = {column['name'] for column in inspect(engine).get_columns(StorageContent.__tablename__)}
+        with engine.begin() as conn:
+            for column in ('blob_sha256', 'content_size'):
+                if column not in existing:
+                    column_type = StorageContent.__table__.c[column].type.compile(engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {StorageContent.__tablename__} ADD COLUMN {column} {column_type}"))
         local_announcer.announce("PolymorphicStorage", ["Storage table ready"])
     
+    @staticmethod
+    def _as_bytes(content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, str):
+            return content.encode()
+        if isinstance(content, dict):
+            return json.dumps(content).encode()
+        return str(content).encode()
+    
     def store(self, content: Any, content_type: str = None, source: str = None, metadata: Dict = None) -> int:
         """
         Store ANY content polymorphically
@@ -120,83 +156,99 @@ class PolymorphicStorage:
             else:
                 content_type = "unknown"
         
-        # Announce storage event
+        data = self._as_bytes(content)
+        blob = self.blobs.put(data) if len(data) > INLINE_LIMIT else None
+        return self._add_row(content_type, source, metadata, data if blob is None else None, blob)
+    
+    def store_stream(self, chunks: Union[Iterable[bytes], Any], content_type: str = "binary",
+                     source: str = None, metadata: Dict = None) -> int:
+        """Store a large payload from chunks or a file object without holding it in memory"""
+        return self._add_row(content_type, source, metadata, None, self.blobs.put_stream(chunks))
+    
+    def _add_row(self, content_type: str, source: Optional[str], metadata: Optional[Dict],
+                 inline: Optional[bytes], blob) -> int:
+        size = blob.size if blob else len(inline)
+        try:
+            with session_scope() as session:
+                storage = StorageContent()
+                storage.content_type = content_type
+                storage.source = source or "unknown"
+                storage.content_metadata = json.dumps(metadata) if metadata else None
+                storage.content_blob = inline
+                storage.blob_sha256 = blob.sha256 if blob else None
+                storage.content_size = size
+                session.add(storage)
+                session.flush()
+                storage_id = storage.id
+        except Exception:
+            if blob:
+                self.blobs.release(blob.sha256)
+            raise
+        
+        where = "inline" if blob is None else f"blob {blob.sha256[:12]}" + ("" if blob.created else " (deduplicated)")
         local_announcer.announce(
             "STORAGE_EVENT",
-            [
-                f"STORING: {content_type}",
-                f"SOURCE: {source or 'unknown'}",
-                f"SIZE: {len(content) if hasattr(content, '__len__') else 'unknown'}"
-            ]
+            [f"STORED_ID: {storage_id} | {content_type} from {source or 'unknown'} | "
+             f"{size} bytes | {where}"]
         )
-        
-        with get_session() as session:
-            storage = StorageContent()
-            storage.content_type = content_type
-            storage.source = source or "unknown"
-            storage.content_metadata = json.dumps(metadata) if metadata else None
-            
-            # Decide how to store based on size and type
-            if isinstance(content, bytes) and len(content) > 10000:
-                # Large binary - store as file
-                file_path = os.path.join(
-                    self.storage_dir,
-                    f"{content_type}_{datetime.now().timestamp()}.dat"
-                )
-                with open(file_path, 'wb') as f:
-                    f.write(content)
-                storage.file_path = file_path
-                
-                local_announcer.announce(
-                    "STORAGE_FILE",
-                    [f"Stored as file: {file_path}"]
-                )
-            elif isinstance(content, str) and len(content) > 10000:
-                # Large text - store as file
-                file_path = os.path.join(
-                    self.storage_dir,
-                    f"{content_type}_{datetime.now().timestamp()}.txt"
-                )
-                with open(file_path, 'w') as f:
-                    f.write(content)
-                storage.file_path = file_path
-            else:
-                # Small content - store in database
-                if isinstance(content, str):
-                    storage.content_blob = content.encode()
-                elif isinstance(content, dict):
-                    storage.content_blob = json.dumps(content).encode()
-                elif isinstance(content, bytes):
-                    storage.content_blob = content
-                else:
-                    storage.content_blob = str(content).encode()
-            
-            session.add(storage)
-            session.commit()
-            storage_id = storage.id
-            
-            local_announcer.announce(
-                "STORAGE_COMPLETE",
-                [
-                    f"STORED_ID: {storage_id}",
-                    f"TYPE: {content_type}",
-                    f"RETRIEVAL: storage.retrieve({storage_id})"
-                ]
-            )
-            
-            return storage_id
+        return storage_id
     
     def retrieve(self, storage_id: int) -> Optional[Any]:
         """Retrieve stored content by ID"""
-        with get_session() as session:
+        with read_session_scope() as session:
             storage = session.query(StorageContent).filter_by(id=storage_id).first()
             if storage:
                 return storage.do("read")
         return None
     
+    def read_range(self, storage_id: int, start: int, length: Optional[int] = None) -> Optional[bytes]:
+        """Part of a stored item (large blobs are memory-mapped, not read whole)"""
+        with read_session_scope() as session:
+            storage = session.query(StorageContent).filter_by(id=storage_id).first()
+            if storage is None:
+                return None
+            if storage.blob_sha256:
+                return self.blobs.read_range(storage.blob_sha256, start, length)
+            data = storage.do("read") or b''
+            return data[start:] if length is None else data[start:start + length]
+    
+    def delete(self, storage_id: int) -> bool:
+        """Delete a stored item and drop its blob reference"""
+        with session_scope() as session:
+            storage = session.query(StorageContent).filter_by(id=storage_id).first()
+            if storage is None:
+                return False
+            blob_sha256, file_path = storage.blob_sha256, storage.file_path
+            session.delete(storage)
+        # Only once the row is gone: gc() may then reclaim the blob
+        if blob_sha256:
+            self.blobs.release(blob_sha256)
+        elif file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        return True
+    
+    def collect_garbage(self, grace_seconds: Optional[int] = None) -> Dict[str, int]:
+        """Recount blob references from the table, then delete unreferenced blobs"""
+        from sqlalchemy import func as sql_func
+        with read_session_scope() as session:
+            references = dict(
+                session.query(StorageContent.blob_sha256, sql_func.count(StorageContent.id))
+                       .filter(StorageContent.blob_sha256.isnot(None))
+                       .group_by(StorageContent.blob_sha256)
+            )
+        fixed = self.blobs.reconcile(references)
+        result = self.blobs.gc() if grace_seconds is None else self.blobs.gc(grace_seconds)
+        result['references_fixed'] = fixed
+        local_announcer.announce(
+            "PolymorphicStorage",
+            [f"🧹 Removed {result['removed']} blobs ({result['bytes_freed']:,} bytes), "
+             f"fixed {fixed} reference counts"]
+        )
+        return result
+    
     def list_recent(self, limit: int = 10) -> list:
         """List recent stored items"""
-        with get_session() as session:
+        with read_session_scope() as session:
             items = session.query(StorageContent)\
                           .order_by(StorageContent.created_at.desc())\
                           .limit(limit)\
@@ -211,33 +263,13 @@ class PolymorphicStorage:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Store as WAV file
-        file_path = os.path.join(
-            self.storage_dir,
-            f"voice_{user_id}_{datetime.now().timestamp()}.wav"
-        )
-        
-        with open(file_path, 'wb') as f:
-            f.write(audio_data)
-        
-        # Store reference in database
-        storage_id = self.store(
+        # One blob per distinct recording; the row carries who and when
+        return self.store(
             audio_data,
             content_type="audio/wav",
             source=f"discord_voice_{user_id}",
             metadata=metadata
         )
-        
-        local_announcer.announce(
-            "AUDIO_STORED",
-            [
-                f"Audio from user {user_id} stored",
-                f"Storage ID: {storage_id}",
-                f"File: {file_path}"
-            ]
-        )
-        
-        return storage_id
 
 # Global instance
 _storage_instance = PolymorphicStorage()
@@ -0,0 +1,202 @@
+"""
+build_graph.py - Content-hashed build graph for incremental publishing
+
+Every output (an HTML page, the JSON feed) is an artifact keyed by a hash of
+its inputs, the source of the function that builds it and the hashes of the
+artifacts it depends on. Every upload (a Shopify theme asset) is keyed by
+the hash of the artifact it ships.
+
+A persisted manifest remembers the hash each artifact was last built with
+and each asset was last published with, so a republish with unchanged data
+rebuilds nothing and uploads nothing. plan() reports the dirty set without
+doing any of the work.
+"""
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def content_hash(value: Any) -> str:
+    """Stable sha256 of any JSON-able value (dict order and datetimes included)"""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def recipe_hash(func: Callable) -> str:
+    """Hash of a builder's source, so template changes invalidate its output"""
+    func = getattr(func, '__func__', func)
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, '__qualname__', repr(func))
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Artifact:
+    """An output built from inputs (and other artifacts)"""
+    name: str
+    filename: str
+    inputs: Callable[[], Any]
+    build: Callable[[], str]
+    deps: Sequence[str] = ()
+    recipe: Optional[Callable] = None  # the function whose source is hashed (default: build)
+
+
+@dataclass
+class Asset:
+    """An upload of one artifact; publish returns a result dict with 'success'"""
+    name: str
+    source: str
+    publish: Callable[[str], Dict[str, Any]]
+    target: Any = None  # where it goes (store, theme); a new target means a new upload
+
+
+@dataclass
+class PublishManifest:
+    """Hashes of what was last built and last published, kept on disk"""
+    path: str
+    built: Dict[str, str] = field(default_factory=dict)
+    published: Dict[str, str] = field(default_factory=dict)
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> 'PublishManifest':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        return cls(path, data.get('built', {}), data.get('published', {}), data.get('updated_at'))
+
+    def save(self):
+        """Write atomically: a crash never leaves a half-written manifest"""
+        self.updated_at = datetime.now().isoformat()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'built': self.built, 'published': self.published, 'updated_at': self.updated_at},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class BuildGraph:
+    """Artifacts and assets, rebuilt and re-uploaded only when their hash changes"""
+
+    def __init__(self, build_dir: str):
+        self.build_dir = build_dir
+        self.manifest = PublishManifest.load(os.path.join(build_dir, 'manifest.json'))
+        self.artifacts: Dict[str, Artifact] = {}
+        self.assets: Dict[str, Asset] = {}
+        self._hashes: Dict[str, str] = {}
+        self.built: List[str] = []
+        self.uploaded: List[str] = []
+
+    def artifact(self, name: str, filename: str, inputs: Callable[[], Any], build: Callable[[], str],
+                 deps: Sequence[str] = (), recipe: Optional[Callable] = None) -> 'BuildGraph':
+        """
+        Add an output; deps must already be in the graph. Pass recipe when
+        build is a lambda around the real generator.
+        """
+        missing = [dep for dep in deps if dep not in self.artifacts]
+        if missing:
+            raise ValueError(f"Artifact {name} depends on unknown artifacts: {missing}")
+        self.artifacts[name] = Artifact(name, filename, inputs, build, tuple(deps), recipe)
+        return self
+
+    def asset(self, name: str, source: str, publish: Callable[[str], Dict[str, Any]],
+              target: Any = None) -> 'BuildGraph':
+        """Add an upload of an artifact"""
+        if source not in self.artifacts:
+            raise ValueError(f"Asset {name} ships unknown artifact {source}")
+        self.assets[name] = Asset(name, source, publish, target)
+        return self
+
+    # ============= Hashing and planning =============
+
+    def hash_of(self, name: str) -> str:
+        """Input hash of an artifact (memoized for this run)"""
+        if name not in self._hashes:
+            artifact = self.artifacts[name]
+            self._hashes[name] = content_hash({
+                'inputs': content_hash(artifact.inputs()),
+                'recipe': recipe_hash(artifact.recipe or artifact.build),
+                'deps': {dep: self.hash_of(dep) for dep in artifact.deps},
+            })
+        return self._hashes[name]
+
+    def asset_hash(self, name: str) -> str:
+        asset = self.assets[name]
+        return content_hash({'source': self.hash_of(asset.source), 'target': asset.target})
+
+    def _output_path(self, artifact: Artifact) -> str:
+        return os.path.join(self.build_dir, artifact.filename)
+
+    def _artifact_state(self, artifact: Artifact) -> str:
+        previous = self.manifest.built.get(artifact.name)
+        if previous is None:
+            return 'new'
+        if previous != self.hash_of(artifact.name):
+            return 'changed'
+        if not os.path.exists(self._output_path(artifact)):
+            return 'missing output'
+        return 'unchanged'
+
+    def _asset_state(self, asset: Asset) -> str:
+        previous = self.manifest.published.get(asset.name)
+        if previous is None:
+            return 'new'
+        return 'unchanged' if previous == self.asset_hash(asset.name) else 'changed'
+
+    def plan(self) -> Dict[str, Any]:
+        """What would change: per artifact/asset state, plus the dirty names"""
+        artifacts = {name: self._artifact_state(a) for name, a in self.artifacts.items()}
+        assets = {name: self._asset_state(a) for name, a in self.assets.items()}
+        return {
+            'artifacts': artifacts,
+            'assets': assets,
+            'dirty_artifacts': [name for name, state in artifacts.items() if state != 'unchanged'],
+            'dirty_assets': [name for name, state in assets.items() if state != 'unchanged'],
+        }
+
+    # ============= Building and publishing =============
+
+    def build(self, force: bool = False) -> Dict[str, str]:
+        """Build dirty artifacts, read the rest from the build directory"""
+        os.makedirs(self.build_dir, exist_ok=True)
+        outputs = {}
+        for name, artifact in self.artifacts.items():
+            path = self._output_path(artifact)
+            if force or self._artifact_state(artifact) != 'unchanged':
+                content = artifact.build()
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                self.manifest.built[name] = self.hash_of(name)
+                self.built.append(name)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            outputs[name] = content
+        if self.built:
+            self.manifest.save()
+        return outputs
+
+    def publish(self, outputs: Dict[str, str], force: bool = False) -> List[Dict[str, Any]]:
+        """Upload dirty assets; a successful upload records its hash"""
+        results = []
+        for name, asset in self.assets.items():
+            if not force and self._asset_state(asset) == 'unchanged':
+                continue
+            result = asset.publish(outputs[asset.source])
+            results.append(result)
+            if result.get('success'):
+                self.manifest.published[name] = self.asset_hash(name)
+                self.manifest.save()
+                self.uploaded.append(name)
+        return results
@@ -14,10 +14,20 @@ from database_service import DatabaseService
 from log_manager import LogManager
 from visualizer import UnifiedVisualizer
 from database.tournament_models import Tournament, Organization
+from publishing.build_graph import BuildGraph
+from utils.template_engine import template_engine
 # REMOVED: shopify_separated_publisher.py has been deprecated and renamed to .bak
 # We ONLY update /pages/attendance via theme template - NEVER create new pages!
 # See IMPORTANT_SHOPIFY_RULES.md and ENV_CONFIGURATION.md
 
+DEFAULT_BUILD_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache', 'publish'
+)
+
+# The theme asset behind /pages/attendance
+ATTENDANCE_ASSET = 'shopify:templates/page.attendance.json'
+
 
 @dataclass
 class PublishConfig:
@@ -39,6 +49,10 @@ class PublishConfig:
     min_attendance: int = 0
     days_back: int = 90
     use_separated_files: bool = False  # NEVER SET TO TRUE - We only update /pages/attendance, not create new pages!
+    incremental: bool = True  # Skip outputs/uploads whose inputs hash is unchanged
+    dry_run: bool = False  # Only report what would be rebuilt and uploaded
+    force: bool = False  # Rebuild and upload everything
+    build_dir: str = field(default_factory=lambda: os.getenv('PUBLISH_BUILD_DIR', DEFAULT_BUILD_DIR))
 
 
 @dataclass
@@ -53,6 +67,9 @@ class PublishStatistics:
     json_size_bytes: int = 0
     api_calls: int = 0
     api_errors: int = 0
+    artifacts_built: int = 0
+    artifacts_skipped: int = 0
+    uploads_skipped: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -68,6 +85,11 @@ class PublishStatistics:
             'api': {
                 'calls': self.api_calls,
                 'errors': self.api_errors
+            },
+            'incremental': {
+                'artifacts_built': self.artifacts_built,
+                'artifacts_skipped': self.artifacts_skipped,
+                'uploads_skipped': self.uploads_skipped
             }
         }
 
@@ -114,6 +136,9 @@ class PublishOperation:
                     self.logger.warning("No data to publish")
                     return self._get_result(success=False, error="No data available")
                 
+                if self.config.incremental or self.config.dry_run:
+                    return self._execute_incremental(data)
+                
                 # Generate outputs
                 outputs = self._generate_outputs(data)
                 
@@ -135,6 +160,93 @@ class PublishOperation:
             self.stats.end_time = datetime.now()
             return self._get_result(success=False, error=str(e))
     
+    def _execute_incremental(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild and upload only what changed since the last publish"""
+        graph = self._build_graph(data)
+        plan = graph.plan()
+        self.logger.info(f"Dirty artifacts: {plan['dirty_artifacts'] or 'none'}, "
+                         f"dirty uploads: {plan['dirty_assets'] or 'none'}")
+        
+        if self.config.dry_run:
+            self.stats.end_time = datetime.now()
+            result = self._get_result(success=True)
+            result['plan'] = plan
+            return result
+        
+        outputs = graph.build(force=self.config.force)
+        publish_results = graph.publish(outputs, force=self.config.force)
+        
+        self.stats.artifacts_built = len(graph.built)
+        self.stats.artifacts_skipped = len(graph.artifacts) - len(graph.built)
+        self.stats.uploads_skipped = len(graph.assets) - len(publish_results)
+        if 'org_html' in outputs:
+            self.stats.html_size_bytes = sum(len(outputs[name].encode('utf-8'))
+                                             for name in ('org_html', 'player_html') if name in outputs)
+        if 'json' in outputs:
+            self.stats.json_size_bytes = len(outputs['json'].encode('utf-8'))
+        
+        self.stats.end_time = datetime.now()
+        self._log_summary()
+        
+        result = self._get_result(
+            success=all(r['success'] for r in publish_results),
+            outputs=outputs,
+            publish_results=publish_results
+        )
+        result['plan'] = plan
+        return result
+    
+    def _build_graph(self, data: Dict[str, Any]) -> BuildGraph:
+        """
+        The outputs of _generate_outputs as a build graph, plus the Shopify
+        asset. Inputs leave out date_generated, which changes on every run.
+        """
+        summary = {k: v for k, v in data['summary'].items() if k != 'date_generated'}
+        settings = {'include_stats': self.config.include_stats, 'days_back': self.config.days_back,
+                    'min_attendance': self.config.min_attendance}
+        graph = BuildGraph(self.config.build_dir)
+        
+        if self.config.publish_html:
+            graph.artifact(
+                'org_html', 'org_rankings.html',
+                inputs=lambda: {'organizations': data['organizations'][:50],
+                                'players': data['player_rankings'], 'summary': summary,
+                                'templates': template_engine.fingerprint('publish/tabbed_rankings.html')},
+                build=lambda: self._generate_combined_tabbed_html(data),
+                recipe=self._generate_combined_tabbed_html
+            )
+            graph.artifact(
+                'player_html', 'player_rankings.html',
+                inputs=lambda: {'players': data['player_rankings'],
+                                'templates': template_engine.fingerprint('publish/player_rankings.html')},
+                build=lambda: self._generate_player_rankings_html(data),
+                recipe=self._generate_player_rankings_html
+            )
+        
+        if self.config.publish_json:
+            graph.artifact(
+                'json', 'rankings.json',
+                inputs=lambda: {'organizations': data['organizations'],
+                                'tournaments': data['recent_tournaments'], 'summary': summary,
+                                'settings': settings},
+                build=lambda: self._generate_json_output(data),
+                recipe=self._generate_json_output
+            )
+        
+        # Shopify only gets the combined page (/pages/attendance)
+        if self.config.shopify_domain and self.config.access_token and 'org_html' in graph.artifacts:
+            graph.asset(ATTENDANCE_ASSET, 'org_html', lambda html: self._publish_to_shopify({'org_html': html}),
+                        target=self.config.shopify_domain)
+        
+        return graph
+    
+    def what_would_change(self) -> Dict[str, Any]:
+        """Dry run: the artifacts and uploads a publish would redo, and why"""
+        data = self._gather_tournament_data()
+        if not data:
+            return {'artifacts': {}, 'assets': {}, 'dirty_artifacts': [], 'dirty_assets': []}
+        return self._build_graph(data).plan()
+    
     def _gather_tournament_data(self) -> Dict[str, Any]:
         """Gather tournament data for publishing"""
         self.logger.info("Gathering tournament data")
@@ -211,311 +323,50 @@ class PublishOperation:
         """Generate HTML output for publishing"""
         self.logger.debug("Generating HTML output")
         
-        # Build HTML manually since UnifiedVisualizer doesn't have the methods we need
-        html_parts = []
-        
-        # HTML header
-        html_parts.append("""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Tournament Rankings</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        h1 { color: #333; }
-        h2 { color: #555; margin-top: 30px; }
-        .stats { display: flex; gap: 20px; margin: 20px 0; }
-        .stat-card { background: #f5f5f5; padding: 15px; border-radius: 8px; flex: 1; }
-        .stat-value { font-size: 24px; font-weight: bold; color: #333; }
-        .stat-title { color: #666; margin-bottom: 5px; }
-        .stat-subtitle { color: #999; font-size: 12px; margin-top: 5px; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-        th { background: #f0f0f0; padding: 10px; text-align: left; }
-        td { padding: 8px; border-bottom: 1px solid #ddd; }
-        tr:hover { background: #f9f9f9; }
-    </style>
-</head>
-<body>
-""")
-        
-        # Title
-        html_parts.append(f"<h1>Tournament Rankings</h1>")
-        html_parts.append(f"<p>Southern California FGC • {data['summary']['total_tournaments']} Tournaments • {data['summary']['total_organizations']} Organizations</p>")
-        html_parts.append(f"<p style='color: #666; font-size: 12px;'>Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')} | Data version: 2.0</p>")
-        
-        # Stats cards
+        summary = data['summary']
+        stats = None
         if self.config.include_stats:
-            html_parts.append('<div class="stats">')
-            html_parts.append(f'''
-                <div class="stat-card">
-                    <div class="stat-title">Total Organizations</div>
-                    <div class="stat-value">{data['summary']['total_organizations']}</div>
-                    <div class="stat-subtitle">Active organizers</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-title">Total Tournaments</div>
-                    <div class="stat-value">{data['summary']['total_tournaments']}</div>
-                    <div class="stat-subtitle">Last {self.config.days_back} days</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-title">Total Attendance</div>
-                    <div class="stat-value">{data['summary']['total_attendance']:,}</div>
-                    <div class="stat-subtitle">Unique players</div>
-                </div>
-            ''')
-            html_parts.append('</div>')
-        
-        # Organization rankings table
-        html_parts.append('<h2>Organization Rankings</h2>')
-        html_parts.append('<table>')
-        html_parts.append('<thead><tr>')
-        for header in ['Rank', 'Organization', 'Tournaments', 'Total Attendance', 'Avg Attendance']:
-            html_parts.append(f'<th>{header}</th>')
-        html_parts.append('</tr></thead>')
-        html_parts.append('<tbody>')
-        
-        for idx, org_data in enumerate(data['organizations'][:50], 1):  # Top 50
-            org = org_data['organization']
-            html_parts.append('<tr>')
-            html_parts.append(f'<td>{idx}</td>')
-            html_parts.append(f'<td>{org["display_name"]}</td>')
-            html_parts.append(f'<td>{org_data["tournament_count"]}</td>')
-            html_parts.append(f'<td>{org_data["total_attendance"]:,}</td>')
-            html_parts.append(f'<td>{org_data["average_attendance"]:.1f}</td>')
-            html_parts.append('</tr>')
-        
-        html_parts.append('</tbody></table>')
-        
-        # Recent tournaments
-        if len(data['recent_tournaments']) > 0:
-            html_parts.append('<h2>Recent Tournaments</h2>')
-            html_parts.append('<table>')
-            html_parts.append('<thead><tr>')
-            for header in ['Date', 'Tournament', 'Attendees', 'Location']:
-                html_parts.append(f'<th>{header}</th>')
-            html_parts.append('</tr></thead>')
-            html_parts.append('<tbody>')
-            
-            for tournament in data['recent_tournaments'][:20]:  # Top 20 recent
-                html_parts.append('<tr>')
-                date_str = tournament['start_date'].strftime('%Y-%m-%d') if tournament['start_date'] else 'TBD'
-                html_parts.append(f'<td>{date_str}</td>')
-                html_parts.append(f'<td>{tournament["name"]}</td>')
-                html_parts.append(f'<td>{tournament["num_attendees"]}</td>')
-                location = f"{tournament['city']}, {tournament['state']}" if tournament['city'] else 'Online'
-                html_parts.append(f'<td>{location}</td>')
-                html_parts.append('</tr>')
-            
-            html_parts.append('</tbody></table>')
-        
-        # Footer
-        html_parts.append('</body></html>')
-        
-        return ''.join(html_parts)
+            stats = [
+                {'title': 'Total Organizations', 'value': summary['total_organizations'],
+                 'subtitle': 'Active organizers'},
+                {'title': 'Total Tournaments', 'value': summary['total_tournaments'],
+                 'subtitle': f"Last {self.config.days_back} days"},
+                {'title': 'Total Attendance', 'value': f"{summary['total_attendance']:,}",
+                 'subtitle': 'Unique players'},
+            ]
+        
+        return template_engine.render(
+            'publish/rankings.html',
+            summary=summary,
+            stats=stats,
+            organizations=data['organizations'][:50],  # Top 50
+            recent_tournaments=data['recent_tournaments'][:20],  # Top 20 recent
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')
+        )
     
     def _generate_combined_tabbed_html(self, data: Dict[str, Any]) -> str:
         """Generate combined HTML with tabs for both player and organization rankings"""
         self.logger.debug("Generating combined tabbed HTML")
         
-        html_parts = []
-        
-        # HTML header with tab styles
-        total_orgs = data['summary']['total_organizations']
-        total_players = len(data['player_rankings'])
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')
-        
-        html_parts.append(f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Tournament Rankings</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        h1 {{ color: #333; }}
-        .update-info {{ color: #666; font-size: 12px; margin: 10px 0; }}
-        .tab-nav {{ display: flex; gap: 10px; margin: 20px 0; border-bottom: 2px solid #ddd; }}
-        .tab-button {{ padding: 10px 20px; background: #f5f5f5; border: none; cursor: pointer; border-radius: 5px 5px 0 0; }}
-        .tab-button:hover {{ background: #e0e0e0; }}
-        .tab-button.active {{ background: #333; color: white; }}
-        .tab-content {{ display: none; }}
-        .tab-content.active {{ display: block; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th {{ background: #f0f0f0; padding: 10px; text-align: left; }}
-        td {{ padding: 8px; border-bottom: 1px solid #ddd; }}
-        tr:hover {{ background: #f9f9f9; }}
-    </style>
-</head>
-<body>
-    <h1>Tournament Rankings</h1>
-    <p>Southern California FGC • {total_orgs} Organizations • {total_players} Players</p>
-    <p class="update-info">Last updated: {timestamp} | Version: 3.0 TABBED</p>
-    
-    <div class="tab-nav">
-        <button class="tab-button active" onclick="showTab('organizations')">Organization Rankings</button>
-        <button class="tab-button" onclick="showTab('players')">Player Rankings</button>
-    </div>
-    
-    <div id="organizations" class="tab-content active">
-        <h2>Organization Rankings</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Rank</th>
-                    <th>Organization</th>
-                    <th>Tournaments</th>
-                    <th>Total Attendance</th>
-                    <th>Avg Attendance</th>
-                </tr>
-            </thead>
-            <tbody>
-""")
-        
-        # Add organization rows
-        for idx, org_data in enumerate(data['organizations'][:50], 1):
-            org = org_data['organization']
-            html_parts.append(f"""
-                <tr>
-                    <td>{idx}</td>
-                    <td>{org['display_name']}</td>
-                    <td>{org_data['tournament_count']}</td>
-                    <td>{org_data['total_attendance']:,}</td>
-                    <td>{org_data['average_attendance']:.1f}</td>
-                </tr>""")
-        
-        html_parts.append("""
-            </tbody>
-        </table>
-    </div>
-    
-    <div id="players" class="tab-content">
-        <h2>Player Rankings</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Rank</th>
-                    <th>Player</th>
-                    <th>Points</th>
-                    <th>Events</th>
-                    <th>1st Places</th>
-                    <th>Top 3s</th>
-                    <th>Win %</th>
-                    <th>Podium %</th>
-                </tr>
-            </thead>
-            <tbody>
-""")
-        
-        # Add player rows
-        for idx, player in enumerate(data['player_rankings'][:50], 1):
-            html_parts.append(f"""
-                <tr>
-                    <td>{idx}</td>
-                    <td>{player['name']}</td>
-                    <td>{player['points']}</td>
-                    <td>{player['events']}</td>
-                    <td>{player['first_places']}</td>
-                    <td>{player['top_3s']}</td>
-                    <td>{player['win_rate']:.1f}%</td>
-                    <td>{player['podium_rate']:.1f}%</td>
-                </tr>""")
-        
-        html_parts.append("""
-            </tbody>
-        </table>
-    </div>
-    
-    <script>
-        function showTab(tabName) {
-            // Hide all tabs
-            var tabs = document.querySelectorAll('.tab-content');
-            tabs.forEach(function(tab) {
-                tab.classList.remove('active');
-            });
-            
-            // Remove active from all buttons
-            var buttons = document.querySelectorAll('.tab-button');
-            buttons.forEach(function(button) {
-                button.classList.remove('active');
-            });
-            
-            // Show selected tab
-            document.getElementById(tabName).classList.add('active');
-            
-            // Mark button as active
-            event.target.classList.add('active');
-        }
-    </script>
-</body>
-</html>
-""")
-        
-        return ''.join(html_parts)
+        return template_engine.render(
+            'publish/tabbed_rankings.html',
+            total_orgs=data['summary']['total_organizations'],
+            total_players=len(data['player_rankings']),
+            organizations=data['organizations'][:50],
+            players=data['player_rankings'][:50],
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')
+        )
     
     def _generate_player_rankings_html(self, data: Dict[str, Any]) -> str:
         """Generate HTML for player rankings"""
         self.logger.debug("Generating player rankings HTML")
         
-        html_parts = []
-        
-        # HTML header
-        html_parts.append("""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Player Rankings</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        h1 { color: #333; }
-        h2 { color: #555; margin-top: 30px; }
-        .stats { display: flex; gap: 20px; margin: 20px 0; }
-        .stat-card { background: #f5f5f5; padding: 15px; border-radius: 8px; flex: 1; }
-        .stat-value { font-size: 24px; font-weight: bold; color: #333; }
-        .stat-title { color: #666; margin-bottom: 5px; }
-        .stat-subtitle { color: #999; font-size: 12px; margin-top: 5px; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-        th { background: #f0f0f0; padding: 10px; text-align: left; }
-        td { padding: 8px; border-bottom: 1px solid #ddd; }
-        tr:hover { background: #f9f9f9; }
-    </style>
-</head>
-<body>
-""")
-        
-        # Title
-        html_parts.append(f"<h1>Player Rankings</h1>")
-        html_parts.append(f"<p>Southern California FGC • Top {len(data['player_rankings'])} Players</p>")
-        html_parts.append(f"<p style='color: #666; font-size: 12px;'>Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')}</p>")
-        
-        # Player rankings table
-        html_parts.append('<h2>Top Players by Points</h2>')
-        html_parts.append('<table>')
-        html_parts.append('<thead><tr>')
-        for header in ['Rank', 'Player', 'Points', 'Events', '1st Places', 'Top 3s', 'Win %', 'Podium %']:
-            html_parts.append(f'<th>{header}</th>')
-        html_parts.append('</tr></thead>')
-        html_parts.append('<tbody>')
-        
-        for idx, player in enumerate(data['player_rankings'][:50], 1):  # Top 50
-            html_parts.append('<tr>')
-            html_parts.append(f'<td>{idx}</td>')
-            html_parts.append(f'<td>{player["name"]}</td>')
-            html_parts.append(f'<td>{player["points"]}</td>')
-            html_parts.append(f'<td>{player["events"]}</td>')
-            html_parts.append(f'<td>{player["first_places"]}</td>')
-            html_parts.append(f'<td>{player["top_3s"]}</td>')
-            html_parts.append(f'<td>{player["win_rate"]:.1f}%</td>')
-            html_parts.append(f'<td>{player["podium_rate"]:.1f}%</td>')
-            html_parts.append('</tr>')
-        
-        html_parts.append('</tbody></table>')
-        
-        # Footer
-        html_parts.append('</body></html>')
-        
-        return ''.join(html_parts)
+        return template_engine.render(
+            'publish/player_rankings.html',
+            total_players=len(data['player_rankings']),
+            players=data['player_rankings'][:50],  # Top 50
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S PST')
+        )
     
     def _generate_json_output(self, data: Dict[str, Any]) -> str:
         """Generate JSON output for API consumption"""
@@ -648,6 +499,10 @@ class PublishOperation:
             self.logger.info(f"  JSON size: {self.stats.json_size_bytes:,} bytes")
         self.logger.info(f"  API calls: {self.stats.api_calls} "
                         f"(errors: {self.stats.api_errors})")
+        if self.config.incremental:
+            self.logger.info(f"  Artifacts: {self.stats.artifacts_built} built, "
+                            f"{self.stats.artifacts_skipped} unchanged; "
+                            f"{self.stats.uploads_skipped} uploads skipped")
     
     def _get_result(self, success: bool = True, error: Optional[str] = None, 
                    outputs: Optional[Dict] = None, 
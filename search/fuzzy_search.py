@@ -6,11 +6,19 @@ Uses multiple algorithms for best match quality.
 """
 
 import re
-from typing import List, Tuple, Optional, Any, Dict, Union
+from typing import List, Tuple, Optional, Any, Dict, Union, Sequence, Set
+from collections import OrderedDict, defaultdict
 from difflib import SequenceMatcher, get_close_matches
 from dataclasses import dataclass
 import unicodedata
 
+import numpy as np
+
+# Candidate lists at least this long are searched through a trigram index
+INDEX_MIN_CANDIDATES = 1000
+# Indexes kept for recently searched candidate lists
+INDEX_CACHE_SIZE = 8
+
 
 @dataclass
 class FuzzyMatch:
@@ -24,6 +32,113 @@ class FuzzyMatch:
         return f"FuzzyMatch('{self.matched}', score={self.score:.2f})"
 
 
+def trigrams(text: str) -> Set[str]:
+    """
+    Padded word trigrams of normalized text ("jon" -> "  j", " jo", "jon", "on ").
+    Padding lets short words and word starts/ends share grams with typos.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def score_normalized(query_norm: str, candidate_norm: str, cutoff: float = 0.0) -> float:
+    """
+    FuzzySearcher's match score for already-normalized strings.
+
+    Exact for every score >= cutoff; below that the (expensive) sequence
+    ratio may be skipped once its upper bound shows it cannot matter.
+    """
+    # 1. Exact substring match (highest priority)
+    if query_norm in candidate_norm:
+        best = 1.0
+    # 2. Starts with query
+    elif candidate_norm.startswith(query_norm):
+        best = 0.9
+    # 3. All query words present
+    elif all(word in candidate_norm for word in query_norm.split()):
+        best = 0.85
+    else:
+        best = None
+
+    # 5. Token-based matching (words in different order)
+    query_tokens = set(query_norm.split())
+    candidate_tokens = set(candidate_norm.split())
+    token_score = 0.0
+    if query_tokens and candidate_tokens:
+        token_score = len(query_tokens & candidate_tokens) / len(query_tokens) * 0.8
+
+    if best is not None:
+        return max(best, token_score)
+
+    # 4. Sequence matching (handles typos), skipped when it can't win
+    matcher = SequenceMatcher(None, query_norm, candidate_norm)
+    floor = max(cutoff, token_score)
+    if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+        return token_score
+    return max(matcher.ratio(), token_score)
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over a fixed list of names.
+
+    A query only re-scores the names sharing the most trigrams with it
+    (the candidate pool), so a search over 100k+ names costs a few
+    posting-list lookups instead of a SequenceMatcher per name.
+    """
+
+    def __init__(self, names: Sequence[str], pool: int = 500):
+        self.names = list(names)
+        self.normalized = [FuzzySearcher.normalize_text(name) if name else "" for name in self.names]
+        self.pool = pool
+
+        postings = defaultdict(list)
+        for i, norm in enumerate(self.normalized):
+            for gram in trigrams(norm):
+                postings[gram].append(i)
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, query_norm: str, pool: Optional[int] = None) -> np.ndarray:
+        """Positions of the names sharing most trigrams with the query, ascending"""
+        pool = pool or self.pool
+        lists = [self.postings[gram] for gram in trigrams(query_norm) if gram in self.postings]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        hits = np.flatnonzero(counts)
+        if len(hits) > pool:
+            # Most shared trigrams first, earlier names first among ties
+            key = counts[hits] * len(self.names) - hits
+            hits = hits[np.argpartition(-key, pool - 1)[:pool]]
+        return np.sort(hits)
+
+    def search(self, query: str, limit: int = 10, cutoff: float = 0.6,
+               pool: Optional[int] = None) -> List["FuzzyMatch"]:
+        """Top matches, scored and ordered exactly like FuzzySearcher.fuzzy_match"""
+        query_norm = FuzzySearcher.normalize_text(query)
+        if not query_norm:
+            return []
+
+        matches = []
+        for i in self.candidates(query_norm, pool):
+            candidate_norm = self.normalized[i]
+            if not candidate_norm:
+                continue
+            score = score_normalized(query_norm, candidate_norm, cutoff)
+            if score >= cutoff:
+                matches.append(FuzzyMatch(original=query, matched=self.names[i], score=score))
+
+        matches.sort(key=lambda x: x.score, reverse=True)
+        return matches[:limit]
+
+
 class FuzzySearcher:
     """
     Universal fuzzy search handler for the tournament tracker.
@@ -38,6 +153,7 @@ class FuzzySearcher:
             threshold: Minimum similarity score (0-1) to consider a match
         """
         self.threshold = threshold
+        self._indexes: "OrderedDict[Tuple, TrigramIndex]" = OrderedDict()
     
     @staticmethod
     def normalize_text(text: str) -> str:
@@ -96,6 +212,11 @@ class FuzzySearcher:
             return []
         
         cutoff = cutoff or self.threshold
+
+        # Long candidate lists: prune with a trigram index, then re-score
+        if len(candidates) >= INDEX_MIN_CANDIDATES:
+            return self.index_for(candidates).search(query, limit=limit, cutoff=cutoff)
+
         query_norm = self.normalize_text(query)
         
         matches = []
@@ -103,36 +224,8 @@ class FuzzySearcher:
             if not candidate:
                 continue
             
-            candidate_norm = self.normalize_text(candidate)
-            
-            # Try multiple matching strategies
-            scores = []
-            
-            # 1. Exact substring match (highest priority)
-            if query_norm in candidate_norm:
-                scores.append(1.0)
-            
-            # 2. Starts with query
-            elif candidate_norm.startswith(query_norm):
-                scores.append(0.9)
-            
-            # 3. All query words present
-            elif all(word in candidate_norm for word in query_norm.split()):
-                scores.append(0.85)
-            
-            # 4. Sequence matching (handles typos)
-            else:
-                scores.append(self.calculate_similarity(query_norm, candidate_norm))
-            
-            # 5. Token-based matching (words in different order)
-            query_tokens = set(query_norm.split())
-            candidate_tokens = set(candidate_norm.split())
-            if query_tokens and candidate_tokens:
-                token_score = len(query_tokens & candidate_tokens) / len(query_tokens)
-                scores.append(token_score * 0.8)
-            
-            # Take the best score
-            best_score = max(scores)
+            # Substring, prefix, all-words, typo (sequence) and token scores
+            best_score = score_normalized(query_norm, self.normalize_text(candidate), cutoff)
             
             if best_score >= cutoff:
                 matches.append(FuzzyMatch(
@@ -146,6 +239,19 @@ class FuzzySearcher:
         
         return matches[:limit]
     
+    def index_for(self, candidates: Sequence[str]) -> TrigramIndex:
+        """Trigram index for a candidate list, reused while the list is unchanged"""
+        key = (len(candidates), hash(tuple(candidates)))
+        index = self._indexes.get(key)
+        if index is None:
+            index = TrigramIndex(candidates)
+            self._indexes[key] = index
+            while len(self._indexes) > INDEX_CACHE_SIZE:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+        return index
+    
     def fuzzy_match_objects(
         self,
         query: str,
@@ -177,12 +283,12 @@ class FuzzySearcher:
         # Get matches
         matches = self.fuzzy_match(query, candidates, limit=limit, cutoff=cutoff)
         
-        # Attach original objects to matches
+        # Attach original objects to matches (first object with that text)
+        first_objects = {}
+        for text, obj in candidates_with_objects:
+            first_objects.setdefault(text, obj)
         for match in matches:
-            for text, obj in candidates_with_objects:
-                if text == match.matched:
-                    match.item = obj
-                    break
+            match.item = first_objects.get(match.matched)
         
         return matches
     
@@ -282,7 +388,9 @@ def fuzzy_find_best(query: str, candidates: List[str]) -> Optional[str]:
 def create_fuzzy_filter(column, query: str, threshold: float = 0.6):
     """
     Create a SQLAlchemy filter for fuzzy matching
-    This is a simple version - for true fuzzy DB search, use PostgreSQL extensions
+    
+    Substring/prefix/word matches, plus the ids the persistent name index
+    (search/name_index.py) ranks as typo matches when the column is indexed.
     """
     from sqlalchemy import or_, func
     
@@ -301,6 +409,14 @@ def create_fuzzy_filter(column, query: str, threshold: float = 0.6):
             if len(word) > 2:  # Skip very short words
                 filters.append(func.lower(column).contains(word))
     
+    try:
+        from search.name_index import indexed_ids_for_column
+        ids = indexed_ids_for_column(column, query, cutoff=threshold)
+    except ImportError:
+        ids = None
+    if ids:
+        filters.append(column.class_.id.in_(ids))
+    
     return or_(*filters)
 
 
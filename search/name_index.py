@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+name_index.py - Persistent trigram index for player, organization and venue names
+
+An SQLite FTS5 table (trigram tokenizer) inside the tournament database holds
+every gamer tag, real name, organization display name and venue name. Triggers
+on the source tables keep it in sync, whoever writes them, so nothing has to
+remember to reindex. The table and triggers are created by the alembic
+revision b81e4c0d9a27 (ensure_name_index does the same for a bare sqlite3
+connection); searching never changes the schema, and falls back to LIKE
+queries on databases without the index.
+
+A search asks FTS5 for the names sharing the most trigrams with the query
+(candidate pruning: one posting-list lookup per trigram, counted in SQL),
+then re-scores that pool with the same scoring FuzzySearcher.fuzzy_match
+uses and returns the top k.
+
+Row ids encode the source: rowid = source_id * ROWID_STRIDE + kind code, so a
+trigger can replace one row's names without scanning the index.
+"""
+
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from search.fuzzy_search import FuzzyMatch, FuzzySearcher, score_normalized
+
+INDEX_TABLE = 'search_names'
+ROWID_STRIDE = 4
+TRIGRAM_MIN_SQLITE = (3, 34, 0)  # first release with the FTS5 trigram tokenizer
+
+# kind -> (code, table, column)
+SOURCES: Dict[str, Tuple[int, str, str]] = {
+    'player': (0, 'players', 'gamer_tag'),
+    'player_name': (1, 'players', 'name'),
+    'organization': (2, 'organizations', 'display_name'),
+    'venue': (3, 'tournaments', 'venue_name'),
+}
+KIND_BY_CODE = {code: kind for kind, (code, _, _) in SOURCES.items()}
+
+# Names re-scored per query
+CANDIDATE_POOL = 200
+
+_ready: Dict[str, bool] = {}
+
+
+def _tables(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def _trigger_sql(table: str, sources: List[Tuple[int, str]]) -> List[str]:
+    """Insert/update/delete triggers mirroring one table's name columns"""
+    def inserts(ref):
+        return ' '.join(
+            f"INSERT INTO {INDEX_TABLE}(rowid, name) SELECT {ref}.id * {ROWID_STRIDE} + {code}, {ref}.{column} "
+            f"WHERE {ref}.{column} IS NOT NULL AND {ref}.{column} != '';"
+            for code, column in sources)
+
+    def deletes(ref):
+        return ' '.join(f"DELETE FROM {INDEX_TABLE} WHERE rowid = {ref}.id * {ROWID_STRIDE} + {code};"
+                        for code, _ in sources)
+
+    columns = ', '.join(column for _, column in sources)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {inserts('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_{table}_au AFTER UPDATE OF id, {columns} ON {table} "
+        f"BEGIN {deletes('old')} {inserts('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {deletes('old')} END",
+    ]
+
+
+def _sources_by_table(tables: Iterable[str]) -> Dict[str, List[Tuple[int, str]]]:
+    by_table: Dict[str, List[Tuple[int, str]]] = {}
+    for code, table, column in SOURCES.values():
+        if table in tables:
+            by_table.setdefault(table, []).append((code, column))
+    return by_table
+
+
+def create_statements(tables: Iterable[str]) -> List[str]:
+    """DDL for the index table and the triggers on whichever source tables exist"""
+    statements = [f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5(name, tokenize='trigram')"]
+    for table, sources in _sources_by_table(tables).items():
+        statements.extend(_trigger_sql(table, sources))
+    return statements
+
+
+def fill_statements(tables: Iterable[str]) -> List[str]:
+    """Copy every existing name into a freshly created index"""
+    return [
+        f"INSERT INTO {INDEX_TABLE}(rowid, name) SELECT id * {ROWID_STRIDE} + {code}, {column} "
+        f"FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+        for table, sources in _sources_by_table(tables).items() for code, column in sources
+    ]
+
+
+def drop_statements(tables: Iterable[str]) -> List[str]:
+    """Remove the triggers and the index table"""
+    statements = [f"DROP TRIGGER IF EXISTS {INDEX_TABLE}_{table}_{suffix}"
+                  for table in _sources_by_table(tables) for suffix in ('ai', 'au', 'ad')]
+    return statements + [f"DROP TABLE IF EXISTS {INDEX_TABLE}"]
+
+
+def trigram_supported(conn) -> bool:
+    """Whether this SQLite build has FTS5 with the trigram tokenizer (DB-API connection)"""
+    version = conn.execute("SELECT sqlite_version()").fetchone()[0]
+    options = {row[0] for row in conn.execute("PRAGMA compile_options")}
+    return tuple(int(part) for part in version.split('.')) >= TRIGRAM_MIN_SQLITE and 'ENABLE_FTS5' in options
+
+
+def ensure_name_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the index table and its triggers on a sqlite3 connection if
+    missing, filling it on creation (what the alembic revision does).
+
+    Returns False when this SQLite build has no FTS5 trigram tokenizer
+    (needs SQLite 3.34+).
+    """
+    tables = _tables(conn)
+    try:
+        for sql in create_statements(tables):
+            conn.execute(sql)
+        if INDEX_TABLE not in tables:
+            for sql in fill_statements(tables):
+                conn.execute(sql)
+        conn.commit()
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return False
+    return True
+
+
+def rebuild_name_index(conn: sqlite3.Connection) -> int:
+    """Drop and refill the index from the source tables; returns the row count"""
+    for sql in drop_statements(_tables(conn)):
+        conn.execute(sql)
+    conn.commit()
+    if not ensure_name_index(conn):
+        return 0
+    return conn.execute(f"SELECT count(*) FROM {INDEX_TABLE}").fetchone()[0]
+
+
+def _query_trigrams(query: str) -> List[str]:
+    """Trigrams of the query as FTS5 phrases (the tokenizer folds case itself)"""
+    text = ' '.join(query.split())
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    return ['"{}"'.format(gram.replace('"', '""')) for gram in sorted(grams)]
+
+
+def search_names(conn: sqlite3.Connection, query: str, kinds: Optional[Sequence[str]] = None,
+                 limit: int = 10, cutoff: float = 0.6, pool: int = CANDIDATE_POOL) -> List[FuzzyMatch]:
+    """
+    Top-k fuzzy matches from the index.
+
+    Each FuzzyMatch.item is (kind, source_id). Every matching source row is
+    returned: two players sharing a gamer tag, or every tournament held at a
+    venue, each get their own match.
+    """
+    query_norm = FuzzySearcher.normalize_text(query)
+    if not query_norm:
+        return []
+    codes = [SOURCES[kind][0] for kind in (kinds or SOURCES)]
+    kind_filter = f"rowid % {ROWID_STRIDE} IN ({', '.join(str(c) for c in codes)})"
+
+    grams = _query_trigrams(query_norm)
+    if grams:
+        # Names sharing the most trigrams; one indexed lookup per trigram
+        # (cheaper than bm25 over an OR of every trigram)
+        lookups = ' UNION ALL '.join(f"SELECT rowid AS id FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH ?"
+                                     for _ in grams)
+        rows = conn.execute(
+            f"SELECT names.rowid, names.name FROM ("
+            f"  SELECT id, count(*) AS shared FROM ({lookups}) WHERE {kind_filter.replace('rowid', 'id')}"
+            f"  GROUP BY id ORDER BY shared DESC, id LIMIT ?"
+            f") JOIN {INDEX_TABLE} AS names ON names.rowid = id ORDER BY shared DESC, id",
+            (*grams, pool)).fetchall()
+    else:
+        # One or two characters: too short for trigrams, prefix scan instead
+        pattern = query_norm.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = conn.execute(
+            f"SELECT rowid, name FROM {INDEX_TABLE} WHERE name LIKE ? ESCAPE '\\' AND {kind_filter} "
+            f"ORDER BY rowid LIMIT ?", (pattern, pool)).fetchall()
+
+    matches = []
+    for rowid, name in rows:
+        kind = KIND_BY_CODE[rowid % ROWID_STRIDE]
+        name_norm = FuzzySearcher.normalize_text(name)
+        score = score_normalized(query_norm, name_norm, cutoff)
+        if score >= cutoff:
+            matches.append(FuzzyMatch(original=query, matched=name, score=score,
+                                      item=(kind, rowid // ROWID_STRIDE)))
+
+    # Best score first; shared-trigram order breaks ties
+    matches.sort(key=lambda x: x.score, reverse=True)
+    return matches[:limit]
+
+
+def search_ids(conn: sqlite3.Connection, query: str, kinds: Sequence[str],
+               limit: int = 10, cutoff: float = 0.6) -> List[int]:
+    """Source ids of the best matches, best first, without repeats"""
+    ids: List[int] = []
+    for match in search_names(conn, query, kinds=kinds, limit=limit * len(kinds), cutoff=cutoff):
+        if match.item[1] not in ids:
+            ids.append(match.item[1])
+    return ids[:limit]
+
+
+# ============================================================================
+# Tournament database adapters
+# ============================================================================
+
+def ranked_ids(query: str, kinds: Sequence[str], limit: int = 10, cutoff: float = 0.6) -> Optional[List[int]]:
+    """
+    search_ids against the tournament database engine.
+
+    Returns None when the index can't be used (not SQLite, or the alembic
+    revision creating it hasn't run) so callers fall back to their LIKE
+    queries. Read-only: the schema is left alone.
+    """
+    from utils.database import engine
+
+    if engine.dialect.name != 'sqlite':
+        return None
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection if hasattr(raw, 'driver_connection') else raw.connection
+        url = str(engine.url)
+        if not _ready.get(url):
+            # Only a hit is cached, so the index is picked up once migrated
+            _ready[url] = INDEX_TABLE in _tables(conn)
+        if not _ready[url]:
+            return None
+        return search_ids(conn, query, kinds, limit=limit, cutoff=cutoff)
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        raw.close()
+
+
+def indexed_ids_for_column(column: Any, query: str, limit: int = 50, cutoff: float = 0.6) -> Optional[List[int]]:
+    """ranked_ids for an ORM column, if that column is one the index mirrors"""
+    try:
+        table, key = column.class_.__tablename__, column.key
+    except AttributeError:
+        return None
+    kinds = [kind for kind, (_, t, c) in SOURCES.items() if (t, c) == (table, key)]
+    if not kinds:
+        return None
+    return ranked_ids(query, kinds, limit=limit, cutoff=cutoff)
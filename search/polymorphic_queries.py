@@ -13,6 +13,7 @@ from utils.database_service import database_service
 from database.tournament_models import Player, Tournament, Organization, TournamentPlacement
 from utils.formatters import PlayerFormatter, TournamentFormatter
 from utils.points_system import PointsSystem
+from search.name_index import ranked_ids
 from polymorphic_core import announcer
 
 
@@ -75,6 +76,11 @@ class PolymorphicQuery:
     @classmethod
     def _search_players_by_name(cls, session: Session, name: str) -> List[Player]:
         """Search for players by name (case-insensitive, fuzzy)"""
+        # Trigram name index: gamer tags and real names, best match first
+        ids = ranked_ids(name, ('player', 'player_name'), limit=10)
+        if ids:
+            return cls._in_order(session.query(Player).filter(Player.id.in_(ids)).all(), ids)
+        
         search_pattern = f'%{name}%'
         players = session.query(Player).filter(
             func.lower(Player.gamer_tag).like(search_pattern.lower())
@@ -88,6 +94,12 @@ class PolymorphicQuery:
         
         return players
     
+    @staticmethod
+    def _in_order(rows: List[Any], ids: List[int]) -> List[Any]:
+        """Rows sorted to follow a ranked id list"""
+        rank = {row_id: i for i, row_id in enumerate(ids)}
+        return sorted(rows, key=lambda row: rank[row.id])
+    
     @classmethod
     def _get_top_players(cls, session: Session, limit: int = 8, event: Optional[str] = None) -> List[Player]:
         """Get top players by points with calculated stats
@@ -213,9 +225,13 @@ class PolymorphicQuery:
                 return orgs
             
             else:
-                # Search by name
+                # Search by name (trigram name index, then LIKE)
+                ids = ranked_ids(input_data, ('organization',), limit=10)
+                if ids:
+                    orgs = session.query(Organization).filter(Organization.id.in_(ids)).all()
+                    return cls._in_order(orgs, ids)
                 return session.query(Organization)\
-                    .filter(func.lower(Organization.name).like(f'%{input_data}%'))\
+                    .filter(func.lower(Organization.display_name).like(f'%{input_lower}%'))\
                     .limit(10).all()
         
         else:
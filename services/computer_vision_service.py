@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Computer Vision Service - OCR and Image Recognition for Form Detection
+
+Images are decoded once and OCR/contour results are cached by content hash
+(see services/vision_pipeline.py), so the find_* helpers can be chained freely.
 """
 
 import sys
@@ -11,10 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from polymorphic_core.execution_guard import require_go_py
 require_go_py("services.computer_vision_service")
 
-import cv2
-import numpy as np
 import pytesseract
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw, ImageFont
 import json
 import re
 from typing import Dict, List, Tuple, Optional, Any
@@ -23,6 +24,7 @@ import time
 from polymorphic_core import announcer
 from logging_services.polymorphic_log_manager import PolymorphicLogManager
 from polymorphic_core.visualizable import MediaFile
+from services.vision_pipeline import VisionPipeline
 
 class ComputerVisionService:
     """Computer Vision Service for form element detection and OCR"""
@@ -36,6 +38,9 @@ class ComputerVisionService:
             self.ocr_available = True
         except:
             self.ocr_available = False
+        
+        # Decode-once pipeline with content-hash result cache
+        self.pipeline = VisionPipeline(ocr_available=self.ocr_available)
             
         # Announce this service
         announcer.announce(
@@ -46,6 +51,8 @@ class ComputerVisionService:
                 "Button and input field location detection",
                 "Visual element coordinate extraction",
                 "Anti-automation bypass via image recognition",
+                "Decode-once pipeline, OCR cached by image content hash",
+                "Batch analysis across a process pool",
                 f"OCR Engine: {'Available' if self.ocr_available else 'Not Available'}"
             ]
         )
@@ -75,6 +82,16 @@ class ComputerVisionService:
                 return {'error': 'Image path required for element detection'}
             return self._find_all_elements(image_path)
             
+        elif 'batch' in query_lower:
+            image_paths = kwargs.get('image_paths') or []
+            if not image_paths:
+                return {'error': 'image_paths required for batch analysis'}
+            analysis = kwargs.get('analysis', 'elements')
+            return self.pipeline.analyze_batch(image_paths, analysis, kwargs.get('workers'))
+            
+        elif 'cache' in query_lower or 'stats' in query_lower:
+            return self.pipeline.stats_snapshot()
+            
         elif 'analyze' in query_lower or 'info' in query_lower:
             if not image_path:
                 return {'error': 'Image path required for analysis'}
@@ -87,7 +104,9 @@ class ComputerVisionService:
                     'buttons in image - Find clickable buttons',
                     'inputs in image - Find input fields',
                     'elements in image - Find all interactive elements',
-                    'analyze image - Complete image analysis'
+                    'analyze image - Complete image analysis',
+                    'batch analyze - Analyze image_paths across a process pool',
+                    'cache stats - Decode/OCR cache statistics'
                 ],
                 'ocr_available': self.ocr_available
             }
@@ -161,33 +180,8 @@ class ComputerVisionService:
             return {'error': 'OCR not available - tesseract not found'}
         
         try:
-            # Load image
-            image = Image.open(image_path)
-            
-            # Get detailed OCR data with coordinates
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            
-            text_elements = []
-            n_boxes = len(ocr_data['text'])
-            
-            for i in range(n_boxes):
-                text = ocr_data['text'][i].strip()
-                if text:  # Only include non-empty text
-                    x, y, w, h = ocr_data['left'][i], ocr_data['top'][i], ocr_data['width'][i], ocr_data['height'][i]
-                    confidence = ocr_data['conf'][i]
-                    
-                    text_elements.append({
-                        'text': text,
-                        'bbox': [x, y, x + w, y + h],
-                        'center': [x + w//2, y + h//2],
-                        'confidence': confidence
-                    })
-            
-            return {
-                'text_elements': text_elements,
-                'total_elements': len(text_elements),
-                'image_size': image.size
-            }
+            # Decoded once, OCR cached by content hash
+            return self.pipeline.ocr(self.pipeline.load(image_path))
             
         except Exception as e:
             return {'error': f'OCR failed: {str(e)}'}
@@ -195,41 +189,8 @@ class ComputerVisionService:
     def _find_buttons(self, image_path: str) -> Dict:
         """Find button-like elements in the image"""
         try:
-            # Load image with OpenCV
-            img = cv2.imread(image_path)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Look for rectangular shapes (buttons)
-            edges = cv2.Canny(gray, 50, 150)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            buttons = []
-            for contour in contours:
-                # Approximate contour
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                
-                # Look for rectangular shapes
-                if len(approx) >= 4:
-                    x, y, w, h = cv2.boundingRect(contour)
-                    area = cv2.contourArea(contour)
-                    
-                    # Filter for button-like dimensions and size
-                    if 50 < w < 300 and 20 < h < 80 and area > 1000:
-                        buttons.append({
-                            'bbox': [x, y, x + w, y + h],
-                            'center': [x + w//2, y + h//2],
-                            'area': area,
-                            'aspect_ratio': w / h
-                        })
-            
-            # Sort by size (larger buttons first)
-            buttons.sort(key=lambda b: b['area'], reverse=True)
-            
-            return {
-                'buttons': buttons,
-                'count': len(buttons)
-            }
+            # Rectangular shapes with button-like dimensions (contours cached per image)
+            return self.pipeline.buttons(self.pipeline.load(image_path))
             
         except Exception as e:
             return {'error': f'Button detection failed: {str(e)}'}
@@ -237,37 +198,8 @@ class ComputerVisionService:
     def _find_input_fields(self, image_path: str) -> Dict:
         """Find input field elements in the image"""
         try:
-            # Load image with OpenCV
-            img = cv2.imread(image_path)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Look for rectangular input-like shapes
-            edges = cv2.Canny(gray, 30, 100)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            inputs = []
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                area = cv2.contourArea(contour)
-                
-                # Filter for input field dimensions (wide and short)
-                if w > 100 and 20 < h < 50 and area > 800:
-                    aspect_ratio = w / h
-                    if aspect_ratio > 3:  # Wide rectangles like input fields
-                        inputs.append({
-                            'bbox': [x, y, x + w, y + h],
-                            'center': [x + w//2, y + h//2],
-                            'area': area,
-                            'aspect_ratio': aspect_ratio
-                        })
-            
-            # Sort by vertical position (top to bottom)
-            inputs.sort(key=lambda inp: inp['bbox'][1])
-            
-            return {
-                'inputs': inputs,
-                'count': len(inputs)
-            }
+            # Wide, short rectangles sorted top to bottom (contours cached per image)
+            return self.pipeline.input_fields(self.pipeline.load(image_path))
             
         except Exception as e:
             return {'error': f'Input field detection failed: {str(e)}'}
@@ -293,7 +225,7 @@ class ComputerVisionService:
     def _analyze_image(self, image_path: str) -> Dict:
         """Complete image analysis with all detection methods"""
         try:
-            image = Image.open(image_path)
+            decoded = self.pipeline.load(image_path)
             
             # Get all elements
             elements = self._find_all_elements(image_path)
@@ -301,8 +233,9 @@ class ComputerVisionService:
             # Basic image info
             analysis = {
                 'image_path': image_path,
-                'image_size': image.size,
-                'file_size': os.path.getsize(image_path),
+                'image_size': decoded.size,
+                'file_size': decoded.file_size,
+                'content_hash': decoded.content_hash,
                 'elements_detected': elements,
                 'ocr_available': self.ocr_available,
                 'analysis_timestamp': time.time()
@@ -315,8 +248,19 @@ class ComputerVisionService:
     
     def _find_email_field(self, image_path: str) -> Dict:
         """Specifically find email input field"""
-        # Get all text and input elements
-        elements = self._find_all_elements(image_path)
+        # Fields first (cheap), then OCR only the region around them
+        elements = self._find_input_fields(image_path)
+        if self.ocr_available and elements.get('inputs'):
+            try:
+                decoded = self.pipeline.load(image_path)
+                # Related text must sit within 150px of a field - crop to that neighbourhood
+                roi = self.pipeline.roi_around(decoded, [i['bbox'] for i in elements['inputs']],
+                                               padding=150 + 40)
+                elements['text_elements'] = self.pipeline.ocr(decoded, roi=roi).get('text_elements', [])
+            except Exception as e:
+                self.log_manager.log('WARNING', f'Email field OCR failed for {image_path}: {e}',
+                                     source='computer_vision')
+                elements['text_elements'] = []
         
         # Look for email-related text near input fields
         email_candidates = []
@@ -368,8 +312,27 @@ class ComputerVisionService:
     
     def _find_continue_button(self, image_path: str) -> Dict:
         """Specifically find continue/submit button"""
-        elements = self._find_all_elements(image_path)
+        # OCR just the button regions first; fall back to the whole page
+        buttons = self._find_buttons(image_path).get('buttons', [])
+        if self.ocr_available and buttons:
+            try:
+                decoded = self.pipeline.load(image_path)
+                roi = self.pipeline.roi_around(decoded, [b['bbox'] for b in buttons])
+                elements = {
+                    'buttons': buttons,
+                    'text_elements': self.pipeline.ocr(decoded, roi=roi).get('text_elements', [])
+                }
+                result = self._match_continue_button(elements)
+                if result['found']:
+                    return result
+            except Exception as e:
+                self.log_manager.log('WARNING', f'Button OCR failed for {image_path}, trying the whole page: {e}',
+                                     source='computer_vision')
         
+        return self._match_continue_button(self._find_all_elements(image_path))
+    
+    def _match_continue_button(self, elements: Dict) -> Dict:
+        """Pick the best continue/submit candidate from detected elements"""
         # Look for continue/submit related text
         button_keywords = ['continue', 'submit', 'next', 'login', 'sign in', 'go']
         button_candidates = []
@@ -425,8 +388,8 @@ class ComputerVisionService:
             # Get all elements
             elements = self._find_all_elements(image_path)
             
-            # Load image
-            image = Image.open(image_path).convert('RGB')
+            # Decoded copy (shared with detection)
+            image = self.pipeline.load(image_path).pil()
             draw = ImageDraw.Draw(image)
             
             # Try to load a font
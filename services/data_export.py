@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+data_export.py - Streaming bulk export of tournaments, players and placements
+
+GET /api/export/{dataset}?format=csv|ndjson|json streams rows straight from
+a database cursor into a chunked aiohttp response:
+
+- the query runs on a read-only snapshot session with yield_per, so rows
+  arrive in batches of EXPORT_BATCH_SIZE and are never all in memory
+- each batch is encoded and written (gzip with ?gzip=1) before the next
+  one is fetched, waiting on the client when it reads slowly
+- rows come in primary key order; with ?limit=N the X-Next-Token header
+  holds a keyset token, and ?after=<token> resumes right after that key
+
+Filters: since/until (YYYY-MM-DD or unix time, on the tournament start),
+event (substring of the event name) and region (socal, norcal, a
+"lat_min,lat_max,lng_min,lng_max" box, or a city/state name). Players
+are filtered through the placements they have.
+"""
+
+import os
+import io
+import csv
+import json
+import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, date, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '2000'))
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'json': ('application/json', 'json'),
+}
+
+# Same boxes as LocationMixin.is_in_socal / is_in_norcal
+REGIONS = {
+    'socal': (32.5, 34.5, -119.0, -116.0),
+    'norcal': (36.0, 39.0, -123.0, -120.0),
+}
+
+# dataset -> exported columns (the first one is the keyset key)
+DATASETS = {
+    'tournaments': ('id', 'name', 'start_at', 'end_at', 'num_attendees', 'venue_name', 'city',
+                    'addr_state', 'lat', 'lng', 'owner_name', 'primary_contact', 'url'),
+    'players': ('id', 'startgg_id', 'gamer_tag', 'name'),
+    'placements': ('id', 'tournament_id', 'tournament_name', 'start_at', 'player_id', 'gamer_tag',
+                   'placement', 'event_name', 'event_id'),
+}
+
+
+class ExportError(ValueError):
+    """Bad export request (reported as HTTP 400)"""
+
+
+# ============================================================================
+# Filters and keyset tokens
+# ============================================================================
+
+def _timestamp(value: str, end_of_day: bool = False) -> int:
+    """Unix time from a YYYY-MM-DD date or a unix timestamp"""
+    if value.isdigit():
+        return int(value)
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Bad date: {value!r} (use YYYY-MM-DD or a unix timestamp)")
+    moment = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+    return int(moment) + (86399 if end_of_day else 0)
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    """Filters shared by every dataset"""
+    since: Optional[int] = None
+    until: Optional[int] = None
+    event: Optional[str] = None
+    region: Optional[str] = None
+
+    @classmethod
+    def from_query(cls, params) -> 'ExportFilters':
+        since, until = params.get('since'), params.get('until')
+        return cls(
+            since=_timestamp(since) if since else None,
+            until=_timestamp(until, end_of_day=True) if until else None,
+            event=params.get('event') or None,
+            region=params.get('region') or None,
+        )
+
+    @property
+    def touches_tournaments(self) -> bool:
+        return any(v is not None for v in (self.since, self.until, self.region))
+
+    def __bool__(self) -> bool:
+        return self.touches_tournaments or self.event is not None
+
+    def region_box(self) -> Optional[Tuple[float, float, float, float]]:
+        """Bounding box for a named or numeric region; None for city/state names"""
+        if self.region is None:
+            return None
+        if self.region.lower() in REGIONS:
+            return REGIONS[self.region.lower()]
+        parts = self.region.split(',')
+        if len(parts) == 4:
+            try:
+                return tuple(float(p) for p in parts)
+            except ValueError:
+                pass
+        return None
+
+
+def encode_token(dataset: str, key: Any) -> str:
+    """Opaque keyset token: resume after this key"""
+    raw = json.dumps({'dataset': dataset, 'after': key}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token: str, dataset: str) -> Any:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw)
+        if data['dataset'] != dataset:
+            raise ExportError(f"Token is for {data['dataset']}, not {dataset}")
+        return data['after']
+    except (ValueError, KeyError, TypeError):
+        raise ExportError("Bad resume token")
+
+
+# ============================================================================
+# Encoders: one batch of rows in, bytes out
+# ============================================================================
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class CsvEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+
+    def _lines(self, rows: Iterable[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def header(self) -> bytes:
+        return self._lines([self.columns])
+
+    def batch(self, rows: List[Sequence]) -> bytes:
+        return self._lines([[_plain(v) for v in row] for row in rows])
+
+    def footer(self) -> bytes:
+        return b''
+
+
+class NdjsonEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+
+    def header(self) -> bytes:
+        return b''
+
+    def batch(self, rows: List[Sequence]) -> bytes:
+        return ''.join(json.dumps(dict(zip(self.columns, row)), default=_plain) + '\n'
+                       for row in rows).encode('utf-8')
+
+    def footer(self) -> bytes:
+        return b''
+
+
+class JsonEncoder(NdjsonEncoder):
+    """One JSON array, written element by element"""
+
+    def __init__(self, columns: Sequence[str]):
+        super().__init__(columns)
+        self.first = True
+
+    def header(self) -> bytes:
+        return b'['
+
+    def batch(self, rows: List[Sequence]) -> bytes:
+        if not rows:
+            return b''
+        body = ',\n'.join(json.dumps(dict(zip(self.columns, row)), default=_plain) for row in rows)
+        prefix = '\n' if self.first else ',\n'
+        self.first = False
+        return (prefix + body).encode('utf-8')
+
+    def footer(self) -> bytes:
+        return b'\n]\n'
+
+
+ENCODERS = {'csv': CsvEncoder, 'ndjson': NdjsonEncoder, 'json': JsonEncoder}
+
+
+def encode_stream(fmt: str, columns: Sequence[str], batches: Iterable[List[Sequence]]) -> Iterator[bytes]:
+    """Bytes for a whole export, one chunk per batch"""
+    encoder = ENCODERS[fmt](columns)
+    yield encoder.header()
+    for rows in batches:
+        yield encoder.batch(rows)
+    yield encoder.footer()
+
+
+# ============================================================================
+# Queries
+# ============================================================================
+
+def build_select(dataset: str, filters: ExportFilters, after: Any = None):
+    """The export SELECT, in key order, for one dataset"""
+    from sqlalchemy import select, exists, and_, or_, func
+    from database.tournament_models import Tournament, Player, TournamentPlacement
+
+    def tournament_conditions():
+        conditions = []
+        if filters.since is not None:
+            conditions.append(Tournament.start_at >= filters.since)
+        if filters.until is not None:
+            conditions.append(Tournament.start_at <= filters.until)
+        if filters.region is not None:
+            box = filters.region_box()
+            if box:
+                lat_min, lat_max, lng_min, lng_max = box
+                conditions.append(and_(Tournament.lat.between(lat_min, lat_max),
+                                       Tournament.lng.between(lng_min, lng_max)))
+            else:
+                name = filters.region.lower()
+                conditions.append(or_(func.lower(Tournament.city) == name,
+                                      func.lower(Tournament.addr_state) == name))
+        return conditions
+
+    def event_conditions():
+        if filters.event is None:
+            return []
+        return [TournamentPlacement.event_name.ilike(f'%{filters.event}%')]
+
+    if dataset == 'tournaments':
+        if filters.event is not None:
+            raise ExportError("The event filter applies to placements and players")
+        key = Tournament.id
+        stmt = select(*[getattr(Tournament, c) for c in DATASETS['tournaments']])\
+            .where(*tournament_conditions())
+    elif dataset == 'players':
+        key = Player.id
+        stmt = select(*[getattr(Player, c) for c in DATASETS['players']])
+        if filters:
+            placed = select(TournamentPlacement.id).where(TournamentPlacement.player_id == Player.id,
+                                                          *event_conditions())
+            if filters.touches_tournaments:
+                placed = placed.join(Tournament, TournamentPlacement.tournament_id == Tournament.id)\
+                    .where(*tournament_conditions())
+            stmt = stmt.where(exists(placed))
+    elif dataset == 'placements':
+        key = TournamentPlacement.id
+        stmt = select(
+            TournamentPlacement.id, TournamentPlacement.tournament_id, Tournament.name.label('tournament_name'),
+            Tournament.start_at, TournamentPlacement.player_id, Player.gamer_tag,
+            TournamentPlacement.placement, TournamentPlacement.event_name, TournamentPlacement.event_id
+        ).join(Tournament, TournamentPlacement.tournament_id == Tournament.id)\
+            .join(Player, TournamentPlacement.player_id == Player.id)\
+            .where(*tournament_conditions(), *event_conditions())
+    else:
+        raise ExportError(f"Unknown dataset {dataset!r} (choose from {', '.join(DATASETS)})")
+
+    if after is not None:
+        stmt = stmt.where(key > after)
+    return stmt.order_by(key), key
+
+
+def next_token(session, dataset: str, filters: ExportFilters, after: Any, limit: int) -> Optional[str]:
+    """Token for the page after this one, or None on the last page (a key-only query)"""
+    stmt, key = build_select(dataset, filters, after)
+    keys = session.execute(stmt.with_only_columns(key).offset(limit - 1).limit(2)).scalars().all()
+    return encode_token(dataset, keys[0]) if len(keys) == 2 else None
+
+
+def iter_batches(session, dataset: str, filters: ExportFilters, after: Any = None,
+                 limit: Optional[int] = None, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """Rows in batches from a streaming cursor"""
+    stmt, _ = build_select(dataset, filters, after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = session.execute(stmt.execution_options(yield_per=batch_size, stream_results=True))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+def _export_batches(dataset, filters, after, limit, batch_size, info) -> Iterator[List[tuple]]:
+    """Snapshot session + batches; runs entirely on the export's own thread"""
+    from utils.database import read_session_scope
+
+    with read_session_scope() as session:
+        info['next'] = next_token(session, dataset, filters, after, limit) if limit else None
+        yield []  # headers can go out now
+        yield from iter_batches(session, dataset, filters, after, limit, batch_size)
+
+
+# ============================================================================
+# aiohttp handler
+# ============================================================================
+
+async def stream_export(request):
+    """GET /api/export/{dataset}: stream one dataset as CSV, NDJSON or JSON"""
+    from aiohttp import web
+
+    dataset = request.match_info['dataset']
+    params = request.rel_url.query
+    fmt = params.get('format', 'ndjson').lower()
+    try:
+        if dataset not in DATASETS:
+            raise ExportError(f"Unknown dataset {dataset!r} (choose from {', '.join(DATASETS)})")
+        if fmt not in FORMATS:
+            raise ExportError(f"Unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        filters = ExportFilters.from_query(params)
+        after = decode_token(params['after'], dataset) if params.get('after') else None
+        limit = int(params['limit']) if params.get('limit') else None
+        if limit is not None and limit < 1:
+            raise ExportError("limit must be positive")
+        build_select(dataset, filters)  # reject bad filter combinations before streaming
+    except (ExportError, ValueError) as e:
+        return web.json_response({'error': str(e)}, status=400)
+
+    # A cursor belongs to one thread: every fetch for this export runs on this one
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'export-{dataset}')
+    info: Dict[str, Any] = {}
+    batches = _export_batches(dataset, filters, after, limit, EXPORT_BATCH_SIZE, info)
+    try:
+        await loop.run_in_executor(executor, next, batches)
+
+        content_type, extension = FORMATS[fmt]
+        response = web.StreamResponse(headers={
+            'Content-Type': f'{content_type}; charset=utf-8',
+            'Content-Disposition': f'attachment; filename="{dataset}.{extension}"',
+        })
+        if info.get('next'):
+            response.headers['X-Next-Token'] = info['next']
+            response.headers['Link'] = f'<{request.rel_url.update_query(after=info["next"])}>; rel="next"'
+        response.enable_chunked_encoding()
+        if params.get('gzip') in ('1', 'true', 'yes'):
+            response.enable_compression(web.ContentCoding.gzip)
+        await response.prepare(request)
+
+        # Fetching and encoding both step on the export's thread
+        chunks = encode_stream(fmt, DATASETS[dataset], batches)
+        while True:
+            chunk = await loop.run_in_executor(executor, next, chunks, None)
+            if chunk is None:
+                break
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+    finally:
+        await loop.run_in_executor(executor, batches.close)
+        executor.shutdown(wait=False)
@@ -16,6 +16,7 @@ from polymorphic_core.execution_guard import require_go_py
 require_go_py("services.editor_service")
 
 from database_service import database_service
+from utils.database import session_scope, read_session_scope
 from log_manager import LogManager
 from capability_announcer import announcer
 from shutdown_coordinator import on_shutdown
@@ -106,6 +107,7 @@ class EditorService:
         app.router.add_get('/api/organizations', self.get_organizations)
         app.router.add_get('/api/players', self.get_players)
         app.router.add_get('/api/attendance-timeline', self.get_attendance_timeline)
+        app.router.add_get('/api/export/{dataset}', self.export_data)
         app.router.add_post('/api/organizations/{org_id}/update', self.update_organization)
         app.router.add_post('/api/organizations/merge', self.merge_organizations)
         app.router.add_post('/api/sync', self.start_sync)
@@ -145,7 +147,7 @@ class EditorService:
         from sqlalchemy import func
         import html as html_module
         
-        with get_session() as session:
+        with read_session_scope() as session:
             # Get all tournaments and map them to organizations
             tournaments = database_service.get_all_tournaments()
             
@@ -350,7 +352,7 @@ class EditorService:
         # Get recent tournaments
         from database_service import database_service
         from database.tournament_models import Tournament
-        with session_scope() as session:
+        with read_session_scope() as session:
             recent_tournaments = session.query(Tournament)\
                 .order_by(Tournament.start_at.desc())\
                 .limit(10).all()
@@ -366,6 +368,17 @@ class EditorService:
                     <td>{html_module.escape(t.venue_name or 'N/A')}</td>
                 </tr>"""
         
+        # Last 12 months of attendance from the monthly rollup
+        monthly_html = ""
+        for month in database_service.ask("monthly attendance")[-12:][::-1]:
+            monthly_html += f"""
+            <tr>
+                <td>{month['month']}</td>
+                <td>{month['tournament_count']}</td>
+                <td>{month['total_attendance']:,}</td>
+                <td>{month['total_attendance'] / month['tournament_count']:.0f}</td>
+            </tr>"""
+        
         html = f"""
         <!DOCTYPE html>
         <html>
@@ -438,6 +451,23 @@ class EditorService:
                     </table>
                 </div>
                 
+                <div class="section">
+                    <h2>Monthly Attendance</h2>
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>Month</th>
+                                <th>Events</th>
+                                <th>Total Attendance</th>
+                                <th>Avg Attendance</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {monthly_html}
+                        </tbody>
+                    </table>
+                </div>
+                
                 <div class="section">
                     <h2>Recent Tournaments</h2>
                     <table>
@@ -470,8 +500,15 @@ class EditorService:
         import os
         from pathlib import Path
         
+        raw = request.query.get('raw') == 'true' or request.query.get('format') in ('png', 'html')
+        
         # Check if request is for the raw heatmap (for iframe)
-        if request.query.get('raw') == 'true':
+        if raw:
+            response = await self._serve_heatmap_artifact(request, request.query.get('format', 'html'))
+            if response is not None:
+                return response
+            
+            # Render cache unavailable - fall back to a file from ./go.py --heatmap
             heatmap_file = Path("tournament_heatmap.html")
             if heatmap_file.exists():
                 with open(heatmap_file, 'r') as f:
@@ -481,7 +518,7 @@ class EditorService:
         # Check if we have a generated heatmap file
         heatmap_file = Path("tournament_heatmap.html")
         
-        if heatmap_file.exists():
+        if not raw and (heatmap_file.exists() or self._prefetch_heatmap()):
             # Embed the heatmap in an iframe with proper page structure
             html = """
             <!DOCTYPE html>
@@ -756,6 +793,45 @@ class EditorService:
         """
         return web.Response(text=html, content_type='text/html')
     
+    def _prefetch_heatmap(self) -> bool:
+        """Start rendering the interactive heatmap so the iframe request joins it; False without data"""
+        try:
+            from visualization_services import heatmap_service
+            if not heatmap_service.has_data():
+                return False
+            heatmap_service.do('prefetch html')
+            return True
+        except Exception as e:
+            self.logger.warning(f"Heatmap render cache unavailable: {e}")
+            return False
+    
+    async def _serve_heatmap_artifact(self, request, kind: str):
+        """Serve a cached heatmap render with ETag / Last-Modified revalidation"""
+        from email.utils import formatdate
+        
+        try:
+            from visualization_services import heatmap_service
+            artifact = await heatmap_service.artifact_async(kind)
+        except Exception as e:
+            self.logger.warning(f"Heatmap render failed: {e}")
+            return None
+        
+        headers = {
+            'ETag': artifact.etag,
+            'Last-Modified': formatdate(artifact.created, usegmt=True),
+            'Cache-Control': 'no-cache',
+            'X-Heatmap-Version': artifact.version
+        }
+        if artifact.stale:
+            headers['Warning'] = '110 - "Response is Stale"'
+        
+        if_none_match = request.headers.get('If-None-Match', '')
+        client_tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',') if tag.strip()}
+        if '*' in client_tags or artifact.etag in client_tags:
+            return web.Response(status=304, headers=headers)
+        
+        return web.Response(body=artifact.body, content_type=artifact.content_type, headers=headers)
+    
     async def players_handler(self, request):
         """Serve the players page"""
         html = self._load_template('players.html')
@@ -768,7 +844,7 @@ class EditorService:
         
         player_id = int(request.match_info['player_id'])
         
-        with session_scope() as session:
+        with read_session_scope() as session:
             player = database_service.get_player_by_id(player_id)
             
             if not player:
@@ -847,7 +923,7 @@ class EditorService:
         
         tournament_id = int(request.match_info['tournament_id'])
         
-        with session_scope() as session:
+        with read_session_scope() as session:
             tournament = database_service.get_tournament_by_id(tournament_id)
             
             if not tournament:
@@ -1047,12 +1123,43 @@ class EditorService:
                 <a href="/">← Home</a>
             </nav>
             <h1>Export Options</h1>
-            <p>Data export functionality coming soon...</p>
+            <p>Exports stream straight from the database, so full datasets download at any size.</p>
+            <form action="/api/export/tournaments" method="get" id="export-form">
+                <p>
+                    <label>Dataset
+                        <select onchange="this.form.action = '/api/export/' + this.value">
+                            <option value="tournaments">Tournaments</option>
+                            <option value="players">Players</option>
+                            <option value="placements">Placements</option>
+                        </select>
+                    </label>
+                    <label>Format
+                        <select name="format">
+                            <option value="csv">CSV</option>
+                            <option value="ndjson">NDJSON</option>
+                            <option value="json">JSON</option>
+                        </select>
+                    </label>
+                </p>
+                <p>
+                    <label>Since <input type="date" name="since"></label>
+                    <label>Until <input type="date" name="until"></label>
+                    <label>Event <input type="text" name="event" placeholder="Ultimate Singles"></label>
+                    <label>Region <input type="text" name="region" placeholder="socal, norcal or a city"></label>
+                    <label><input type="checkbox" name="gzip" value="1"> gzip</label>
+                </p>
+                <button type="submit">Download</button>
+            </form>
         </body>
         </html>
         """
         return web.Response(text=html, content_type='text/html')
     
+    async def export_data(self, request):
+        """API: stream a dataset as CSV, NDJSON or JSON"""
+        from services.data_export import stream_export
+        return await stream_export(request)
+    
     async def sync_status_handler(self, request):
         """Serve the sync status page"""
         html = """
@@ -1084,10 +1191,15 @@ class EditorService:
         # Get last sync time (simplified for now)
         last_sync = "Unknown"
         
+        # Attendance totals come from the monthly rollup, not the tournaments table
+        timeline = database_service.ask("monthly attendance")
+        
         return web.json_response({
             'tournaments': stats.total_tournaments,
             'organizations': stats.total_organizations,
             'players': stats.total_players,
+            'total_attendance': sum(month['total_attendance'] for month in timeline),
+            'latest_month': timeline[-1] if timeline else None,
             'last_sync': last_sync
         })
     
@@ -1146,7 +1258,7 @@ class EditorService:
             # For now, return a simplified tournament list
             # We'll enhance this once we understand the model structure better
             from database.tournament_models import Tournament
-            with session_scope() as session:
+            with read_session_scope() as session:
                 tournaments = session.query(Tournament).limit(100).all()
                 
                 for t in tournaments:
@@ -1186,7 +1298,7 @@ class EditorService:
         try:
             from database.tournament_models import Player
             
-            with session_scope() as session:
+            with read_session_scope() as session:
                 players = session.query(Player).limit(100).all()
                 
                 # Calculate rankings based on points - within session scope
@@ -1261,7 +1373,7 @@ class EditorService:
         """API endpoint for organizations"""
         from database.tournament_models import Organization
         
-        with session_scope() as session:
+        with read_session_scope() as session:
             orgs = database_service.get_all_organizations()
             
             data = []
@@ -1473,54 +1585,57 @@ class EditorService:
 
 
     async def get_attendance_timeline(self, request):
-        """API endpoint for attendance over time data"""
+        """API endpoint for attendance over time data (from the attendance_monthly rollup)"""
         from database.tournament_models import Tournament
-        from datetime import datetime, timedelta
+        from database.attendance_rollup import REGIONS, monthly_totals
+        from datetime import datetime, timezone
         import calendar
         
+        params = request.rel_url.query
+        organization, region = params.get('organization'), params.get('region')
         try:
-            with session_scope() as session:
-                # Get all tournaments with attendance data
-                tournaments = session.query(Tournament).filter(
-                    Tournament.num_attendees > 0,
-                    Tournament.start_at > 0
-                ).order_by(Tournament.start_at).all()
-                
-                # Group by month
-                monthly_data = {}
-                for t in tournaments:
-                    # Convert timestamp to date
-                    date = datetime.fromtimestamp(t.start_at)
-                    month_key = f"{date.year}-{date.month:02d}"
-                    
-                    if month_key not in monthly_data:
-                        monthly_data[month_key] = {
-                            'month': calendar.month_name[date.month][:3],
-                            'year': date.year,
-                            'total_attendance': 0,
-                            'tournament_count': 0,
-                            'tournaments': []
-                        }
-                    
-                    monthly_data[month_key]['total_attendance'] += t.num_attendees
-                    monthly_data[month_key]['tournament_count'] += 1
-                    monthly_data[month_key]['tournaments'].append({
-                        'name': t.name,
-                        'attendance': t.num_attendees,
-                        'date': date.strftime('%Y-%m-%d')
-                    })
-                
-                # Convert to sorted list
+            top = int(params.get('top', 0))  # top tournaments per month (reads tournaments)
+        except ValueError:
+            return web.json_response({'error': f"top must be an integer, got {params.get('top')!r}"}, status=400)
+
+        try:
+            with read_session_scope() as session:
                 timeline = []
-                for month_key in sorted(monthly_data.keys()):
-                    data = monthly_data[month_key]
-                    timeline.append({
-                        'label': f"{data['month']} {data['year']}",
-                        'total_attendance': data['total_attendance'],
-                        'tournament_count': data['tournament_count'],
-                        'average_attendance': data['total_attendance'] / data['tournament_count'] if data['tournament_count'] > 0 else 0,
-                        'tournaments': sorted(data['tournaments'], key=lambda x: x['attendance'], reverse=True)[:5]  # Top 5
-                    })
+                for row in monthly_totals(session, organization=organization, region=region,
+                                          since=params.get('since'), until=params.get('until')):
+                    year, month = map(int, row['month'].split('-'))
+                    entry = {
+                        'label': f"{calendar.month_name[month][:3]} {year}",
+                        'month': row['month'],
+                        'total_attendance': row['total_attendance'],
+                        'tournament_count': row['tournament_count'],
+                        'average_attendance': row['total_attendance'] / row['tournament_count'],
+                        'tournaments': []
+                    }
+                    if top > 0:
+                        start = datetime(year, month, 1, tzinfo=timezone.utc)
+                        end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+                        query = session.query(Tournament.name, Tournament.num_attendees, Tournament.start_at).filter(
+                            Tournament.start_at >= int(start.timestamp()),
+                            Tournament.start_at < int(end.timestamp()),
+                            Tournament.num_attendees > 0
+                        )
+                        if organization is not None:
+                            query = query.filter(Tournament.owner_name == organization)
+                        if region in dict(REGIONS):
+                            lat_min, lat_max, lng_min, lng_max = dict(REGIONS)[region]
+                            query = query.filter(Tournament.lat.between(lat_min, lat_max),
+                                                 Tournament.lng.between(lng_min, lng_max))
+                        entry['tournaments'] = [
+                            {
+                                'name': name,
+                                'attendance': attendance,
+                                'date': datetime.fromtimestamp(start_at, timezone.utc).strftime('%Y-%m-%d')
+                            }
+                            for name, attendance, start_at in
+                            query.order_by(Tournament.num_attendees.desc()).limit(top)
+                        ]
+                    timeline.append(entry)
                 
                 return web.json_response(timeline)
                 
@@ -1886,7 +2001,7 @@ def get_unnamed_tournaments():
     from database_service import database_service
     from database.tournament_models import Tournament
     
-    with session_scope() as session:
+    with read_session_scope() as session:
         tournaments = session.query(Tournament).filter(
             Tournament.organization_id.is_(None)
         ).order_by(Tournament.start_date.desc()).all()
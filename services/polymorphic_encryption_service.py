@@ -25,6 +25,7 @@ from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from typing import Any, Optional, Union
+from utils.stream_encryption import StreamCipher, StreamIntegrityError
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -46,6 +47,7 @@ class PolymorphicEncryption:
         """Initialize and announce capabilities."""
         self.ssl_context = None
         self.fernet = None
+        self.stream_cipher = None
         self.private_key = None
         self.public_key = None
         self.proxy_tasks = []
@@ -88,6 +90,8 @@ class PolymorphicEncryption:
             os.chmod(key_file, 0o600)  # Secure the key file
         
         self.fernet = Fernet(key)
+        # Large files use chunked AEAD under a key derived from the same secret
+        self.stream_cipher = StreamCipher(base64.urlsafe_b64decode(key))
         
         # SSL context for proxy - now in services directory, check local first
         local_cert = pathlib.Path(__file__).parent / "rsa_certificate"
@@ -114,7 +118,7 @@ class PolymorphicEncryption:
                 "encryption": "active" if self.fernet else "inactive",
                 "ssl": "ready" if self.ssl_context else "no certificates",
                 "proxy_tasks": len(self.proxy_tasks),
-                "algorithms": ["Fernet", "RSA", "SSL/TLS"]
+                "algorithms": ["Fernet", self.stream_cipher.algorithm.upper() + " (chunked files)", "RSA", "SSL/TLS"]
             }
         
         elif "capabilities" in query_lower:
@@ -243,21 +247,14 @@ class PolymorphicEncryption:
         return f"Unknown action: {action}"
     
     def _encrypt_file(self, filepath: str) -> str:
-        """Encrypt a file."""
+        """Encrypt a file in authenticated chunks (constant memory at any size)."""
         try:
-            with open(filepath, 'rb') as f:
-                data = f.read()
-            
-            encrypted = self.fernet.encrypt(data)
-            
-            # Save encrypted file
-            encrypted_path = f"{filepath}.encrypted"
-            with open(encrypted_path, 'wb') as f:
-                f.write(encrypted)
+            encrypted_path = self.stream_cipher.encrypt_file(filepath, f"{filepath}.encrypted")
             
             announcer.announce(
                 "FILE_ENCRYPTED",
-                [f"Encrypted {filepath} → {encrypted_path}"]
+                [f"Encrypted {filepath} → {encrypted_path} "
+                 f"({self.stream_cipher.algorithm}, {self.stream_cipher.chunk_size // 1024} KB chunks)"]
             )
             return encrypted_path
             
@@ -265,28 +262,25 @@ class PolymorphicEncryption:
             return f"Encryption failed: {e}"
     
     def _decrypt_file(self, filepath: str) -> str:
-        """Decrypt a file."""
+        """Decrypt a chunked file, or a whole-file Fernet token written before chunking."""
         try:
-            with open(filepath, 'rb') as f:
-                encrypted = f.read()
-            
-            decrypted = self.fernet.decrypt(encrypted)
-            
             # Save decrypted file
             if filepath.endswith('.encrypted'):
                 decrypted_path = filepath[:-10]  # Remove .encrypted
             else:
                 decrypted_path = f"{filepath}.decrypted"
             
-            with open(decrypted_path, 'wb') as f:
-                f.write(decrypted)
+            chunked = self.stream_cipher.decrypt_file(filepath, decrypted_path, legacy_decrypt=self.fernet.decrypt)
             
             announcer.announce(
                 "FILE_DECRYPTED",
-                [f"Decrypted {filepath} → {decrypted_path}"]
+                [f"Decrypted {filepath} → {decrypted_path}" + ("" if chunked else " (legacy Fernet file)")]
             )
             return decrypted_path
             
+        except StreamIntegrityError as e:
+            announcer.announce("FILE_DECRYPT_REJECTED", [f"{filepath}: {e}"])
+            return f"Decryption failed: {e}"
         except Exception as e:
             return f"Decryption failed: {e}"
     
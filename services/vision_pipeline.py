@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+vision_pipeline.py - Decode-once analysis pipeline for ComputerVisionService
+
+- Each image is read and decoded once; gray/PIL views are derived lazily
+- OCR and contour results are cached by image content hash (SHA-256), so the
+  same screenshot is never re-OCR'd, even under a different filename; callers
+  get copies, so mutating a result never changes the cache
+- OCR can run on a cropped region of interest (around buttons or fields) and on
+  a downscaled copy of very large screenshots, with coordinates mapped back
+- Batches of images can be analyzed across a process pool
+"""
+
+import os
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+
+# Screenshots bigger than this (longest side, px) are downscaled before full-image OCR
+OCR_MAX_SIDE = 2400
+# Padding around regions of interest so text boxes on the edge are not clipped
+ROI_PADDING = 40
+
+Box = Tuple[int, int, int, int]  # x1, y1, x2, y2
+
+
+class DecodedImage:
+    """One decoded image plus lazily derived views"""
+
+    def __init__(self, path: str, data: bytes):
+        self.path = path
+        self.content_hash = hashlib.sha256(data).hexdigest()
+        self.file_size = len(data)
+        self.bgr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if self.bgr is None:
+            raise ValueError(f"Could not decode image: {path}")
+        self._gray = None
+        self._rgb = None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(width, height), same order as PIL's Image.size"""
+        return self.bgr.shape[1], self.bgr.shape[0]
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def pil(self) -> Image.Image:
+        return Image.fromarray(self.rgb.copy())  # callers draw on it
+
+
+class VisionPipeline:
+    """Image decode + OCR + contour analysis with content-hash caching"""
+
+    def __init__(self, ocr_available: bool = True, max_images: int = 16, max_results: int = 512):
+        self.ocr_available = ocr_available
+        self.max_images = max_images
+        self.max_results = max_results
+        # (path, mtime_ns, size) -> DecodedImage
+        self._images: "OrderedDict[Tuple, DecodedImage]" = OrderedDict()
+        # (content_hash, kind, params) -> result
+        self._results: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {'decodes': 0, 'image_hits': 0, 'ocr_runs': 0,
+                      'result_hits': 0, 'result_misses': 0}
+
+    # ============= DECODE =============
+
+    def load(self, image_path: str) -> DecodedImage:
+        """Decode an image once; repeat calls for an unchanged file reuse it"""
+        st = os.stat(image_path)
+        file_key = (os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            decoded = self._images.get(file_key)
+            if decoded is not None:
+                self._images.move_to_end(file_key)
+                self.stats['image_hits'] += 1
+                return decoded
+        with open(image_path, 'rb') as f:
+            decoded = DecodedImage(image_path, f.read())
+        with self._lock:
+            self.stats['decodes'] += 1
+            self._images[file_key] = decoded
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+        return decoded
+
+    # ============= RESULT CACHE =============
+
+    def _cached(self, key: Tuple, compute, private: bool = False):
+        """Cached result for key, a copy unless private (internal, never handed out)"""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats['result_hits'] += 1
+                result = self._results[key]
+                return result if private else copy.deepcopy(result)
+            self.stats['result_misses'] += 1
+        result = compute()
+        self.remember(key, result)
+        return result if private else copy.deepcopy(result)
+
+    def remember(self, key: Tuple, result: Any):
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def stats_snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._results.clear()
+
+    # ============= OCR =============
+
+    def ocr(self, decoded: DecodedImage, roi: Optional[Box] = None,
+            max_side: Optional[int] = OCR_MAX_SIDE) -> Dict:
+        """
+        Text elements with full-image coordinates.
+        roi limits OCR to a crop; max_side downscales very large images first.
+        """
+        if not self.ocr_available:
+            return {'error': 'OCR not available - tesseract not found'}
+        key = (decoded.content_hash, 'ocr', roi, max_side)
+        return self._cached(key, lambda: self._run_ocr(decoded, roi, max_side))
+
+    def _run_ocr(self, decoded: DecodedImage, roi: Optional[Box], max_side: Optional[int]) -> Dict:
+        image = decoded.rgb
+        offset_x, offset_y = 0, 0
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            image = image[y1:y2, x1:x2]
+            offset_x, offset_y = x1, y1
+
+        scale = 1.0
+        height, width = image.shape[:2]
+        if max_side and max(width, height) > max_side:
+            scale = max_side / max(width, height)
+            image = cv2.resize(image, (int(width * scale), int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+
+        with self._lock:
+            self.stats['ocr_runs'] += 1
+        ocr_data = pytesseract.image_to_data(Image.fromarray(image),
+                                             output_type=pytesseract.Output.DICT)
+
+        text_elements = []
+        for i in range(len(ocr_data['text'])):
+            text = ocr_data['text'][i].strip()
+            if not text:
+                continue
+            x = int(ocr_data['left'][i] / scale) + offset_x
+            y = int(ocr_data['top'][i] / scale) + offset_y
+            w = int(ocr_data['width'][i] / scale)
+            h = int(ocr_data['height'][i] / scale)
+            text_elements.append({
+                'text': text,
+                'bbox': [x, y, x + w, y + h],
+                'center': [x + w // 2, y + h // 2],
+                'confidence': ocr_data['conf'][i]
+            })
+
+        return {
+            'text_elements': text_elements,
+            'total_elements': len(text_elements),
+            'image_size': decoded.size
+        }
+
+    def roi_around(self, decoded: DecodedImage, boxes: Sequence[Sequence[int]],
+                   padding: int = ROI_PADDING) -> Optional[Box]:
+        """Single crop covering every box plus padding (one OCR call, not one per box)"""
+        if not boxes:
+            return None
+        width, height = decoded.size
+        x1 = max(0, min(b[0] for b in boxes) - padding)
+        y1 = max(0, min(b[1] for b in boxes) - padding)
+        x2 = min(width, max(b[2] for b in boxes) + padding)
+        y2 = min(height, max(b[3] for b in boxes) + padding)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2, y2)
+
+    # ============= CONTOURS =============
+
+    def contours(self, decoded: DecodedImage, low: int, high: int):
+        key = (decoded.content_hash, 'contours', low, high)
+
+        def compute():
+            edges = cv2.Canny(decoded.gray, low, high)
+            found, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            return found
+
+        return self._cached(key, compute, private=True)
+
+    def buttons(self, decoded: DecodedImage) -> Dict:
+        def compute():
+            buttons = []
+            for contour in self.contours(decoded, 50, 150):
+                epsilon = 0.02 * cv2.arcLength(contour, True)
+                approx = cv2.approxPolyDP(contour, epsilon, True)
+                if len(approx) >= 4:
+                    x, y, w, h = cv2.boundingRect(contour)
+                    area = cv2.contourArea(contour)
+                    if 50 < w < 300 and 20 < h < 80 and area > 1000:
+                        buttons.append({
+                            'bbox': [x, y, x + w, y + h],
+                            'center': [x + w // 2, y + h // 2],
+                            'area': area,
+                            'aspect_ratio': w / h
+                        })
+            buttons.sort(key=lambda b: b['area'], reverse=True)
+            return {'buttons': buttons, 'count': len(buttons)}
+
+        return self._cached((decoded.content_hash, 'buttons'), compute)
+
+    def input_fields(self, decoded: DecodedImage) -> Dict:
+        def compute():
+            inputs = []
+            for contour in self.contours(decoded, 30, 100):
+                x, y, w, h = cv2.boundingRect(contour)
+                area = cv2.contourArea(contour)
+                if w > 100 and 20 < h < 50 and area > 800:
+                    aspect_ratio = w / h
+                    if aspect_ratio > 3:
+                        inputs.append({
+                            'bbox': [x, y, x + w, y + h],
+                            'center': [x + w // 2, y + h // 2],
+                            'area': area,
+                            'aspect_ratio': aspect_ratio
+                        })
+            inputs.sort(key=lambda inp: inp['bbox'][1])
+            return {'inputs': inputs, 'count': len(inputs)}
+
+        return self._cached((decoded.content_hash, 'inputs'), compute)
+
+    def elements(self, decoded: DecodedImage) -> Dict:
+        text_result = self.ocr(decoded) if self.ocr_available else {'text_elements': []}
+        button_result = self.buttons(decoded)
+        input_result = self.input_fields(decoded)
+        return {
+            'text_elements': text_result.get('text_elements', []),
+            'buttons': button_result.get('buttons', []),
+            'inputs': input_result.get('inputs', []),
+            'analysis': {
+                'text_count': len(text_result.get('text_elements', [])),
+                'button_count': len(button_result.get('buttons', [])),
+                'input_count': len(input_result.get('inputs', []))
+            }
+        }
+
+    # ============= BATCH =============
+
+    def analyze_batch(self, image_paths: List[str], analysis: str = 'elements',
+                      workers: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Analyze many images across a process pool.
+        Results come back keyed by path and are cached here by content hash.
+        """
+        results: Dict[str, Dict] = {}
+        pending = []
+        for path in image_paths:
+            try:
+                decoded = self.load(path)
+            except Exception as e:
+                results[path] = {'error': f'Could not load image: {e}'}
+                continue
+            key = (decoded.content_hash, 'batch', analysis)
+            with self._lock:
+                cached = self._results.get(key)
+                if cached is not None:
+                    self.stats['result_hits'] += 1
+            if cached is not None:
+                results[path] = copy.deepcopy(cached)
+            else:
+                pending.append((path, key))
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [(path, key, pool.submit(_analyze_in_worker, path, analysis, self.ocr_available))
+                           for path, key in pending]
+                for path, key, future in futures:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'error': f'Analysis failed: {e}'}
+                    if 'error' not in result:
+                        self.remember(key, copy.deepcopy(result))
+                    results[path] = result
+        return results
+
+
+_worker_pipeline: Optional[VisionPipeline] = None
+
+
+def _analyze_in_worker(image_path: str, analysis: str, ocr_available: bool) -> Dict:
+    """Process-pool entry point - each worker keeps its own pipeline"""
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = VisionPipeline(ocr_available=ocr_available)
+    decoded = _worker_pipeline.load(image_path)
+    if analysis == 'ocr':
+        return _worker_pipeline.ocr(decoded)
+    if analysis == 'buttons':
+        return _worker_pipeline.buttons(decoded)
+    if analysis == 'inputs':
+        return _worker_pipeline.input_fields(decoded)
+    return _worker_pipeline.elements(decoded)
@@ -20,11 +20,18 @@ Structure:
     data.json           <- Raw org data
     tournaments.html    <- Tournament list
     contacts.json       <- Contact information
+
+Members resolve with one indexed lookup (primary key, or a slug column).
+Tables larger than PAGE_SIZE list as page_0001/, page_0002/, ... sub-collections.
+Object folders and files carry ETag/Last-Modified from the row's timestamps,
+so clients can revalidate GETs and cache PROPFIND results.
 """
 import sys
 import os
 import json
 import io
+import math
+import hashlib
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from pathlib import Path
@@ -39,11 +46,12 @@ require_go_py("services.webdav_database_browser")
 from wsgidav.wsgidav_app import WsgiDAVApp
 from wsgidav.fs_dav_provider import FilesystemProvider
 from wsgidav import util
-from wsgidav.dav_provider import DAVProvider, _DAVResource, DAVCollection
+from wsgidav.dav_provider import DAVProvider, _DAVResource, DAVCollection, DAVNonCollection
 from wsgidav.dav_error import DAVError, HTTP_NOT_FOUND, HTTP_FORBIDDEN
 
 # Import database and models
-from utils.database import get_session
+from sqlalchemy import func
+from utils.database import read_session_scope
 from database.tournament_models import Tournament, Player, Organization
 
 # Bonjour system imports for /bonjour filesystem
@@ -56,11 +64,72 @@ from polymorphic_core.real_bonjour import announcer as real_announcer
 from polymorphic_core.service_locator import get_service
 
 
-class DatabaseResource(_DAVResource):
+# Rows listed per directory; larger tables become page_NNNN sub-collections
+PAGE_SIZE = int(os.environ.get('WEBDAV_PAGE_SIZE', '500'))
+
+# Top-level directories and the tables behind them
+DATABASE_ROOTS = {
+    'tournaments': Tournament,
+    'players': Player,
+    'organizations': Organization,
+}
+
+# Columns a member name (<model>_<key>) may carry, tried in order; all indexed
+MEMBER_KEYS = {
+    Tournament: ('id', 'short_slug'),
+    Player: ('id', 'startgg_id'),
+    Organization: ('id',),
+}
+
+
+def _member_prefix(model_class) -> str:
+    return f"{model_class.__name__.lower()}_"
+
+
+def _member_name(obj) -> str:
+    return f"{_member_prefix(type(obj))}{obj.id}"
+
+
+def _lookup_member(model_class, key: str):
+    """Resolve a member key with one lookup per key column (primary key first)"""
+    with read_session_scope() as session:
+        for column in MEMBER_KEYS.get(model_class, ('id',)):
+            if column == 'id':
+                try:
+                    obj = session.get(model_class, model_class.__table__.c.id.type.python_type(key))
+                except (ValueError, TypeError):
+                    continue
+            else:
+                obj = session.query(model_class).filter(getattr(model_class, column) == key).first()
+            if obj is not None:
+                return obj
+    return None
+
+
+def _row_timestamp(obj) -> Optional[float]:
+    """When the row last changed: updated_at, created_at, else sync_timestamp"""
+    for attr in ('updated_at', 'created_at'):
+        value = getattr(obj, attr, None)
+        if isinstance(value, datetime):
+            return value.timestamp()
+    synced = getattr(obj, 'sync_timestamp', None)
+    return float(synced) if synced else None
+
+
+def _row_etag(obj, view: str = '') -> Optional[str]:
+    """Unquoted entity tag for a view of a row; changes whenever the row does"""
+    stamp = _row_timestamp(obj)
+    if stamp is None:
+        return None
+    key = f"{obj.__tablename__}:{obj.id}:{stamp}:{view}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+class DatabaseResource(DAVNonCollection):
     """Represents a virtual file backed by database object intelligence"""
     
     def __init__(self, path, environ, obj_data, content_func):
-        super().__init__(path, False, environ)
+        super().__init__(path, environ)
         self.obj_data = obj_data
         self.content_func = content_func
         self._content = None
@@ -80,10 +149,17 @@ class DatabaseResource(_DAVResource):
         return "text/plain"
     
     def get_creation_date(self):
-        return util.get_rfc1123_time()
+        created = getattr(self.obj_data, 'created_at', None)
+        return created.timestamp() if isinstance(created, datetime) else self.get_last_modified()
     
     def get_last_modified(self):
-        return util.get_rfc1123_time()
+        return _row_timestamp(self.obj_data) or time.time()
+    
+    def support_etag(self):
+        return True
+    
+    def get_etag(self):
+        return _row_etag(self.obj_data, self.name)
     
     def get_content(self):
         if self._content is None:
@@ -95,12 +171,18 @@ class DatabaseResource(_DAVResource):
 
 
 class DatabaseCollection(DAVCollection):
-    """Represents a virtual directory backed by database queries"""
+    """
+    Represents a virtual directory backed by database queries.
+
+    Small tables list their rows; larger ones list page_NNNN sub-collections
+    (page is set on those) of PAGE_SIZE rows in primary-key order.
+    """
 
-    def __init__(self, path, environ, model_class, get_objects_func):
+    def __init__(self, path, environ, model_class, page: Optional[int] = None):
         super().__init__(path, environ)
         self.model_class = model_class
-        self.get_objects_func = get_objects_func
+        self.page = page
+        self._total = None
         self._logger = None
 
     @property
@@ -113,49 +195,63 @@ class DatabaseCollection(DAVCollection):
                 self._logger = logging.getLogger(__name__)
         return self._logger
     
+    def _count(self) -> int:
+        if self._total is None:
+            with read_session_scope() as session:
+                self._total = session.query(func.count(self.model_class.id)).scalar() or 0
+        return self._total
+    
+    def _is_paged(self) -> bool:
+        return self.page is None and self._count() > PAGE_SIZE
+    
+    def _page_names(self) -> List[str]:
+        pages = math.ceil(self._count() / PAGE_SIZE)
+        return [f"page_{n:04d}" for n in range(1, pages + 1)]
+    
+    def _rows(self) -> list:
+        """This directory's rows, one query on the primary key index"""
+        offset = ((self.page or 1) - 1) * PAGE_SIZE
+        with read_session_scope() as session:
+            return session.query(self.model_class).order_by(self.model_class.id)\
+                .offset(offset).limit(PAGE_SIZE).all()
+    
     def get_member_names(self):
-        """Return list of child names (object IDs/names)"""
+        """Return list of child names (page folders or object IDs)"""
         try:
-            objects = self.get_objects_func()
-            names = []
-            for obj in objects:
-                if hasattr(obj, 'id'):
-                    names.append(f"{self.model_class.__name__.lower()}_{obj.id}")
-                elif hasattr(obj, 'name'):
-                    clean_name = "".join(c for c in obj.name if c.isalnum() or c in '-_')
-                    names.append(f"{self.model_class.__name__.lower()}_{clean_name}")
-            return names
+            if self._is_paged():
+                return self._page_names()
+            return [_member_name(obj) for obj in self._rows()]
         except Exception as e:
             self.logger.error(f"Error getting database collection member names: {e}")
             return []
     
+    def get_member_list(self):
+        """All children from a single query (PROPFIND depth 1) instead of one lookup each"""
+        try:
+            if self._is_paged():
+                return [self.get_member(name) for name in self._page_names()]
+            return [ObjectCollection(util.join_uri(self.path, _member_name(obj)), self.environ, obj)
+                    for obj in self._rows()]
+        except Exception as e:
+            self.logger.error(f"Error listing database collection members: {e}")
+            return []
+    
     def get_member(self, name):
-        """Return child resource/collection by name"""
+        """Return child page folder or object folder by name"""
         try:
-            # Extract object ID from name
-            if '_' in name:
-                obj_id = name.split('_', 1)[1]
-                
-                objects = self.get_objects_func()
-                target_obj = None
-                
-                for obj in objects:
-                    if hasattr(obj, 'id') and str(obj.id) == obj_id:
-                        target_obj = obj
-                        break
-                    elif hasattr(obj, 'name'):
-                        clean_name = "".join(c for c in obj.name if c.isalnum() or c in '-_')
-                        if clean_name == obj_id:
-                            target_obj = obj
-                            break
-                
-                if target_obj:
-                    return ObjectCollection(
-                        util.join_uri(self.path, name),
-                        self.environ,
-                        target_obj
-                    )
+            if self.page is None and name.startswith('page_'):
+                page = int(name[len('page_'):])
+                if 1 <= page <= len(self._page_names()):
+                    return DatabaseCollection(util.join_uri(self.path, name), self.environ,
+                                              self.model_class, page=page)
+                return None
             
+            prefix = _member_prefix(self.model_class)
+            if not name.startswith(prefix):
+                return None
+            target_obj = _lookup_member(self.model_class, name[len(prefix):])
+            if target_obj is not None:
+                return ObjectCollection(util.join_uri(self.path, name), self.environ, target_obj)
             return None
         except Exception as e:
             self.logger.error(f"Error getting database collection member {name}: {e}")
@@ -169,6 +265,15 @@ class ObjectCollection(DAVCollection):
         super().__init__(path, environ)
         self.db_object = db_object
     
+    def get_last_modified(self):
+        return _row_timestamp(self.db_object) or time.time()
+    
+    def support_etag(self):
+        return True
+    
+    def get_etag(self):
+        return _row_etag(self.db_object)
+    
     def get_member_names(self):
         """Return available views for this object"""
         base_files = ['data.json']
@@ -470,28 +575,6 @@ class DatabaseDAVProvider(DAVProvider):
         if path == "/":
             return RootCollection("/", environ)
             
-        # Main collection directories
-        elif path in ["/tournaments", "/tournaments/"]:
-            return DatabaseCollection(
-                "/tournaments/",
-                environ, 
-                Tournament,
-                self._get_tournaments
-            )
-        elif path in ["/players", "/players/"]:
-            return DatabaseCollection(
-                "/players/",
-                environ,
-                Player, 
-                self._get_players
-            )
-        elif path in ["/organizations", "/organizations/"]:
-            return DatabaseCollection(
-                "/organizations/",
-                environ,
-                Organization,
-                self._get_organizations
-            )
         elif path in ["/bonjour", "/bonjour/"]:
             return BonjourRootCollection("/bonjour/", environ)
 
@@ -499,95 +582,21 @@ class DatabaseDAVProvider(DAVProvider):
         elif path.startswith("/bonjour/"):
             return self._get_bonjour_resource(path, environ)
 
-        # Object-specific paths
-        elif path.startswith("/tournaments/"):
-            return self._get_tournament_resource(path, environ)
-        elif path.startswith("/players/"):
-            return self._get_player_resource(path, environ)
-        elif path.startswith("/organizations/"):
-            return self._get_organization_resource(path, environ)
+        # Database paths: /<table>/[page_NNNN/]<model>_<key>/<file>
+        parts = [p for p in path.strip('/').split('/') if p]
+        if parts and parts[0] in DATABASE_ROOTS:
+            return self._get_database_resource(parts, environ)
             
         return None
     
-    def _get_tournaments(self):
-        """Get all tournaments from database"""
-        with get_session() as session:
-            return session.query(Tournament).limit(50).all()
-    
-    def _get_players(self):
-        """Get all players from database"""
-        with get_session() as session:
-            return session.query(Player).limit(50).all()
-    
-    def _get_organizations(self):
-        """Get all organizations from database"""
-        with get_session() as session:
-            return session.query(Organization).limit(50).all()
-    
-    def _get_tournament_resource(self, path, environ):
-        """Get tournament-specific resource"""
-        path_parts = path.strip('/').split('/')
-        if len(path_parts) >= 2:
-            tournament_name = path_parts[1]
-            
-            # If it's a directory request
-            if len(path_parts) == 2 or path.endswith('/'):
-                with get_session() as session:
-                    # Extract ID from tournament name
-                    if '_' in tournament_name:
-                        obj_id = tournament_name.split('_', 1)[1]
-                        tournament = session.query(Tournament).filter(Tournament.id == obj_id).first()
-                        if tournament:
-                            return ObjectCollection(f"/tournaments/{tournament_name}/", environ, tournament)
-            
-            # If it's a file request within tournament directory
-            elif len(path_parts) == 3:
-                tournament_name = path_parts[1]
-                filename = path_parts[2]
-                
-                with get_session() as session:
-                    if '_' in tournament_name:
-                        obj_id = tournament_name.split('_', 1)[1]
-                        tournament = session.query(Tournament).filter(Tournament.id == obj_id).first()
-                        if tournament:
-                            obj_collection = ObjectCollection(f"/tournaments/{tournament_name}/", environ, tournament)
-                            return obj_collection.get_member(filename)
-        
-        return None
-    
-    def _get_player_resource(self, path, environ):
-        """Get player-specific resource"""
-        # Similar implementation for players
-        path_parts = path.strip('/').split('/')
-        if len(path_parts) >= 2:
-            player_name = path_parts[1]
-            
-            if len(path_parts) == 2 or path.endswith('/'):
-                with get_session() as session:
-                    if '_' in player_name:
-                        obj_id = player_name.split('_', 1)[1]
-                        player = session.query(Player).filter(Player.id == obj_id).first()
-                        if player:
-                            return ObjectCollection(f"/players/{player_name}/", environ, player)
-        
-        return None
-    
-    def _get_organization_resource(self, path, environ):
-        """Get organization-specific resource"""
-        # Similar implementation for organizations
-        path_parts = path.strip('/').split('/')
-        if len(path_parts) >= 2:
-            org_name = path_parts[1]
-            
-            if len(path_parts) == 2 or path.endswith('/'):
-                with get_session() as session:
-                    if '_' in org_name:
-                        obj_id = org_name.split('_', 1)[1]
-                        org = session.query(Organization).filter(Organization.id == obj_id).first()
-                        if org:
-                            return ObjectCollection(f"/organizations/{org_name}/", environ, org)
-        
-        return None
+    def _get_database_resource(self, parts, environ):
+        """Walk the path one member at a time; each step is at most one indexed lookup"""
+        resource = DatabaseCollection(f"/{parts[0]}/", environ, DATABASE_ROOTS[parts[0]])
+        for part in parts[1:]:
+            if resource is None or not resource.is_collection:
+                return None
+            resource = resource.get_member(part)
+        return resource
 
     def _get_bonjour_resource(self, path, environ):
         """Get Bonjour-specific resource based on path hierarchy"""
@@ -1082,27 +1091,11 @@ class RootCollection(DAVCollection):
         return ["tournaments", "players", "organizations", "bonjour"]
     
     def get_member(self, name):
-        if name == "tournaments":
-            return DatabaseCollection("/tournaments/", self.environ, Tournament, self._get_tournaments)
-        elif name == "players":
-            return DatabaseCollection("/players/", self.environ, Player, self._get_players)
-        elif name == "organizations":
-            return DatabaseCollection("/organizations/", self.environ, Organization, self._get_organizations)
+        if name in DATABASE_ROOTS:
+            return DatabaseCollection(f"/{name}/", self.environ, DATABASE_ROOTS[name])
         elif name == "bonjour":
             return BonjourRootCollection("/bonjour/", self.environ)
         return None
-    
-    def _get_tournaments(self):
-        with get_session() as session:
-            return session.query(Tournament).limit(50).all()
-    
-    def _get_players(self):
-        with get_session() as session:
-            return session.query(Player).limit(50).all()
-    
-    def _get_organizations(self):
-        with get_session() as session:
-            return session.query(Organization).limit(50).all()
 
 
 def create_webdav_app():
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+test_attendance_rollup.py - attendance_monthly rollup behind the timeline endpoints
+
+1. Inserting, editing and deleting tournaments through the ORM keeps the
+   rollup equal to a fresh GROUP BY (the consistency checker agrees)
+2. Bulk SQL that bypasses the ORM is caught by the checker and fixed by rebuild
+3. Rolled-back changes leave the rollup untouched
+4. Databases without attendance_monthly (not migrated yet) still accept
+   tournament writes
+5. Benchmark: the monthly timeline from the rollup vs bucketing every
+   tournament in Python (the old endpoint)
+"""
+
+import os
+import sys
+import time
+import random
+import calendar
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isolated_database import bind_database, isolated, run_tests
+
+OWNS_DATABASE = bind_database('tt-rollup-', 'rollup.db')
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from utils.database import engine, session_scope, read_session_scope
+from database.tournament_models import Base, Tournament
+from database.attendance_rollup import check, monthly_totals, rebuild
+
+if OWNS_DATABASE:
+    Base.metadata.create_all(engine)
+
+JAN_2024 = 1704067200
+
+
+def _tournament(i, rng):
+    socal = rng.random() < 0.6
+    return Tournament(id=f"t{i}", name=f"Weekly {i}", num_attendees=rng.choice([0, rng.randint(8, 400)]),
+                      start_at=JAN_2024 + rng.randint(0, 730) * 86400,
+                      owner_name=rng.choice(['Team Alpha', 'Bay Brawl', None]),
+                      lat=33.9 if socal else 37.4, lng=-118.1 if socal else -121.9)
+
+
+def _reset(n, seed=1):
+    rng = random.Random(seed)
+    with session_scope() as session:
+        session.execute(text("DELETE FROM tournaments"))
+        session.execute(text("DELETE FROM attendance_monthly"))
+    with session_scope() as session:
+        session.add_all(_tournament(i, rng) for i in range(n))
+
+
+def _python_timeline():
+    """What get_attendance_timeline used to compute, in UTC"""
+    with read_session_scope() as session:
+        months = {}
+        for t in session.query(Tournament).filter(Tournament.num_attendees > 0, Tournament.start_at > 0):
+            date = datetime.fromtimestamp(t.start_at, timezone.utc)
+            entry = months.setdefault(f"{date.year}-{date.month:02d}", [0, 0])
+            entry[0] += 1
+            entry[1] += t.num_attendees
+        return [{'month': key, 'tournament_count': c, 'total_attendance': a} for key, (c, a) in sorted(months.items())]
+
+
+def _consistent():
+    with read_session_scope() as session:
+        return check(session)['consistent']
+
+
+@isolated(OWNS_DATABASE)
+def test_orm_writes_keep_rollup_consistent():
+    _reset(300)
+    assert _consistent()
+    with read_session_scope() as session:
+        assert monthly_totals(session) == _python_timeline()
+
+    with session_scope() as session:
+        t = session.get(Tournament, 't1')
+        t.start_at += 45 * 86400            # moves month
+        t.num_attendees = 512               # changes weight
+        session.get(Tournament, 't2').owner_name = 'Renamed Org'
+        session.get(Tournament, 't3').lat = 10.0  # leaves SoCal/NorCal
+        session.delete(session.get(Tournament, 't4'))
+        session.add(Tournament(id='t-new', name='New Major', num_attendees=900, start_at=JAN_2024 + 86400,
+                               owner_name='Team Alpha', lat=34.0, lng=-118.0))
+        session.flush()
+        session.get(Tournament, 't-new').num_attendees = 950  # edited again after a flush
+    assert _consistent()
+
+    # Expired instances: old values are read back from the database
+    with session_scope() as session:
+        t = session.get(Tournament, 't5')
+        session.expire(t)
+        t.num_attendees = 77
+        t.start_at = JAN_2024 + 400 * 86400
+    assert _consistent()
+
+    with read_session_scope() as session:
+        socal = monthly_totals(session, region='socal', organization='Team Alpha')
+        assert socal and socal[0]['month'] == '2024-01'
+        assert monthly_totals(session) == _python_timeline()
+
+
+@isolated(OWNS_DATABASE)
+def test_bulk_sql_detected_and_rebuilt():
+    _reset(200, seed=2)
+    with session_scope() as session:
+        session.execute(text("UPDATE tournaments SET num_attendees = num_attendees + 1"))
+    with read_session_scope() as session:
+        result = check(session)
+    assert not result['consistent'] and result['differences']
+
+    with session_scope() as session:
+        rebuild(session)
+    assert _consistent()
+
+
+@isolated(OWNS_DATABASE)
+def test_rollback_leaves_rollup_alone():
+    _reset(50, seed=3)
+    try:
+        with session_scope() as session:
+            session.get(Tournament, 't7').num_attendees = 10000
+            session.flush()
+            raise RuntimeError("sync failed")
+    except RuntimeError:
+        pass
+    assert _consistent()
+
+
+def test_unmigrated_database_still_writes():
+    old = create_engine('sqlite://')
+    Base.metadata.create_all(old, tables=[Tournament.__table__])
+    session = sessionmaker(bind=old)()
+    session.add(_tournament(1, random.Random(5)))
+    session.commit()
+    session.get(Tournament, 't1').num_attendees = 99
+    session.commit()
+    assert session.execute(text("SELECT num_attendees FROM tournaments")).scalar() == 99
+    session.close()
+
+
+@isolated(OWNS_DATABASE)
+def test_timeline_benchmark():
+    _reset(20000, seed=4)
+    start = time.perf_counter()
+    old = _python_timeline()
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with read_session_scope() as session:
+        new = monthly_totals(session)
+    rollup = time.perf_counter() - start
+    print(f"📅 Timeline over 20000 tournaments: Python bucketing {scan * 1000:.0f}ms, "
+          f"rollup {rollup * 1000:.1f}ms ({calendar.month_abbr[int(new[0]['month'][5:])]} "
+          f"{new[0]['month'][:4]} - {new[-1]['month']})")
+    assert new == old
+    assert rollup * 10 < scan
+
+
+if __name__ == "__main__":
+    run_tests([test_orm_writes_keep_rollup_consistent, test_bulk_sql_detected_and_rebuilt,
+               test_rollback_leaves_rollup_alone, test_unmigrated_database_still_writes, test_timeline_benchmark])
+    print("✅ Attendance rollup checks passed")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+test_benchmark_suite.py - Synthetic dataset and end-to-end benchmarks
+
+1. The generator is deterministic: same seed, same rows and digest
+2. Distributions look like the real data: placement total near the target,
+   one placement per (tournament, event, player), entrants mostly local,
+   a few organizations running most events
+3. An end-to-end tiny run writes JSON results; every scenario either runs
+   or records why it could not
+4. A slowed-down copy of a run is reported as a regression
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isolated_database import bind_database, isolated, run_tests
+
+_tmp = tempfile.mkdtemp(prefix='tt-benchmark-')
+os.environ['BENCHMARK_DIR'] = _tmp
+os.environ['BENCHMARK_REPEATS'] = '2'
+OWNS_DATABASE = bind_database('tt-benchmark-', os.path.join('data', 'work.db'), directory=_tmp)
+
+from utils.synthetic_data import SCALES, SyntheticConfig, SyntheticDataset, placement_numbers
+from utils.benchmark_suite import SCENARIOS, benchmark_suite, compare_results
+
+
+def test_determinism():
+    config = SyntheticConfig(tournaments=40, placements=1500, seed=3)
+    first, second = SyntheticDataset(config), SyntheticDataset(config)
+    assert first.tournaments == second.tournaments and first.players == second.players
+    sample = first.tournaments[len(first.tournaments) // 2]
+    assert first.tournament_row(sample) == second.tournament_row(sample)
+    assert list(first.placement_rows(sample)) == list(second.placement_rows(sample))
+    assert first.startgg_payload(sample) == second.startgg_payload(sample)
+
+    other = SyntheticDataset(SyntheticConfig(tournaments=40, placements=1500, seed=4))
+    assert [t['name'] for t in other.tournaments] != [t['name'] for t in first.tournaments]
+    assert placement_numbers(9) == [1, 2, 3, 4, 5, 5, 7, 7, 9]
+
+
+def test_distributions():
+    dataset = SyntheticDataset(SCALES['small'])
+    config = dataset.config
+    rows = [row for tournament in dataset.tournaments for row in dataset.placement_rows(tournament)]
+    print(f"📊 {len(dataset.tournaments)} tournaments, {len(rows)} placements, {len(dataset.players)} players")
+    assert abs(len(rows) - config.placements) / config.placements < 0.05
+    assert len(dataset.tournaments) == config.tournaments
+
+    keys = {(row['tournament_id'], row['event_id'], row['player_id']) for row in rows}
+    assert len(keys) == len(rows)
+    starts = [t['start_at'] for t in dataset.tournaments]
+    assert starts == sorted(starts) and starts[-1] <= config.end_at
+
+    # Entrants of in-person events mostly live where the venue is
+    home = {player[0]: player[4] for player in dataset.players}
+    by_id = {t['id']: t for t in dataset.tournaments if not t['online']}
+    local = [home[row['player_id']] == by_id[row['tournament_id']]['venue']['city_index']
+             for row in rows if row['tournament_id'] in by_id]
+    assert sum(local) / len(local) > 0.6
+
+    # Few organizations run most of the scene
+    runs = Counter(t['org_id'] for t in dataset.tournaments).most_common()
+    top_fifth = sum(count for _, count in runs[:max(1, len(runs) // 5)])
+    assert top_fifth / len(dataset.tournaments) > 0.4
+    assert len({row['event_name'] for row in rows}) > 5  # raw spelling variants survive
+
+
+@isolated(OWNS_DATABASE)
+def test_end_to_end_run():
+    start = time.perf_counter()
+    result = benchmark_suite.do("run tiny")
+    print(benchmark_suite.tell("discord", result))
+    print(f"⏱️ Tiny run: {time.perf_counter() - start:.1f}s")
+
+    assert set(result['scenarios']) == set(SCENARIOS)
+    assert result['dataset']['digest'] and result['environment']['sqlite']
+    for name, scenario in result['scenarios'].items():
+        assert scenario['status'] in ('ok', 'skipped', 'error'), name
+        if scenario['status'] != 'ok':
+            assert scenario.get('error') or any('error' in op for op in scenario['operations'].values())
+
+    saved = json.loads(Path(result['file']).read_text())
+    assert saved['scale'] == 'tiny' and saved['scenarios'].keys() == result['scenarios'].keys()
+    sync = result['scenarios']['sync_ingestion']['operations']
+    ingest = next((stats for name, stats in sync.items() if name.startswith('ingest')), None)
+    if ingest and 'result' in ingest:
+        assert ingest['result'] > 0
+
+    # Second run reuses the cached dataset and compares with the first
+    again = benchmark_suite.do("run tiny rankings search")
+    assert again['dataset']['cached'] and again['dataset']['digest'] == result['dataset']['digest']
+    assert set(again['scenarios']) == {'rankings', 'search'}
+    assert again['comparison']['same_dataset']
+    assert len(benchmark_suite.ask("results tiny")) == 2
+
+
+def test_regression_detection():
+    baseline = {'dataset': {'digest': 'abc'}, 'scenarios': {'search': {'operations': {
+        'player lookups': {'median_ms': 10.0}, 'venue lookups': {'median_ms': 10.0},
+        'tiny op': {'median_ms': 0.1}, 'build name index': {'median_ms': 50.0}}}}}
+    current = {'dataset': {'digest': 'abc'}, 'scenarios': {'search': {'operations': {
+        'player lookups': {'median_ms': 14.0}, 'venue lookups': {'median_ms': 10.5},
+        'tiny op': {'median_ms': 0.5}, 'build name index': {'median_ms': 30.0}}}}}
+    comparison = compare_results(current, baseline, threshold=0.15)
+    assert [op['operation'] for op in comparison['regressions']] == ['player lookups']
+    assert [op['operation'] for op in comparison['improvements']] == ['build name index']
+    assert comparison['same_dataset']
+    print(benchmark_suite.tell("discord", comparison))
+
+
+if __name__ == "__main__":
+    run_tests([test_determinism, test_distributions, test_end_to_end_run, test_regression_detection])
+    print("✅ Benchmark suite checks passed")
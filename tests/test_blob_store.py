@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+test_blob_store.py - Content-addressed blobs behind PolymorphicStorage
+
+1. Storing the same recording twice keeps one file with two references
+2. Releasing references and collecting garbage removes only dead blobs
+   (and leftovers from interrupted writes), after the grace period
+3. Range reads and memory-mapped views return the right bytes
+4. PolymorphicStorage drops a row's blob reference once, however it is deleted
+5. Benchmark: Discord voice clips (48kHz stereo 16-bit PCM) written as
+   blobs vs one timestamped file per clip, and range reads vs whole reads
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isolated_database import bind_database, isolated, run_tests
+
+OWNS_DATABASE = bind_database('tt-storage-', 'storage.db')
+os.environ.setdefault('STORAGE_DIR', tempfile.mkdtemp(prefix='tt-storage-'))
+
+from polymorphic_core.blob_store import BlobStore, MMAP_THRESHOLD
+
+PCM_BYTES_PER_SECOND = 48000 * 2 * 2  # 48kHz, stereo, 16-bit
+
+
+def _store():
+    return BlobStore(tempfile.mkdtemp(prefix='tt-blobs-'))
+
+
+def _clip(seconds, seed):
+    return random.Random(seed).randbytes(int(seconds * PCM_BYTES_PER_SECOND))
+
+
+def _files(store):
+    return [name for _, _, names in os.walk(store.objects_dir) for name in names]
+
+
+def test_deduplication():
+    store = _store()
+    clip = _clip(2, seed=1)
+    first, second = store.put(clip), store.put_stream(iter([clip[:1000], clip[1000:]]))
+    assert first.created and not second.created
+    assert first.sha256 == second.sha256 and first.size == len(clip)
+    assert store.refcount(first.sha256) == 2 and len(_files(store)) == 1
+    assert store.path(first.sha256).endswith(os.path.join(first.sha256[:2], first.sha256[2:4], first.sha256))
+    assert store.read(first.sha256) == clip and store.verify(first.sha256)
+    assert store.stats() == {'blobs': 1, 'references': 2, 'stored_bytes': len(clip),
+                             'referenced_bytes': 2 * len(clip)}
+    assert not os.listdir(store.tmp_dir)
+
+
+def test_release_and_gc():
+    store = _store()
+    kept, dropped = store.put(b'kept' * 1000), store.put(b'dropped' * 1000)
+    store.incref(dropped.sha256)
+    assert store.release(dropped.sha256) == 1
+    assert store.release(dropped.sha256) == 0
+
+    # Within the grace period nothing goes
+    assert store.gc()['removed'] == 0 and store.exists(dropped.sha256)
+
+    with open(os.path.join(store.tmp_dir, 'put-interrupted'), 'wb') as f:
+        f.write(b'partial')
+    result = store.gc(grace_seconds=0)
+    assert result == {'removed': 1, 'bytes_freed': dropped.size}
+    assert store.exists(kept.sha256) and not store.exists(dropped.sha256)
+    assert not os.listdir(store.tmp_dir)
+
+    # The database is the source of truth for references
+    assert store.reconcile({kept.sha256: 3}) == 1 and store.refcount(kept.sha256) == 3
+    assert store.reconcile({}) == 1 and store.gc(grace_seconds=0)['removed'] == 1
+    assert _files(store) == []
+
+
+@isolated(OWNS_DATABASE)
+def test_row_delete_releases_once():
+    from polymorphic_core.storage import INLINE_LIMIT, StorageContent, get_storage
+    from utils.database import read_session_scope
+
+    storage = get_storage()
+    recording = _clip(1, seed=9)
+    assert len(recording) > INLINE_LIMIT
+    first, second = storage.store(recording, 'audio/wav'), storage.store(recording, 'audio/wav')
+    with read_session_scope() as session:
+        row = session.get(StorageContent, first)
+        sha256 = row.blob_sha256
+    assert storage.blobs.refcount(sha256) == 2
+
+    assert row.do("delete")
+    assert not storage.delete(first)  # the row is gone: no second release
+    assert storage.blobs.refcount(sha256) == 1
+    assert storage.blobs.gc(grace_seconds=0)['removed'] == 0
+    assert storage.retrieve(second) == recording
+
+
+def test_range_reads_and_views():
+    store = _store()
+    small, large = store.put(b'0123456789'), store.put(_clip(3, seed=2))
+    assert store.read_range(small.sha256, 2, 3) == b'234'
+    assert store.read_range(small.sha256, 8) == b'89'
+    data = store.read(large.sha256)
+    assert large.size >= MMAP_THRESHOLD
+    assert store.read_range(large.sha256, 100000, 4096) == data[100000:104096]
+    assert store.read_range(large.sha256, large.size - 10, 100) == data[-10:]
+    with store.view(large.sha256) as view:
+        assert len(view) == large.size and bytes(view[:16]) == data[:16]
+    with open(os.path.join(tempfile.mkdtemp(), 'clip.wav'), 'wb+') as f:
+        f.write(data)
+        f.seek(0)
+        assert store.put_stream(f).sha256 == large.sha256
+
+
+def test_discord_audio_benchmark():
+    store = _store()
+    legacy_dir = tempfile.mkdtemp(prefix='tt-audio-')
+    # Voice clips of 1-10s, a third of them re-stored (retries, re-sent recordings)
+    unique = [_clip(seconds, seed) for seed, seconds in enumerate([1, 2, 3, 5, 8, 10] * 4)]
+    clips = unique + unique[::3]
+    total = sum(len(clip) for clip in clips)
+
+    start = time.perf_counter()
+    for i, clip in enumerate(clips):
+        with open(os.path.join(legacy_dir, f"audio_{i}_{time.strftime('%Y%m%d_%H%M%S')}.wav"), 'wb') as f:
+            f.write(clip)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    refs = [store.put(clip) for clip in clips]
+    blob = time.perf_counter() - start
+    stats = store.stats()
+
+    longest = max(refs, key=lambda ref: ref.size)
+    start = time.perf_counter()
+    for offset in range(0, longest.size - PCM_BYTES_PER_SECOND, PCM_BYTES_PER_SECOND):
+        store.read_range(longest.sha256, offset, PCM_BYTES_PER_SECOND // 50)  # one 20ms frame per second
+    ranged = time.perf_counter() - start
+    start = time.perf_counter()
+    for offset in range(0, longest.size - PCM_BYTES_PER_SECOND, PCM_BYTES_PER_SECOND):
+        store.read(longest.sha256)[offset:offset + PCM_BYTES_PER_SECOND // 50]
+    whole = time.perf_counter() - start
+
+    print(f"🎙️ {len(clips)} clips, {total / 1e6:.0f} MB: timestamped files {total / legacy / 1e6:.0f} MB/s, "
+          f"blobs with SHA-256 {total / blob / 1e6:.0f} MB/s")
+    print(f"🎙️ On disk: {stats['stored_bytes'] / 1e6:.0f} MB for {stats['referenced_bytes'] / 1e6:.0f} MB stored "
+          f"({stats['blobs']} blobs, {stats['references']} references)")
+    print(f"🎙️ 20ms frames from a {longest.size / 1e6:.1f} MB clip: range reads {ranged * 1000:.1f}ms, "
+          f"whole reads {whole * 1000:.1f}ms")
+    assert stats['blobs'] == len(unique) and stats['references'] == len(clips)
+    assert stats['stored_bytes'] < stats['referenced_bytes']
+    assert ranged < whole
+
+
+if __name__ == "__main__":
+    run_tests([test_deduplication, test_release_and_gc, test_row_delete_releases_once,
+               test_range_reads_and_views, test_discord_audio_benchmark])
+    print("✅ Blob store checks passed")
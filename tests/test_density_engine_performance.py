@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+test_density_engine_performance.py - Binned FFT KDE vs scipy gaussian_kde
+
+1. Same grid layout and values as gaussian_kde on the renderers' mgrid
+2. NumPy FFT fallback agrees with scipy's fftconvolve
+3. Time grows ~linearly up to 100k attendance-weighted points
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math_services.density_engine as density_engine
+from math_services.density_engine import density_grid, select_bandwidth, km_per_degree
+
+LAT_RANGE = (32.5, 34.5)
+LNG_RANGE = (-119.0, -116.0)
+
+
+def _weighted_venues(n, seed=11):
+    """Tournament-like points with attendance weights (mostly small, a few majors)"""
+    rng = np.random.default_rng(seed)
+    lats = rng.normal(33.6, 0.3, n)
+    lngs = rng.normal(-117.6, 0.4, n)
+    weights = np.minimum(rng.pareto(1.5, n) * 16 + 8, 2000)
+    return lats, lngs, weights
+
+
+def test_matches_gaussian_kde():
+    try:
+        from scipy.stats import gaussian_kde
+    except ImportError:
+        print("⚠️ scipy not installed - skipping gaussian_kde comparison")
+        return
+    lats, lngs, weights = _weighted_venues(4000)
+    xx, yy = np.mgrid[LNG_RANGE[0]:LNG_RANGE[1]:100j, LAT_RANGE[0]:LAT_RANGE[1]:100j]
+
+    start = time.perf_counter()
+    kernel = gaussian_kde(np.vstack([lngs, lats]), weights=weights)
+    expected = kernel(np.vstack([xx.ravel(), yy.ravel()])).T.reshape(xx.shape)
+    kde_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    density = density_grid(lats, lngs, weights, lat_range=LAT_RANGE, lng_range=LNG_RANGE, size=xx.shape)
+    fft_time = time.perf_counter() - start
+
+    print(f"🌡️ gaussian_kde {kde_time * 1000:.1f}ms, binned FFT {fft_time * 1000:.1f}ms")
+    assert density.shape == expected.shape
+    assert np.abs(density - expected).max() < 0.01 * expected.max()
+
+
+def test_numpy_fallback_agrees():
+    lats, lngs, weights = _weighted_venues(2000)
+    with_scipy = density_grid(lats, lngs, weights, size=(120, 80))
+    has_scipy = density_engine.HAS_SCIPY
+    density_engine.HAS_SCIPY = False
+    try:
+        numpy_only = density_grid(lats, lngs, weights, size=(120, 80))
+    finally:
+        density_engine.HAS_SCIPY = has_scipy
+    assert numpy_only.shape == (120, 80)
+    assert np.allclose(with_scipy, numpy_only, atol=1e-9 * with_scipy.max())
+
+
+def test_bandwidth_km_is_circular_on_the_ground():
+    sigma_x, sigma_y = select_bandwidth([33.5], [-117.5], bandwidth_km=5.0)
+    assert sigma_x == sigma_y == 5.0
+    density = density_grid([33.5], [-117.5], bandwidth_km=5.0, size=301)
+    km_x, km_y = km_per_degree(33.5)
+    # Half-maximum width along each axis, converted to km, should match
+    peak_i, peak_j = np.unravel_index(np.argmax(density), density.shape)
+    half = density[peak_i, peak_j] / 2
+    dx = (LNG_RANGE[1] - LNG_RANGE[0]) / 300 * km_x
+    dy = (LAT_RANGE[1] - LAT_RANGE[0]) / 300 * km_y
+    width_x = np.count_nonzero(density[:, peak_j] >= half) * dx
+    width_y = np.count_nonzero(density[peak_i, :] >= half) * dy
+    assert abs(width_x - width_y) < 2 * max(dx, dy), (width_x, width_y)
+
+
+def test_scales_linearly_to_100k_points():
+    sizes = [12500, 25000, 50000, 100000]
+    timings = []
+    for n in sizes:
+        lats, lngs, weights = _weighted_venues(n)
+        start = time.perf_counter()
+        for _ in range(3):
+            density_grid(lats, lngs, weights, size=200)
+        elapsed = (time.perf_counter() - start) / 3
+        timings.append(elapsed)
+        print(f"🔥 {n:>6} points: {elapsed * 1000:7.1f}ms on a 200x200 grid")
+
+    # Doubling the points should cost at most ~2x (plus noise), never 4x
+    ratios = [b / a for a, b in zip(timings, timings[1:]) if a > 0]
+    assert sum(ratios) / len(ratios) < 2.5, ratios
+    assert timings[-1] < 2.0
+
+
+if __name__ == "__main__":
+    test_matches_gaussian_kde()
+    test_numpy_fallback_agrees()
+    test_bandwidth_km_is_circular_on_the_ground()
+    test_scales_linearly_to_100k_points()
+    print("✅ Density engine checks passed")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+test_event_normalization.py - Compiled event standardizer and set-based normalization
+
+1. The compiled matchers give exactly the per-pattern re.search results
+2. The persisted mapping is only recomputed for new names or new rules
+3. One UPDATE ... FROM join rewrites a million placements, with a dry-run
+   diff first that writes nothing. Unlike the old per-name loop, each row is
+   renamed once: a name renamed into another raw name is not renamed again
+4. The alembic revision creates the same table EventNameMap writes to
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_standardizer import EventStandardizer, EventNameMap
+from utils.normalize_events import bulk_normalize
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'alembic', 'versions', 'a6d40e9b3f17_add_event_name_map.py')
+
+SAMPLE_EVENTS = [
+    "Ultimate Singles", "Ultimate Doubles", "Ultimate Apex Series Finale", "UAS: Last Apex Standing (LAS)",
+    "UAS: Doubles", "UAS: Arcadian", "GEEX Super Smash Ultimate Tournament",
+    "(3/23/2025) Smash Bros Ultimate Tournament", "SSB Ultimate Elementary Bracket", "SF6 Singles",
+    "Tekken 8 Tournament", "GGST Singles Bracket", "MvC3 Teams", "Random Fighting Game Event",
+    "ultimate", "SSBU ", "Melee Crew Battle", "Squad Strike", "T7 side bracket", "", None,
+    "High School Bracket", "KOF XV 3v3", "Ultimate Redemption\nBracket",
+    "Apex\nSeries Doubles", "Melee\nApex Series", "Crew\nBattle", "Top 8\nTekken 8",
+]
+
+
+def _reference_standardize(name):
+    """The original loop over the pattern tables with re.search"""
+    if not name:
+        return EventStandardizer._standardize(name)
+    lower = name.lower().strip()
+
+    game = next((g for g, patterns in EventStandardizer.GAME_PATTERNS.items()
+                 if any(re.search(p, lower) for p in patterns)), 'unknown')
+    fmt = next((f for f, patterns in EventStandardizer.FORMAT_PATTERNS.items()
+                if any(re.search(p, lower) for p in patterns)), None)
+    if fmt is None:
+        fmt = 'unknown'
+        if re.search(r'tournament|bracket', lower) and not re.search(r'elementary|middle|high\s*school', lower):
+            fmt = 'singles'
+    special = any(re.search(p, lower) for p in EventStandardizer.SPECIAL_PATTERNS)
+    return {'original': name, 'game': game, 'format': fmt, 'is_special': special,
+            'standard_name': EventStandardizer._generate_standard_name(game, fmt, special)}
+
+
+def _event_names(n, seed=5):
+    rng = random.Random(seed)
+    words = ['Ultimate', 'SSBU', 'Melee', 'SF6', 'Street Fighter 6', 'Tekken 8', 'T7', 'Strive', 'DBFZ',
+             'Marvel', 'KOF', 'Singles', 'Doubles', '2v2', 'Teams', 'Squad Strike', 'Crew Battle', '3v3',
+             'Arcadian', 'Amateur', 'Redemption', 'Side Bracket', 'Grand Finals', 'Tournament', 'Bracket',
+             'LAS', 'Weekly', '#42', 'UAS:', 'Apex Series', 'Novice', 'Pools', 'Top 8', 'Ladder']
+    names = {name for name in SAMPLE_EVENTS if name} | {"Ultimate Singles", "Melee Singles"}
+    while len(names) < n:
+        names.add(' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))))
+    return sorted(names)
+
+
+def test_compiled_matches_pattern_loops():
+    for name in SAMPLE_EVENTS + _event_names(3000):
+        assert EventStandardizer.standardize(name) == _reference_standardize(name), name
+
+    # Memoized, but callers can't corrupt the cache
+    result = EventStandardizer.standardize("Ultimate Singles")
+    result['game'] = 'melee'
+    assert EventStandardizer.standardize("Ultimate Singles")['game'] == 'ultimate'
+
+
+def test_mapping_is_persisted():
+    conn = sqlite3.connect(':memory:')
+    mapping = EventNameMap(conn)
+    mapping.ensure_table()
+    names = _event_names(500)
+    assert mapping.sync(names) == len(names)
+    assert mapping.sync(names + ['Brand New Ultimate Doubles']) == 1
+    assert mapping.lookup('SF6 Singles') == 'SF6 Singles'
+    assert mapping.lookup('Tekken 8 Tournament') == 'Tekken 8 Singles'
+
+    # Rows written under different rules are recomputed
+    conn.execute("UPDATE event_name_map SET rules_version = 'old'")
+    assert EventNameMap(conn).sync(names) == len(names)
+
+
+def _placements(conn, n_rows, names, seed=9):
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) for i in range(len(names))]
+    conn.execute("CREATE TABLE tournament_placements (id INTEGER PRIMARY KEY, tournament_id TEXT, "
+                 "player_id INTEGER, placement INTEGER, event_name TEXT)")
+    events = rng.choices(names + [None], weights=weights + [0.05], k=n_rows)
+    conn.executemany("INSERT INTO tournament_placements (tournament_id, player_id, placement, event_name) "
+                     "VALUES (?, ?, ?, ?)",
+                     ((str(i // 64), i % 5000, i % 64 + 1, event) for i, event in enumerate(events)))
+    EventNameMap(conn).ensure_table()
+    conn.commit()
+
+
+def _per_name_loop(conn):
+    """The old normalize_database_events: count and UPDATE one distinct name at a time"""
+    for (name,) in conn.execute("SELECT DISTINCT event_name FROM tournament_placements").fetchall():
+        if not name:
+            continue
+        result = _reference_standardize(name)
+        if result['standard_name'] != name and result['game'] == 'ultimate':
+            conn.execute("SELECT count(*) FROM tournament_placements WHERE event_name = ?", (name,)).fetchone()
+            conn.execute("UPDATE tournament_placements SET event_name = ? WHERE event_name = ?",
+                         (result['standard_name'], name))
+    conn.commit()
+
+
+def _snapshot(conn):
+    return conn.execute("SELECT id, event_name FROM tournament_placements ORDER BY id").fetchall()
+
+
+def _expected(snapshot):
+    """Each placement renamed once, from its original name"""
+    expected = []
+    for row_id, name in snapshot:
+        result = _reference_standardize(name)
+        if name and result['game'] == 'ultimate':
+            name = result['standard_name']
+        expected.append((row_id, name))
+    return expected
+
+
+def test_bulk_update_beats_per_name_loop():
+    names = _event_names(400)
+    old, new = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+    for conn in (old, new):
+        _placements(conn, 100000, names)
+
+    start = time.perf_counter()
+    _per_name_loop(old)
+    loop = time.perf_counter() - start
+
+    original = _snapshot(new)
+    preview = bulk_normalize(new, dry_run=True)
+    assert _snapshot(new) == original
+    assert new.execute(f"SELECT count(*) FROM {EventNameMap.TABLE}").fetchone()[0] == 0
+    start = time.perf_counter()
+    stats = bulk_normalize(new)
+    bulk = time.perf_counter() - start
+
+    assert _snapshot(new) == _expected(original)
+    assert stats['placements_updated'] == preview['placements_affected'] > 0
+    assert [d[:2] for d in stats['diff']] == [d[:2] for d in preview['diff']]
+    assert stats['mapped_new'] == preview['mapped_new'] > 0  # the dry run kept no mappings
+    print(f"🏷️ 100k placements: per-name loop {loop:.2f}s, set-based {bulk:.2f}s")
+    assert bulk < loop
+
+
+def test_million_row_timing():
+    conn = sqlite3.connect(':memory:')
+    _placements(conn, 1000000, _event_names(2000))
+    preview = bulk_normalize(conn, dry_run=True)
+    stats = bulk_normalize(conn)
+    assert stats['placements_updated'] == preview['placements_affected']
+    timings = ', '.join(f"{k} {v:.2f}s" for k, v in {**preview['timings'], **stats['timings']}.items())
+    print(f"🏷️ 1M placements, {len(preview['diff'])} renamed events, "
+          f"{stats['placements_updated']} rows: {timings}")
+    assert stats['timings']['update'] < 30
+
+
+def test_migration_matches_mapping():
+    from sqlalchemy import create_engine, inspect
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location('event_name_map', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    assert migration.TABLE == EventNameMap.TABLE
+
+    engine = create_engine('sqlite://')
+
+    def run(step):
+        with engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                step()
+
+    run(migration.upgrade)
+    run(migration.upgrade)  # already there: nothing to do
+    with engine.connect() as conn:
+        raw = conn.connection.driver_connection
+        assert EventNameMap(raw).sync(["Ultimate Singles", "SSBU Doubles"]) == 2
+        assert EventNameMap(raw).lookup("SSBU Doubles") == "Ultimate Doubles"
+    run(migration.downgrade)
+    assert not inspect(engine).has_table(EventNameMap.TABLE)
+
+
+if __name__ == "__main__":
+    test_compiled_matches_pattern_loops()
+    test_mapping_is_persisted()
+    test_bulk_update_beats_per_name_loop()
+    test_million_row_timing()
+    test_migration_matches_mapping()
+    print("✅ Event normalization checks passed")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+test_health_monitor.py - Concurrent health sweeps in utils/health_monitor.py
+
+1. A sweep reports listening/closed ports, running processes and the
+   database file correctly, probing a shared port once
+2. A port that never answers costs one short timeout, not the sweep
+3. One process-table snapshot per sweep, however many process checks
+4. Rolling history gives uptime and p50/p95/p99 per service
+5. Benchmark: the old one-at-a-time checks vs a concurrent sweep as the
+   number of monitored services grows
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('BYPASS_EXECUTION_GUARD', 'true')
+os.environ.setdefault('HEALTH_PROBE_TIMEOUT', '0.3')
+
+import psutil
+
+from utils import health_monitor as hm
+from utils.health_monitor import HealthMonitor
+
+THIS_PROCESS = os.path.basename(__file__)
+
+
+def _listener():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    sock.listen(64)
+    return sock, sock.getsockname()[1]
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _monitor(services):
+    monitor = HealthMonitor()
+    monitor._known_services = services
+    return monitor
+
+
+class _HungPorts:
+    """Connections to these ports never complete (like a firewalled host)"""
+
+    def __init__(self, ports):
+        self.ports = set(ports)
+        self.original = asyncio.open_connection
+
+    async def _open(self, host, port, **kwargs):
+        if port in self.ports:
+            await asyncio.sleep(3600)
+        return await self.original(host, port, **kwargs)
+
+    def __enter__(self):
+        asyncio.open_connection = self._open
+
+    def __exit__(self, *exc):
+        asyncio.open_connection = self.original
+
+
+class _CountSnapshots:
+    def __init__(self):
+        self.calls = 0
+        self.original = psutil.process_iter
+
+    def _iter(self, *args, **kwargs):
+        self.calls += 1
+        return self.original(*args, **kwargs)
+
+    def __enter__(self):
+        psutil.process_iter = self._iter
+        return self
+
+    def __exit__(self, *exc):
+        psutil.process_iter = self.original
+
+
+def _services(count, listening_ports, closed_ports, hung_ports=()):
+    """A mix of port and process services, a quarter of each kind down"""
+    services = {}
+    ports = list(listening_ports) + list(closed_ports) + list(hung_ports)
+    for i in range(count):
+        if i % 2:
+            services[f"web_{i}"] = {"port": ports[i % len(ports)]}
+        else:
+            name = THIS_PROCESS if i % 4 else f"not_running_{i}.py"
+            services[f"worker_{i}"] = {"port": None, "process_name": name}
+    return services
+
+
+def test_sweep_results():
+    sock, port = _listener()
+    db = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    services = {
+        "web_editor": {"port": port, "process_name": "web_editor.py"},
+        "polymorphic_web_editor": {"port": port, "process_name": "polymorphic_web_editor.py"},
+        "closed": {"port": _closed_port()},
+        "this_test": {"port": None, "process_name": THIS_PROCESS},
+        "missing": {"port": None, "process_name": "definitely_not_running_123.py"},
+        "database": {"port": None, "file_path": db.name},
+        "lost_database": {"port": None, "file_path": db.name + ".missing"},
+    }
+    monitor = _monitor(services)
+    probed = []
+    original = monitor._probe_port
+
+    async def counting(port, host='localhost'):
+        probed.append(port)
+        return await original(port, host)
+
+    monitor._probe_port = counting
+    results = monitor.do("check all services")
+    status = {name: health.status for name, health in results.items()}
+    assert status == {"web_editor": "healthy", "polymorphic_web_editor": "healthy", "closed": "unhealthy",
+                      "this_test": "healthy", "missing": "unhealthy", "database": "healthy",
+                      "lost_database": "unhealthy"}, status
+    assert probed.count(port) == 1
+    assert os.getpid() in results["this_test"].details["pids"]
+    assert results["web_editor"].details == {"port": port, "listening": True}
+    assert results["web_editor"].response_time > 0
+    assert monitor.do("check missing") == "missing: unhealthy"
+    assert asyncio.run(monitor.sweep([])) == {}  # an empty selection checks nothing, not everything
+    sock.close()
+
+
+def test_hung_port_costs_one_timeout():
+    sock, port = _listener()
+    hung = [_closed_port() for _ in range(10)]
+    monitor = _monitor({f"hung_{p}": {"port": p} for p in hung} | {"up": {"port": port}})
+    with _HungPorts(hung):
+        start = time.perf_counter()
+        results = monitor.do("check all services")
+        elapsed = time.perf_counter() - start
+    assert results["up"].status == "healthy"
+    assert all(results[f"hung_{p}"].status == "unhealthy" for p in hung)
+    assert "no answer" in results[f"hung_{hung[0]}"].details["error"]
+    assert elapsed < hm.PROBE_TIMEOUT * 3, elapsed  # ten hung ports, still about one timeout
+    sock.close()
+
+
+def test_one_process_snapshot_per_sweep():
+    sock, port = _listener()
+    monitor = _monitor(_services(40, [port], [_closed_port()]))
+    with _CountSnapshots() as counter:
+        monitor.do("check all services")
+        monitor.do("check all services")
+    assert counter.calls == 2
+    sock.close()
+
+
+def test_history_percentiles():
+    sock, port = _listener()
+    monitor = _monitor({"web": {"port": port}, "gone": {"port": _closed_port()}})
+    for _ in range(8):
+        monitor.do("check all services")
+    latency = monitor.ask("latency")
+    assert latency["web"]["checks"] == 8 and latency["web"]["uptime"] == 100.0
+    assert 0 < latency["web"]["p50_ms"] <= latency["web"]["p95_ms"] <= latency["web"]["p99_ms"]
+    assert latency["gone"]["uptime"] == 0.0 and latency["gone"]["p95_ms"] == 0.0
+    assert list(monitor.ask("web latency")) == ["web"]
+    assert "p95" in monitor.tell("text")
+    assert monitor.ask("system health")["last_sweep_ms"] > 0
+    assert hm._percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0 and hm._percentile([5.0], 0.99) == 5.0
+    sock.close()
+
+
+def _legacy_sweep(services):
+    """The old checks: ports one at a time, a process-table walk per process service"""
+    for config in services.values():
+        if config.get("port"):
+            with socket.socket() as sock:
+                sock.settimeout(3)
+                sock.connect_ex(('localhost', config["port"]))
+        else:
+            [p for p in psutil.process_iter(['pid', 'name', 'cmdline'])
+             if config["process_name"] in ' '.join(p.info['cmdline'] or [])]
+
+
+def test_sweep_benchmark():
+    listeners = [_listener() for _ in range(4)]
+    listening = [port for _, port in listeners]
+    closed = [_closed_port() for _ in range(4)]
+    timings = {}
+    for count in (10, 40, 160):
+        services = _services(count, listening, closed)
+        start = time.perf_counter()
+        _legacy_sweep(services)
+        legacy = time.perf_counter() - start
+        monitor = _monitor(services)
+        monitor.do("check all services")  # warm the loop machinery once
+        start = time.perf_counter()
+        monitor.do("check all services")
+        swept = time.perf_counter() - start
+        timings[count] = (legacy, swept)
+        print(f"🏥 {count} services: one at a time {legacy * 1000:.0f}ms, concurrent sweep {swept * 1000:.0f}ms")
+
+    hung = [_closed_port() for _ in range(8)]
+    with _HungPorts(hung):
+        monitor = _monitor(_services(160, listening, closed, hung))
+        start = time.perf_counter()
+        monitor.do("check all services")
+        swept = time.perf_counter() - start
+    print(f"🏥 160 services with 8 hung ports: concurrent sweep {swept * 1000:.0f}ms "
+          f"(one at a time would wait {len(hung) * 3}s+ on the hung ports alone)")
+
+    assert timings[160][1] < timings[160][0]
+    # The process table is read once either way; growth comes from cheap in-memory matching
+    assert timings[160][1] < timings[10][1] * 4 + 0.05
+    for sock, _ in listeners:
+        sock.close()
+
+
+if __name__ == "__main__":
+    test_sweep_results()
+    test_hung_port_costs_one_timeout()
+    test_one_process_snapshot_per_sweep()
+    test_history_percentiles()
+    test_sweep_benchmark()
+    print("✅ Health monitor checks passed")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+test_heatmap_artifact_cache.py - Versioned heatmap render cache
+
+1. Concurrent requests for the same key share one render
+2. A data-version change serves the stale artifact while re-rendering
+3. Artifacts survive a restart (disk) and ETags are stable per version
+4. With no located tournaments the service reports no data (nothing to prefetch)
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualization_services.heatmap_cache import HeatmapArtifactCache
+
+
+class _Renderer:
+    """Slow stand-in for a matplotlib/folium render that records each call"""
+
+    def __init__(self, delay=0.3):
+        self.delay = delay
+        self.calls = []
+        self.version = 'v1'
+
+    def __call__(self, params, output_path):
+        self.calls.append((dict(params), self.version))
+        time.sleep(self.delay)
+        with open(output_path, 'w') as f:
+            f.write(f'<html>{self.version} {sorted(params.items())}</html>')
+        return output_path
+
+
+def _cache(tmpdir, renderer, ttl=0.0):
+    return HeatmapArtifactCache(version_fn=lambda: renderer.version,
+                                renderers={'html': renderer, 'png': renderer},
+                                cache_dir=tmpdir, version_ttl=ttl)
+
+
+def test_concurrent_requests_share_render():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        renderer = _Renderer()
+        cache = _cache(tmpdir, renderer)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('html', {'zoom': 9})))
+                   for _ in range(10)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        assert len(renderer.calls) == 1
+        assert len({r.etag for r in results}) == 1
+        assert cache.stats['joined_renders'] == 9
+        print(f"🗺️ 10 concurrent requests, 1 render, {elapsed * 1000:.0f}ms")
+
+        # Different params are a different artifact
+        cache.get('html', {'zoom': 10})
+        assert len(renderer.calls) == 2
+
+
+def test_version_change_serves_stale_then_fresh():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        renderer = _Renderer(delay=0.2)
+        cache = _cache(tmpdir, renderer)
+        first = cache.get('html')
+        assert not first.stale and first.version == 'v1'
+
+        renderer.version = 'v2'
+        start = time.perf_counter()
+        stale = cache.get('html')
+        assert time.perf_counter() - start < renderer.delay  # no wait on the render
+        assert stale.stale and stale.etag == first.etag
+
+        artifact, future = cache.request('html')
+        fresh = future.result(5) if future else artifact
+        assert fresh.version == 'v2' and fresh.etag != first.etag
+        assert cache.get('html').etag == fresh.etag
+        assert len(renderer.calls) == 2
+
+        # The replaced render is removed from disk
+        files = [n for n in os.listdir(tmpdir) if n.endswith('.html')]
+        assert files == [f'{fresh.key}.html']
+
+
+def test_artifacts_survive_restart():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        renderer = _Renderer(delay=0)
+        etag = _cache(tmpdir, renderer).get('png').etag
+
+        restarted = _cache(tmpdir, renderer)
+        artifact = restarted.get('png')
+        assert artifact.etag == etag
+        assert restarted.stats['disk_hits'] == 1
+        assert len(renderer.calls) == 1
+
+
+def test_render_errors_reach_waiters():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = HeatmapArtifactCache(version_fn=lambda: 'v1',
+                                     renderers={'html': lambda params, path: {'error': 'No heatmap data available'}},
+                                     cache_dir=tmpdir)
+        try:
+            cache.get('html')
+        except RuntimeError as e:
+            assert 'No heatmap data' in str(e)
+        else:
+            raise AssertionError("render error was swallowed")
+        assert cache.status()['in_flight'] == 0
+
+
+def test_has_data_follows_version():
+    os.environ.setdefault('BYPASS_EXECUTION_GUARD', 'true')
+    from visualization_services import heatmap_service
+
+    located = {'count': 0}
+    previous = heatmap_service._artifact_cache
+    with tempfile.TemporaryDirectory() as tmpdir:
+        heatmap_service._artifact_cache = HeatmapArtifactCache(
+            version_fn=lambda: f"1700000000:{located['count']}", renderers={'html': _Renderer()},
+            cache_dir=tmpdir, version_ttl=0.0)
+        try:
+            assert not heatmap_service.has_data()
+            located['count'] = 10
+            assert heatmap_service.has_data()
+        finally:
+            heatmap_service._artifact_cache = previous
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_render()
+    test_version_change_serves_stale_then_fresh()
+    test_artifacts_survive_restart()
+    test_render_errors_reach_waiters()
+    test_has_data_follows_version()
+    print("✅ Heatmap artifact cache checks passed")
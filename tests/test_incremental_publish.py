@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+test_incremental_publish.py - Content-hashed build graph behind PublishOperation
+
+1. The first publish builds every artifact and uploads every asset; a
+   republish with the same data builds and uploads nothing
+2. A change rebuilds only the artifacts whose inputs changed (and the
+   uploads shipping them); the dry-run plan names exactly that dirty set
+3. Failed uploads, deleted outputs and changed builders are redone
+4. Benchmark: a no-op republish costs a fraction of a full one
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from publishing.build_graph import BuildGraph, content_hash
+
+
+def _data(n_orgs=400, n_players=3000, seed=1):
+    rng = random.Random(seed)
+    return {
+        'organizations': [{'display_name': f"Org {i}", 'tournament_count': rng.randint(1, 40),
+                           'total_attendance': rng.randint(10, 4000)} for i in range(n_orgs)],
+        'player_rankings': [{'name': f"Player {i}", 'points': rng.randint(0, 500),
+                             'events': rng.randint(1, 60)} for i in range(n_players)],
+        'recent_tournaments': [{'id': i, 'name': f"Weekly {i}", 'num_attendees': rng.randint(8, 300)}
+                               for i in range(200)],
+    }
+
+
+def _table(rows):
+    """A deliberately heavy renderer standing in for the HTML generators"""
+    html = []
+    for _ in range(20):
+        html = ['<table>'] + [''.join(f"<td>{value}</td>" for value in row.values()) for row in rows] + ['</table>']
+    return '\n'.join(html)
+
+
+def render_orgs(data):
+    return _table(data['organizations']) + _table(data['player_rankings'][:50])
+
+
+def render_players(data):
+    return _table(data['player_rankings'])
+
+
+def render_players_v2(data):
+    return '<h1>Players</h1>' + _table(data['player_rankings'])
+
+
+def _graph(build_dir, data, log, fail_upload=False, player_renderer=render_players):
+    """Same shape as PublishOperation._build_graph"""
+    graph = BuildGraph(build_dir)
+    graph.artifact('org_html', 'org_rankings.html',
+                   inputs=lambda: {'organizations': data['organizations'], 'players': data['player_rankings'][:50]},
+                   build=lambda: log.append('org_html') or render_orgs(data), recipe=render_orgs)
+    graph.artifact('player_html', 'player_rankings.html',
+                   inputs=lambda: {'players': data['player_rankings']},
+                   build=lambda: log.append('player_html') or player_renderer(data), recipe=player_renderer)
+    graph.artifact('json', 'rankings.json',
+                   inputs=lambda: {'organizations': data['organizations'], 'tournaments': data['recent_tournaments']},
+                   build=lambda: log.append('json') or json.dumps(data['organizations']))
+
+    def upload(content):
+        log.append('upload')
+        return {'success': not fail_upload}
+
+    graph.asset('shopify:templates/page.attendance.json', 'org_html', upload, target='store.example.com')
+    return graph
+
+
+def _publish(build_dir, data, **kwargs):
+    log = []
+    graph = _graph(build_dir, data, log, **kwargs)
+    outputs = graph.build()
+    graph.publish(outputs)
+    return log, outputs
+
+
+def test_noop_republish_does_nothing():
+    build_dir = tempfile.mkdtemp(prefix='publish-')
+    data = _data()
+    log, outputs = _publish(build_dir, data)
+    assert log == ['org_html', 'player_html', 'json', 'upload']
+
+    log, again = _publish(build_dir, _data())  # same content, new objects
+    assert log == []
+    assert again == outputs
+    with open(os.path.join(build_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    assert set(manifest['built']) == {'org_html', 'player_html', 'json'}
+    assert list(manifest['published']) == ['shopify:templates/page.attendance.json']
+
+
+def test_only_dirty_outputs_are_rebuilt():
+    build_dir = tempfile.mkdtemp(prefix='publish-')
+    data = _data()
+    _publish(build_dir, data)
+
+    # A player far down the rankings: only the full player page changes
+    data['player_rankings'][2000]['points'] += 1
+    plan = _graph(build_dir, data, []).plan()
+    assert plan['dirty_artifacts'] == ['player_html'] and plan['dirty_assets'] == []
+    assert _publish(build_dir, data)[0] == ['player_html']
+
+    # A top-50 player: the combined page and its Shopify upload change too
+    data['player_rankings'][3]['points'] += 1
+    log = []
+    plan = _graph(build_dir, data, log).plan()
+    assert log == []  # planning builds nothing
+    assert plan['artifacts'] == {'org_html': 'changed', 'player_html': 'changed', 'json': 'unchanged'}
+    assert plan['assets'] == {'shopify:templates/page.attendance.json': 'changed'}
+    assert _publish(build_dir, data)[0] == ['org_html', 'player_html', 'upload']
+
+
+def test_failures_and_removed_outputs_are_redone():
+    build_dir = tempfile.mkdtemp(prefix='publish-')
+    data = _data(n_orgs=20, n_players=100)
+    assert _publish(build_dir, data, fail_upload=True)[0][-1] == 'upload'
+    assert _publish(build_dir, data)[0] == ['upload']  # failed upload not recorded
+    assert _publish(build_dir, data)[0] == []
+
+    os.remove(os.path.join(build_dir, 'rankings.json'))
+    assert _graph(build_dir, data, []).plan()['artifacts']['json'] == 'missing output'
+    assert _publish(build_dir, data)[0] == ['json']
+
+    # A new template is a new recipe
+    assert _publish(build_dir, data, player_renderer=render_players_v2)[0] == ['player_html']
+
+    assert content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+
+
+def test_noop_republish_benchmark():
+    build_dir = tempfile.mkdtemp(prefix='publish-')
+    data = _data()
+    start = time.perf_counter()
+    _publish(build_dir, data)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    log, _ = _publish(build_dir, _data())
+    noop = time.perf_counter() - start
+    print(f"📦 Full publish {full * 1000:.0f}ms, no-op republish {noop * 1000:.0f}ms "
+          f"(hashing inputs + reading cached outputs)")
+    assert log == []
+    assert noop * 5 < full
+
+
+if __name__ == "__main__":
+    test_noop_republish_does_nothing()
+    test_only_dirty_outputs_are_rebuilt()
+    test_failures_and_removed_outputs_are_redone()
+    test_noop_republish_benchmark()
+    print("✅ Incremental publish checks passed")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+test_name_index.py - Trigram name search (in-memory and persistent SQLite FTS5)
+
+1. Trigram-pruned fuzzy_match finds the full scan's best match with the same
+   scores; only weak matches sharing no trigram with the query can drop out
+2. Top-k over 100k names takes milliseconds instead of seconds
+3. The SQLite index follows inserts, renames and deletes through triggers,
+   and returns every matching row (players sharing a tag, tournaments
+   sharing a venue)
+4. The alembic revision creates, fills and drops the index and triggers
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import string
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search.fuzzy_search import FuzzySearcher, TrigramIndex
+from search.name_index import INDEX_TABLE, ensure_name_index, rebuild_name_index, search_ids, search_names
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'alembic', 'versions', 'b81e4c0d9a27_add_search_names_trigram_index.py')
+
+
+def _names(n, seed=7):
+    rng = random.Random(seed)
+    syllables = ['ka', 'zu', 'mi', 'ro', 'shi', 'ne', 'to', 'ax', 'el', 'qu', 'vy', 'dra', 'gon', 'leaf']
+    names = set()
+    while len(names) < n:
+        word = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        suffix = rng.choice(['', '', str(rng.randint(1, 99)), ' ' + rng.choice(string.ascii_lowercase) * 2])
+        names.add(word.capitalize() + suffix)
+    names = sorted(names)
+    rng.shuffle(names)
+    return names
+
+
+def _typo(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def _full_scan(query, names, limit=10, cutoff=0.6):
+    """fuzzy_match without the index (candidate lists below the index threshold)"""
+    searcher = FuzzySearcher()
+    matches = []
+    for start in range(0, len(names), 500):
+        matches.extend(searcher.fuzzy_match(query, names[start:start + 500], limit=limit, cutoff=cutoff))
+    matches.sort(key=lambda m: m.score, reverse=True)
+    return matches[:limit]
+
+
+def test_pruned_matches_full_scan():
+    rng = random.Random(1)
+    names = _names(5000)
+    index = TrigramIndex(names)
+    queries = [_typo(rng.choice(names), rng) for _ in range(30)] + [rng.choice(names)[:4] for _ in range(10)]
+    found_total = expected_total = 0
+    for query in queries:
+        expected = _full_scan(query, names)
+        found = index.search(query)
+        scores = {m.matched: m.score for m in expected}
+        assert found[0].matched == expected[0].matched, query
+        assert all(scores.get(m.matched) == m.score for m in found if m.score > expected[-1].score), query
+        found_total += len(found)
+        expected_total += len(expected)
+    assert found_total >= 0.9 * expected_total
+
+    # fuzzy_match switches to the index for long lists and keeps its signature
+    searcher = FuzzySearcher()
+    assert searcher.fuzzy_match(names[3], names, limit=1)[0].matched == names[3]
+    assert searcher.index_for(names) is searcher.index_for(list(names))
+
+
+def test_top_k_is_fast():
+    rng = random.Random(2)
+    names = _names(100000)
+    searcher = FuzzySearcher()
+    start = time.perf_counter()
+    searcher.index_for(names)
+    build = time.perf_counter() - start
+
+    queries = [_typo(rng.choice(names), rng) for _ in range(50)]
+    start = time.perf_counter()
+    for query in queries:
+        assert searcher.fuzzy_match(query, names, limit=10)
+    per_query = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    _full_scan(queries[0], names)
+    scan = time.perf_counter() - start
+    print(f"🔎 100k names: index build {build:.2f}s, {per_query * 1000:.1f}ms/query vs full scan {scan:.2f}s")
+    assert per_query < 0.05 and per_query * 10 < scan
+
+
+def _database(n_players, path=':memory:'):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE players (id INTEGER PRIMARY KEY, gamer_tag TEXT NOT NULL, name TEXT);
+        CREATE TABLE organizations (id INTEGER PRIMARY KEY, display_name TEXT NOT NULL);
+        CREATE TABLE tournaments (id INTEGER PRIMARY KEY, name TEXT, venue_name TEXT);
+    """)
+    names = _names(n_players)
+    conn.executemany("INSERT INTO players (id, gamer_tag, name) VALUES (?, ?, ?)",
+                     [(i + 1, tag, 'José Ramírez' if i == 0 else None) for i, tag in enumerate(names)])
+    conn.execute("INSERT INTO organizations (id, display_name) VALUES (1, 'Backyard Tryhards')")
+    conn.executemany("INSERT INTO tournaments (id, name, venue_name) VALUES (?, ?, ?)",
+                     [(i, f'Weekly {i}', 'Game Rush Anaheim') for i in range(1, 6)])
+    conn.commit()
+    return conn, names
+
+
+def test_sqlite_index_stays_in_sync():
+    conn, names = _database(2000)
+    assert ensure_name_index(conn)
+    assert ensure_name_index(conn)  # idempotent
+
+    assert search_ids(conn, names[10], ('player',), limit=1) == [11]
+    assert search_ids(conn, 'jose ramirez', ('player_name',), limit=1) == [1]
+    assert search_ids(conn, 'backyard tryhard', ('organization',)) == [1]
+    venues = search_names(conn, 'game rush', kinds=('venue',))
+    assert [(m.matched, m.item) for m in venues] == [('Game Rush Anaheim', ('venue', i)) for i in range(1, 6)]
+
+    # Two players with the same tag are both found
+    conn.execute("INSERT INTO players (id, gamer_tag) VALUES (9101, 'Desert Hawk'), (9102, 'Desert Hawk')")
+    assert sorted(search_ids(conn, 'desert hawk', ('player',), limit=5)) == [9101, 9102]
+    conn.execute("DELETE FROM players WHERE id IN (9101, 9102)")
+
+    conn.execute("INSERT INTO players (id, gamer_tag) VALUES (9001, 'Zzyzx Falcon')")
+    assert search_ids(conn, 'zzyzx falcn', ('player',), limit=1) == [9001]
+    conn.execute("UPDATE players SET gamer_tag = 'Mojave Falcon' WHERE id = 9001")
+    assert search_ids(conn, 'zzyzx', ('player',), cutoff=0.5) == []
+    assert search_ids(conn, 'mojave falcon', ('player',), limit=1) == [9001]
+    conn.execute("DELETE FROM players WHERE id = 9001")
+    assert search_ids(conn, 'mojave falcon', ('player',), cutoff=0.8) == []
+
+    assert rebuild_name_index(conn) == 2000 + 1 + 1 + 5
+    assert search_ids(conn, 'ka', ('player',), limit=3)  # short query: prefix scan
+
+
+def test_migration():
+    from sqlalchemy import create_engine
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location('search_names_index', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    path = os.path.join(tempfile.mkdtemp(prefix='tt-names-'), 'names.db')
+    conn, names = _database(300, path)
+    engine = create_engine(f"sqlite:///{path}")
+
+    def run(step):
+        with engine.begin() as connection:
+            with Operations.context(MigrationContext.configure(connection)):
+                step()
+
+    def schema():
+        return {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'search_names%'")}
+
+    run(migration.upgrade)
+    assert INDEX_TABLE in schema() and len(schema() & {f"{INDEX_TABLE}_players_ai", f"{INDEX_TABLE}_tournaments_ad"}) == 2
+    assert conn.execute(f"SELECT count(*) FROM {INDEX_TABLE}").fetchone()[0] == 300 + 1 + 1 + 5
+    assert search_ids(conn, names[7], ('player',), limit=1) == [8]
+    run(migration.upgrade)  # rerun on an indexed database changes nothing
+    assert conn.execute(f"SELECT count(*) FROM {INDEX_TABLE}").fetchone()[0] == 300 + 1 + 1 + 5
+    run(migration.downgrade)
+    assert not schema()
+    conn.execute("INSERT INTO players (id, gamer_tag) VALUES (9001, 'No Index')")  # no trigger left behind
+
+
+def test_sqlite_top_k_is_fast():
+    rng = random.Random(3)
+    conn, names = _database(100000)
+    ensure_name_index(conn)
+    queries = [_typo(rng.choice(names), rng) for _ in range(50)]
+    start = time.perf_counter()
+    hits = sum(1 for query in queries if search_ids(conn, query, ('player',)))
+    per_query = (time.perf_counter() - start) / len(queries)
+    print(f"🔎 SQLite FTS5 trigram index, 100k players: {per_query * 1000:.1f}ms/query, {hits}/50 found")
+    assert hits >= 45 and per_query < 0.1
+
+
+if __name__ == "__main__":
+    test_pruned_matches_full_scan()
+    test_top_k_is_fast()
+    test_sqlite_index_stays_in_sync()
+    test_migration()
+    test_sqlite_top_k_is_fast()
+    print("✅ Name index checks passed")
@@ -124,6 +124,37 @@ def test_optimization_application():
     print(f"✅ All optimizations: {applied_count}/{total_count} applied")
 
 
+def test_profiling():
+    """Test the sampling profiler behind do("profile ...")"""
+    print("\n🔬 Testing profiling...")
+    
+    class ScoringService:
+        def ask(self, query):
+            deadline = time.time() + 0.3
+            while time.time() < deadline:
+                sum(i * i for i in range(500))
+    
+    start_result = performance_optimizer.do("profile start every 2ms")
+    print(f"✅ Profiler: {start_result}")
+    ScoringService().ask("scores")
+    report = performance_optimizer.do("profile stop")
+    entries = [entry['entry'] for entry in report['entry_points']]
+    print(f"✅ Samples: {report['samples']}, entry points: {entries}")
+    print(f"✅ Flamegraph files: {len(report.get('files', []))}")
+    assert 'ScoringService.ask' in entries
+    
+    bottlenecks = performance_optimizer.ask("bottlenecks")
+    functions = [b for b in bottlenecks['bottlenecks'] if b['type'] == 'function']
+    print(f"✅ Functions by self time: {len(functions)}")
+    assert functions and functions[0]['location']
+    print(performance_optimizer.tell("discord", performance_optimizer.ask("profile")))
+    
+    timed = performance_optimizer.do("profile for 0.2 seconds")
+    print(f"✅ Timed profile: {timed}")
+    time.sleep(0.4)
+    assert not performance_optimizer.ask("profile")['running']
+
+
 def test_cache_management():
     """Test cache and cleanup functionality"""
     print("\n🧹 Testing cache management...")
@@ -183,6 +214,7 @@ if __name__ == "__main__":
     test_optimization_recommendations()
     test_system_metrics()
     test_optimization_application()
+    test_profiling()
     test_cache_management()
     test_different_output_formats()
     benchmark_performance_impact()
@@ -196,4 +228,5 @@ if __name__ == "__main__":
     print("• 🎯 Multiple output formats (Discord, JSON, HTML)")
     print("• 🔧 Automated optimization application")
     print("• 📈 Performance trend tracking and alerts")
-    print("• 🧹 Cache management and resource cleanup")
\ No newline at end of file
+    print("• 🧹 Cache management and resource cleanup")
+    print("• 🔬 Sampling profiler with collapsed-stack flamegraphs")
\ No newline at end of file
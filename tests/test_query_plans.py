@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+test_query_plans.py - EXPLAIN QUERY PLAN over the hot query paths
+
+1. The key DatabaseService, UnifiedTabulator and editor queries search an
+   index on the tables they filter instead of scanning the whole table
+2. Without the query-path indexes the same queries fall back to full scans
+3. The alembic revision creates exactly the missing indexes and drops them again
+"""
+
+import os
+import re
+import sys
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, case, inspect
+from sqlalchemy.orm import sessionmaker
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from database.tournament_models import Base, Tournament, Player, TournamentPlacement
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'alembic', 'versions', 'c4a1d7e93b20_add_query_path_indexes.py')
+
+# "SCAN tournaments" (or "SCAN TABLE tournaments" before SQLite 3.36) with no index
+FULL_SCAN = re.compile(r'SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def _migration():
+    spec = importlib.util.spec_from_file_location('query_path_indexes', MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _engine():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _key_queries(session):
+    """(label, query, tables that must not be scanned) as the services build them"""
+    cutoff = 1750000000
+    points = case((TournamentPlacement.placement == 1, 10), (TournamentPlacement.placement == 2, 7), else_=1)
+    return [
+        # DatabaseService
+        ('recent tournaments',
+         session.query(Tournament).filter(Tournament.end_at >= cutoff).order_by(Tournament.start_at.desc()),
+         ['tournaments']),
+        ('player rankings',
+         session.query(Player.id, Player.gamer_tag,
+                       func.sum(9 - TournamentPlacement.placement).label('points'),
+                       func.count(TournamentPlacement.id).label('tournaments'))
+         .join(TournamentPlacement).filter(TournamentPlacement.placement <= 8)
+         .group_by(Player.id).order_by(func.sum(9 - TournamentPlacement.placement).desc()).limit(50),
+         ['tournament_placements']),
+        ('tournaments with location',
+         session.query(Tournament).filter(Tournament.lat.isnot(None), Tournament.lng.isnot(None)),
+         ['tournaments']),
+        ('organization ranking count',
+         session.query(func.count(Tournament.id)).filter(Tournament.owner_name == 'Backyard Tryhards'),
+         ['tournaments']),
+        ('organization ranking attendance',
+         session.query(func.sum(Tournament.num_attendees)).filter(Tournament.owner_name == 'Backyard Tryhards'),
+         ['tournaments']),
+        ('tournament placements',
+         session.query(TournamentPlacement, Player).join(Player)
+         .filter(TournamentPlacement.tournament_id == '12345').order_by(TournamentPlacement.placement),
+         ['tournament_placements', 'players']),
+        ('player placements',
+         session.query(TournamentPlacement, Tournament).join(Tournament)
+         .filter(TournamentPlacement.player_id == 42).order_by(Tournament.start_at.desc()),
+         ['tournament_placements', 'tournaments']),
+        ('tournaments needing standings',
+         session.query(Tournament)
+         .filter(~Tournament.id.in_(session.query(TournamentPlacement.tournament_id).subquery()))
+         .order_by(Tournament.num_attendees.desc()).limit(10),
+         ['tournaments']),
+        ('contact lookup',
+         session.query(Tournament).filter(Tournament.primary_contact == 'discord.gg/socalsmash'),
+         ['tournaments']),
+        # UnifiedTabulator.tabulate_player_points
+        ('player points',
+         session.query(Player, func.sum(points).label('total_points'),
+                       func.count(TournamentPlacement.id).label('event_count'))
+         .join(TournamentPlacement).group_by(Player.id),
+         ['tournament_placements']),
+        ('event placements',
+         session.query(TournamentPlacement)
+         .filter(TournamentPlacement.event_name == 'Ultimate Singles', TournamentPlacement.placement <= 8),
+         ['tournament_placements']),
+        # Editor handlers
+        ('editor recent tournaments',
+         session.query(Tournament).order_by(Tournament.start_at.desc()).limit(10),
+         ['tournaments']),
+        ('editor attendance timeline',
+         session.query(Tournament).filter(Tournament.num_attendees > 0, Tournament.start_at > 0)
+         .order_by(Tournament.start_at),
+         ['tournaments']),
+    ]
+
+
+def _full_scans(engine, session):
+    """label -> plan lines scanning a table the query must reach through an index"""
+    scans = {}
+    with engine.connect() as conn:
+        for label, query, tables in _key_queries(session):
+            sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+            plan = [row[3] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+            bad = [line for line in plan if (m := FULL_SCAN.match(line)) and m.group(1) in tables]
+            if bad:
+                scans[label] = plan
+    return scans
+
+
+def test_key_queries_use_indexes():
+    engine = _engine()
+    session = sessionmaker(bind=engine)()
+    scans = _full_scans(engine, session)
+    assert not scans, '\n'.join(f"{label}: {plan}" for label, plan in scans.items())
+    print(f"📇 {len(_key_queries(session))} key queries, none scan an indexed table")
+
+
+def test_migration_adds_missing_indexes():
+    migration = _migration()
+    engine = _engine()
+    session = sessionmaker(bind=engine)()
+    names = {name for name, _, _, _ in migration.INDEXES}
+
+    def indexes():
+        return {index['name'] for table in ('tournaments', 'tournament_placements')
+                for index in inspect(engine).get_indexes(table)}
+
+    # The models and the revision declare the same indexes
+    assert names <= indexes()
+
+    def run(step):
+        with engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                step()
+
+    run(migration.downgrade)
+    assert not names & indexes()
+    assert 'ix_tournament_player_event' in indexes()
+    before = _full_scans(engine, session)
+    assert {'recent tournaments', 'tournaments with location', 'contact lookup',
+            'player placements', 'event placements'} <= set(before)
+
+    run(migration.upgrade)
+    assert names <= indexes()
+    run(migration.upgrade)  # already there: nothing to do
+    assert not _full_scans(engine, session)
+
+
+if __name__ == "__main__":
+    test_key_queries_use_indexes()
+    test_migration_adds_missing_indexes()
+    print("✅ Query plan checks passed")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+test_realtime_mixer_performance.py - In-process mixer vs per-utterance ffmpeg
+
+Measures for each path:
+1. Latency to the first mixed chunk
+2. Total wall time per utterance
+3. CPU time (own process + child processes)
+"""
+
+import os
+import sys
+import time
+import wave
+import shutil
+import tempfile
+import resource
+from statistics import mean
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'experimental', 'audio'))
+sys.path.insert(0, os.path.join(ROOT, 'utils'))
+sys.path.insert(0, ROOT)
+
+from realtime_mixer import DetectionTap, RealtimeMixer, WavStreamDecoder, OUTPUT_RATE
+
+
+def _write_wav(path, samples, rate):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype('<i2').tobytes())
+
+
+def _tone(seconds, rate, freq, amplitude):
+    t = np.arange(int(seconds * rate)) / rate
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def _speech_wav_chunks(path, chunk=4096):
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk)
+            if not data:
+                break
+            yield data
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _measure(stream_factory, runs=5):
+    first_chunk, total, cpu = [], [], []
+    for _ in range(runs):
+        cpu_start = _cpu_seconds()
+        start = time.perf_counter()
+        first = None
+        for _chunk in stream_factory():
+            if first is None:
+                first = time.perf_counter()
+        end = time.perf_counter()
+        first_chunk.append(((first or end) - start) * 1000)
+        total.append((end - start) * 1000)
+        cpu.append((_cpu_seconds() - cpu_start) * 1000)
+    return {'first_chunk_ms': mean(first_chunk), 'total_ms': mean(total), 'cpu_ms': mean(cpu)}
+
+
+def _ffmpeg_mix(speech_path, music_path, duck_level=0.15):
+    import subprocess
+    cmd = [
+        "ffmpeg", "-i", speech_path, "-ss", "0", "-i", music_path,
+        "-filter_complex",
+        f"[1:a]volume={duck_level}[bg];[0:a]volume=1.0[fg];"
+        "[fg][bg]amix=inputs=2:duration=first:dropout_transition=0",
+        "-f", "wav", "-ac", "1", "-ar", "8000", "pipe:1"
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    while True:
+        chunk = process.stdout.read(4096)
+        if not chunk:
+            break
+        yield chunk
+    process.wait()
+
+
+def test_wav_decoder_resamples_espeak_rate():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        speech_path = os.path.join(tmpdir, 'speech.wav')
+        _write_wav(speech_path, _tone(1.0, 22050, 220, 8000), 22050)
+        decoder = WavStreamDecoder()
+        samples = np.concatenate([decoder.feed(c) for c in _speech_wav_chunks(speech_path, 333)])
+        assert abs(len(samples) - OUTPUT_RATE) <= 2
+
+
+def test_mixer_ducks_under_speech():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        music_path = os.path.join(tmpdir, 'music.wav')
+        _write_wav(music_path, _tone(5.0, OUTPUT_RATE, 110, 10000), OUTPUT_RATE)
+        mixer = RealtimeMixer(music_path)
+        try:
+            silence = np.zeros(OUTPUT_RATE, dtype=np.float32)
+            speech = _tone(1.0, OUTPUT_RATE, 440, 8000).astype(np.float32)
+            out = b''.join(mixer.mix_stream([silence, speech], include_header=False))
+            mixed = np.frombuffer(out, dtype='<i2').astype(np.float32)
+
+            assert len(mixed) == 2 * OUTPUT_RATE  # output ends with the speech
+            music_only = mixed[OUTPUT_RATE // 2:OUTPUT_RATE]
+            assert np.abs(music_only).max() > 3000          # 35% of 10000
+            speech_music = mixed[OUTPUT_RATE + 800:] - speech[800:]
+            assert np.abs(speech_music).max() < 2000        # ducked to 15%
+        finally:
+            mixer.close()
+
+
+def test_mixer_outlives_close_while_streaming():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        music_path = os.path.join(tmpdir, 'music.wav')
+        _write_wav(music_path, _tone(2.0, OUTPUT_RATE, 110, 10000), OUTPUT_RATE)
+        mixer = RealtimeMixer(music_path)
+        assert mixer.acquire()
+        speech = [_tone(0.5, OUTPUT_RATE, 440, 8000).astype(np.float32) for _ in range(4)]
+        stream = mixer.mix_stream(speech, include_header=False)
+        first = next(stream)
+        mixer.close()  # e.g. the background track changed mid-utterance
+        assert not mixer.acquire()
+        rest = b''.join(stream)  # the stream keeps reading the old track
+        assert len(first) + len(rest) == 2 * 2 * OUTPUT_RATE
+        assert mixer.buffer.samples is not None
+        mixer.release()
+        assert mixer.buffer.samples is None
+
+
+def test_detection_tap_keeps_every_batch():
+    import queue
+    detections = queue.Queue()
+    tap = DetectionTap(detections, batch_bytes=100)
+    for _ in range(20):
+        tap.push(b'x' * 100)
+    tap.flush()
+    assert detections.qsize() == 20 and tap.dropped == 0
+
+    dropping = DetectionTap(queue.Queue(), batch_bytes=100, max_backlog=4)
+    for _ in range(20):
+        dropping.push(b'x' * 100)
+    assert dropping.detection_queue.qsize() == 4 and dropping.dropped == 16
+
+
+def test_benchmark_against_ffmpeg():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        music_path = os.path.join(tmpdir, 'music.wav')
+        speech_path = os.path.join(tmpdir, 'speech.wav')
+        _write_wav(music_path, _tone(60.0, 44100, 110, 10000), 44100)
+        _write_wav(speech_path, _tone(3.0, 22050, 440, 8000), 22050)
+
+        mixer = RealtimeMixer(music_path)
+        try:
+            numpy_stats = _measure(lambda: mixer.mix_wav_stream(_speech_wav_chunks(speech_path)))
+        finally:
+            mixer.close()
+        print(f"🎚️ NumPy mixer: first chunk {numpy_stats['first_chunk_ms']:.2f}ms, "
+              f"total {numpy_stats['total_ms']:.2f}ms, cpu {numpy_stats['cpu_ms']:.2f}ms")
+
+        if not shutil.which('ffmpeg'):
+            print("⚠️ ffmpeg not installed - skipping comparison")
+            return
+
+        ffmpeg_stats = _measure(lambda: _ffmpeg_mix(speech_path, music_path))
+        print(f"🎬 ffmpeg mixer: first chunk {ffmpeg_stats['first_chunk_ms']:.2f}ms, "
+              f"total {ffmpeg_stats['total_ms']:.2f}ms, cpu {ffmpeg_stats['cpu_ms']:.2f}ms")
+        assert numpy_stats['first_chunk_ms'] < ffmpeg_stats['first_chunk_ms']
+
+
+if __name__ == "__main__":
+    test_wav_decoder_resamples_espeak_rate()
+    test_mixer_ducks_under_speech()
+    test_mixer_outlives_close_while_streaming()
+    test_detection_tap_keeps_every_batch()
+    test_benchmark_against_ffmpeg()
+    print("✅ Realtime mixer benchmarks passed")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+test_sampling_profiler.py - Stack sampling per ask/tell/do entry point
+
+1. Samples are attributed to the outermost ask/tell/do on the stack, and
+   the hot function comes out on top by self-time; idle threads (the
+   caller in join(), parked workers) are left out of the ranking
+2. SQL executed through SQLAlchemy is reported with its statement
+3. Collapsed-stack files are written per entry point, in the
+   "frame;frame count" format flamegraph tools read
+4. A timed run stops by itself
+5. Overhead: a CPU-bound workload with and without the sampler running
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('BYPASS_EXECUTION_GUARD', 'true')
+
+from sqlalchemy import create_engine, text
+
+from utils.sampling_profiler import OUTSIDE_ENTRY, SamplingProfiler
+
+
+def crunch(seconds):
+    """The hot function: pure Python work"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(i * i for i in range(200))
+    return total
+
+
+def light(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(50))
+
+
+class RankingService:
+    def ask(self, query):
+        return crunch(0.3)
+
+    def do(self, action):
+        light(0.05)
+        # Nested ask/tell/do calls stay attributed to the outermost one
+        return Formatter().tell(action)
+
+
+class Formatter:
+    def tell(self, data):
+        return crunch(0.1)
+
+
+SLOW_QUERY = ("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 3000000) "
+              "SELECT SUM(x) FROM n")
+
+
+class ReportService:
+    def ask(self, query):
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            return conn.execute(text(SLOW_QUERY)).scalar()
+
+
+def _profile(work, interval_ms=2):
+    profiler = SamplingProfiler(interval_ms=interval_ms, output_dir=tempfile.mkdtemp(prefix='tt-profiles-'))
+    profiler.start()
+    worker = threading.Thread(target=work)
+    worker.start()
+    worker.join()
+    return profiler, profiler.stop()
+
+
+def _entry(report, name):
+    return next((entry for entry in report["entry_points"] if entry["entry"] == name), None)
+
+
+def test_entry_points_and_self_time():
+    service = RankingService()
+    profiler, report = _profile(lambda: (service.ask("top players"), service.do("rank")))
+    ask, do = _entry(report, "RankingService.ask"), _entry(report, "RankingService.do")
+    assert ask and do, report["entry_points"]
+    assert _entry(report, "Formatter.tell") is None
+    assert ask["samples"] > do["samples"]
+    assert "crunch" in ask["hottest"] or "genexpr" in ask["hottest"]
+
+    # The caller waiting in join() is sampled too, outside any entry point,
+    # but idle waits do not rank as hot functions
+    assert _entry(report, OUTSIDE_ENTRY) and report["idle_samples"] > 0
+    assert report["samples"] > report["sweeps"] > 0  # a sweep samples both the worker and the caller
+    top = report["functions"][0]["function"]
+    assert "crunch" in top or "genexpr" in top, report["functions"][:3]
+    assert not any(f["function"].split(" (")[0] in ("wait", "_bootstrap_inner", "select", "_wait_for_tstate_lock")
+                   for f in report["functions"]), report["functions"]
+    crunch_row = next(f for f in report["functions"] if f["function"].startswith("crunch"))
+    assert crunch_row["total_pct"] >= crunch_row["self_pct"]
+
+
+def test_queries_reported():
+    profiler, report = _profile(lambda: ReportService().ask("attendance"))
+    assert report["queries"], report["functions"][:3]
+    assert report["queries"][0]["query"].startswith("WITH RECURSIVE n(x)")
+    assert _entry(report, "ReportService.ask")["samples"] >= report["queries"][0]["samples"]
+
+
+def test_collapsed_files():
+    service = RankingService()
+    profiler, report = _profile(lambda: service.ask("top players"))
+    files = report["files"]
+    assert len(files) == len(report["entry_points"]) + 1
+    combined = open(files[0]).read().splitlines()
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in combined)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in combined) == report["samples"]
+    assert any(line.startswith("RankingService.ask;") and "crunch (" in line for line in combined)
+    ask_file = next(path for path in files if path.endswith("-RankingService.ask.collapsed"))
+    assert not any(line.startswith("RankingService.ask;") for line in open(ask_file))
+
+
+def test_timed_run_stops_itself():
+    profiler = SamplingProfiler(interval_ms=1, output_dir=tempfile.mkdtemp(prefix='tt-profiles-'))
+    assert "for 0.2s" in profiler.start(duration=0.2)
+    crunch(0.4)
+    assert not profiler.running
+    assert profiler.last_report["samples"] > 0 and profiler.last_report["files"]
+
+
+def test_overhead_benchmark():
+    def run():
+        start = time.perf_counter()
+        total = 0
+        for _ in range(200):
+            total += sum(i * i for i in range(20000))
+        return time.perf_counter() - start
+
+    profiler = SamplingProfiler(output_dir=tempfile.mkdtemp(prefix='tt-profiles-'))
+    start = time.perf_counter()
+    for _ in range(1000):
+        profiler.sample()
+    per_sample = (time.perf_counter() - start) / 1000
+    print(f"🔬 One sample of {threading.active_count()} thread(s): {per_sample * 1e6:.1f}µs")
+
+    baseline = min(run() for _ in range(3))
+    results = {}
+    for interval in (10, 5, 1):
+        profiler = SamplingProfiler(interval_ms=interval, output_dir=tempfile.mkdtemp(prefix='tt-profiles-'))
+        profiler.start()
+        sampled = min(run() for _ in range(3))
+        report = profiler.stop(write=False)
+        results[interval] = sampled
+        print(f"🔬 Sampling every {interval}ms: {sampled * 1000:.0f}ms vs {baseline * 1000:.0f}ms unprofiled "
+              f"({(sampled / baseline - 1) * 100:+.1f}%, {report['samples']} samples)")
+    assert per_sample < 0.0005
+    assert results[5] < baseline * 1.5
+
+
+if __name__ == "__main__":
+    test_entry_points_and_self_time()
+    test_queries_reported()
+    test_collapsed_files()
+    test_timed_run_stops_itself()
+    test_overhead_benchmark()
+    print("✅ Sampling profiler checks passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+test_screenshot_pool_performance.py - Pooled async capture vs one page per call
+
+Serves a set of static report pages from a local HTTP server and compares:
+1. The old approach: sync Playwright, new page per URL, networkidle + fixed sleep
+2. AsyncCaptureEngine.capture_many: warm page pool, readiness conditions
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualization_services.async_capture_engine import AsyncCaptureEngine
+
+PAGE_COUNT = 12
+REPORT_HTML = """<!DOCTYPE html>
+<html><head><title>Report {n}</title>
+<style>table {{border-collapse: collapse}} td {{padding: 4px; border: 1px solid #ccc}}</style>
+</head><body><h1>Attendance report {n}</h1>
+<table>{rows}</table></body></html>"""
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_reports(directory):
+    for n in range(PAGE_COUNT):
+        rows = ''.join(f'<tr><td>Tournament {i}</td><td>{i * 7 % 90}</td></tr>' for i in range(200))
+        with open(os.path.join(directory, f'report_{n}.html'), 'w') as f:
+            f.write(REPORT_HTML.format(n=n, rows=rows))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    return server, [f'{base}/report_{n}.html' for n in range(PAGE_COUNT)]
+
+
+def _baseline_sequential(urls, wait=0.5):
+    """Mirror of the previous _capture_screenshot loop"""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
+        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        start = time.perf_counter()
+        for url in urls:
+            page = context.new_page()
+            page.goto(url, wait_until='networkidle', timeout=30000)
+            time.sleep(wait)
+            page.screenshot()
+            page.close()
+        elapsed = time.perf_counter() - start
+        browser.close()
+    return elapsed
+
+
+def test_batch_capture_vs_sequential():
+    try:
+        import playwright  # noqa: F401
+    except ImportError:
+        print("⚠️ Playwright not installed - skipping")
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server, urls = _serve_reports(tmpdir)
+        try:
+            baseline = _baseline_sequential(urls)
+
+            engine = AsyncCaptureEngine(pool_size=4, max_open_pages=2)
+            engine.run(engine.warm())
+            start = time.perf_counter()
+            results = engine.run(engine.capture_many(urls, wait=0.5))
+            pooled = time.perf_counter() - start
+
+            assert all('screenshot' in r for r in results), [r.get('error') for r in results]
+            print(f"📸 Sequential (new page + sleep): {baseline:.2f}s for {len(urls)} pages")
+            print(f"⚡ Pooled async batch:             {pooled:.2f}s "
+                  f"({engine.stats['pages_reused']} page reuses)")
+            assert pooled < baseline
+
+            # Kept-open pages are LRU bounded
+            for url in urls[:4]:
+                engine.run(engine.capture(url, keep_open=True, wait=0))
+            assert list(engine.open_pages) == urls[2:4]
+            assert engine.stats['evicted_open_pages'] == 2
+
+            # Capturing a kept-open URL again makes it the most recently used
+            engine.run(engine.capture(urls[2], wait=0))
+            engine.run(engine.capture(urls[4], keep_open=True, wait=0))
+            assert list(engine.open_pages) == [urls[2], urls[4]]
+
+            engine.run(engine.close())
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_batch_capture_vs_sequential()
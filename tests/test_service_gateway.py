@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+test_service_gateway.py - One shared HTTPS gateway vs a server per service
+
+1. Gateway mode mounts every wrapped service under /{service-name}/ask|tell|do
+   on one port, and the announcement records point at that port and path
+2. Calls to one service are capped at SERVICE_GATEWAY_CONCURRENCY in flight
+3. Measurement: thread count, memory and startup time for N services with
+   and without the gateway (each mode in its own process)
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = 20
+
+# Runs in a fresh interpreter: wrap N services, wait until they all answer,
+# report threads/memory/startup time (and exercise the gateway routes)
+CHILD = r'''
+import json, os, socket, ssl, sys, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, sys.argv[1])
+n_services, gateway = int(sys.argv[2]), sys.argv[3] == 'gateway'
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith('VmRSS'))
+
+threads_before, rss_before = threading.active_count(), rss_kb()
+start = time.perf_counter()
+from polymorphic_core.network_service_wrapper import network_wrapper
+from polymorphic_core.local_bonjour import local_announcer
+
+class EchoService:
+    in_flight = peak = 0
+    lock = threading.Lock()
+    def __init__(self, n):
+        self.n = n
+    def ask(self, query, **kwargs):
+        with self.lock:
+            EchoService.in_flight += 1
+            EchoService.peak = max(EchoService.peak, EchoService.in_flight)
+        time.sleep(0.2 if query == 'slow' else 0)
+        with self.lock:
+            EchoService.in_flight -= 1
+        return f"{self.n}:{query}"
+    def tell(self, format, data=None, **kwargs):
+        return f"{format}:{data}"
+    def do(self, action, **kwargs):
+        return f"did {action}"
+
+wrapped = []
+for i in range(n_services):
+    service = EchoService(i)
+    local_announcer.announce(f"Echo Service {i}", ["echo"], service_instance=service)
+    wrapped.append(network_wrapper.wrapped_services[f"Echo Service {i}"])
+
+context = ssl.create_default_context()
+context.check_hostname = False
+context.verify_mode = ssl.CERT_NONE
+
+def ready(port):
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=0.2) as sock:
+            with context.wrap_socket(sock):
+                return True
+    except OSError:
+        return False
+
+for port in sorted({w.port for w in wrapped}):
+    while not ready(port):
+        time.sleep(0.01)
+startup = time.perf_counter() - start
+result = {'threads': threading.active_count() - threads_before, 'rss_mb': (rss_kb() - rss_before) / 1024,
+          'startup_s': startup, 'ports': len({w.port for w in wrapped})}
+
+def post(w, method, body):
+    request = urllib.request.Request(f"https://127.0.0.1:{w.port}{w.path}/{method}", data=json.dumps(body).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, context=context, timeout=10) as response:
+        return json.loads(response.read())['result']
+
+result['answers'] = [post(wrapped[3], 'ask', {'query': 'hi'}), post(wrapped[3], 'tell', {'format': 'text', 'data': 1}),
+                     post(wrapped[4], 'do', {'action': 'sync'})]
+result['record'] = {k: local_announcer.services["Echo Service 3"].get(k) for k in ('https_port', 'https_path')}
+result['path'] = wrapped[3].path
+EchoService.peak = 0
+with ThreadPoolExecutor(12) as pool:
+    list(pool.map(lambda _: post(wrapped[5], 'ask', {'query': 'slow'}), range(12)))
+result['peak_in_flight'] = EchoService.peak
+print('RESULT:' + json.dumps(result), flush=True)
+'''
+
+
+def _measure(mode):
+    env = dict(os.environ, QUIET_MODE='1', SERVICE_GATEWAY='1' if mode == 'gateway' else '0',
+               SERVICE_GATEWAY_PORT='9543', SERVICE_GATEWAY_CONCURRENCY='3')
+    output = subprocess.run([sys.executable, '-c', CHILD, ROOT, str(SERVICES), mode], env=env, cwd=ROOT,
+                            capture_output=True, text=True, timeout=120, check=True).stdout
+    # atexit hooks (Bonjour cleanup) print after the result, so find it by prefix
+    line = next(line for line in output.splitlines() if line.startswith('RESULT:'))
+    return json.loads(line[len('RESULT:'):])
+
+
+def test_gateway_routes_and_records():
+    result = _measure('gateway')
+    assert result['ports'] == 1
+    assert result['answers'] == ['3:hi', 'text:1', 'did sync']
+    assert result['path'] == '/echo-service-3'
+    assert result['record'] == {'https_port': 9543, 'https_path': '/echo-service-3'}
+    assert result['peak_in_flight'] == 3
+
+
+def test_gateway_vs_dedicated_servers():
+    dedicated, gateway = _measure('dedicated'), _measure('gateway')
+    for label, result in (('server per service', dedicated), ('shared gateway', gateway)):
+        print(f"🌐 {SERVICES} services, {label}: {result['ports']} ports, +{result['threads']} threads, "
+              f"+{result['rss_mb']:.1f} MB, ready in {result['startup_s']:.2f}s")
+    assert dedicated['ports'] == SERVICES and gateway['ports'] == 1
+    assert gateway['threads'] < dedicated['threads']
+    # Unlike the gateway, a dedicated server runs calls inline: one at a time
+    assert dedicated['peak_in_flight'] == 1
+
+
+if __name__ == "__main__":
+    test_gateway_routes_and_records()
+    test_gateway_vs_dedicated_servers()
+    print("✅ Service gateway checks passed")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+test_service_metrics.py - Per-call latency metrics for ask/tell/do
+
+1. HDR buckets bound every value within ~3% and invert exactly
+2. Instrumented services record latency, errors (re-raised) and calls in
+   flight, labeled by normalized query pattern; async methods too
+3. Patterns per service are capped, the rest go to "(other)"
+4. Prometheus text: cumulative buckets, +Inf equals the count, escaping
+5. Benchmark: overhead per call of an instrumented no-op ask
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polymorphic_core import metrics
+from polymorphic_core.metrics import ServiceMetrics, normalize_pattern
+
+
+class PlayerService:
+    def ask(self, query, **kwargs):
+        if "boom" in query:
+            raise ValueError("bad query")
+        return query
+
+    def tell(self, format, data=None):
+        return f"{format}:{data}"
+
+    def do(self, action, **kwargs):
+        if kwargs.get('wait'):
+            kwargs['wait'].wait()
+        return action
+
+
+class AsyncService:
+    async def ask(self, query):
+        await asyncio.sleep(0.01)
+        return query
+
+
+def _row(registry, service, method, pattern):
+    return next(row for row in registry.ask("summary")
+                if (row["service"], row["method"], row["pattern"]) == (service, method, pattern))
+
+
+def test_buckets():
+    rng = random.Random(7)
+    values = list(range(200)) + [rng.randrange(1, 10 ** 12) for _ in range(20000)]
+    for value in values:
+        index = metrics._bucket(value)
+        low, high = metrics._bucket_bounds(index)
+        assert low <= value <= high, (value, index, low, high)
+        assert high - low <= max(0, low / metrics.SUB_COUNT)
+        assert metrics._bucket(low) == index and metrics._bucket(high) == index
+    assert metrics._bucket(10 ** 15) == metrics.BUCKETS - 1
+
+
+def test_patterns():
+    assert normalize_pattern("player 1234 stats") == "player N stats"
+    assert normalize_pattern("Show top 8 players in 2024 season") == "show top N players"
+    assert normalize_pattern("find 'West Coast Warzone' events") == "find S events"
+    assert normalize_pattern("player's \"full name\" history") == "player s S history"
+    assert normalize_pattern("tournaments since 2024-01-05") == "tournaments since N"
+    assert normalize_pattern(None) == "" and normalize_pattern({"a": 1}) == "dict"
+
+
+def test_instrumented_calls():
+    registry = ServiceMetrics()
+    service = registry.instrument(PlayerService(), "players")
+    assert registry.instrument(service, "players") is service
+    ask = service.ask
+    registry.instrument(service, "players")
+    assert service.ask is ask  # wrapped once
+
+    for player_id in range(20):
+        assert service.ask(f"player {player_id} stats") == f"player {player_id} stats"
+    assert service.tell("discord", [1, 2]) == "discord:[1, 2]"
+    try:
+        service.ask("boom 1")
+        raise AssertionError("error swallowed")
+    except ValueError:
+        pass
+
+    stats = _row(registry, "players", "ask", "player N stats")
+    assert stats["calls"] == 20 and stats["errors"] == 0 and stats["max_ms"] >= stats["p99_ms"] >= stats["p50_ms"]
+    assert _row(registry, "players", "ask", "boom N")["errors"] == 1
+    assert _row(registry, "players", "tell", "discord")["calls"] == 1
+
+    gate = threading.Event()
+    worker = threading.Thread(target=service.do, args=("sync all",), kwargs={"wait": gate})
+    worker.start()
+    time.sleep(0.05)
+    assert registry.ask("in flight") == {"players.do": 1}
+    gate.set()
+    worker.join()
+    assert _row(registry, "players", "do", "sync all")["in_flight"] == 0
+    assert _row(registry, "players", "do", "sync all")["p50_ms"] >= 40
+
+    async_service = registry.instrument(AsyncService(), "async")
+    assert asyncio.run(async_service.ask("heatmap 3")) == "heatmap 3"
+    assert _row(registry, "async", "ask", "heatmap N")["p50_ms"] >= 9
+
+    assert registry.ask("slowest")[0]["method"] == "do"
+    assert registry.ask("players errors")[0]["pattern"] == "boom N"
+    assert "players.ask(player N stats): 20 calls" in registry.tell("text")
+    registry.do("reset")
+    assert registry.ask("summary") == []
+    service.ask("player 1 stats")
+    assert _row(registry, "players", "ask", "player N stats")["calls"] == 1
+
+
+def test_pattern_cap():
+    registry = ServiceMetrics()
+    service = registry.instrument(PlayerService(), "players")
+    for i in range(metrics.MAX_PATTERNS + 30):
+        service.ask(f"query{chr(97 + i % 26)}{chr(97 + i // 26)} words")
+    patterns = {row["pattern"] for row in registry.ask("summary")}
+    assert len(patterns) == metrics.MAX_PATTERNS + 1 and metrics.OTHER_PATTERN in patterns
+    assert _row(registry, "players", "ask", metrics.OTHER_PATTERN)["calls"] == 30
+
+
+def test_prometheus_text():
+    registry = ServiceMetrics()
+    service = registry.instrument(PlayerService(), 'odd "name"\\')
+    for _ in range(5):
+        service.ask("player 1 stats")
+    text = registry.tell("prometheus")
+    assert "# TYPE polymorphic_call_duration_seconds histogram" in text
+    assert "# TYPE polymorphic_call_errors_total counter" in text
+    assert "# TYPE polymorphic_calls_in_flight gauge" in text
+    labels = 'service="odd \\"name\\"\\\\",method="ask",pattern="player N stats"'
+    buckets = [line for line in text.splitlines()
+               if line.startswith("polymorphic_call_duration_seconds_bucket{" + labels)]
+    counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+    assert len(counts) == len(metrics.PROMETHEUS_BOUNDS) + 1
+    assert counts == sorted(counts) and counts[-1] == 5 and buckets[-1].endswith('le="+Inf"} 5')
+    assert f"polymorphic_call_duration_seconds_count{{{labels}}} 5" in text
+    assert f'polymorphic_call_duration_quantile_seconds{{{labels},quantile="0.99"}}' in text
+    assert f"polymorphic_call_errors_total{{{labels}}} 0" in text
+
+
+def test_overhead_benchmark():
+    calls = 200000
+    registry = ServiceMetrics()
+    plain = PlayerService()
+    wrapped = registry.instrument(PlayerService(), "players")
+    queries = [f"player {i} stats" for i in range(100)]
+
+    def run(service):
+        ask = service.ask
+        start = time.perf_counter()
+        for i in range(calls):
+            ask(queries[i % 100])
+        return time.perf_counter() - start
+
+    baseline = min(run(plain) for _ in range(3))
+    measured = min(run(wrapped) for _ in range(3))
+    overhead_us = (measured - baseline) / calls * 1e6
+    print(f"⏱️ {calls} ask() calls: {baseline * 1e9 / calls:.0f}ns each unwrapped, "
+          f"{measured * 1e9 / calls:.0f}ns instrumented ({overhead_us:.2f}µs overhead per call)")
+    start = time.perf_counter()
+    text = registry.tell("prometheus")
+    print(f"⏱️ Scrape of {len(registry.ask('summary'))} series: {(time.perf_counter() - start) * 1000:.1f}ms, "
+          f"{len(text)} bytes")
+    assert _row(registry, "players", "ask", "player N stats")["calls"] == 3 * calls
+    assert overhead_us < 5.0
+
+
+if __name__ == "__main__":
+    test_buckets()
+    test_patterns()
+    test_instrumented_calls()
+    test_pattern_cap()
+    test_prometheus_text()
+    test_overhead_benchmark()
+    print("✅ Service metrics checks passed")
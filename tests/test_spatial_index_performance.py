@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+test_spatial_index_performance.py - Scaling of the math_services spatial index
+
+1. Radius / k-nearest results match brute-force haversine
+2. Grid fallback agrees with the KD-tree
+3. Clustering time grows sub-quadratically (tens of thousands of venues)
+4. The geometric service reports cluster, nearest and radius results as
+   positions in the caller's data, skipping entries without coordinates
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_services.spatial_index import SpatialIndex, haversine_km, HAS_SCIPY
+
+
+def _socal_venues(n, seed=7):
+    """Venue-like coordinates: dense metro hotspots plus scattered points"""
+    rng = np.random.default_rng(seed)
+    hubs = np.array([[34.05, -118.25], [33.75, -117.87], [32.72, -117.16], [34.11, -117.29]])
+    hub_ids = rng.integers(0, len(hubs), n)
+    points = hubs[hub_ids] + rng.normal(scale=0.15, size=(n, 2))
+    scattered = rng.random(n) < 0.1
+    points[scattered] = np.column_stack((rng.uniform(32.5, 35.0, scattered.sum()),
+                                         rng.uniform(-119.5, -116.0, scattered.sum())))
+    return points
+
+
+def test_queries_match_brute_force():
+    points = _socal_venues(3000)
+    center = (34.0, -118.0)
+    brute = haversine_km(center[0], center[1], points[:, 0], points[:, 1])
+
+    backends = ['grid'] + (['kdtree'] if HAS_SCIPY else [])
+    for backend in backends:
+        index = SpatialIndex(points, metric='haversine', backend=backend)
+
+        idx, dist = index.within(center, 25.0)
+        assert set(idx.tolist()) == set(np.flatnonzero(brute <= 25.0).tolist())
+        assert np.allclose(dist, brute[idx], atol=1e-6)
+
+        idx, dist = index.nearest(center, 10)
+        assert np.allclose(dist, np.sort(brute)[:10], atol=1e-6)
+
+
+def test_grid_and_kdtree_clusters_agree():
+    if not HAS_SCIPY:
+        print("⚠️ scipy not installed - grid only")
+        return
+    points = _socal_venues(4000)
+    grid = SpatialIndex(points, backend='grid').cluster(2.0, min_samples=3)
+    tree = SpatialIndex(points, backend='kdtree').cluster(2.0, min_samples=3)
+    assert np.array_equal(grid >= 0, tree >= 0)
+    assert len(set(grid.tolist())) == len(set(tree.tolist()))
+
+
+def test_clustering_scales_subquadratically():
+    sizes = [5000, 10000, 20000, 40000]
+    timings = []
+    for n in sizes:
+        points = _socal_venues(n)
+        start = time.perf_counter()
+        index = SpatialIndex(points, metric='haversine')
+        labels = index.cluster(0.5, min_samples=2)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        print(f"📍 {n:>6} venues: {elapsed * 1000:8.1f}ms, "
+              f"{labels.max() + 1} clusters ({index.backend})")
+
+    # Doubling n should cost well under 4x (quadratic) on average
+    ratios = [b / a for a, b in zip(timings, timings[1:]) if a > 0]
+    assert sum(ratios) / len(ratios) < 3.0, ratios
+
+
+class _Venue:
+    def __init__(self, lat, lng):
+        self.lat, self.lng = lat, lng
+
+
+def test_service_results_use_caller_positions():
+    from math_services.geometric_math import GeometricMathService
+
+    service = GeometricMathService()
+    venues = [_Venue(None, None), _Venue(34.05, -118.25), _Venue(None, -117.0),
+              _Venue(34.051, -118.251), _Venue(32.72, -117.16)]
+    result = service.ask("spatial cluster", venues, threshold=1.0, metric='haversine', min_samples=2)
+    assert result['clusters'] == [[1, 3]] and result['noise'] == [4]
+
+    nearest = service.ask("nearest", venues, reference=(32.7, -117.1), count=1)['nearest']
+    assert [n['index'] for n in nearest] == [4] and nearest[0]['point'] is venues[4]
+    assert [n['index'] for n in service.ask("within", venues, center=(34.05, -118.25), radius=1.0)] == [1, 3]
+
+
+if __name__ == "__main__":
+    test_queries_match_brute_force()
+    test_grid_and_kdtree_clusters_agree()
+    test_clustering_scales_subquadratically()
+    test_service_results_use_caller_positions()
+    print("✅ Spatial index checks passed")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+test_sqlite_concurrency.py - WAL connection profile and read-only snapshot sessions
+
+1. The main engine runs with WAL, synchronous=NORMAL, mmap, cache size and
+   busy_timeout; the read engine is query_only
+2. A read session sees one snapshot for its whole life
+3. Stress: two threads stream long analytics reads while a sync writer
+   commits small transactions. With the old plain engine every commit waits
+   for the readers; with the profile and read sessions writers never wait
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isolated_database import bind_database, isolated, run_tests
+
+OWNS_DATABASE = bind_database('tt-concurrency-', 'profile.db')
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from utils.database import engine, read_engine, session_scope, read_session_scope
+
+ROWS = 50000
+STRESS_SECONDS = 2.0
+
+
+def _fill(bind):
+    with bind.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS samples")
+        conn.exec_driver_sql("CREATE TABLE samples (id INTEGER PRIMARY KEY, value TEXT)")
+        conn.exec_driver_sql("INSERT INTO samples (value) "
+                             f"WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {ROWS}) "
+                             "SELECT printf('%050d', i) FROM n")
+
+
+def _stress(write_scope, read_scope):
+    """Writes committed, worst commit latency and lock errors while readers stream"""
+    stop = time.perf_counter() + STRESS_SECONDS
+
+    def reader():
+        while time.perf_counter() < stop:
+            with read_scope() as session:
+                for i, _ in enumerate(session.execute(text("SELECT id, value FROM samples"))):
+                    if i % 2000 == 0:
+                        time.sleep(0.02)  # a slow report consuming rows
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    latencies, errors = [], 0
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        try:
+            with write_scope() as session:
+                session.execute(text("INSERT INTO samples (value) VALUES ('sync')"))
+        except OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    return len(latencies) - errors, max(latencies), errors
+
+
+@isolated(OWNS_DATABASE)
+def test_connection_profile():
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() >= 5000
+        assert conn.exec_driver_sql("PRAGMA mmap_size").scalar() > 0
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 0
+    assert read_engine is not engine
+    with read_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+
+    _fill(engine)
+    try:
+        with read_session_scope() as session:
+            session.execute(text("DELETE FROM samples"))
+        raise AssertionError("read session wrote to the database")
+    except OperationalError:
+        pass
+
+
+@isolated(OWNS_DATABASE)
+def test_read_session_is_a_snapshot():
+    _fill(engine)
+    with read_session_scope() as session:
+        before = session.execute(text("SELECT count(*) FROM samples")).scalar()
+        with session_scope() as writer:
+            writer.execute(text("INSERT INTO samples (value) VALUES ('late')"))
+        assert session.execute(text("SELECT count(*) FROM samples")).scalar() == before
+    with read_session_scope() as session:
+        assert session.execute(text("SELECT count(*) FROM samples")).scalar() == before + 1
+
+
+@isolated(OWNS_DATABASE)
+def test_writers_not_blocked_by_long_reads():
+    # The old setup: one plain engine, reads and writes on the same sessions
+    plain_db = os.path.join(tempfile.mkdtemp(prefix='tt-concurrency-'), 'plain.db')
+    plain = create_engine(f"sqlite:///{plain_db}", pool_pre_ping=True, pool_recycle=3600)
+    _fill(plain)
+    plain_sessions = sessionmaker(bind=plain)
+
+    @contextmanager
+    def plain_scope():
+        session = plain_sessions()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    _fill(engine)
+    old_writes, old_worst, old_errors = _stress(plain_scope, plain_scope)
+    new_writes, new_worst, new_errors = _stress(session_scope, read_session_scope)
+    print(f"🗄️ {STRESS_SECONDS:.0f}s under 2 streaming readers: plain engine {old_writes} commits "
+          f"(worst {old_worst * 1000:.0f}ms, {old_errors} locked), WAL profile {new_writes} commits "
+          f"(worst {new_worst * 1000:.0f}ms, {new_errors} locked)")
+    assert new_errors == 0
+    assert new_writes > 5 * max(old_writes, 1)
+    assert new_worst * 5 < old_worst
+    plain.dispose()
+
+
+if __name__ == "__main__":
+    run_tests([test_connection_profile, test_read_session_is_a_snapshot, test_writers_not_blocked_by_long_reads])
+    print("✅ SQLite concurrency checks passed")
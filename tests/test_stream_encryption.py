@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+test_stream_encryption.py - Chunked authenticated file encryption
+
+1. Round trips at awkward sizes (empty, exact chunk multiples) with both
+   algorithms, serial and on a thread pool
+2. Flipped bits, reordered, dropped, truncated or appended chunks, an
+   edited header and the wrong key are all rejected, leaving no output
+3. Existing whole-file Fernet .encrypted files still decrypt
+4. Benchmark: a 64 MB backup through Fernet (whole file) vs chunked
+   AES-GCM, serial and parallel, with peak memory
+"""
+
+import io
+import os
+import sys
+import time
+import base64
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('BYPASS_EXECUTION_GUARD', 'true')
+
+from cryptography.fernet import Fernet
+
+from utils.stream_encryption import HEADER, TAG_SIZE, StreamCipher, StreamIntegrityError
+
+KEY = base64.urlsafe_b64decode(Fernet.generate_key())
+CHUNK = 4096
+
+
+def _encrypt(data, **options):
+    out = io.BytesIO()
+    StreamCipher(KEY, chunk_size=CHUNK, **options).encrypt(io.BytesIO(data), out)
+    return out.getvalue()
+
+
+def _decrypt(blob, key=KEY, **options):
+    out = io.BytesIO()
+    StreamCipher(key, chunk_size=CHUNK, **options).decrypt(io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+def _rejected(blob, key=KEY):
+    try:
+        _decrypt(blob, key)
+    except StreamIntegrityError:
+        return True
+    return False
+
+
+def test_round_trips():
+    for algorithm in ('aes-256-gcm', 'chacha20-poly1305'):
+        for size in (0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 3 * CHUNK, 10 * CHUNK + 17):
+            data = os.urandom(size)
+            for workers in (1, 4):
+                blob = _encrypt(data, algorithm=algorithm, workers=workers)
+                # Every chunk but the last is full; the last is short (just a tag if empty)
+                assert len(blob) == HEADER.size + size + (size // CHUNK + 1) * TAG_SIZE
+                assert _decrypt(blob, workers=workers) == data
+                assert _decrypt(blob, workers=5 - workers) == data
+    # Same plaintext, fresh salt: unrelated ciphertexts
+    assert _encrypt(b'backup') != _encrypt(b'backup')
+
+
+def test_tampering_rejected():
+    data = os.urandom(5 * CHUNK + 100)
+    blob = _encrypt(data)
+    sealed = CHUNK + TAG_SIZE
+    header, body = blob[:HEADER.size], blob[HEADER.size:]
+    chunks = [body[i:i + sealed] for i in range(0, len(body), sealed)]
+    assert len(chunks) == 6
+
+    flipped = bytearray(blob)
+    flipped[HEADER.size + 2 * sealed + 10] ^= 1
+    assert _rejected(bytes(flipped))
+    assert _rejected(header + chunks[1] + chunks[0] + b''.join(chunks[2:]))   # reordered
+    assert _rejected(header + b''.join(chunks[:2] + chunks[3:]))              # chunk dropped
+    assert _rejected(header + b''.join(chunks[:-1]))                          # cut at a chunk boundary
+    assert _rejected(blob[:-5])                                               # cut mid-chunk
+    assert _rejected(blob + b'extra')                                         # appended
+    assert _rejected(header[:-1] + bytes([header[-1] ^ 1]) + body)            # salt edited
+    assert _rejected(header[:4] + b'\x01\x02' + header[6:] + body)            # algorithm swapped
+    assert _rejected(blob, key=os.urandom(32))
+    assert _rejected(b'not encrypted at all')
+
+    # A failed file decrypt leaves nothing behind
+    directory = tempfile.mkdtemp(prefix='tt-crypt-')
+    source = os.path.join(directory, 'backup.db.encrypted')
+    with open(source, 'wb') as f:
+        f.write(blob[:-5])
+    try:
+        StreamCipher(KEY, chunk_size=CHUNK).decrypt_file(source, os.path.join(directory, 'backup.db'))
+        raise AssertionError("truncated file decrypted")
+    except StreamIntegrityError:
+        pass
+    assert os.listdir(directory) == ['backup.db.encrypted']
+
+
+def test_legacy_fernet_files():
+    directory = tempfile.mkdtemp(prefix='tt-crypt-')
+    fernet = Fernet(base64.urlsafe_b64encode(KEY))
+    cipher = StreamCipher(KEY, chunk_size=CHUNK)
+    data = os.urandom(3 * CHUNK)
+    legacy, chunked = os.path.join(directory, 'old.encrypted'), os.path.join(directory, 'new.encrypted')
+    with open(legacy, 'wb') as f:
+        f.write(fernet.encrypt(data))
+    with open(os.path.join(directory, 'new'), 'wb') as f:
+        f.write(data)
+    cipher.encrypt_file(os.path.join(directory, 'new'), chunked)
+
+    assert cipher.decrypt_file(legacy, os.path.join(directory, 'old'), legacy_decrypt=fernet.decrypt) is False
+    assert cipher.decrypt_file(chunked, os.path.join(directory, 'new.out'), legacy_decrypt=fernet.decrypt) is True
+    for name in ('old', 'new.out'):
+        with open(os.path.join(directory, name), 'rb') as f:
+            assert f.read() == data
+    try:
+        cipher.decrypt_file(legacy, os.path.join(directory, 'old2'))
+        raise AssertionError("legacy file accepted without a legacy decryptor")
+    except StreamIntegrityError:
+        pass
+
+
+def _timed(run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def test_backup_benchmark():
+    size = 64 * 1024 * 1024
+    directory = tempfile.mkdtemp(prefix='tt-crypt-')
+    path = os.path.join(directory, 'tournament_tracker.db')
+    with open(path, 'wb') as f:
+        for _ in range(size // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+    fernet = Fernet(base64.urlsafe_b64encode(KEY))
+
+    def whole_file():
+        with open(path, 'rb') as f:
+            token = fernet.encrypt(f.read())
+        with open(path + '.fernet', 'wb') as f:
+            f.write(token)
+
+    results = {'Fernet, whole file': _timed(whole_file)}
+    for workers in (1, 4):
+        cipher = StreamCipher(KEY, workers=workers)
+        results[f"AES-GCM chunks, {workers} worker(s)"] = _timed(lambda: cipher.encrypt_file(path))
+        restored = os.path.join(directory, 'restored.db')
+        elapsed, peak = _timed(lambda: cipher.decrypt_file(path + '.encrypted', restored))
+        results[f"AES-GCM chunks, {workers} worker(s), decrypt"] = (elapsed, peak)
+        assert os.path.getsize(restored) == size
+
+    for label, (elapsed, peak) in results.items():
+        print(f"🔐 {size >> 20} MB backup, {label}: {size / elapsed / 1e6:.0f} MB/s, peak {peak / 1e6:.1f} MB")
+    whole_peak = results['Fernet, whole file'][1]
+    assert whole_peak > size
+    for label, (_, peak) in results.items():
+        if label.startswith('AES-GCM'):
+            assert peak * 5 < whole_peak, label  # a few chunks in flight, whatever the file size
+
+
+if __name__ == "__main__":
+    test_round_trips()
+    test_tampering_rejected()
+    test_legacy_fernet_files()
+    test_backup_benchmark()
+    print("✅ Stream encryption checks passed")
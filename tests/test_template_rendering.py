@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+test_template_rendering.py - Compiled Jinja2 layouts for HTMLRenderer and publish HTML
+
+1. HTMLRenderer pages come out the same through templates as through the
+   string builders (escaping, table ids, stats cards, theme CSS)
+2. Each theme's stylesheet is rendered once and reused
+3. Publish pages render from templates, and editing a template changes
+   the fingerprint the incremental build hashes
+4. Benchmark: a 10k-row rankings page with the string builders, the
+   compiled template and the streamed template
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('BYPASS_EXECUTION_GUARD', 'true')
+os.environ.setdefault('TEMPLATE_CACHE_DIR', tempfile.mkdtemp(prefix='tt-templates-'))
+
+from utils.template_engine import TEMPLATE_DIR, TemplateEngine, template_engine
+from utils.html_renderer import HTMLRenderer
+
+ROWS = 10000
+
+
+def _renderer(use_templates):
+    renderer = HTMLRenderer(theme='dark')
+    renderer.use_templates = use_templates
+    return renderer
+
+
+def _page(renderer, rows):
+    return (renderer.start_page("Player Rankings", "Top players")
+            .add_stats_cards([{'title': 'Players', 'value': f"{len(rows):,}", 'subtitle': 'ranked'}])
+            .add_table(['Rank', 'Player', 'Points'], rows, table_id='rankings')
+            .finish_page())
+
+
+def _players(n):
+    return [[i + 1, f"Player <{i}> & co", 1000 - i % 1000] for i in range(n)]
+
+
+def test_templates_match_string_builders():
+    rows = _players(3)
+    templated, legacy = _page(_renderer(True), rows), _page(_renderer(False), rows)
+    for html in (templated, legacy):
+        assert '<title>Player Rankings</title>' in html
+        assert '<table id="rankings">' in html and '<th>Player</th>' in html
+        assert '<td>Player &lt;0&gt; &amp; co</td>' in html
+        assert '<div class="stat-value">3</div>' in html
+        assert '--bg-color: #1a1a2e;' in html and "'Segoe UI'" in html
+    tags = lambda html: re.findall(r'<[^>]+>', html)
+    assert tags(templated) == tags(legacy)
+
+
+def test_styles_rendered_once_per_theme():
+    engine = TemplateEngine()
+    renders = []
+    original = engine.render
+    engine.render = lambda name, **context: renders.append(name) or original(name, **context)
+    themes = HTMLRenderer().themes
+    for _ in range(50):
+        for name in ('dark', 'light'):
+            engine.theme_css(name, themes[name])
+    assert renders == ['theme.css', 'theme.css']
+    assert engine.theme_css('dark', themes['dark']) is engine.theme_css('dark', themes['dark'])
+    assert '#ffffff' in engine.theme_css('light', themes['light'])
+
+
+def test_publish_templates_and_fingerprint():
+    players = [{'name': f"Player {i}", 'points': 100 - i, 'events': 5, 'first_places': 1, 'top_3s': 2,
+                'win_rate': 20.0, 'podium_rate': 40.0} for i in range(60)]
+    organizations = [{'organization': {'display_name': 'Team A & B'}, 'tournament_count': 12,
+                      'total_attendance': 4321, 'average_attendance': 360.08}]
+    html = template_engine.render('publish/tabbed_rankings.html', total_orgs=1, total_players=60,
+                                  organizations=organizations, players=players[:50], timestamp='now')
+    assert '<td>Team A &amp; B</td><td>12</td><td>4,321</td><td>360.1</td>' in html
+    assert html.count('<tr><td>') == 51 and 'showTab' in html
+
+    layouts = tempfile.mkdtemp(prefix='tt-layouts-')
+    shutil.copytree(TEMPLATE_DIR, layouts, dirs_exist_ok=True)
+    engine = TemplateEngine(template_dir=layouts, cache_dir=tempfile.mkdtemp())
+    before = engine.fingerprint('publish/player_rankings.html')
+    assert before == TemplateEngine(template_dir=layouts).fingerprint('publish/player_rankings.html')
+    # An edit to an included table invalidates the page, an unrelated template does not
+    with open(os.path.join(layouts, 'publish', 'org_table.html'), 'a') as f:
+        f.write('\n')
+    assert engine.fingerprint('publish/player_rankings.html') == before
+    with open(os.path.join(layouts, 'publish', 'player_table.html'), 'a') as f:
+        f.write('\n')
+    assert engine.fingerprint('publish/player_rankings.html') != before
+
+
+def _measure(render):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in render():
+        first = first or time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first, peak, size
+
+
+def test_rankings_page_benchmark():
+    rows = _players(ROWS)
+    engine = TemplateEngine(cache_dir=tempfile.mkdtemp(prefix='tt-bytecode-'))
+    start = time.perf_counter()
+    engine.precompile()
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    TemplateEngine(cache_dir=engine.cache_dir).precompile()
+    warm = time.perf_counter() - start
+    assert os.listdir(engine.cache_dir)
+
+    def streamed():
+        renderer = _renderer(True)
+        renderer.start_page("Player Rankings").add_streamed_table(['Rank', 'Player', 'Points'], iter(rows))
+        return renderer.stream_page()
+
+    results = {
+        'string builders': _measure(lambda: [_page(_renderer(False), rows)]),
+        'compiled template': _measure(lambda: [_page(_renderer(True), rows)]),
+        'streamed template': _measure(streamed),
+    }
+    print(f"🧩 Layout compile: cold {cold * 1000:.0f}ms, from bytecode cache {warm * 1000:.0f}ms")
+    for label, (elapsed, first, peak, size) in results.items():
+        print(f"🧩 {ROWS} rows, {label}: {elapsed * 1000:.0f}ms, first bytes after {first * 1000:.1f}ms, "
+              f"peak {peak / 1e6:.1f} MB, {size / 1e6:.1f} MB of HTML")
+
+    streamed_result, whole = results['streamed template'], results['compiled template']
+    assert streamed_result[3] > 0.9 * whole[3]
+    assert streamed_result[2] * 3 < whole[2]   # chunks, not the whole page, are held in memory
+    assert streamed_result[1] * 10 < whole[0]  # first bytes long before a full render finishes
+
+
+if __name__ == "__main__":
+    test_templates_match_string_builders()
+    test_styles_rendered_once_per_theme()
+    test_publish_templates_and_fingerprint()
+    test_rankings_page_benchmark()
+    print("✅ Template rendering checks passed")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+test_tile_store.py - Offline MBTiles basemap store
+
+Serves generated tiles from a local HTTP server and checks that:
+1. Prefetch stores every tile for a bounding box / zoom range, once
+2. Offline mosaics are byte-for-byte reproducible and never hit the network
+3. Missing tiles fall back to the plain background colour
+4. Mercator rows are resampled onto an even latitude spacing
+"""
+
+import io
+import os
+import sys
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tile_store import (MBTilesStore, PLAIN_BACKGROUND, SOCAL_BOUNDS, lnglat_to_pixel,
+                              parse_prefetch_spec, tiles_for_bounds)
+
+
+def _tile_png(zoom, x, y):
+    """Solid tile whose colour encodes its coordinates"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (256, 256), (zoom * 20, x % 256, y % 256)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    def __init__(self, requests, *args, **kwargs):
+        self.requests = requests
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        z, x, y = (int(p) for p in self.path[:-len('.png')].strip('/').split('/'))
+        self.requests.append((z, x, y))
+        body = _tile_png(z, x, y)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_tiles():
+    requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_TileHandler, requests))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/{{z}}/{{x}}/{{y}}.png'
+    return server, url, requests
+
+
+def test_prefetch_is_complete_and_idempotent():
+    server, url, requests = _serve_tiles()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = MBTilesStore(os.path.join(tmpdir, 'basemap.mbtiles'), url=url)
+            expected = sum(len(list(tiles_for_bounds(SOCAL_BOUNDS, z))) for z in (8, 9, 10))
+            result = store.prefetch(SOCAL_BOUNDS, (8, 10))
+            assert result['fetched'] == expected and result['failed'] == 0
+            assert store.count() == expected
+
+            again = store.prefetch(SOCAL_BOUNDS, (8, 10))
+            assert again['fetched'] == 0 and again['present'] == expected
+            assert len(requests) == expected
+            print(f"🗺️ Prefetched {expected} tiles for SoCal z8-10")
+            store.close()
+    finally:
+        server.shutdown()
+
+
+def test_offline_mosaic_is_reproducible():
+    server, url, requests = _serve_tiles()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'basemap.mbtiles')
+            MBTilesStore(path, url=url).prefetch(SOCAL_BOUNDS, (9, 9))
+            seen = len(requests)
+
+            offline = MBTilesStore(path, url=url, offline=True)
+            first, drawn, missing = offline.mosaic(SOCAL_BOUNDS, 9)
+            second, _, _ = offline.mosaic(SOCAL_BOUNDS, 9)
+            assert missing == 0 and drawn > 0
+            assert np.array_equal(first, second)
+            assert len(requests) == seen
+
+            # Zoom 10 was never fetched: plain background, still no network
+            image, drawn, missing = offline.mosaic(SOCAL_BOUNDS, 10)
+            assert drawn == 0 and missing > 0
+            assert (image == np.array(PLAIN_BACKGROUND, dtype=np.uint8)).all()
+            assert len(requests) == seen
+    finally:
+        server.shutdown()
+
+
+def test_rows_follow_latitude():
+    server, url, _ = _serve_tiles()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = MBTilesStore(os.path.join(tmpdir, 'basemap.mbtiles'), url=url)
+            west, south, east, north = SOCAL_BOUNDS
+            image, _, _ = store.mosaic(SOCAL_BOUNDS, 8)
+            height = image.shape[0]
+            for lat in (33.0, 33.5, 34.2):
+                row = int((north - lat) / (north - south) * height)
+                _, py = lnglat_to_pixel(-117.5, lat, 8)
+                assert image[row, image.shape[1] // 2, 2] == int(py // 256) % 256
+    finally:
+        server.shutdown()
+
+
+def test_parse_prefetch_spec():
+    assert parse_prefetch_spec(None) == (SOCAL_BOUNDS, (8, 11))
+    assert parse_prefetch_spec('socal:9-12') == (SOCAL_BOUNDS, (9, 12))
+    assert parse_prefetch_spec('10-12') == (SOCAL_BOUNDS, (10, 12))
+    assert parse_prefetch_spec('-118.5,33.5,-117.5,34.2:11') == ((-118.5, 33.5, -117.5, 34.2), (11, 11))
+
+
+if __name__ == "__main__":
+    test_prefetch_is_complete_and_idempotent()
+    test_offline_mosaic_is_reproducible()
+    test_rows_follow_latitude()
+    test_parse_prefetch_spec()
+    print("✅ Tile store checks passed")
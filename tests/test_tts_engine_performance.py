@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+test_tts_engine_performance.py - Time-to-first-byte benchmark for the TTS engine
+
+Compares:
+1. Buffered synthesis (old behaviour: wait for the whole utterance)
+2. Streaming synthesis through the worker pool (first chunk ASAP)
+3. Phrase cache hits (no synthesis at all)
+
+Uses a simulated backend so it runs without espeak installed.
+"""
+
+import sys
+import os
+import time
+import tempfile
+from statistics import mean
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polymorphic_core.audio.tts_engine import (
+    TTSEngine, TTSPhraseCache, SynthesisWorkerPool, wav_header
+)
+
+
+class SimulatedBackend:
+    """Emits 10 x 4KB PCM chunks, 20ms apart (roughly espeak's pacing)"""
+
+    name = 'simulated'
+    sample_rate = 22050
+
+    def synthesize(self, text, params, emit):
+        for _ in range(10):
+            time.sleep(0.02)
+            emit(b'\x00\x01' * 2048)
+
+
+class HeaderRateBackend(SimulatedBackend):
+    """Learns its rate mid-synthesis, like the espeak CLI reading its WAV header"""
+
+    def synthesize(self, text, params, emit):
+        self.sample_rate = 16000
+        emit(b'\x00\x01' * 2048)
+
+
+def _engine(tmpdir, max_bytes=1024 * 1024, backend=SimulatedBackend):
+    return TTSEngine(
+        cache=TTSPhraseCache(tmpdir, max_bytes),
+        pool=SynthesisWorkerPool(workers=2, backend_factory=backend)
+    )
+
+
+def test_streaming_ttfb_beats_buffered():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir)
+        try:
+            stream = [engine.time_to_first_byte(f"phrase {i}") for i in range(5)]
+            buffered = []
+            for i in range(5):
+                start = time.perf_counter()
+                engine.synthesize(f"buffered {i}", fmt='pcm')
+                buffered.append((time.perf_counter() - start) * 1000)
+
+            stream_ttfb = mean(r['ttfb_ms'] for r in stream)
+            print(f"⚡ Streaming TTFB: {stream_ttfb:.1f}ms, buffered: {mean(buffered):.1f}ms")
+            assert stream_ttfb < mean(buffered) / 2
+        finally:
+            engine.shutdown()
+
+
+def test_cache_hit_skips_synthesis():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir)
+        try:
+            first = engine.synthesize("Tournament tracker ready!", fmt='pcm')
+            synthesized = engine.pool.completed
+            hit = engine.time_to_first_byte("Tournament tracker ready!")
+            print(f"💾 Cache hit TTFB: {hit['ttfb_ms']:.2f}ms")
+
+            assert engine.pool.completed == synthesized
+            assert hit['bytes'] == len(first)
+            assert engine.cache.stats()['hits'] >= 1
+        finally:
+            engine.shutdown()
+
+
+def test_cache_lru_by_bytes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = TTSPhraseCache(tmpdir, max_bytes=100)
+        cache.put('a' * 64, b'x' * 40)
+        cache.put('b' * 64, b'x' * 40)
+        cache.get('a' * 64)               # a is now most recent
+        cache.put('c' * 64, b'x' * 40)    # evicts b
+
+        assert cache.get('a' * 64) is not None
+        assert cache.get('b' * 64) is None
+        assert cache.stats()['bytes'] <= 100
+
+        # Index survives a restart
+        reopened = TTSPhraseCache(tmpdir, max_bytes=100)
+        assert reopened.stats()['entries'] == 2
+
+
+def test_wav_output_has_exact_sizes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir)
+        try:
+            audio = engine.synthesize("Top 8 results", fmt='wav')
+            pcm_size = len(audio) - 44
+            assert audio[:44] == wav_header(pcm_size, 22050)
+        finally:
+            engine.shutdown()
+
+
+def test_wav_header_uses_backend_rate():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir, backend=HeaderRateBackend)
+        try:
+            streamed = b''.join(engine.stream("Grand finals", fmt='wav'))
+            assert streamed[:44] == wav_header(0xFFFFFFFF, 16000)
+            audio = engine.synthesize("Grand finals", fmt='wav')  # cache hit
+            assert audio[:44] == wav_header(len(audio) - 44, 16000)
+        finally:
+            engine.shutdown()
+
+
+if __name__ == "__main__":
+    test_streaming_ttfb_beats_buffered()
+    test_cache_hit_skips_synthesis()
+    test_cache_lru_by_bytes()
+    test_wav_output_has_exact_sizes()
+    test_wav_header_uses_backend_rate()
+    print("✅ TTS engine benchmarks passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+test_venue_network.py - Sparse venue co-occurrence vs the per-player pair walk
+
+1. Heat points, lines (order and orientation) and markers match the old walk
+   exactly, including shared gamer tags and repeat visits to one venue
+2. The sparse build is much faster than the O(players x venues^2) walk
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tournament_domain.analytics.venue_network import build_venue_network
+
+
+def _reference_walk(rows):
+    """The original generate_community_network_heatmap loop over the same rows"""
+    by_player = defaultdict(list)
+    tags = {}
+    for player_id, tag, venue, lat, lng in rows:
+        by_player[player_id].append((venue, (lat, lng)))
+        tags[player_id] = tag
+
+    venue_connections = defaultdict(lambda: defaultdict(set))
+    venue_locations = {}
+    for player_id, placements in by_player.items():
+        player_venues = []
+        for venue, coords in placements:
+            venue_locations[venue] = coords
+            player_venues.append(venue)
+        for i in range(len(player_venues)):
+            for j in range(i + 1, len(player_venues)):
+                v1, v2 = player_venues[i], player_venues[j]
+                venue_connections[v1][v2].add(tags[player_id])
+                venue_connections[v2][v1].add(tags[player_id])
+
+    heat_points = []
+    for venue, coords in venue_locations.items():
+        weight = len(venue_connections[venue])
+        if weight > 0:
+            heat_points.append([coords[0], coords[1], weight])
+
+    edges = []
+    drawn = set()
+    for v1, connections in venue_connections.items():
+        if v1 in venue_locations:
+            for v2, players in connections.items():
+                if v2 in venue_locations and len(players) >= 5:
+                    key = tuple(sorted([v1, v2]))
+                    if key not in drawn:
+                        drawn.add(key)
+                        edges.append((v1, v2, len(players)))
+
+    hubs = [(venue, len(venue_connections[venue])) for venue in venue_locations
+            if len(venue_connections[venue]) >= 3]
+    return heat_points, edges, hubs
+
+
+def _placements(n_players, n_venues, seed=3, max_events=12):
+    """Rows ordered by player then placement; popular venues, repeat visits, some duplicate tags"""
+    rng = np.random.default_rng(seed)
+    popularity = rng.pareto(1.2, n_venues) + 0.05
+    popularity /= popularity.sum()
+    coords = np.column_stack((rng.uniform(32.6, 34.4, n_venues), rng.uniform(-118.9, -116.2, n_venues)))
+    rows = []
+    for player_id in range(1, n_players + 1):
+        tag = f"player{player_id}" if rng.random() > 0.05 else f"dupe{rng.integers(0, 20)}"
+        for venue in rng.choice(n_venues, size=rng.integers(1, max_events), p=popularity):
+            # Venues occasionally move (last location written wins)
+            lat, lng = coords[venue] + (0.01 if rng.random() < 0.02 else 0.0)
+            rows.append((player_id, tag, f"Venue {venue}", float(lat), float(lng)))
+    return rows
+
+
+def test_matches_reference_walk():
+    for seed in range(4):
+        rows = _placements(600, 40, seed=seed)
+        heat_points, edges, hubs = _reference_walk(rows)
+        network = build_venue_network(rows)
+        assert network['heat_points'] == heat_points
+        assert network['edges'] == edges
+        assert network['hubs'] == hubs
+        assert any(v1 == v2 for v1, v2, _ in edges)  # self-links from repeat visits are kept
+    assert build_venue_network([])['edges'] == []
+
+
+def test_sparse_build_is_faster():
+    rows = _placements(20000, 300, max_events=30)
+    start = time.perf_counter()
+    expected = _reference_walk(rows)
+    walk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    network = build_venue_network(rows)
+    sparse_time = time.perf_counter() - start
+
+    assert (network['heat_points'], network['edges'], network['hubs']) == expected
+    print(f"🕸️ {len(rows)} placements: pair walk {walk:.2f}s, sparse {sparse_time:.2f}s, "
+          f"{len(network['edges'])} lines")
+    assert sparse_time < walk
+
+
+if __name__ == "__main__":
+    test_matches_reference_walk()
+    test_sparse_build_is_faster()
+    print("✅ Venue network checks passed")
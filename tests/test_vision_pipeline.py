@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+test_vision_pipeline.py - Decode-once / content-hash caching for computer vision
+
+Checks that:
+1. An image is decoded once no matter how many find_* steps run on it
+2. Contour and OCR results are cached by content hash (copies hit the cache)
+   and handed out as copies callers may mutate
+3. ROI crops map OCR coordinates back to the full image
+4. Batch analysis over a process pool matches single-image analysis
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vision_pipeline import VisionPipeline
+
+
+def _draw_form(path):
+    """Login form: an email label, an input field and a Continue button"""
+    img = np.full((600, 900, 3), 255, dtype=np.uint8)
+    cv2.putText(img, 'Email', (200, 185), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+    cv2.rectangle(img, (200, 200), (600, 235), (0, 0, 0), 2)
+    cv2.rectangle(img, (200, 300), (400, 360), (40, 40, 40), -1)
+    cv2.putText(img, 'Continue', (225, 340), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    cv2.imwrite(path, img)
+
+
+def _has_tesseract():
+    return shutil.which('tesseract') is not None
+
+
+def test_decode_once_and_contour_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'form.png')
+        _draw_form(path)
+        pipeline = VisionPipeline(ocr_available=False)
+
+        for _ in range(5):
+            decoded = pipeline.load(path)
+            pipeline.buttons(decoded)
+            pipeline.input_fields(decoded)
+            pipeline.elements(decoded)
+
+        assert pipeline.stats['decodes'] == 1
+        assert pipeline.input_fields(decoded)['count'] >= 1
+        assert pipeline.buttons(decoded)['count'] >= 1
+
+        # Callers get copies: mutating a result leaves the cache alone
+        fields = pipeline.input_fields(decoded)
+        fields['inputs'][0]['center'] = None
+        fields['inputs'].clear()
+        assert pipeline.input_fields(decoded)['inputs'][0]['center'] is not None
+
+        # Same content under another name: decoded again, but analysis is a cache hit
+        copy_path = os.path.join(tmpdir, 'copy.png')
+        shutil.copy(path, copy_path)
+        misses = pipeline.stats['result_misses']
+        pipeline.buttons(pipeline.load(copy_path))
+        assert pipeline.stats['decodes'] == 2
+        assert pipeline.stats['result_misses'] == misses
+
+
+def test_ocr_cache_and_roi():
+    if not _has_tesseract():
+        print("⚠️ tesseract not installed - skipping OCR checks")
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'form.png')
+        _draw_form(path)
+        pipeline = VisionPipeline(ocr_available=True)
+        decoded = pipeline.load(path)
+
+        start = time.perf_counter()
+        full = pipeline.ocr(decoded)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        pipeline.ocr(decoded)
+        cached = time.perf_counter() - start
+        print(f"🔍 OCR: first {first * 1000:.1f}ms, cached {cached * 1000:.3f}ms")
+        assert pipeline.stats['ocr_runs'] == 1
+
+        roi = pipeline.roi_around(decoded, [b['bbox'] for b in pipeline.buttons(decoded)['buttons']])
+        cropped = pipeline.ocr(decoded, roi=roi)
+        words = {e['text'].lower(): e for e in cropped['text_elements']}
+        full_words = {e['text'].lower(): e for e in full['text_elements']}
+        if 'continue' in words and 'continue' in full_words:
+            dx = abs(words['continue']['center'][0] - full_words['continue']['center'][0])
+            dy = abs(words['continue']['center'][1] - full_words['continue']['center'][1])
+            assert dx <= 3 and dy <= 3
+
+
+def test_batch_matches_single():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(4):
+            path = os.path.join(tmpdir, f'form_{i}.png')
+            _draw_form(path)
+            paths.append(path)
+
+        pipeline = VisionPipeline(ocr_available=False)
+        batch = pipeline.analyze_batch(paths, analysis='buttons', workers=2)
+        single = VisionPipeline(ocr_available=False)
+        expected = single.buttons(single.load(paths[0]))
+
+        assert set(batch) == set(paths)
+        assert all(r['count'] == expected['count'] for r in batch.values())
+
+
+if __name__ == "__main__":
+    test_decode_once_and_contour_cache()
+    test_ocr_cache_and_roi()
+    test_batch_matches_single()
+    print("✅ Vision pipeline checks passed")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+test_webdav_database_browser.py - Member lookup, paging and caching headers
+
+1. <model>_<key> folders resolve by primary key or slug column
+   (tournaments: short_slug, players: startgg_id), as do files inside them
+2. Tables larger than PAGE_SIZE list as page_NNNN sub-collections
+3. get_member_list builds a directory from one query
+4. Object folders and files carry ETag/Last-Modified that follow the row
+5. The short_slug index exists on fresh databases and the alembic revision
+   adds/drops it on old ones
+"""
+
+import os
+import sys
+import importlib.util
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isolated_database import bind_database, isolated, run_tests
+
+OWNS_DATABASE = bind_database('tt-webdav-', 'webdav.db')
+os.environ['WEBDAV_PAGE_SIZE'] = '5'
+
+from sqlalchemy import create_engine, event, inspect
+
+from utils.database import engine, read_engine, session_scope
+from database.tournament_models import Base, Tournament, Player, Organization
+from services.webdav_database_browser import (PAGE_SIZE, DatabaseCollection, DatabaseDAVProvider,
+                                              DatabaseResource, ObjectCollection)
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'alembic', 'versions', 'f3a9c61d8e52_add_tournament_short_slug_index.py')
+
+TOURNAMENTS = 12
+UPDATED = datetime(2026, 3, 14, 18, 30)
+
+
+def _seed():
+    Base.metadata.create_all(engine)
+    with session_scope() as session:
+        for n in range(1, TOURNAMENTS + 1):
+            session.add(Tournament(id=str(1000 + n), name=f"Weekly #{n}", short_slug=f"weekly-{n}",
+                                   num_attendees=10 + n, updated_at=UPDATED))
+        for n in range(1, 4):
+            session.add(Player(id=n, startgg_id=f"sg{n}", gamer_tag=f"Tag{n}", updated_at=UPDATED))
+            session.add(Organization(id=n, display_name=f"Org {n}", updated_at=UPDATED))
+
+
+if OWNS_DATABASE:
+    _seed()
+
+PROVIDER = DatabaseDAVProvider()
+ENVIRON = {'wsgidav.provider': PROVIDER}
+
+
+def _get(path):
+    return PROVIDER.get_resource_inst(path, ENVIRON)
+
+
+class _QueryCounter:
+    """Counts SELECTs on both engines while active"""
+
+    def __enter__(self):
+        self.count = 0
+        for bind in {engine, read_engine}:
+            event.listen(bind, 'before_cursor_execute', self._seen)
+        return self
+
+    def __exit__(self, *exc):
+        for bind in {engine, read_engine}:
+            event.remove(bind, 'before_cursor_execute', self._seen)
+
+    def _seen(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.count += 1
+
+
+@isolated(OWNS_DATABASE)
+def test_member_resolution():
+    assert PAGE_SIZE == 5
+    by_id = _get('/tournaments/tournament_1003/')
+    by_slug = _get('/tournaments/tournament_weekly-3/')
+    assert isinstance(by_id, ObjectCollection) and isinstance(by_slug, ObjectCollection)
+    assert by_id.db_object.id == by_slug.db_object.id == '1003'
+
+    assert _get('/players/player_2/').db_object.gamer_tag == 'Tag2'
+    assert _get('/players/player_sg3/').db_object.gamer_tag == 'Tag3'
+    assert _get('/organizations/organization_1/').db_object.display_name == 'Org 1'
+
+    # One indexed lookup resolves a folder
+    with _QueryCounter() as queries:
+        assert _get('/tournaments/tournament_weekly-7/').db_object.id == '1007'
+    assert queries.count <= 2  # primary key miss, then short_slug
+
+    for missing in ('/tournaments/tournament_nope/', '/players/player_sg9/', '/organizations/organization_x/',
+                    '/tournaments/player_1/', '/tournaments/tournament_1003/missing.txt'):
+        assert _get(missing) is None, missing
+
+    # Files resolve under every model, paged paths included
+    data = _get('/tournaments/tournament_weekly-3/data.json')
+    assert isinstance(data, DatabaseResource) and data.get_content_length() > 0
+    assert isinstance(_get('/players/player_sg1/stats.html'), DatabaseResource)
+    assert isinstance(_get('/organizations/organization_2/summary.txt'), DatabaseResource)
+    assert _get('/tournaments/page_0002/tournament_1007/').db_object.id == '1007'
+
+
+@isolated(OWNS_DATABASE)
+def test_paging():
+    tournaments = _get('/tournaments/')
+    assert isinstance(tournaments, DatabaseCollection)
+    assert tournaments.get_member_names() == ['page_0001', 'page_0002', 'page_0003']
+
+    first, last = _get('/tournaments/page_0001/'), _get('/tournaments/page_0003/')
+    assert first.get_member_names() == [f"tournament_{1000 + n}" for n in range(1, 6)]
+    assert last.get_member_names() == ['tournament_1011', 'tournament_1012']
+    assert _get('/tournaments/page_0004/') is None and _get('/tournaments/page_0000/') is None
+
+    # Tables within PAGE_SIZE list their rows directly
+    assert _get('/players/').get_member_names() == ['player_1', 'player_2', 'player_3']
+
+
+@isolated(OWNS_DATABASE)
+def test_member_list():
+    page = _get('/tournaments/page_0002/')
+    with _QueryCounter() as queries:
+        members = page.get_member_list()
+    assert queries.count == 1
+    assert [member.name for member in members] == page.get_member_names()
+    assert all(isinstance(member, ObjectCollection) for member in members)
+    assert members[0].path == '/tournaments/page_0002/tournament_1006'
+
+    pages = _get('/tournaments/').get_member_list()
+    assert [member.page for member in pages] == [1, 2, 3]
+    assert [member.name for member in _get('/organizations/').get_member_list()] == \
+        ['organization_1', 'organization_2', 'organization_3']
+
+
+@isolated(OWNS_DATABASE)
+def test_caching_headers():
+    folder = _get('/tournaments/tournament_1004/')
+    data, analytics = folder.get_member('data.json'), folder.get_member('analytics.html')
+    assert folder.support_etag() and data.support_etag()
+    assert folder.get_last_modified() == data.get_last_modified() == UPDATED.timestamp()
+
+    # Stable across requests, distinct per view
+    etags = {folder.get_etag(), data.get_etag(), analytics.get_etag()}
+    assert len(etags) == 3 and None not in etags
+    assert _get('/tournaments/tournament_weekly-4/data.json').get_etag() == data.get_etag()
+    assert _get('/tournaments/tournament_1005/data.json').get_etag() != data.get_etag()
+
+    # A write to the row changes its validators
+    with session_scope() as session:
+        session.get(Tournament, '1004').updated_at = datetime(2026, 4, 1, 9, 0)
+    changed = _get('/tournaments/tournament_1004/data.json')
+    assert changed.get_last_modified() == datetime(2026, 4, 1, 9, 0).timestamp()
+    assert changed.get_etag() != data.get_etag()
+
+
+def test_short_slug_index():
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location('short_slug_index', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    memory = create_engine('sqlite://')
+    Base.metadata.create_all(memory)
+
+    def indexes():
+        return {index['name'] for index in inspect(memory).get_indexes('tournaments')}
+
+    def run(step):
+        with memory.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                step()
+
+    assert migration.INDEX in indexes()  # the model declares it
+    run(migration.upgrade)  # already there: nothing to do
+    run(migration.downgrade)
+    assert migration.INDEX not in indexes()
+    run(migration.upgrade)
+    assert migration.INDEX in indexes()
+
+
+if __name__ == "__main__":
+    run_tests([test_member_resolution, test_paging, test_member_list, test_caching_headers, test_short_slug_index])
+    print("✅ WebDAV database browser checks passed")
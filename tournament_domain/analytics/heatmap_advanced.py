@@ -334,32 +334,13 @@ class AdvancedHeatmapGenerator:
         """
         import folium
         from folium.plugins import HeatMap
-        from collections import defaultdict
+        from tournament_domain.analytics.venue_network import fetch_venue_rows, build_venue_network
         
         logger.info("Generating community network heat map")
         
-        # Build venue connection network
-        venue_connections = defaultdict(lambda: defaultdict(set))
-        venue_locations = {}
-        
-        players = self.session.query(Player).all()
-        
-        for player in players:
-            player_venues = []
-            
-            for placement in player.get_placements():
-                t = placement.tournament
-                if t.venue_name and t.has_location:
-                    venue_key = t.venue_name
-                    venue_locations[venue_key] = t.coordinates
-                    player_venues.append(venue_key)
-            
-            # Connect all venues this player has visited
-            for i in range(len(player_venues)):
-                for j in range(i + 1, len(player_venues)):
-                    v1, v2 = player_venues[i], player_venues[j]
-                    venue_connections[v1][v2].add(player.gamer_tag)
-                    venue_connections[v2][v1].add(player.gamer_tag)
+        # Build venue connection network: one placements query, sparse co-occurrence
+        network = build_venue_network(fetch_venue_rows(self.session))
+        venue_locations = network['locations']
         
         if not venue_locations:
             logger.error("No venue location data found")
@@ -368,51 +349,33 @@ class AdvancedHeatmapGenerator:
         # Create map
         m = folium.Map(location=[33.7, -117.8], zoom_start=9)
         
-        # Add heat map of venue activity
-        heat_points = []
-        for venue, coords in venue_locations.items():
-            # Weight by number of connections
-            weight = len(venue_connections[venue])
-            if weight > 0:
-                heat_points.append([coords[0], coords[1], weight])
-        
-        HeatMap(heat_points,
+        # Add heat map of venue activity (weighted by number of connections)
+        HeatMap(network['heat_points'],
                 name='Venue Activity',
                 min_opacity=0.3,
                 radius=20).add_to(m)
         
         # Add connection lines for strong connections (5+ shared players)
-        drawn_connections = set()
-        for v1, connections in venue_connections.items():
-            if v1 in venue_locations:
-                for v2, players in connections.items():
-                    if v2 in venue_locations and len(players) >= 5:
-                        # Avoid duplicate lines
-                        connection_key = tuple(sorted([v1, v2]))
-                        if connection_key not in drawn_connections:
-                            drawn_connections.add(connection_key)
-                            
-                            # Draw line with width based on connection strength
-                            folium.PolyLine(
-                                [venue_locations[v1], venue_locations[v2]],
-                                color='blue',
-                                weight=min(len(players) / 5, 5),
-                                opacity=0.3,
-                                popup=f"{v1} ↔ {v2}<br>{len(players)} shared players"
-                            ).add_to(m)
-        
-        # Add venue markers
-        for venue, coords in venue_locations.items():
-            connection_count = len(venue_connections[venue])
-            if connection_count >= 3:  # Only show connected venues
-                folium.CircleMarker(
-                    coords,
-                    radius=min(connection_count, 15),
-                    popup=f"<b>{venue}</b><br>Connections: {connection_count}",
-                    color='red',
-                    fill=True,
-                    fillColor='orange'
-                ).add_to(m)
+        for v1, v2, shared_players in network['edges']:
+            # Draw line with width based on connection strength
+            folium.PolyLine(
+                [venue_locations[v1], venue_locations[v2]],
+                color='blue',
+                weight=min(shared_players / 5, 5),
+                opacity=0.3,
+                popup=f"{v1} ↔ {v2}<br>{shared_players} shared players"
+            ).add_to(m)
+        
+        # Add venue markers (only connected venues)
+        for venue, connection_count in network['hubs']:
+            folium.CircleMarker(
+                venue_locations[venue],
+                radius=min(connection_count, 15),
+                popup=f"<b>{venue}</b><br>Connections: {connection_count}",
+                color='red',
+                fill=True,
+                fillColor='orange'
+            ).add_to(m)
         
         # Save
         m.save(output_file)
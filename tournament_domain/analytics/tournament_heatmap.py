@@ -13,6 +13,7 @@ from utils.database_service import database_service
 from models.tournament_models import Tournament
 from log_manager import LogManager
 from polymorphic_core import announcer
+from math_services.density_engine import density_grid
 
 # Initialize logger for this module
 logger = LogManager().get_logger('tournament_heatmap')
@@ -42,11 +43,10 @@ def generate_static_heatmap(output_file='tournament_heatmap.png', dpi=150, use_m
         import matplotlib.pyplot as plt
         import matplotlib.cm as cm
         from matplotlib.colors import LinearSegmentedColormap
-        from scipy.stats import gaussian_kde
         if use_map_background:
-            import contextily as ctx
+            from utils.tile_store import add_basemap
     except ImportError as e:
-        logger.error(f"Missing dependencies: {e}. Run: pip3 install matplotlib scipy contextily")
+        logger.error(f"Missing dependencies: {e}. Run: pip3 install matplotlib")
         return False
     
     logger.info("Generating static heat map")
@@ -98,17 +98,15 @@ def generate_static_heatmap(output_file='tournament_heatmap.png', dpi=150, use_m
     ax.set_xlim(lng_min, lng_max)
     ax.set_ylim(lat_min, lat_max)
     
-    # Create density estimation
-    xy = np.vstack([lngs, lats])
-    
     # Create grid for heat map
     xx, yy = np.mgrid[lng_min:lng_max:200j, lat_min:lat_max:200j]
-    positions = np.vstack([xx.ravel(), yy.ravel()])
     
-    # Calculate kernel density with weights
+    # Calculate kernel density with weights (binned FFT KDE)
     if len(weights) > 1:
-        kernel = gaussian_kde(xy, weights=weights)
-        density = np.reshape(kernel(positions).T, xx.shape)
+        density = density_grid(lats, lngs, weights,
+                               lat_range=(lat_min, lat_max),
+                               lng_range=(lng_min, lng_max),
+                               size=xx.shape)
     else:
         # Fallback for single point
         density = np.zeros_like(xx)
@@ -132,12 +130,11 @@ def generate_static_heatmap(output_file='tournament_heatmap.png', dpi=150, use_m
     # Add map background if requested (after setting limits)
     if use_map_background:
         try:
-            ctx.add_basemap(ax, 
-                          crs='EPSG:4326',  # Lat/lng coordinate system
-                          source=ctx.providers.CartoDB.Positron,  # Light map style
-                          zoom=10,
-                          alpha=1.0)
-            logger.info("Added map background")
+            # Light CartoDB Positron tiles from the offline store
+            if add_basemap(ax, (lng_min, lat_min, lng_max, lat_max), zoom=10, alpha=1.0):
+                logger.info("Added map background")
+            else:
+                logger.info("No basemap tiles available - using plain background")
         except Exception as e:
             logger.error(f"Could not add map background: {e}")
             use_map_background = False  # Fall back to no background
@@ -322,7 +319,7 @@ def generate_attendance_heatmap(output_file='attendance_heatmap.png', use_map_ba
         import matplotlib.patches as patches
         from matplotlib.collections import PatchCollection
         if use_map_background:
-            import contextily as ctx
+            from utils.tile_store import add_basemap
     except ImportError as e:
         logger.error(f"Missing dependencies: {e}")
         return False
@@ -390,17 +387,17 @@ def generate_attendance_heatmap(output_file='attendance_heatmap.png', use_map_ba
     ax.set_xlim(lng_min, lng_max)
     ax.set_ylim(lat_min, lat_max)
     
-    # Add map background if requested
+    # Add map background if requested (labels turn black only over light tiles)
+    text_color = 'white'
     if use_map_background:
         try:
-            ctx.add_basemap(ax, crs='EPSG:4326', source=ctx.providers.CartoDB.Positron, zoom=10)
-            logger.info("Added map background")
-            text_color = 'black'
+            if add_basemap(ax, (lng_min, lat_min, lng_max, lat_max), zoom=10):
+                logger.info("Added map background")
+                text_color = 'black'
+            else:
+                logger.info("No basemap tiles available - using plain background")
         except Exception as e:
-            logger.error(f"Could not add map background: {e}") 
-            text_color = 'white'
-    else:
-        text_color = 'white'
+            logger.error(f"Could not add map background: {e}")
     
     ax.set_xlabel('Longitude', color=text_color, fontsize=12)
     ax.set_ylabel('Latitude', color=text_color, fontsize=12)
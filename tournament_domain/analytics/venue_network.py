@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+venue_network.py - Sparse venue co-occurrence for the community network heatmap
+
+Two venues are connected by every player (counted by gamer tag) who has
+placed at both. Instead of walking each player's placements and emitting
+every venue pair, one placements query becomes a sparse player x venue
+incidence matrix B, and the shared-player counts are B^T B.
+
+The result reproduces the original nested-dict walk exactly, including the
+order heat points, lines and markers were emitted in and which end of each
+line came first, so the rendered map is unchanged.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# (player_id, gamer_tag, venue_name, lat, lng) in player order, then placement order
+PlacementRow = Tuple[Any, str, str, float, float]
+
+MIN_SHARED_PLAYERS = 5     # draw a line between venues sharing this many players
+MIN_HUB_CONNECTIONS = 3    # mark venues connected to this many venues
+
+
+def fetch_venue_rows(session) -> List[PlacementRow]:
+    """Every located placement at a named venue, in the order the walk visited them"""
+    from database.tournament_models import Tournament, Player, TournamentPlacement
+
+    rows = session.query(
+        TournamentPlacement.player_id,
+        Player.gamer_tag,
+        Tournament.venue_name,
+        Tournament.lat,
+        Tournament.lng
+    ).join(
+        Player, TournamentPlacement.player_id == Player.id
+    ).join(
+        Tournament, TournamentPlacement.tournament_id == Tournament.id
+    ).filter(
+        Tournament.venue_name.isnot(None),
+        Tournament.venue_name != '',
+        Tournament.lat.isnot(None),
+        Tournament.lng.isnot(None)
+    ).order_by(
+        Player.id, TournamentPlacement.id
+    ).all()
+
+    located = []
+    for player_id, gamer_tag, venue, lat, lng in rows:
+        try:
+            located.append((player_id, gamer_tag, venue, float(lat), float(lng)))
+        except (ValueError, TypeError):
+            continue
+    return located
+
+
+def _factorize(values: Sequence) -> Tuple[np.ndarray, list]:
+    """Integer codes in order of first appearance"""
+    index: Dict[Any, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return np.asarray(codes, dtype=np.int64), list(index)
+
+
+def build_venue_network(rows: Sequence[PlacementRow], min_shared: int = MIN_SHARED_PLAYERS,
+                        min_connections: int = MIN_HUB_CONNECTIONS) -> Dict[str, Any]:
+    """
+    Venue network from placement rows.
+
+    Returns venues (first-seen order), locations, per-venue connection counts,
+    heat_points [[lat, lng, connections]], edges [(v1, v2, shared_players)]
+    and hubs [(venue, connections)], each in the original emission order.
+    """
+    empty = {'venues': [], 'locations': {}, 'connections': {}, 'heat_points': [], 'edges': [], 'hubs': []}
+    if not rows:
+        return empty
+
+    player_codes, _ = _factorize([r[0] for r in rows])
+    venue_codes, venues = _factorize([r[2] for r in rows])
+    n_rows, n_players, n_venues = len(rows), int(player_codes.max()) + 1, len(venues)
+
+    # Player -> gamer tag (tags are what get counted; two players may share one)
+    first_row_of_player = np.unique(player_codes, return_index=True)[1]
+    tag_codes, _ = _factorize([rows[i][1] for i in first_row_of_player])
+
+    # Last coordinates written per venue win, as in the dict walk
+    last_row = np.empty(n_venues, dtype=np.int64)
+    last_row[venue_codes] = np.arange(n_rows)
+    locations = {venues[v]: (rows[i][3], rows[i][4]) for v, i in enumerate(last_row)}
+
+    # Visits per (player, venue) and the rows of the first and second visit
+    cell = player_codes * n_venues + venue_codes
+    cells, first_visit = np.unique(cell, return_index=True)
+    cell_player, cell_venue = cells // n_venues, cells % n_venues
+    repeat_rows = np.setdiff1d(np.arange(n_rows), first_visit)
+    repeat_cells, second_visit = np.unique(cell[repeat_rows], return_index=True)
+    second_visit = repeat_rows[second_visit]
+
+    incidence = sparse.csr_matrix((np.ones(len(cells)), (cell_player, cell_venue)),
+                                  shape=(n_players, n_venues))
+    shared = incidence.T @ incidence
+
+    # Players sharing a tag count once per venue pair: subtract the extra copies
+    tag_sizes = np.bincount(tag_codes)
+    extra = []
+    for tag in np.flatnonzero(tag_sizes > 1):
+        sub = incidence[np.flatnonzero(tag_codes == tag)]
+        overlap = (sub.T @ sub).tocoo()
+        extra.append((overlap.row, overlap.col, overlap.data - 1))
+    if extra:
+        rows_, cols_, data_ = (np.concatenate(parts) for parts in zip(*extra))
+        shared = shared - sparse.csr_matrix((data_, (rows_, cols_)), shape=shared.shape)
+    shared = shared.tolil()
+
+    # A venue is linked to itself by tags that visited it twice (the walk paired
+    # duplicate entries too)
+    repeat_player, repeat_venue = repeat_cells // n_venues, repeat_cells % n_venues
+    tag_repeats = sparse.csr_matrix((np.ones(len(repeat_cells)), (tag_codes[repeat_player], repeat_venue)),
+                                    shape=(len(tag_sizes), n_venues))
+    self_shared = np.asarray((tag_repeats > 0).sum(axis=0)).ravel().astype(np.int64)
+    shared.setdiag(self_shared)
+    shared = shared.tocsr()
+    shared.eliminate_zeros()
+
+    connection_counts = np.diff(shared.indptr)
+    connections = {venues[v]: int(connection_counts[v]) for v in range(n_venues)}
+
+    heat_points = [[locations[venues[v]][0], locations[venues[v]][1], int(connection_counts[v])]
+                   for v in range(n_venues) if connection_counts[v] > 0]
+    hubs = [(venues[v], int(connection_counts[v]))
+            for v in range(n_venues) if connection_counts[v] >= min_connections]
+
+    # Row (+1) of each player's first and second visit to each venue
+    first_rows = sparse.csr_matrix((first_visit + 1, (cell_player, cell_venue)), shape=incidence.shape)
+    second_rows = sparse.csr_matrix((second_visit + 1, (repeat_player, repeat_venue)), shape=incidence.shape)
+
+    edges = _ordered_edges(shared, min_shared, venues, player_codes, venue_codes,
+                           incidence, first_rows, second_rows)
+    return {'venues': venues, 'locations': locations, 'connections': connections,
+            'heat_points': heat_points, 'edges': edges, 'hubs': hubs}
+
+
+def _first_row_per_column(matrix) -> np.ndarray:
+    """Smallest row index holding a value, per (non-empty) column"""
+    csc = matrix.tocsc()
+    csc.sort_indices()
+    return csc.indices[csc.indptr[:-1]]
+
+
+def _ordered_edges(shared, min_shared, venues, player_codes, venue_codes,
+                   incidence, first_rows, second_rows) -> List[Tuple[str, str, int]]:
+    """
+    Edges over the threshold, oriented and ordered like the dict walk drew them:
+    outer loop over venues in the order they first took part in a pair, inner
+    loop in the order each pair was first seen; first orientation wins.
+    """
+    strong = sparse.triu(shared, format='coo')
+    keep = strong.data >= min_shared
+    a, b, counts = strong.row[keep], strong.col[keep], strong.data[keep]
+    if not len(a):
+        return []
+
+    # Venues become outer keys at their first visit by a player with 2+ entries
+    entries = np.bincount(player_codes)
+    eligible = np.flatnonzero(entries[player_codes] >= 2)
+    key_rank = np.full(len(venues), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(key_rank, venue_codes[eligible], eligible)
+
+    # First player (players are numbered in walk order) who produced each pair
+    first_player = np.empty(len(a), dtype=np.int64)
+    self_pair = a == b
+    if self_pair.any():
+        first_player[self_pair] = _first_row_per_column(second_rows[:, a[self_pair]])
+    by_venue = incidence.tocsc()
+    by_venue.sort_indices()
+    for venue in np.unique(a[~self_pair]):
+        idx = np.flatnonzero((a == venue) & ~self_pair)
+        players = by_venue.indices[by_venue.indptr[venue]:by_venue.indptr[venue + 1]]
+        first_player[idx] = players[_first_row_per_column(incidence[players][:, b[idx]])]
+
+    # That player's pair (i, j) is its first visit to each venue, or first and
+    # second visit for a venue paired with itself; rows order those like (i, j)
+    row_a = np.asarray(first_rows[first_player, a]).ravel()
+    row_b = np.where(self_pair,
+                     np.asarray(second_rows[first_player, a]).ravel(),
+                     np.asarray(first_rows[first_player, b]).ravel())
+    event_i, event_j = np.minimum(row_a, row_b), np.maximum(row_a, row_b)
+
+    a_first = key_rank[a] <= key_rank[b]
+    v1, v2 = np.where(a_first, a, b), np.where(a_first, b, a)
+    order = np.lexsort((event_j, event_i, key_rank[v1]))
+    return [(venues[v1[k]], venues[v2[k]], int(counts[k])) for k in order]
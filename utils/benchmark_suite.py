@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""
+benchmark_suite.py - End-to-end benchmarks over a synthetic database
+
+Builds a synthetic database (utils.synthetic_data) once per scale and seed,
+copies it to a scratch file for every run and times the hot paths on it:
+
+- rankings: UnifiedTabulator player points, overall and for one event
+- org_tabulation: organization attendance/event rankings, monthly timeline
+- heatmaps: attendance density grid and the venue co-occurrence network
+- search: trigram name index build, fuzzy player/organization/venue lookups
+- editor: the editor's pages and JSON endpoints through an in-process client
+- sync_ingestion: the newest tournaments replayed as start.gg payloads, then
+  event normalization and a rollup consistency check
+
+Each operation runs up to BENCHMARK_REPEATS times (within a time budget) and
+reports first/min/median/p95. A run is written to cache/benchmarks/results
+(BENCHMARK_DIR) as JSON with the dataset digest, git commit and environment,
+and compared with the previous run at the same scale: medians that moved by
+more than BENCHMARK_REGRESSION are listed as regressions or improvements.
+
+utils.database binds DATABASE_URL on first import, so runs belong in their
+own process: ./go.py --benchmark small
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import platform
+import subprocess
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.benchmark_suite")
+
+from polymorphic_core import announcer
+from utils.synthetic_data import SCALES, SyntheticDataset, get_dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARK_DIR = Path(os.getenv('BENCHMARK_DIR', str(ROOT / 'cache' / 'benchmarks')))
+REPEATS = int(os.getenv('BENCHMARK_REPEATS', '5'))
+OPERATION_BUDGET = float(os.getenv('BENCHMARK_OPERATION_BUDGET', '10'))  # seconds per operation
+REGRESSION_THRESHOLD = float(os.getenv('BENCHMARK_REGRESSION', '0.15'))  # median ratio beyond 1 +/- this
+MIN_DELTA_MS = 1.0  # smaller moves are noise whatever the ratio
+RESULTS_VERSION = 1
+DATASET_VERSION = 1  # bump when utils.synthetic_data output changes
+
+SCENARIOS = ('rankings', 'org_tabulation', 'heatmaps', 'search', 'editor', 'sync_ingestion')
+
+Operation = Tuple[str, Callable[[], Any], int]  # (name, function, repeats; 0 = REPEATS)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _size(result: Any) -> Optional[int]:
+    """What an operation returned, as a number to sanity-check runs against each other"""
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, int):
+        return result
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def time_operation(function: Callable[[], Any], repeats: int = REPEATS,
+                   budget: float = OPERATION_BUDGET) -> Dict[str, Any]:
+    """Run function up to `repeats` times, stopping early once `budget` seconds are spent"""
+    times, result = [], None
+    deadline = time.perf_counter() + budget
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() > deadline:
+            break
+    ordered = sorted(times)
+    return {
+        'runs': len(times),
+        'first_ms': round(times[0], 3),
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(_percentile(ordered, 0.5), 3),
+        'p95_ms': round(_percentile(ordered, 0.95), 3),
+        'result': _size(result),
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> Dict[str, Any]:
+    """Median ratio per operation present in both runs"""
+    operations = []
+    for scenario, data in current.get('scenarios', {}).items():
+        before_ops = baseline.get('scenarios', {}).get(scenario, {}).get('operations', {})
+        for name, stats in data.get('operations', {}).items():
+            before = before_ops.get(name, {})
+            if 'median_ms' not in stats or not before.get('median_ms'):
+                continue
+            ratio = stats['median_ms'] / before['median_ms']
+            delta = stats['median_ms'] - before['median_ms']
+            if ratio > 1 + threshold and delta > MIN_DELTA_MS:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold) and -delta > MIN_DELTA_MS:
+                status = 'improvement'
+            else:
+                status = 'unchanged'
+            operations.append({'scenario': scenario, 'operation': name, 'status': status,
+                               'baseline_ms': before['median_ms'], 'current_ms': stats['median_ms'],
+                               'ratio': round(ratio, 3)})
+    return {
+        'baseline': baseline.get('file'),
+        'baseline_commit': baseline.get('environment', {}).get('git_commit'),
+        'same_dataset': baseline.get('dataset', {}).get('digest') == current.get('dataset', {}).get('digest'),
+        'threshold': threshold,
+        'regressions': [op for op in operations if op['status'] == 'regression'],
+        'improvements': [op for op in operations if op['status'] == 'improvement'],
+        'operations': operations,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'sqlite': sqlite3.sqlite_version,
+        'git_commit': _git_commit(),
+    }
+
+
+class BenchmarkRun:
+    """One run's dataset, scratch database and query fixtures"""
+
+    def __init__(self, dataset: SyntheticDataset, db_path: Path, holdout: int):
+        self.dataset = dataset
+        self.db_path = db_path
+        self.holdout = holdout
+        loaded = dataset.tournaments[:len(dataset.tournaments) - holdout]
+        # Fixed lookups: the first players and the largest loaded tournaments
+        self.tournament_ids = [t['id'] for t in sorted(loaded, key=lambda t: -t['num_attendees'])[:5]]
+        self.player_ids = [p[0] for p in dataset.players[:5]]
+
+    def typo_queries(self, names: List[str], count: int = 20) -> List[str]:
+        """Deterministic one-character typos of existing names"""
+        queries = []
+        for i, name in enumerate(names[:count]):
+            position = (i * 7) % len(name)
+            queries.append(name[:position] + 'x' + name[position + 1:] if len(name) > 3 else name)
+        return queries
+
+
+class BenchmarkSuite:
+    """
+    Benchmark service with 3-method pattern
+    """
+
+    def __init__(self):
+        self.last_result: Optional[Dict[str, Any]] = None
+
+        announcer.announce(
+            "Benchmark Suite",
+            [
+                "End-to-end benchmarks over a deterministic synthetic database",
+                "do('run small') - Time rankings, org tabulation, heatmaps, search, editor and sync ingestion",
+                "do('run large rankings search') - Only some scenarios (10k tournaments, 1M placements)",
+                "ask('compare') - Latest run against the previous one at the same scale",
+                "Results are JSON files in cache/benchmarks/results"
+            ],
+            [
+                "benchmarks.do('run tiny')",
+                "benchmarks.ask('latest')",
+                "benchmarks.tell('discord', benchmarks.ask('compare'))"
+            ]
+        )
+
+    def ask(self, query: str, **kwargs) -> Any:
+        """
+        Query benchmark results
+        Examples:
+            ask("scenarios")
+            ask("results")
+            ask("latest small")
+            ask("compare")
+        """
+        query = query.lower().strip()
+        scale = next((word for word in query.split() if word in SCALES), None)
+
+        if "scenario" in query:
+            return list(SCENARIOS)
+        elif "scale" in query:
+            return {name: asdict(config.resolved()) for name, config in SCALES.items()}
+        elif "compare" in query:
+            results = self._result_files(scale)
+            if len(results) < 2:
+                return {'error': 'Need two runs at the same scale to compare'}
+            return compare_results(self._load(results[-1]), self._load(results[-2]))
+        elif "latest" in query or "last" in query:
+            results = self._result_files(scale)
+            return self._load(results[-1]) if results else None
+        elif "result" in query:
+            return [self._headline(self._load(path)) for path in self._result_files(scale)]
+        return {'error': f"Unknown query: {query}"}
+
+    def tell(self, format: str, data: Any = None) -> str:
+        """
+        Format benchmark results
+        """
+        if data is None:
+            data = self.last_result or self.ask("latest")
+
+        if format.lower() == "json":
+            return json.dumps(data, default=str, indent=2)
+        elif format.lower() in ["discord", "text"]:
+            if isinstance(data, dict) and 'scenarios' in data:
+                return self._format_run(data)
+            elif isinstance(data, dict) and 'operations' in data:
+                return self._format_comparison(data)
+            return str(data)
+        return str(data)
+
+    def do(self, action: str, **kwargs) -> Any:
+        """
+        Run benchmarks
+        Examples:
+            do("run small")
+            do("run large rankings search seed 7")
+            do("generate medium") - build the cached dataset only
+        """
+        words = action.lower().split()
+        scale = next((word for word in words if word in SCALES), 'small')
+        seed = int(words[words.index('seed') + 1]) if 'seed' in words[:-1] else None
+        scenarios = [word for word in words if word in SCENARIOS] or kwargs.get('scenarios')
+
+        if words and words[0] in ("run", "benchmark"):
+            return self.run(scale, scenarios=scenarios, seed=seed)
+        elif words and words[0] in ("generate", "build"):
+            dataset = get_dataset(scale, seed)
+            return self._prepare_database(dataset, self._holdout(dataset))[1]
+        return {'error': f"Unknown action: {action}"}
+
+    # ============= Running =============
+
+    def run(self, scale: str = 'small', scenarios: Optional[List[str]] = None, seed: Optional[int] = None,
+            save: bool = True) -> Dict[str, Any]:
+        """Run the scenarios on a fresh copy of the scale's dataset; returns (and saves) the result"""
+        started = datetime.now(timezone.utc)
+        dataset = get_dataset(scale, seed)
+        holdout = self._holdout(dataset)
+        db_path, dataset_info = self._prepare_database(dataset, holdout)
+        benchmark = BenchmarkRun(dataset, db_path, holdout)
+
+        result = {
+            'version': RESULTS_VERSION,
+            'timestamp': started.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'scale': scale,
+            'dataset': dataset_info,
+            'environment': _environment(),
+            'settings': {'repeats': REPEATS, 'operation_budget_s': OPERATION_BUDGET},
+            'scenarios': {},
+        }
+        for name in scenarios or SCENARIOS:
+            print(f"⏱️ {name}...")
+            result['scenarios'][name] = self._run_scenario(getattr(self, f"_{name}"), benchmark)
+
+        if save:
+            baseline = self._result_files(scale, seed=dataset.config.seed)
+            path = self._save(result, started)
+            if baseline:
+                result['comparison'] = compare_results(result, self._load(baseline[-1]))
+                path.write_text(json.dumps(result, indent=2, default=str))
+        self.last_result = result
+        return result
+
+    def _run_scenario(self, scenario: Callable, benchmark: BenchmarkRun) -> Dict[str, Any]:
+        start = time.perf_counter()
+        operations = {}
+        try:
+            with scenario(benchmark) as steps:
+                for name, function, repeats in steps:
+                    try:
+                        operations[name] = time_operation(function, repeats or REPEATS)
+                    except Exception as e:
+                        operations[name] = {'error': f"{type(e).__name__}: {e}"}
+        except ImportError as e:
+            # Optional parts of the stack (aiohttp, scipy, ...) not installed here
+            return {'status': 'skipped', 'error': str(e), 'operations': operations}
+        except Exception as e:
+            return {'status': 'error', 'error': f"{type(e).__name__}: {e}", 'operations': operations}
+        failed = any('error' in stats for stats in operations.values())
+        return {'status': 'error' if failed else 'ok', 'seconds': round(time.perf_counter() - start, 3),
+                'operations': operations}
+
+    @staticmethod
+    def _holdout(dataset: SyntheticDataset) -> int:
+        """Tournaments left out of the database for the sync ingestion scenario"""
+        return min(100, max(5, len(dataset.tournaments) // 100))
+
+    def _prepare_database(self, dataset: SyntheticDataset, holdout: int) -> Tuple[Path, Dict[str, Any]]:
+        """Copy the cached dataset (building it on first use) to the scratch database"""
+        data_dir = BENCHMARK_DIR / 'data'
+        data_dir.mkdir(parents=True, exist_ok=True)
+        config = dataset.config
+        name = f"{config.tournaments}t-{config.placements}p-seed{config.seed}-v{DATASET_VERSION}"
+        template, info_path = data_dir / f"{name}.db", data_dir / f"{name}.json"
+        work = data_dir / 'work.db'
+
+        database = self._bind_database(work)
+        database.dispose_engine()
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            Path(f"{work}{suffix}").unlink(missing_ok=True)
+
+        if template.exists() and info_path.exists():
+            shutil.copyfile(template, work)
+            info = json.loads(info_path.read_text())
+            info['cached'] = True
+            return work, info
+
+        print(f"🏗️ Generating {name} ({config.tournaments} tournaments, {config.placements} placements)...")
+        info = {'name': name, 'config': asdict(config), **dataset.populate(database.engine, holdout=holdout)}
+        database.dispose_engine()  # closing the last connection checkpoints the WAL into the file
+        shutil.copyfile(work, f"{template}.partial")
+        os.replace(f"{template}.partial", template)
+        info_path.write_text(json.dumps(info, indent=2))
+        print(f"✅ Dataset ready in {info['seconds']}s (digest {info['digest']})")
+        return work, {**info, 'cached': False}
+
+    @staticmethod
+    def _bind_database(path: Path):
+        """utils.database pointed at path: set DATABASE_URL before its first import"""
+        url = f"sqlite:///{path}"
+        if 'utils.database' not in sys.modules:
+            os.environ['DATABASE_URL'] = url
+        import utils.database as database
+        if str(database.engine.url) != url:
+            raise RuntimeError(f"utils.database is already bound to {database.engine.url}; "
+                               f"run benchmarks in their own process (./go.py --benchmark)")
+        return database
+
+    # ============= Scenarios =============
+
+    @contextmanager
+    def _rankings(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from utils.database import read_session_scope
+        from utils.unified_tabulator import UnifiedTabulator
+
+        def player_points(event_filter=None):
+            with read_session_scope() as session:
+                return UnifiedTabulator.tabulate_player_points(session, limit=50, event_filter=event_filter)
+
+        yield [
+            ('player points top 50', player_points, 0),
+            ('player points ultimate singles', lambda: player_points('Ultimate Singles'), 0),
+        ]
+
+    @contextmanager
+    def _org_tabulation(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from utils.database import read_session_scope
+        from utils.unified_tabulator import UnifiedTabulator
+        from database.attendance_rollup import monthly_totals
+
+        def read(function):
+            def operation():
+                with read_session_scope() as session:
+                    return function(session)
+            return operation
+
+        yield [
+            ('org attendance', read(UnifiedTabulator.tabulate_org_attendance), 0),
+            ('org events', read(UnifiedTabulator.tabulate_org_events), 0),
+            ('attendance timeline', read(monthly_totals), 0),
+            ('attendance timeline socal', read(lambda session: monthly_totals(session, region='socal')), 0),
+        ]
+
+    @contextmanager
+    def _heatmaps(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from utils.database import read_session_scope
+        from database.tournament_models import Tournament
+        from math_services.density_engine import density_grid
+        from tournament_domain.analytics.venue_network import build_venue_network, fetch_venue_rows
+
+        def density():
+            with read_session_scope() as session:
+                rows = session.query(Tournament.lat, Tournament.lng, Tournament.num_attendees).filter(
+                    Tournament.lat.isnot(None), Tournament.lng.isnot(None), Tournament.num_attendees > 0).all()
+            lats, lngs, weights = zip(*rows)
+            density_grid(lats, lngs, weights, size=200)
+            return len(rows)
+
+        def venue_network():
+            with read_session_scope() as session:
+                rows = fetch_venue_rows(session)
+            return build_venue_network(rows)['edges']
+
+        yield [
+            ('attendance density 200x200', density, 0),
+            ('venue network', venue_network, 0),
+        ]
+
+    @contextmanager
+    def _search(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from search.name_index import rebuild_name_index, search_names
+
+        conn = sqlite3.connect(str(run.db_path))
+        dataset = run.dataset
+        lookups = {
+            'player': run.typo_queries([p[2] for p in dataset.players[::max(1, len(dataset.players) // 20)]]),
+            'organization': run.typo_queries([o['display_name'] for o in dataset.organizations]),
+            'venue': run.typo_queries(sorted({v['venue_name'] for o in dataset.organizations for v in o['venues']})),
+        }
+
+        def lookup(kind):
+            return lambda: sum(len(search_names(conn, query, kinds=[kind])) for query in lookups[kind])
+
+        try:
+            yield [('build name index', lambda: rebuild_name_index(conn), 1)] + [
+                (f"{kind} lookups x{len(queries)}", lookup(kind), 0) for kind, queries in lookups.items()]
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _editor(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from aiohttp.test_utils import TestClient, TestServer
+        from services.editor_service import EditorService
+
+        loop = asyncio.new_event_loop()
+        client = TestClient(TestServer(EditorService().create_app()), loop=loop)
+        loop.run_until_complete(client.start_server())
+
+        def get(path):
+            async def fetch():
+                response = await client.get(path)
+                body = await response.read()
+                if response.status >= 400:
+                    raise RuntimeError(f"GET {path} returned {response.status}")
+                return len(body)
+            return lambda: loop.run_until_complete(fetch())
+
+        try:
+            yield [
+                ('GET /api/attendance-timeline', get('/api/attendance-timeline'), 0),
+                ('GET /api/attendance-timeline socal top 3', get('/api/attendance-timeline?region=socal&top=3'), 0),
+                ('GET /api/players', get('/api/players'), 0),
+                ('GET /api/organizations', get('/api/organizations'), 0),
+                ('GET /org-rankings', get('/org-rankings'), 0),
+                ('GET /player/{id}', get(f"/player/{run.player_ids[0]}"), 0),
+                ('GET /tournament/{id}', get(f"/tournament/{run.tournament_ids[0]}"), 0),
+            ]
+        finally:
+            loop.run_until_complete(client.close())
+            loop.close()
+
+    @contextmanager
+    def _sync_ingestion(self, run: BenchmarkRun) -> Iterator[List[Operation]]:
+        from utils.database import read_session_scope
+        from utils.normalize_events import bulk_normalize
+        from database.attendance_rollup import check
+
+        payloads = run.dataset.holdout_payloads(run.holdout)
+
+        def normalize():
+            conn = sqlite3.connect(str(run.db_path))
+            try:
+                return bulk_normalize(conn)['placements_updated']
+            finally:
+                conn.close()
+
+        def rollup_differences():
+            with read_session_scope() as session:
+                return len(check(session)['differences'])
+
+        # Inserts are not repeatable, so each step runs once
+        yield [
+            (f"ingest {len(payloads)} start.gg tournaments", lambda: ingest_payloads(payloads), 1),
+            ('normalize events', normalize, 1),
+            ('attendance rollup differences', rollup_differences, 1),
+        ]
+
+    # ============= Results =============
+
+    def _result_files(self, scale: Optional[str] = None, seed: Optional[int] = None) -> List[Path]:
+        results = sorted((BENCHMARK_DIR / 'results').glob('*.json'))
+        if scale:
+            results = [path for path in results if path.stem.endswith(f"-{scale}")]
+        if seed is not None:
+            results = [path for path in results
+                       if self._load(path).get('dataset', {}).get('config', {}).get('seed') == seed]
+        return results
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Any]:
+        data = json.loads(Path(path).read_text())
+        data['file'] = str(path)
+        return data
+
+    @staticmethod
+    def _save(result: Dict[str, Any], started: datetime) -> Path:
+        directory = BENCHMARK_DIR / 'results'
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{started.strftime('%Y%m%d-%H%M%S')}-{result['scale']}.json"
+        path.write_text(json.dumps(result, indent=2, default=str))
+        result['file'] = str(path)
+        return path
+
+    @staticmethod
+    def _headline(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'file': result.get('file'), 'timestamp': result.get('timestamp'), 'scale': result.get('scale'),
+            'commit': result.get('environment', {}).get('git_commit'),
+            'regressions': len(result.get('comparison', {}).get('regressions', [])),
+            'scenarios': {name: data.get('status') for name, data in result.get('scenarios', {}).items()},
+        }
+
+    def _format_run(self, result: Dict[str, Any]) -> str:
+        dataset = result.get('dataset', {})
+        lines = [f"⏱️ **Benchmarks: {result.get('scale')}** ({dataset.get('tournaments')} tournaments, "
+                 f"{dataset.get('placements')} placements, commit {result.get('environment', {}).get('git_commit')})"]
+        for name, data in result.get('scenarios', {}).items():
+            icon = {'ok': '✅', 'skipped': '⏭️'}.get(data.get('status'), '❌')
+            lines.append(f"\n{icon} **{name}**" + (f" - {data['error']}" if data.get('error') else ''))
+            for operation, stats in data.get('operations', {}).items():
+                if 'error' in stats:
+                    lines.append(f"  • {operation}: ❌ {stats['error']}")
+                else:
+                    lines.append(f"  • {operation}: {stats['median_ms']:.1f}ms median "
+                                 f"(min {stats['min_ms']:.1f}, p95 {stats['p95_ms']:.1f}, {stats['runs']} runs)")
+        if result.get('comparison'):
+            lines.append("")
+            lines.append(self._format_comparison(result['comparison']))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_comparison(comparison: Dict[str, Any]) -> str:
+        lines = [f"📊 **Compared with {Path(comparison.get('baseline') or '?').name}** "
+                 f"(commit {comparison.get('baseline_commit')}, threshold ±{comparison['threshold'] * 100:.0f}%)"]
+        if not comparison.get('same_dataset'):
+            lines.append("⚠️ Different dataset digest - timings are not comparable")
+        for label, key in (("🔴 Regressions", 'regressions'), ("🟢 Improvements", 'improvements')):
+            if comparison.get(key):
+                lines.append(f"{label}:")
+                lines.extend(f"  • {op['scenario']} / {op['operation']}: {op['baseline_ms']:.1f}ms → "
+                             f"{op['current_ms']:.1f}ms ({op['ratio']:.2f}x)" for op in comparison[key])
+        if not comparison.get('regressions') and not comparison.get('improvements'):
+            lines.append(f"No changes beyond the threshold across {len(comparison.get('operations', []))} operations")
+        return "\n".join(lines)
+
+
+def _tournament_record(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Tournament columns from a start.gg tournament, as StartGGSync maps them"""
+    return {
+        'id': str(payload['id']),
+        'name': payload.get('name', ''),
+        'num_attendees': payload.get('numAttendees', 0),
+        'start_at': payload.get('startAt'),
+        'end_at': payload.get('endAt'),
+        'registration_closes_at': payload.get('registrationClosesAt'),
+        'timezone': payload.get('timezone'),
+        'venue_name': payload.get('venueName'),
+        'venue_address': payload.get('venueAddress'),
+        'city': payload.get('city'),
+        'addr_state': payload.get('addrState'),
+        'country_code': payload.get('countryCode'),
+        'postal_code': payload.get('postalCode'),
+        'lat': payload.get('lat'),
+        'lng': payload.get('lng'),
+        'owner_id': str((payload.get('owner') or {}).get('id', '')),
+        'owner_name': (payload.get('owner') or {}).get('name'),
+        'primary_contact': payload.get('primaryContact'),
+        'primary_contact_type': payload.get('primaryContactType'),
+        'short_slug': payload.get('shortSlug'),
+        'slug': payload.get('slug'),
+        'url': payload.get('url'),
+        'tournament_state': payload.get('state', 0),
+        'is_registration_open': 1 if payload.get('isRegistrationOpen') else 0,
+        'has_offline_events': 1 if payload.get('hasOfflineEvents') else 0,
+        'has_online_events': 1 if payload.get('hasOnlineEvents') else 0,
+        'tournament_type': payload.get('tournamentType'),
+        'sync_timestamp': int(time.time()),
+    }
+
+
+def ingest_payloads(payloads: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> int:
+    """
+    Write start.gg tournaments and standings the way a sync does: one
+    transaction per tournament, players looked up by start.gg id (created
+    when new), one placement per standing. Returns the placements written.
+    """
+    from utils.database import session_scope
+    from database.tournament_models import Player, Tournament, TournamentPlacement
+
+    written = 0
+    for payload, standings in payloads:
+        with session_scope() as session:
+            session.merge(Tournament(**_tournament_record(payload)))
+            players = {str(s['entrant']['participants'][0]['player']['id']): s['entrant']['participants'][0]
+                       for s in standings if s.get('entrant', {}).get('participants')}
+            known = dict(session.query(Player.startgg_id, Player.id).filter(Player.startgg_id.in_(list(players))))
+            for startgg_id, participant in players.items():
+                if startgg_id not in known:
+                    player = Player(startgg_id=startgg_id, gamer_tag=participant['player']['gamerTag'],
+                                    name=(participant.get('user') or {}).get('name'))
+                    session.add(player)
+                    session.flush()
+                    known[startgg_id] = player.id
+            for standing in standings:
+                startgg_id = str(standing['entrant']['participants'][0]['player']['id'])
+                session.add(TournamentPlacement(tournament_id=str(payload['id']), player_id=known[startgg_id],
+                                                placement=standing['placement'], event_name=standing['event_name'],
+                                                event_id=str(standing['event_id'])))
+                written += 1
+    return written
+
+
+# Global instance
+benchmark_suite = BenchmarkSuite()
+
+
+def run_benchmarks(scale: str = 'small', scenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark suite at one scale"""
+    return benchmark_suite.run(scale, scenarios=scenarios)
+
+
+def benchmark_handler(args):
+    """Handler for --benchmark switch: [scale] [scenario ...] [seed N] | compare | results"""
+    command = getattr(args, 'benchmark', None) or 'small'
+    if command.startswith('compare'):
+        print(benchmark_suite.tell("discord", benchmark_suite.ask(command)))
+    elif command.startswith('result'):
+        print(benchmark_suite.tell("json", benchmark_suite.ask(command)))
+    else:
+        result = benchmark_suite.do(command if command.startswith(('run', 'generate')) else f"run {command}")
+        print(benchmark_suite.tell("discord", result))
+
+
+# Announce the benchmark switch via bonjour
+announcer.announce(
+    "GoSwitch__benchmark",
+    [
+        "Provides go.py flag: --benchmark",
+        "Help: End-to-end benchmarks on synthetic data ([tiny|small|medium|large] [scenario ...]|compare|results)",
+        "Handler: benchmark_handler"
+    ],
+    examples=[
+        "./go.py --benchmark small",
+        "./go.py --benchmark 'large rankings search'",
+        "./go.py --benchmark compare"
+    ]
+)
@@ -7,7 +7,7 @@ All other modules MUST import from here.
 import os
 from typing import Optional, Generator
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session, Session as SessionType
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -27,16 +27,78 @@ DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///tournament_tracker.db')
 # SINGLE SOURCE OF TRUTH - Engine and Session Factory
 # ============================================================================
 
+# SQLite connection profile: WAL lets readers keep a snapshot while a writer
+# commits, NORMAL sync is safe under WAL, mmap/cache keep hot pages in memory
+# and busy_timeout makes writers queue briefly instead of failing
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '15000')),  # ms
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, read_only: bool = False):
+    """
+    Apply SQLITE_PRAGMAS to a raw sqlite3 connection.
+    Read-only connections also get query_only, so a stray write fails
+    instead of taking the write lock.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def _create_engine(read_only: bool = False):
+    """Build an engine; SQLite file databases get the connection profile"""
+    new_engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=3600
+    )
+    if new_engine.dialect.name != 'sqlite':
+        return new_engine
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, read_only=read_only)
+        if read_only:
+            # Let SQLAlchemy issue BEGIN itself (below) instead of pysqlite
+            # skipping it for SELECTs
+            dbapi_connection.isolation_level = None
+
+    if read_only:
+        @event.listens_for(new_engine, "begin")
+        def _on_begin(connection):
+            # One snapshot per read session: every query sees the same commit
+            connection.exec_driver_sql("BEGIN")
+
+    return new_engine
+
+
 # Create engine ONCE
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_recycle=3600
-)
+engine = _create_engine()
+
+# Read-only engine for reports, rankings and HTTP handlers. On a SQLite file
+# it has its own connections, so long reads never hold up sync writers;
+# elsewhere (other databases, in-memory SQLite) it is the main engine
+read_engine = _create_engine(read_only=True) if _is_sqlite_file(engine.url) else engine
 
 # Create session factory ONCE
 SessionLocal = sessionmaker(bind=engine)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False)
 
 # Create scoped session ONCE
 Session = scoped_session(SessionLocal)
@@ -98,6 +160,25 @@ def fresh_session() -> Generator[SessionType, None, None]:
         session.close()
 
 
+@contextmanager
+def read_session_scope() -> Generator[SessionType, None, None]:
+    """
+    Provide a read-only session on the read engine.
+    Use this for reports, rankings and HTTP handlers: the session reads one
+    consistent snapshot and never commits, so it can't block sync writes.
+    
+    Usage:
+        with read_session_scope() as session:
+            session.query(Model).all()
+    """
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        # Ends the read transaction; loaded objects stay usable (detached)
+        session.close()
+
+
 def clear_session():
     """
     Clear the current session.
@@ -146,6 +227,8 @@ def dispose_engine():
     Call this when shutting down the application.
     """
     engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
 
 
 # ============================================================================
@@ -251,6 +334,7 @@ __all__ = [
     'get_session',
     'session_scope',
     'fresh_session',
+    'read_session_scope',
     'clear_session',
     
     # Database management
@@ -269,6 +353,8 @@ __all__ = [
     # Base and engine (for models and special cases only)
     'Base',
     'engine',
+    'read_engine',
+    'apply_sqlite_pragmas',
 ]
 
 # Only print if explicitly requested via environment variable
@@ -21,7 +21,7 @@ from polymorphic_core import announcer
 from polymorphic_core.service_locator import get_service
 
 # Use existing SSOT database module
-from utils.database import session_scope
+from utils.database import session_scope, read_session_scope
 
 
 @dataclass
@@ -94,6 +94,7 @@ class DatabaseService:
             ask("recent tournaments")
             ask("stats")
             ask("tournament 123 placements")
+            ask("monthly attendance", region="socal")
         """
         query_lower = query.lower().strip()
         
@@ -101,6 +102,10 @@ class DatabaseService:
         if any(word in query_lower for word in ["stats", "statistics", "summary"]):
             return self._get_summary_stats()
         
+        # Monthly attendance from the attendance_monthly rollup
+        if "attendance" in query_lower and any(word in query_lower for word in ["monthly", "timeline", "per month"]):
+            return self._get_attendance_timeline(**kwargs)
+        
         # Rankings queries (check before other categories)
         if any(word in query_lower for word in ["ranking", "leaderboard", "top", "best"]) and "tournament" not in query_lower:
             # Check what type of ranking is requested
@@ -278,6 +283,8 @@ class DatabaseService:
             do("update player 456 tag='NewTag'")
             do("assign tournament 123 to org 789")
             do("cleanup old logs")
+            do("check attendance rollup")
+            do("rebuild attendance rollup")
         """
         action_lower = action.lower().strip()
         
@@ -307,6 +314,13 @@ class DatabaseService:
             if "tournament" in action_lower:
                 return self._assign_tournament_to_org(action, **kwargs)
         
+        # Attendance rollup maintenance
+        if "attendance" in action_lower and "rollup" in action_lower:
+            if "check" in action_lower or "verify" in action_lower:
+                return self._check_attendance_rollup()
+            if "rebuild" in action_lower:
+                return self._rebuild_attendance_rollup()
+        
         # Cleanup operations
         if any(word in action_lower for word in ["cleanup", "clean", "delete old"]):
             return self._cleanup_old_data(action, **kwargs)
@@ -328,6 +342,12 @@ class DatabaseService:
         with session_scope() as session:
             yield session
     
+    @contextmanager
+    def _read_scope(self):
+        """Private context manager for read-only snapshot sessions (never commits)"""
+        with read_session_scope() as session:
+            yield session
+    
     @staticmethod
     def _normalize_contact(contact: str) -> str:
         """Normalize contact for comparison"""
@@ -358,7 +378,7 @@ class DatabaseService:
         """Get database summary statistics"""
         from database.tournament_models import Tournament, Organization, Player, TournamentPlacement
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             return DatabaseStats(
                 total_organizations=session.query(Organization).count(),
                 total_tournaments=session.query(Tournament).count(),
@@ -373,7 +393,7 @@ class DatabaseService:
         """Get attendance rankings for reporting"""
         from utils.unified_tabulator import UnifiedTabulator
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             # Use the unified tabulator for organization attendance rankings
             ranked_items = UnifiedTabulator.tabulate_org_attendance(session, limit)
             
@@ -388,12 +408,39 @@ class DatabaseService:
                 for item in ranked_items
             ]
     
+    def _get_attendance_timeline(self, organization: Optional[str] = None, region: Optional[str] = None,
+                                 since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Monthly tournament count and attendance from the attendance_monthly rollup"""
+        from database.attendance_rollup import monthly_totals
+        
+        with self._read_scope() as session:
+            return monthly_totals(session, organization=organization, region=region, since=since, until=until)
+    
+    def _check_attendance_rollup(self) -> Dict[str, Any]:
+        """Compare attendance_monthly with the tournaments table"""
+        from database.attendance_rollup import check
+        
+        with self._read_scope() as session:
+            result = check(session)
+        status = "✅ consistent" if result['consistent'] else f"⚠️ {len(result['differences'])} buckets differ"
+        announcer.announce("Attendance Rollup", [f"{status} ({result['buckets']} buckets)"])
+        return result
+    
+    def _rebuild_attendance_rollup(self) -> Dict[str, Any]:
+        """Recompute attendance_monthly from the tournaments table"""
+        from database.attendance_rollup import rebuild
+        
+        with self._session_scope() as session:
+            buckets = rebuild(session)
+        announcer.announce("Attendance Rollup", [f"🔄 Rebuilt {buckets} buckets"])
+        return {'rebuilt': True, 'buckets': buckets}
+    
     def _get_organizations_with_stats(self) -> List[Dict[str, Any]]:
         """Get organizations with tournament and attendance stats"""
         from database.tournament_models import Organization, Tournament
         from sqlalchemy import func
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             results = session.query(
                 Organization.id,
                 Organization.display_name,
@@ -422,7 +469,7 @@ class DatabaseService:
         
         cutoff = (datetime.now() - timedelta(days=days)).timestamp()
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             tournaments = session.query(Tournament).filter(
                 Tournament.end_at >= cutoff
             ).order_by(Tournament.start_at.desc()).all()
@@ -444,7 +491,7 @@ class DatabaseService:
         from database.tournament_models import Player, TournamentPlacement
         from sqlalchemy import func
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             # Calculate points: 1st=8pts, 2nd=7pts, ..., 8th=1pt
             rankings = session.query(
                 Player.id,
@@ -476,7 +523,7 @@ class DatabaseService:
         """Get a specific tournament by ID"""
         from database.tournament_models import Tournament
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             tournament = session.query(Tournament).filter_by(id=str(tournament_id)).first()
             if tournament:
                 return {
@@ -494,7 +541,7 @@ class DatabaseService:
         """Get tournaments that have location data"""
         from database.tournament_models import Tournament
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             query = session.query(Tournament).filter(
                 Tournament.lat.isnot(None),
                 Tournament.lng.isnot(None)
@@ -538,7 +585,7 @@ class DatabaseService:
         """Get organizations with their location data (for visualization services)"""
         from database.tournament_models import Organization
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             orgs = session.query(Organization).filter(
                 Organization.lat.isnot(None),
                 Organization.lng.isnot(None)
@@ -559,7 +606,7 @@ class DatabaseService:
         """Get all tournaments"""
         from database.tournament_models import Tournament
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             tournaments = session.query(Tournament).all()
             return [
                 {
@@ -575,7 +622,7 @@ class DatabaseService:
         """Get all organizations"""
         from database.tournament_models import Organization
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             orgs = session.query(Organization).all()
             return [
                 {
@@ -590,7 +637,7 @@ class DatabaseService:
         """Get all players"""
         from database.tournament_models import Player
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             players = session.query(Player).all()
             return [
                 {
@@ -605,7 +652,7 @@ class DatabaseService:
         """Get a specific organization by ID"""
         from database.tournament_models import Organization
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             org = session.query(Organization).filter_by(id=org_id).first()
             if org:
                 return {
@@ -620,7 +667,7 @@ class DatabaseService:
         from database.tournament_models import Organization, Tournament
         from sqlalchemy import func
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             # Organizations are independent - they're identified from tournament owner_name
             # Count tournaments by owner_name matching organization display_name
             organizations = session.query(Organization).all()
@@ -667,7 +714,7 @@ class DatabaseService:
         """Get a specific player by ID"""
         from database.tournament_models import Player
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             player = session.query(Player).filter_by(id=player_id).first()
             if player:
                 return {
@@ -682,7 +729,7 @@ class DatabaseService:
         """Search for players by name/tag"""
         from database.tournament_models import Player
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             players = session.query(Player).filter(
                 Player.gamer_tag.ilike(f'%{name}%')
             ).limit(10).all()
@@ -700,7 +747,7 @@ class DatabaseService:
         """Get placements for a tournament"""
         from database.tournament_models import TournamentPlacement, Player
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             placements = session.query(
                 TournamentPlacement, Player
             ).join(
@@ -804,7 +851,7 @@ class DatabaseService:
         """Get tournaments for an organization"""
         from database.tournament_models import Tournament
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             tournaments = session.query(Tournament).filter_by(
                 organization_id=org_id
             ).all()
@@ -822,7 +869,7 @@ class DatabaseService:
         """Get tournament placements for a player"""
         from database.tournament_models import TournamentPlacement, Tournament
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             placements = session.query(
                 TournamentPlacement, Tournament
             ).join(
@@ -847,7 +894,7 @@ class DatabaseService:
         from database.tournament_models import Tournament, TournamentPlacement
         from sqlalchemy import and_, not_, exists
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             # Find tournaments without any placements
             subquery = session.query(TournamentPlacement.tournament_id).subquery()
             
@@ -1022,7 +1069,7 @@ class DatabaseService:
         
         from database.tournament_models import Tournament, Player, Organization
         
-        with self._session_scope() as session:
+        with self._read_scope() as session:
             # Search tournaments
             tournaments = session.query(Tournament).filter(
                 Tournament.name.ilike(f'%{search_term}%')
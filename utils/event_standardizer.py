@@ -2,15 +2,45 @@
 """
 Event name standardization for tournament tracker
 Maps various event names to standardized categories
+
+Each ordered pattern table is compiled once into a single regex that keeps
+the table's priority (first category with any matching pattern wins), and
+results are memoized per raw name. EventNameMap persists the raw ->
+canonical mapping in the database so bulk normalization can be one join.
 """
 
 import re
-from typing import Optional, Tuple
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
 
 # CRITICAL: Enforce go.py execution - this module CANNOT be run directly
 from polymorphic_core.execution_guard import require_go_py
 require_go_py("utils.event_standardizer")
 
+def compile_priority_patterns(table: Dict[str, List[str]]) -> Pattern:
+    """
+    One regex for an ordered {category: [patterns]} table.
+
+    Matched from position 0, each category is a lookahead that searches the
+    whole string, tried in table order, so match.lastgroup is exactly the
+    first category a re.search over its patterns would have found. Only the
+    glue skipping ahead crosses newlines ((?s:...)); the patterns keep their
+    own flags.
+    """
+    branches = []
+    for category, patterns in table.items():
+        alternation = '|'.join(f'(?:{p})' for p in patterns)
+        branches.append(f'(?=(?s:.*?)(?:{alternation}))(?P<{category}>)')
+    return re.compile('|'.join(branches))
+
+
+def compile_any_pattern(patterns: Iterable[str]) -> Pattern:
+    """One regex that searches for any of the patterns"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns))
+
+
 class EventStandardizer:
     """Standardize event names to consistent categories"""
     
@@ -77,6 +107,19 @@ class EventStandardizer:
         r'crew\s*battle'
     ]
     
+    # Compiled matchers (see compile_priority_patterns)
+    _game_matcher = compile_priority_patterns(GAME_PATTERNS)
+    _format_matcher = compile_priority_patterns(FORMAT_PATTERNS)
+    _special_matcher = compile_any_pattern(SPECIAL_PATTERNS)
+    _bracket_matcher = re.compile(r'tournament|bracket')
+    _school_matcher = re.compile(r'elementary|middle|high\s*school')
+    
+    @classmethod
+    def rules_version(cls) -> str:
+        """Fingerprint of the pattern tables; persisted mappings from other rules are stale"""
+        rules = json.dumps([cls.GAME_PATTERNS, cls.FORMAT_PATTERNS, cls.SPECIAL_PATTERNS])
+        return hashlib.sha1(rules.encode('utf-8')).hexdigest()[:12]
+    
     @classmethod
     def standardize(cls, event_name: str) -> dict:
         """
@@ -88,6 +131,12 @@ class EventStandardizer:
         - is_special: Whether this is a special/side event
         - standard_name: Standardized name for grouping
         """
+        # Memoized per raw name; callers get their own copy
+        return dict(_standardize_cached(cls, event_name))
+    
+    @classmethod
+    def _standardize(cls, event_name: str) -> dict:
+        """Uncached standardize()"""
         if not event_name:
             return {
                 'game': 'unknown',
@@ -121,26 +170,22 @@ class EventStandardizer:
     @classmethod
     def _detect_game(cls, event_lower: str) -> str:
         """Detect which game this event is for"""
-        for game, patterns in cls.GAME_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, event_lower):
-                    return game
-        return 'unknown'
+        match = cls._game_matcher.match(event_lower)
+        return match.lastgroup if match else 'unknown'
     
     @classmethod
     def _detect_format(cls, event_lower: str) -> str:
         """Detect the format of the event"""
         # Check explicit format patterns
-        for format_type, patterns in cls.FORMAT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, event_lower):
-                    return format_type
+        match = cls._format_matcher.match(event_lower)
+        if match:
+            return match.lastgroup
         
         # Default heuristics
         # If it's a tournament/bracket without other qualifiers, assume singles
-        if re.search(r'tournament|bracket', event_lower):
+        if cls._bracket_matcher.search(event_lower):
             # But not if it's a school bracket
-            if not re.search(r'elementary|middle|high\s*school', event_lower):
+            if not cls._school_matcher.search(event_lower):
                 return 'singles'
         
         return 'unknown'
@@ -148,10 +193,7 @@ class EventStandardizer:
     @classmethod
     def _is_special(cls, event_lower: str) -> bool:
         """Check if this is a special/side event"""
-        for pattern in cls.SPECIAL_PATTERNS:
-            if re.search(pattern, event_lower):
-                return True
-        return False
+        return cls._special_matcher.search(event_lower) is not None
     
     @classmethod
     def _generate_standard_name(cls, game: str, format_type: str, is_special: bool) -> str:
@@ -190,6 +232,62 @@ class EventStandardizer:
         return ' '.join(parts)
 
 
+@lru_cache(maxsize=65536)
+def _standardize_cached(standardizer: type, event_name: str) -> dict:
+    return standardizer._standardize(event_name)
+
+
+class EventNameMap:
+    """
+    Persisted raw event name -> standardized fields (table event_name_map).
+
+    Works on a DB-API connection (qmark parameters, e.g. sqlite3). Rows
+    written under other pattern rules are recomputed on sync. The table is
+    created by alembic revision a6d40e9b3f17; ensure_table is for scratch
+    databases outside the migrations.
+    """
+    
+    TABLE = 'event_name_map'
+    
+    def __init__(self, conn, standardizer: type = EventStandardizer):
+        self.conn = conn
+        self.standardizer = standardizer
+        self.version = standardizer.rules_version()
+    
+    def ensure_table(self) -> None:
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                raw_name TEXT PRIMARY KEY,
+                game TEXT NOT NULL,
+                format TEXT NOT NULL,
+                is_special INTEGER NOT NULL,
+                standard_name TEXT NOT NULL,
+                rules_version TEXT NOT NULL
+            )""")
+    
+    def sync(self, raw_names: Iterable[str]) -> int:
+        """Map every raw name not mapped under the current rules; returns how many were added"""
+        current = {row[0] for row in self.conn.execute(
+            f"SELECT raw_name FROM {self.TABLE} WHERE rules_version = ?", (self.version,))}
+        rows = []
+        for raw in raw_names:
+            if raw and raw not in current:
+                result = self.standardizer.standardize(raw)
+                rows.append((raw, result['game'], result['format'], int(result['is_special']),
+                             result['standard_name'], self.version))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {self.TABLE} "
+            f"(raw_name, game, format, is_special, standard_name, rules_version) VALUES (?, ?, ?, ?, ?, ?)",
+            rows)
+        return len(rows)
+    
+    def lookup(self, raw_name: str) -> Optional[str]:
+        row = self.conn.execute(
+            f"SELECT standard_name FROM {self.TABLE} WHERE raw_name = ? AND rules_version = ?",
+            (raw_name, self.version)).fetchone()
+        return row[0] if row else None
+
+
 def test_standardizer():
     """Test the event standardizer with sample data"""
     test_events = [
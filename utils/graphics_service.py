@@ -328,12 +328,7 @@ class GraphicsService:
         if not self.plt:
             return None
         
-        try:
-            import matplotlib.cm as cm
-            from scipy.stats import gaussian_kde
-        except ImportError:
-            logger.error("scipy required for static heatmaps. Run: pip install scipy")
-            return None
+        from math_services.density_engine import density_grid
         
         # Extract coordinates and weights
         lats = [p[0] for p in points]
@@ -349,32 +344,29 @@ class GraphicsService:
         lng_min = kwargs.get('lng_min', -119)
         lng_max = kwargs.get('lng_max', -116)
         
-        # Add map background if available
-        if kwargs.get('map_background', True) and self.ctx:
+        # Add map background from the offline tile store (plain background for missing tiles)
+        if kwargs.get('map_background', True):
             try:
-                # Convert to Web Mercator
-                import contextily as ctx
-                from matplotlib import patheffects
+                from utils.tile_store import add_basemap
                 
                 ax.set_xlim(lng_min, lng_max)
                 ax.set_ylim(lat_min, lat_max)
                 
                 # Add basemap
-                ctx.add_basemap(ax, crs='EPSG:4326', source=ctx.providers.CartoDB.Positron)
+                add_basemap(ax, (lng_min, lat_min, lng_max, lat_max), zoom=kwargs.get('zoom', 'auto'))
             except Exception as e:
                 logger.warning(f"Could not add map background: {e}")
         
         # Create density plot
         if len(points) > 1:
             try:
-                # Create KDE
-                positions = np.vstack([lngs, lats])
-                kernel = gaussian_kde(positions, weights=weights)
-                
-                # Create grid
+                # Binned FFT KDE on the same grid
                 xx, yy = np.mgrid[lng_min:lng_max:100j, lat_min:lat_max:100j]
-                positions_grid = np.vstack([xx.ravel(), yy.ravel()])
-                density = kernel(positions_grid).T.reshape(xx.shape)
+                density = density_grid(lats, lngs, weights,
+                                       lat_range=(lat_min, lat_max),
+                                       lng_range=(lng_min, lng_max),
+                                       size=xx.shape,
+                                       bandwidth_km=kwargs.get('bandwidth_km'))
                 
                 # Plot density
                 im = ax.contourf(xx, yy, density, levels=15, cmap='hot', alpha=0.6)
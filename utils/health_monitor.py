@@ -2,14 +2,23 @@
 """
 health_monitor.py - Service Health Monitoring with 3-Method Pattern
 Monitors all services and provides health status via ask/tell/do interface
+
+A sweep probes every port at once on an asyncio loop (short connect
+timeouts) and matches every process-backed service against one snapshot
+of the process table, so it takes about as long as the slowest probe
+however many services are monitored. Each service keeps a rolling
+history of results for uptime and latency percentiles.
 """
 import sys
 import os
+import math
 import time
 import psutil
-import socket
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 from dataclasses import dataclass, field
 from threading import Thread, Lock
 
@@ -23,6 +32,11 @@ from polymorphic_core import announcer
 from utils.simple_logger import info, warning, error
 from utils.config_service import get_config
 
+# Seconds to wait for a port to accept before calling it down
+PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '0.5'))
+# Checks remembered per service for uptime and latency percentiles
+HISTORY_SIZE = int(os.getenv('HEALTH_HISTORY_SIZE', '120'))
+
 
 @dataclass
 class ServiceHealth:
@@ -36,6 +50,13 @@ class ServiceHealth:
     details: Dict[str, Any] = field(default_factory=dict)
 
 
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
 class HealthMonitor:
     """
     Service health monitoring with 3-method pattern
@@ -43,6 +64,8 @@ class HealthMonitor:
     
     def __init__(self):
         self._services: Dict[str, ServiceHealth] = {}
+        self._history: Dict[str, deque] = {}
+        self._last_sweep_ms = 0.0
         self._lock = Lock()
         self._monitoring = False
         self._monitor_thread: Optional[Thread] = None
@@ -64,10 +87,13 @@ class HealthMonitor:
                 "ask('service status') - Get health status",
                 "tell('discord', health) - Format health reports",
                 "do('start monitoring') - Begin health checks",
-                "Monitors ports, processes, and service responses"
+                "Monitors ports, processes, and service responses",
+                "Probes every service concurrently in one sweep",
+                "ask('latency') - p50/p95/p99 and uptime per service"
             ],
             [
                 "health.ask('all services')",
+                "health.ask('discord latency')",
                 "health.do('check discord')",
                 "health.tell('discord')"
             ]
@@ -93,6 +119,10 @@ class HealthMonitor:
         elif "system" in query and "health" in query:
             return self._get_system_health()
         
+        elif "latency" in query or "history" in query or "percentile" in query:
+            names = [name for name in self._known_services if name in query] or list(self._known_services)
+            return {name: self._get_history_summary(name) for name in names}
+        
         elif any(service in query for service in self._known_services.keys()):
             # Check specific service
             for service_name in self._known_services.keys():
@@ -129,6 +159,10 @@ class HealthMonitor:
                         lines.append(f"{status_emoji} {health.name}: {health.status}")
                         if health.response_time > 0:
                             lines.append(f"   Response: {health.response_time:.2f}ms")
+                        summary = self._get_history_summary(service_name)
+                        if summary["checks"] > 1:
+                            lines.append(f"   Last {summary['checks']} checks: {summary['uptime']:.0f}% up, "
+                                         f"p95 {summary['p95_ms']:.2f}ms")
                     else:
                         lines.append(f"• {service_name}: {health}")
                 
@@ -167,6 +201,7 @@ class HealthMonitor:
         
         elif "reset" in action:
             self._services.clear()
+            self._history.clear()
             return "Health history reset"
         
         else:
@@ -204,109 +239,149 @@ class HealthMonitor:
                 time.sleep(60)  # Wait longer on error
     
     def _check_all_services(self) -> Dict[str, ServiceHealth]:
-        """Check health of all known services"""
+        """Check health of all known services in one concurrent sweep"""
+        return self._run_sweep(list(self._known_services.keys()))
+    
+    def _check_service(self, service_name: str) -> ServiceHealth:
+        """Check health of a specific service"""
+        return self._run_sweep([service_name])[service_name]
+    
+    def _run_sweep(self, service_names: List[str]) -> Dict[str, ServiceHealth]:
+        """Run a sweep from sync code, including from inside a running event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.sweep(service_names))
+        # Called from an async handler: sweep on a worker thread's own loop
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-sweep") as pool:
+            return pool.submit(asyncio.run, self.sweep(service_names)).result()
+    
+    async def sweep(self, service_names: Optional[Iterable[str]] = None) -> Dict[str, ServiceHealth]:
+        """Probe services concurrently; one process-table snapshot serves every process check"""
+        names = list(self._known_services.keys() if service_names is None else service_names)
+        configs = {name: self._known_services.get(name, {}) for name in names}
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        
+        # Each distinct port is probed once, even if several services share it
+        ports = {config["port"] for config in configs.values() if config.get("port")}
+        port_probes = {port: asyncio.ensure_future(self._probe_port(port)) for port in ports}
+        snapshot = None
+        if any(not config.get("port") and config.get("process_name") for config in configs.values()):
+            snapshot = await loop.run_in_executor(None, self._process_snapshot)
+        port_results = dict(zip(port_probes, await asyncio.gather(*port_probes.values())))
+        
         results = {}
+        for name, config in configs.items():
+            try:
+                results[name] = self._evaluate(name, config, port_results, snapshot)
+            except Exception as e:
+                error(f"Failed to check {name}: {e}")
+                results[name] = ServiceHealth(name=name, status="unknown", last_check=datetime.now(),
+                                              details={"error": str(e)})
         
         with self._lock:
-            for service_name in self._known_services.keys():
-                try:
-                    health = self._check_service(service_name)
-                    self._services[service_name] = health
-                    results[service_name] = health
-                except Exception as e:
-                    error(f"Failed to check {service_name}: {e}")
-                    health = ServiceHealth(
-                        name=service_name,
-                        status="unknown",
-                        last_check=datetime.now(),
-                        details={"error": str(e)}
-                    )
-                    self._services[service_name] = health
-                    results[service_name] = health
-        
+            for name, health in results.items():
+                self._services[name] = health
+                history = self._history.setdefault(name, deque(maxlen=HISTORY_SIZE))
+                history.append((health.last_check, health.status, health.response_time))
+            self._last_sweep_ms = (time.perf_counter() - start) * 1000
         return results
     
-    def _check_service(self, service_name: str) -> ServiceHealth:
-        """Check health of a specific service"""
-        service_config = self._known_services.get(service_name, {})
-        start_time = time.time()
-        
+    def _evaluate(self, service_name: str, service_config: Dict[str, Any],
+                  port_results: Dict[int, Tuple[bool, float, Optional[str]]],
+                  snapshot: Optional[List[Tuple[int, str]]]) -> ServiceHealth:
+        """Turn the sweep's probe results into one service's health"""
         health = ServiceHealth(
             name=service_name,
             status="unknown",
             last_check=datetime.now()
         )
         
-        try:
-            # Check if it's a database file
-            if "file_path" in service_config:
-                file_path = service_config["file_path"]
-                if os.path.exists(file_path):
-                    file_size = os.path.getsize(file_path)
-                    health.status = "healthy"
-                    health.details = {"file_size": file_size}
-                else:
-                    health.status = "unhealthy"
-                    health.details = {"error": "Database file not found"}
-            
-            # Check port if specified
-            elif service_config.get("port"):
-                port = service_config["port"]
-                if self._check_port(port):
-                    health.status = "healthy"
-                    health.details = {"port": port, "listening": True}
-                else:
-                    health.status = "unhealthy" 
-                    health.details = {"port": port, "listening": False}
-            
-            # Check process
-            elif service_config.get("process_name"):
-                process_name = service_config["process_name"]
-                processes = self._find_processes(process_name)
-                if processes:
-                    health.status = "healthy"
-                    health.details = {
-                        "processes": len(processes),
-                        "pids": [p.pid for p in processes]
-                    }
-                else:
-                    health.status = "unhealthy"
-                    health.details = {"process": process_name, "running": False}
-            
-            health.response_time = (time.time() - start_time) * 1000
-            
-        except Exception as e:
-            health.status = "unhealthy"
-            health.details = {"error": str(e)}
-            health.response_time = (time.time() - start_time) * 1000
+        # Check if it's a database file
+        if "file_path" in service_config:
+            start_time = time.perf_counter()
+            file_path = service_config["file_path"]
+            if os.path.exists(file_path):
+                file_size = os.path.getsize(file_path)
+                health.status = "healthy"
+                health.details = {"file_size": file_size}
+            else:
+                health.status = "unhealthy"
+                health.details = {"error": "Database file not found"}
+            health.response_time = (time.perf_counter() - start_time) * 1000
+        
+        # Check port if specified
+        elif service_config.get("port"):
+            port = service_config["port"]
+            listening, latency_ms, probe_error = port_results[port]
+            health.status = "healthy" if listening else "unhealthy"
+            health.details = {"port": port, "listening": listening}
+            if probe_error:
+                health.details["error"] = probe_error
+            health.response_time = latency_ms
+        
+        # Check process
+        elif service_config.get("process_name"):
+            process_name = service_config["process_name"]
+            pids = [pid for pid, cmdline in snapshot if process_name in cmdline]
+            if pids:
+                health.status = "healthy"
+                health.details = {
+                    "processes": len(pids),
+                    "pids": pids
+                }
+            else:
+                health.status = "unhealthy"
+                health.details = {"process": process_name, "running": False}
         
         return health
     
-    def _check_port(self, port: int) -> bool:
-        """Check if a port is listening"""
+    async def _probe_port(self, port: int, host: str = 'localhost') -> Tuple[bool, float, Optional[str]]:
+        """(listening, connect latency in ms, error) for one port"""
+        start = time.perf_counter()
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(3)
-                result = sock.connect_ex(('localhost', port))
-                return result == 0
-        except:
-            return False
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=PROBE_TIMEOUT)
+            latency = (time.perf_counter() - start) * 1000
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            return True, latency, None
+        except asyncio.TimeoutError:
+            return False, (time.perf_counter() - start) * 1000, f"no answer in {PROBE_TIMEOUT}s"
+        except (ConnectionError, OSError) as e:
+            return False, (time.perf_counter() - start) * 1000, e.strerror or str(e)
     
-    def _find_processes(self, process_name: str) -> List[psutil.Process]:
-        """Find processes by name"""
-        processes = []
+    def _process_snapshot(self) -> List[Tuple[int, str]]:
+        """(pid, command line) for every process, read once per sweep"""
+        snapshot = []
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            for proc in psutil.process_iter(['pid', 'cmdline']):
                 try:
-                    cmdline = ' '.join(proc.info['cmdline'] or [])
-                    if process_name in cmdline:
-                        processes.append(proc)
+                    snapshot.append((proc.info['pid'], ' '.join(proc.info['cmdline'] or [])))
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
         except Exception as e:
             error(f"Error finding processes: {e}")
-        
-        return processes
+        return snapshot
+    
+    def _get_history_summary(self, service_name: str) -> Dict[str, Any]:
+        """Uptime and latency percentiles over a service's recent checks"""
+        with self._lock:
+            history = list(self._history.get(service_name, ()))
+        latencies = sorted(latency for _, status, latency in history if status == "healthy")
+        healthy = sum(1 for _, status, _ in history if status == "healthy")
+        return {
+            "checks": len(history),
+            "uptime": (healthy / len(history) * 100) if history else 0.0,
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+            "last_status": history[-1][1] if history else "unknown",
+            "since": history[0][0] if history else None
+        }
     
     def _get_all_health(self) -> Dict[str, ServiceHealth]:
         """Get health status of all services"""
@@ -333,7 +408,8 @@ class HealthMonitor:
             "healthy_services": healthy_services,
             "unhealthy_services": total_services - healthy_services,
             "health_percentage": (healthy_services / total_services * 100) if total_services > 0 else 0,
-            "system_status": "healthy" if healthy_services == total_services else "degraded"
+            "system_status": "healthy" if healthy_services == total_services else "degraded",
+            "last_sweep_ms": round(self._last_sweep_ms, 2)
         }
 
 
@@ -3,7 +3,7 @@ html_renderer.py - HTML Rendering Service
 Modern OOP replacement for html_utils.py
 Stateful HTML renderer with templates, themes, and component generation
 """
-from typing import List, Tuple, Dict, Any, Optional, Callable
+from typing import List, Tuple, Dict, Any, Optional, Callable, Iterable, Iterator, Union
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import html
@@ -13,6 +13,8 @@ import json
 from polymorphic_core.execution_guard import require_go_py
 require_go_py("utils.html_renderer")
 
+from utils.template_engine import template_engine
+
 
 class HTMLRenderer:
     """Stateful HTML rendering service with theming and templates"""
@@ -23,7 +25,9 @@ class HTMLRenderer:
         self.template_dir = template_dir or Path('.')
         self._templates_cache = {}
         self._components = {}
-        self._current_page = []
+        self._current_page: List[Union[str, Iterator[str]]] = []
+        # Compiled Jinja2 layouts when available, string builders otherwise
+        self.use_templates = template_engine.available()
         
         # Theme configurations
         self.themes = {
@@ -88,6 +92,13 @@ class HTMLRenderer:
         """Start building a new HTML page"""
         self._current_page = []
         
+        if self.use_templates:
+            self._current_page.append(template_engine.render(
+                'page_head.html', title=title, subtitle=subtitle, meta_tags=meta_tags or {},
+                styles=template_engine.theme_css(self.theme, self.current_theme)
+            ))
+            return self
+        
         # Build head section
         self._current_page.append('<!DOCTYPE html>')
         self._current_page.append('<html lang="en">')
@@ -152,6 +163,22 @@ class HTMLRenderer:
         self._current_page.append(table_html)
         return self
     
+    def add_streamed_table(self, headers: List[str], rows: Iterable[List[Any]],
+                           table_id: Optional[str] = None,
+                           sortable: bool = False,
+                           row_formatter: Optional[Callable] = None) -> 'HTMLRenderer':
+        """Add a large table that is rendered in row chunks when the page is streamed"""
+        if self.use_templates:
+            self._current_page.append(template_engine.stream(
+                'table.html', headers=headers, rows=rows, table_id=table_id,
+                sortable=sortable, row_formatter=row_formatter
+            ))
+        else:
+            self._current_page.append(self._data_table_component(
+                headers, list(rows), table_id, sortable, row_formatter
+            ))
+        return self
+    
     def add_nav_links(self, links: List[Tuple[str, str]]) -> 'HTMLRenderer':
         """Add navigation links"""
         nav_html = self._nav_bar_component(links)
@@ -160,6 +187,10 @@ class HTMLRenderer:
     
     def add_stats_cards(self, stats: List[Dict[str, Any]]) -> 'HTMLRenderer':
         """Add statistics cards"""
+        if self.use_templates:
+            self._current_page.append(str(template_engine.macro('macros.html', 'stats_cards')(stats)))
+            return self
+        
         cards_html = '<div class="stats-container">'
         for stat in stats:
             cards_html += self._stats_card_component(
@@ -174,13 +205,22 @@ class HTMLRenderer:
     
     def finish_page(self) -> str:
         """Finish building the page and return HTML"""
+        return ''.join(self.stream_page())
+    
+    def stream_page(self) -> Iterator[str]:
+        """Finish the page and yield it in pieces (streamed tables in row chunks)"""
         self._current_page.append(self._footer_component())
         self._current_page.append('</body>')
         self._current_page.append('</html>')
         
-        result = '\n'.join(self._current_page)
-        self._current_page = []  # Clear for next page
-        return result
+        parts, self._current_page = self._current_page, []  # Clear for next page
+        for i, part in enumerate(parts):
+            if i:
+                yield '\n'
+            if isinstance(part, str):
+                yield part
+            else:
+                yield from part
     
     def render_template(self, template_name: str, context: Dict[str, Any]) -> str:
         """Render a template file with context"""
@@ -211,172 +251,16 @@ class HTMLRenderer:
     # Component implementations
     
     def _generate_styles(self) -> str:
-        """Generate CSS styles based on current theme"""
-        theme = self.current_theme
+        """CSS styles for the current theme (rendered once per theme, see templates/layouts/theme.css)"""
         return f'''
     <style>
-        :root {{
-            --bg-color: {theme['bg_color']};
-            --text-color: {theme['text_color']};
-            --accent-color: {theme['accent_color']};
-            --link-color: {theme['link_color']};
-            --border-color: {theme['border_color']};
-            --table-header-bg: {theme['table_header_bg']};
-        }}
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background-color: var(--bg-color);
-            color: var(--text-color);
-            line-height: 1.6;
-            padding: 2rem;
-        }}
-        
-        h1.page-title {{
-            color: var(--accent-color);
-            margin-bottom: 0.5rem;
-            font-size: 2.5rem;
-        }}
-        
-        p.page-subtitle {{
-            color: var(--text-color);
-            opacity: 0.8;
-            margin-bottom: 2rem;
-        }}
-        
-        a {{
-            color: var(--link-color);
-            text-decoration: none;
-        }}
-        
-        a:hover {{
-            text-decoration: underline;
-        }}
-        
-        .nav-links {{
-            background: rgba(255, 255, 255, 0.05);
-            padding: 1rem;
-            border-radius: 8px;
-            margin: 1rem 0;
-            display: flex;
-            gap: 1rem;
-            flex-wrap: wrap;
-        }}
-        
-        .nav-links a {{
-            padding: 0.5rem 1rem;
-            background: var(--accent-color);
-            color: white;
-            border-radius: 4px;
-            transition: opacity 0.3s;
-        }}
-        
-        .nav-links a:hover {{
-            opacity: 0.8;
-            text-decoration: none;
-        }}
-        
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 1rem 0;
-            background: rgba(255, 255, 255, 0.02);
-        }}
-        
-        th {{
-            background: var(--table-header-bg);
-            padding: 0.75rem;
-            text-align: left;
-            font-weight: 600;
-            border-bottom: 2px solid var(--border-color);
-        }}
-        
-        td {{
-            padding: 0.75rem;
-            border-bottom: 1px solid var(--border-color);
-        }}
-        
-        tr:hover {{
-            background: rgba(255, 255, 255, 0.05);
-        }}
-        
-        .stats-container {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1rem;
-            margin: 2rem 0;
-        }}
-        
-        .stat-card {{
-            background: rgba(255, 255, 255, 0.05);
-            padding: 1.5rem;
-            border-radius: 8px;
-            border: 1px solid var(--border-color);
-        }}
-        
-        .stat-value {{
-            font-size: 2rem;
-            font-weight: bold;
-            color: var(--accent-color);
-        }}
-        
-        .stat-title {{
-            font-size: 0.9rem;
-            opacity: 0.8;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .stat-subtitle {{
-            font-size: 0.8rem;
-            opacity: 0.6;
-            margin-top: 0.5rem;
-        }}
-        
-        .content-section {{
-            margin: 2rem 0;
-            padding: 1.5rem;
-            background: rgba(255, 255, 255, 0.02);
-            border-radius: 8px;
-            border: 1px solid var(--border-color);
-        }}
-        
-        .content-section h2 {{
-            color: var(--accent-color);
-            margin-bottom: 1rem;
-        }}
-        
-        .footer {{
-            margin-top: 3rem;
-            padding-top: 1rem;
-            border-top: 1px solid var(--border-color);
-            text-align: center;
-            opacity: 0.6;
-            font-size: 0.9rem;
-        }}
-        
-        @media (max-width: 768px) {{
-            body {{
-                padding: 1rem;
-            }}
-            
-            h1.page-title {{
-                font-size: 1.8rem;
-            }}
-            
-            .stats-container {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-    </style>'''
+{template_engine.theme_css(self.theme, self.current_theme)}    </style>'''
     
     def _nav_bar_component(self, links: List[Tuple[str, str]]) -> str:
         """Generate navigation bar component"""
+        if self.use_templates:
+            return str(template_engine.macro('macros.html', 'nav_links')(links))
+        
         nav_html = '<div class="nav-links">'
         for url, text in links:
             nav_html += f'<a href="{html.escape(url)}">{html.escape(text)}</a>'
@@ -385,6 +269,9 @@ class HTMLRenderer:
     
     def _stats_card_component(self, title: str, value: str, subtitle: str = "", icon: str = "") -> str:
         """Generate statistics card component"""
+        if self.use_templates:
+            return str(template_engine.macro('macros.html', 'stat_card')(title, value, subtitle))
+        
         return f'''
     <div class="stat-card">
         <div class="stat-title">{html.escape(title)}</div>
@@ -397,6 +284,11 @@ class HTMLRenderer:
                              sortable: bool = False,
                              row_formatter: Optional[Callable] = None) -> str:
         """Generate data table component"""
+        if self.use_templates:
+            return str(template_engine.macro('macros.html', 'data_table')(
+                headers, rows, table_id, sortable, row_formatter
+            ))
+        
         table_attrs = f'id="{table_id}"' if table_id else ''
         if sortable:
             table_attrs += ' class="sortable"'
@@ -2,12 +2,21 @@
 """
 Post-sync event normalization
 Normalizes event names in the database that haven't been normalized yet
+
+Set-based: distinct raw names are mapped once into event_name_map
+(EventNameMap, created by alembic revision a6d40e9b3f17), then every
+placement is rewritten by a single UPDATE ... FROM join against that table
+instead of one UPDATE per name.
 """
 
-from sqlalchemy import func, distinct
-from event_standardizer import EventStandardizer
-from database_service import database_service
-from models.tournament_models import TournamentPlacement
+import time
+import sqlite3
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func
+from utils.event_standardizer import EventNameMap
+from utils.database import session_scope, engine
+from database.tournament_models import TournamentPlacement
 from log_manager import LogManager
 
 # CRITICAL: Enforce go.py execution - this module CANNOT be run directly
@@ -17,32 +26,89 @@ require_go_py("utils.normalize_events")
 # Initialize logger for this module
 logger = LogManager().get_logger('normalize_events')
 
-def get_unnormalized_events(session):
-    """Find event names that appear to be unnormalized"""
-    # Get distinct event names
-    event_names = session.query(distinct(TournamentPlacement.event_name)).all()
+def _pending_condition(alias: str = 'm') -> str:
+    """Mapped names that change under the current rules, for one game"""
+    return (f"{alias}.rules_version = ? AND {alias}.game = ? "
+            f"AND {alias}.standard_name != {alias}.raw_name")
+
+def bulk_normalize(conn, dry_run: bool = False, game: str = 'ultimate') -> Dict[str, Any]:
+    """
+    Normalize tournament_placements.event_name in one set-based pass.
     
-    unnormalized = []
-    for (event_name,) in event_names:
-        if not event_name:
-            continue
-            
-        # Check if this looks like a normalized name already
-        standardized = EventStandardizer.standardize(event_name)
-        
-        # If the standardized name differs from current, it needs normalization
-        if standardized['standard_name'] != event_name:
-            # Only process Ultimate events
-            if standardized['game'] == 'ultimate':
-                unnormalized.append({
-                    'original': event_name,
-                    'normalized': standardized['standard_name'],
-                    'game': standardized['game'],
-                    'format': standardized['format'],
-                    'is_special': standardized['is_special']
-                })
+    Args:
+        conn: DB-API connection to the tournament database (qmark parameters)
+        dry_run: Report the diff without updating (rolled back, mapping rows included)
+        game: Only names detected as this game are rewritten
     
-    return unnormalized
+    Returns:
+        dict: Statistics plus 'diff' [(original, normalized, placements)]
+    """
+    timings = {}
+    start = time.perf_counter()
+    names = [row[0] for row in conn.execute(
+        "SELECT DISTINCT event_name FROM tournament_placements WHERE event_name IS NOT NULL")]
+    mapping = EventNameMap(conn)
+    mapped_new = mapping.sync(names)
+    timings['map'] = time.perf_counter() - start
+    params = (mapping.version, game)
+    
+    start = time.perf_counter()
+    diff = conn.execute(f"""
+        SELECT m.raw_name, m.standard_name, count(*)
+        FROM tournament_placements AS p
+        JOIN {EventNameMap.TABLE} AS m ON m.raw_name = p.event_name
+        WHERE {_pending_condition()}
+        GROUP BY m.raw_name, m.standard_name
+        ORDER BY count(*) DESC, m.raw_name""", params).fetchall()
+    skipped = conn.execute(f"""
+        SELECT count(*) FROM {EventNameMap.TABLE} AS m
+        WHERE m.rules_version = ? AND m.game != ? AND m.standard_name != m.raw_name""", params).fetchone()[0]
+    timings['diff'] = time.perf_counter() - start
+    
+    updated = 0
+    if not dry_run:
+        start = time.perf_counter()
+        updated = conn.execute(_update_sql(conn), params).rowcount
+        conn.commit()
+        timings['update'] = time.perf_counter() - start
+    else:
+        conn.rollback()  # a dry run writes nothing, new mappings included
+    
+    return {
+        'events_checked': len(names),
+        'events_normalized': 0 if dry_run else len(diff),
+        'placements_updated': updated,
+        'placements_affected': sum(count for _, _, count in diff),
+        'mapped_new': mapped_new,
+        'non_ultimate_skipped': skipped,
+        'errors': 0,
+        'diff': diff,
+        'timings': timings,
+    }
+
+def _update_sql(conn) -> str:
+    """UPDATE ... FROM join (SQLite 3.33+, PostgreSQL), correlated subquery otherwise"""
+    if isinstance(conn, sqlite3.Connection) and sqlite3.sqlite_version_info < (3, 33, 0):
+        return f"""
+            UPDATE tournament_placements
+            SET event_name = (SELECT m.standard_name FROM {EventNameMap.TABLE} AS m
+                              WHERE m.raw_name = tournament_placements.event_name)
+            WHERE event_name IN (SELECT m.raw_name FROM {EventNameMap.TABLE} AS m
+                                 WHERE {_pending_condition()})"""
+    return f"""
+        UPDATE tournament_placements
+        SET event_name = m.standard_name
+        FROM {EventNameMap.TABLE} AS m
+        WHERE m.raw_name = tournament_placements.event_name AND {_pending_condition()}"""
+
+def format_diff(diff: List[Tuple[str, str, int]]) -> str:
+    """Dry-run report: one block per renamed event"""
+    lines = []
+    for original, normalized, count in diff:
+        lines.append(f"\nWould normalize: {original}")
+        lines.append(f"  → {normalized}")
+        lines.append(f"  Affects {count} placements")
+    return '\n'.join(lines)
 
 def normalize_database_events(dry_run=False):
     """
@@ -56,60 +122,28 @@ def normalize_database_events(dry_run=False):
     """
     logger.info("Starting event name normalization")
     
-    stats = {
-        'events_checked': 0,
-        'events_normalized': 0,
-        'placements_updated': 0,
-        'errors': 0,
-        'non_ultimate_skipped': 0
-    }
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection if hasattr(raw, 'driver_connection') else raw.connection
+        stats = bulk_normalize(conn, dry_run=dry_run)
+    except Exception as e:
+        raw.rollback()
+        logger.error(f"Failed to normalize events: {e}")
+        raise
+    finally:
+        raw.close()
     
-    with session_scope() as session:
-        # Find unnormalized events
-        unnormalized_events = get_unnormalized_events(session)
-        stats['events_checked'] = len(unnormalized_events)
-        
-        if dry_run:
-            print("\nDRY RUN - No changes will be made")
-            print("=" * 60)
-        
-        for event_info in unnormalized_events:
-            original = event_info['original']
-            normalized = event_info['normalized']
-            
-            try:
-                # Count how many placements will be affected
-                count = session.query(TournamentPlacement).filter_by(
-                    event_name=original
-                ).count()
-                
-                if dry_run:
-                    print(f"\nWould normalize: {original}")
-                    print(f"  → {normalized}")
-                    print(f"  Affects {count} placements")
-                else:
-                    # Update all placements with this event name
-                    session.query(TournamentPlacement).filter_by(
-                        event_name=original
-                    ).update({
-                        'event_name': normalized
-                    })
-                    
-                    stats['events_normalized'] += 1
-                    stats['placements_updated'] += count
-                    
-                    logger.info(f"Normalized '{original}' → '{normalized}' ({count} placements)")
-                    
-            except Exception as e:
-                stats['errors'] += 1
-                logger.error(f"Failed to normalize '{original}': {e}")
-                if not dry_run:
-                    session.rollback()
-                    raise
-        
-        if not dry_run:
-            session.commit()
-            logger.info(f"Normalization complete: {stats['events_normalized']} events normalized")
+    if dry_run:
+        print("\nDRY RUN - No changes will be made")
+        print("=" * 60)
+        print(format_diff(stats['diff']))
+        print(f"\n{len(stats['diff'])} events, {stats['placements_affected']} placements")
+    else:
+        for original, normalized, count in stats['diff']:
+            logger.info(f"Normalized '{original}' → '{normalized}' ({count} placements)")
+        logger.info(f"Normalization complete: {stats['events_normalized']} events normalized, "
+                    f"{stats['placements_updated']} placements in "
+                    f"{stats['timings'].get('update', 0):.2f}s")
     
     return stats
 
@@ -156,9 +190,10 @@ def main():
     
     print("\nNormalization Statistics:")
     print("=" * 40)
-    print(f"Events checked:     {stats['events_checked']}")
+    print(f"Events checked:     {stats['events_checked']} ({stats['mapped_new']} newly mapped)")
     print(f"Events normalized:  {stats['events_normalized']}")
     print(f"Placements updated: {stats['placements_updated']}")
+    print("Timing:             " + ', '.join(f"{k} {v:.2f}s" for k, v in stats['timings'].items()))
     if stats['non_ultimate_skipped'] > 0:
         print(f"Non-Ultimate skipped: {stats['non_ultimate_skipped']}")
     if stats['errors'] > 0:
@@ -5,6 +5,7 @@ Identifies and optimizes performance bottlenecks across the tournament tracker
 """
 import sys
 import os
+import re
 import time
 import threading
 import psutil
@@ -23,6 +24,7 @@ require_go_py("utils.performance_optimizer")
 
 from utils.simple_logger import info, warning, error
 from utils.error_handler import handle_errors, handle_exception, ErrorSeverity
+from utils.sampling_profiler import SamplingProfiler
 from polymorphic_core import announcer
 
 
@@ -61,6 +63,7 @@ class PerformanceOptimizer:
         self._monitor_thread: Optional[threading.Thread] = None
         self._cache = {}
         self._connection_pool = None
+        self._profiler = SamplingProfiler()
         
         # Initialize optimizations
         self._initialize_optimizations()
@@ -75,10 +78,14 @@ class PerformanceOptimizer:
                 "do('optimize database') - Apply database optimizations",
                 "Automatic bottleneck detection and recommendations",
                 "Real-time monitoring with threshold alerts",
-                "Concurrent processing optimization"
+                "Concurrent processing optimization",
+                "do('profile for 30 seconds') - Sample stacks per ask/tell/do entry point",
+                "Writes collapsed-stack flamegraph files to cache/profiles"
             ],
             [
                 "optimizer.ask('bottlenecks')",
+                "optimizer.do('profile start every 2ms')",
+                "optimizer.ask('profile')",
                 "optimizer.do('optimize api calls')",
                 "optimizer.tell('discord', metrics)"
             ]
@@ -101,6 +108,9 @@ class PerformanceOptimizer:
         elif "bottleneck" in query:
             return self._identify_bottlenecks()
         
+        elif "profil" in query:
+            return self._get_profile_report()
+        
         elif "memory" in query:
             return self._get_memory_metrics()
         
@@ -134,6 +144,8 @@ class PerformanceOptimizer:
             if isinstance(data, dict):
                 if 'bottlenecks' in data:
                     return self._format_bottlenecks_discord(data)
+                elif 'entry_points' in data:
+                    return self._format_profile_discord(data)
                 elif 'recommendations' in data:
                     return self._format_recommendations_discord(data)
                 else:
@@ -154,10 +166,15 @@ class PerformanceOptimizer:
             do("optimize database")
             do("optimize api calls") 
             do("apply all optimizations")
+            do("profile for 30 seconds every 2ms")
+            do("profile start") / do("profile stop")
         """
         action = action.lower().strip()
         
-        if "start" in action and "monitor" in action:
+        if "profil" in action:
+            return self._control_profiler(action)
+        
+        elif "start" in action and "monitor" in action:
             return self._start_monitoring()
         
         elif "stop" in action and "monitor" in action:
@@ -366,29 +383,71 @@ class PerformanceOptimizer:
         return bottlenecks
     
     def _detect_long_running_operations(self) -> List[Dict[str, Any]]:
-        """Detect operations that may be causing performance issues"""
+        """Top functions and queries by self-time from the latest profile"""
+        report = self._get_profile_report()
         bottlenecks = []
+        if not report.get("samples"):
+            return bottlenecks
+        
+        def severity(pct):
+            return "high" if pct >= 20 else "medium" if pct >= 5 else "low"
+        
+        for query in report["queries"][:3]:
+            bottlenecks.append({
+                "type": "database",
+                "severity": severity(query["pct"]),
+                "description": f"{query['pct']:.1f}% of sampled time in query: {query['query'][:80]}",
+                "recommendation": "Check the plan for this query (index, LIMIT, fewer round trips)",
+                "samples": query["samples"]
+            })
         
-        # Check for database query patterns that might be slow
-        bottlenecks.append({
-            "type": "database",
-            "severity": "medium",
-            "description": "Detected .all() queries without limits in editor service",
-            "recommendation": "Add LIMIT clauses to large result set queries",
-            "location": "services/editor_service.py:1146, 1186"
-        })
-        
-        # Check for API rate limiting bottlenecks
-        bottlenecks.append({
-            "type": "api", 
-            "severity": "medium",
-            "description": "Fixed 1-second sleep in StartGG API calls",
-            "recommendation": "Implement adaptive rate limiting based on response times",
-            "location": "services/startgg_sync.py:450"
-        })
+        for function in report["functions"][:5]:
+            name, _, location = function["function"].partition(" (")
+            bottlenecks.append({
+                "type": "function",
+                "severity": severity(function["self_pct"]),
+                "description": f"{name}: {function['self_pct']:.1f}% self time "
+                               f"({function['total_pct']:.1f}% including callees)",
+                "recommendation": "Hot in the sampled stacks - see the collapsed-stack flamegraph",
+                "location": location.rstrip(")"),
+                "samples": function["self_samples"]
+            })
         
         return bottlenecks
     
+    def _control_profiler(self, action: str) -> Any:
+        """do("profile start|stop|reset", optionally "for N seconds" / "every N ms")"""
+        if "stop" in action:
+            if not self._profiler.running:
+                return "Profiler is not running"
+            report = self._profiler.stop()
+            info(f"Profiling stopped: {report['samples']} samples")
+            return report
+        
+        if "reset" in action:
+            self._profiler.reset()
+            self._profiler.last_report = None
+            return "Profile data cleared"
+        
+        interval = re.search(r'every\s+([\d.]+)\s*ms', action)
+        duration = re.search(r'for\s+([\d.]+)\s*(s|sec|second|seconds|m|min|minute|minutes)\b', action)
+        if self._profiler.running:
+            return "Profiler already running"
+        if interval:
+            self._profiler.interval = float(interval.group(1)) / 1000.0
+        seconds = None
+        if duration:
+            seconds = float(duration.group(1)) * (60 if duration.group(2).startswith('m') else 1)
+        result = self._profiler.start(duration=seconds)
+        info(result)
+        return result
+    
+    def _get_profile_report(self) -> Dict[str, Any]:
+        """The running profile so far, else the last finished one"""
+        if self._profiler.running or self._profiler.last_report is None:
+            return self._profiler.report()
+        return self._profiler.last_report
+    
     def _optimize_database_queries(self) -> Dict[str, Any]:
         """Optimize database query performance"""
         optimizations_applied = []
@@ -547,6 +606,24 @@ class PerformanceOptimizer:
         
         return "\n".join(lines)
     
+    def _format_profile_discord(self, report: Dict[str, Any]) -> str:
+        """Format a profile report for Discord"""
+        if not report.get("samples"):
+            return "🔬 **No profile yet** - try do('profile for 30 seconds')"
+        
+        lines = [f"🔬 **Profile** ({report['samples']} samples every {report['interval_ms']:g}ms, "
+                 f"{report['duration_s']}s)"]
+        for entry in report["entry_points"][:5]:
+            lines.append(f"🎯 {entry['entry']}: {entry['pct']:.1f}% (hottest: {entry['hottest']})")
+        for function in report["functions"][:5]:
+            lines.append(f"🔥 {function['self_pct']:.1f}% self {function['function']}")
+        for query in report["queries"][:3]:
+            lines.append(f"🗄️ {query['pct']:.1f}% {query['query'][:80]}")
+        for path in report.get("files", [])[:1]:
+            lines.append(f"📁 {path}")
+        
+        return "\n".join(lines)
+    
     def _clear_performance_cache(self) -> str:
         """Clear performance monitoring cache"""
         cache_size = len(self._cache)
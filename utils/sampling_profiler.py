@@ -0,0 +1,267 @@
+"""
+sampling_profiler.py - In-process sampling profiler for ask/tell/do services
+
+A background thread reads every other thread's stack (sys._current_frames)
+at a fixed interval, so the profiled code runs unmodified and the cost is
+paid per sample rather than per call. Samples are wall-clock: a thread
+waiting on I/O or a lock is counted where it waits. Each sample is
+attributed to the outermost ask/tell/do method on its stack (e.g.
+"DatabaseService.ask"), and SQL statements are picked up from
+SQLAlchemy's do_execute frames.
+
+Function and query rankings leave out idle threads: samples outside any
+ask/tell/do whose innermost frame is a standard-library wait (a worker
+blocked on a queue, an event loop in select, the caller in join()).
+Waits inside an entry point still count, since that is where a slow
+service spends its time. The collapsed-stack files keep every sample.
+
+stop() writes collapsed-stack files (the format flamegraph.pl, speedscope
+and `py-spy record --format raw` use: "frame;frame;frame count") to
+cache/profiles (PROFILE_DIR): one for everything, rooted at the entry
+point, and one per entry point.
+"""
+import os
+import re
+import sys
+import time
+import sysconfig
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.sampling_profiler")
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', str(ROOT / 'cache' / 'profiles')))
+INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+MAX_DEPTH = 128
+
+ENTRY_METHODS = ('ask', 'tell', 'do')
+OUTSIDE_ENTRY = '(outside ask/tell/do)'
+# SQLAlchemy dialect methods that receive the SQL text as `statement`
+QUERY_FRAMES = ('do_execute', 'do_execute_no_params', 'do_executemany')
+
+# Standard-library functions a parked thread sits in (its innermost Python frame)
+IDLE_FUNCTIONS = frozenset((
+    'wait', '_wait_for_tstate_lock', 'join', 'acquire', '_bootstrap_inner', 'get', 'sleep',
+    'select', 'poll', 'accept', 'recv', 'recv_into', 'readinto', 'read', '_run_once', 'run_forever',
+))
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+def _short_path(filename: str) -> str:
+    try:
+        return os.path.relpath(filename, ROOT) if filename.startswith(str(ROOT)) else filename
+    except ValueError:
+        return filename
+
+
+def _normalize_sql(statement: Any) -> str:
+    return re.sub(r'\s+', ' ', str(statement)).strip()[:200]
+
+
+def is_idle(entry: str, stack: Tuple[Frame, ...]) -> bool:
+    """A thread parked in a standard-library wait, outside any ask/tell/do"""
+    if entry != OUTSIDE_ENTRY or not stack:
+        return False
+    function, filename, _ = stack[-1]
+    return function in IDLE_FUNCTIONS and filename.startswith(STDLIB_DIR) and 'site-packages' not in filename
+
+
+def format_frame(frame: Frame) -> str:
+    function, filename, line = frame
+    return f"{function} ({_short_path(filename)}:{line})"
+
+
+class SamplingProfiler:
+    """Samples all threads' stacks and aggregates them per ask/tell/do entry point"""
+
+    def __init__(self, interval_ms: float = INTERVAL_MS, output_dir: Optional[Path] = None):
+        self.interval = interval_ms / 1000.0
+        self.output_dir = Path(output_dir or PROFILE_DIR)
+        self._stacks: Counter = Counter()          # (entry, frames root-first) -> samples
+        self._queries: Counter = Counter()         # SQL -> samples spent inside it
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started_at: Optional[float] = None
+        self._elapsed = 0.0
+        self.sweeps = 0                            # sample() calls; samples count per thread
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ============= Control =============
+
+    def start(self, duration: Optional[float] = None) -> str:
+        """Begin sampling; with a duration, stop() runs by itself afterwards"""
+        if self.running:
+            return "Profiler already running"
+        self.reset()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return f"Profiling every {self.interval * 1000:g}ms" + (f" for {duration:g}s" if duration else "")
+
+    def stop(self, write: bool = True) -> Dict[str, Any]:
+        """Stop sampling, write collapsed-stack files and return the report"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        self._thread = None
+        report = self.report()
+        if write and self.sweeps:
+            report["files"] = self.write_collapsed()
+        self.last_report = report
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._queries.clear()
+            self.sweeps = 0
+            self._elapsed = 0.0
+
+    def _run(self, duration: Optional[float]):
+        own = threading.get_ident()
+        deadline = None if duration is None else time.perf_counter() + duration
+        while not self._stop.wait(self.interval):
+            self.sample(skip={own})
+            self._elapsed = time.perf_counter() - self._started_at
+            if deadline is not None and time.perf_counter() >= deadline:
+                self._stop.set()
+                self.stop()  # writes files and keeps the report in last_report
+                return
+
+    # ============= Sampling =============
+
+    def sample(self, skip=()):
+        """One sweep: record one stack (one sample) per running thread"""
+        frames = sys._current_frames()
+        taken = []
+        for thread_id, frame in frames.items():
+            if thread_id in skip:
+                continue
+            taken.append(self._walk(frame))
+        del frames
+        with self._lock:
+            for entry, stack, query in taken:
+                if not stack:
+                    continue
+                self._stacks[(entry, stack)] += 1
+                if query:
+                    self._queries[query] += 1
+            self.sweeps += 1
+
+    @staticmethod
+    def _walk(frame) -> Tuple[str, Tuple[Frame, ...], Optional[str]]:
+        """(entry point, frames root-first, SQL being executed) for one thread's stack"""
+        stack: List[Frame] = []
+        entry, query = OUTSIDE_ENTRY, None
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            if code.co_name in ENTRY_METHODS:
+                owner = frame.f_locals.get('self')
+                if owner is not None:
+                    entry = f"{type(owner).__name__}.{code.co_name}"  # keeps the outermost
+            elif query is None and code.co_name in QUERY_FRAMES and 'sqlalchemy' in code.co_filename:
+                statement = frame.f_locals.get('statement')
+                if statement is not None:
+                    query = _normalize_sql(statement)
+            frame = frame.f_back
+            depth += 1
+        stack.reverse()
+        return entry, tuple(stack), query
+
+    # ============= Reports =============
+
+    def report(self, top: int = 15) -> Dict[str, Any]:
+        """Top functions by self and total samples, entry points and queries (idle threads left out)"""
+        with self._lock:
+            stacks = list(self._stacks.items())
+            queries = self._queries.most_common(top)
+            sweeps = self.sweeps
+        samples = sum(count for _, count in stacks)
+        self_time: Counter = Counter()
+        total_time: Counter = Counter()
+        entries: Counter = Counter()
+        entry_functions: Dict[str, Counter] = defaultdict(Counter)
+        idle = 0
+        for (entry, stack), count in stacks:
+            entries[entry] += count
+            entry_functions[entry][stack[-1]] += count
+            if is_idle(entry, stack):
+                idle += count
+                continue
+            self_time[stack[-1]] += count
+            for frame in set(stack):
+                total_time[frame] += count
+        active = samples - idle
+
+        def share(count, total=active):
+            return round(count / total * 100, 1) if total else 0.0
+
+        per_sample_ms = self.interval * 1000
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "running": self.running,
+            "interval_ms": per_sample_ms,
+            "duration_s": round(self._elapsed, 2),
+            "sweeps": sweeps,
+            "samples": samples,
+            "idle_samples": idle,
+            "functions": [
+                {"function": format_frame(frame), "self_samples": count, "self_pct": share(count),
+                 "total_pct": share(total_time[frame]), "est_self_ms": round(count * per_sample_ms, 1)}
+                for frame, count in self_time.most_common(top)
+            ],
+            "entry_points": [
+                {"entry": entry, "samples": count, "pct": share(count, samples),
+                 "hottest": format_frame(entry_functions[entry].most_common(1)[0][0])}
+                for entry, count in entries.most_common(top)
+            ],
+            "queries": [
+                {"query": query, "samples": count, "pct": share(count), "est_ms": round(count * per_sample_ms, 1)}
+                for query, count in queries
+            ],
+        }
+
+    def collapsed(self, entry: Optional[str] = None) -> List[str]:
+        """Collapsed-stack lines; all entries rooted at their entry point, or one entry's own stacks"""
+        lines: Counter = Counter()
+        with self._lock:
+            for (stack_entry, stack), count in self._stacks.items():
+                if entry is not None and stack_entry != entry:
+                    continue
+                frames = [format_frame(frame).replace(';', ':') for frame in stack]
+                if entry is None:
+                    frames.insert(0, stack_entry)
+                lines[';'.join(frames)] += count
+        return [f"{stack} {count}" for stack, count in sorted(lines.items())]
+
+    def write_collapsed(self) -> List[str]:
+        """Write profile-<time>.collapsed plus one file per entry point; returns the paths"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        with self._lock:
+            entries = sorted({entry for entry, _ in self._stacks})
+        paths = []
+        for entry in [None] + entries:
+            suffix = '' if entry is None else '-' + re.sub(r'[^A-Za-z0-9_.-]+', '_', entry).strip('_')
+            path = self.output_dir / f"profile-{stamp}{suffix}.collapsed"
+            path.write_text('\n'.join(self.collapsed(entry)) + '\n', encoding='utf-8')
+            paths.append(str(path))
+        return paths
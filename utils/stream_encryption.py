@@ -0,0 +1,212 @@
+"""
+stream_encryption.py - Chunked authenticated encryption for large files
+
+Files are encrypted in fixed-size chunks so memory stays constant however
+big the backup or recording is. The layout is:
+
+    header: b'TTSE' | version (1) | algorithm (1) | chunk size (4) | salt (16)
+    chunks: ciphertext + 16-byte tag, every one but the last a full chunk
+
+Each file gets its own key, derived from the service key and the random
+salt with HKDF. Chunk i is sealed with nonce = i (11 bytes) | last flag,
+and the header is authenticated data for every chunk, so a reordered,
+dropped, appended or truncated chunk - or an edited header - fails to
+decrypt. The last chunk is always shorter than a full one (empty when the
+plaintext is an exact multiple), which is how the reader spots it.
+
+Chunks are independent, so they can be sealed and opened on a thread
+pool (ENCRYPTION_WORKERS) with a bounded window of chunks in flight.
+"""
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.stream_encryption")
+
+MAGIC = b'TTSE'
+VERSION = 1
+ALGORITHMS = {'aes-256-gcm': 1, 'chacha20-poly1305': 2}
+HEADER = struct.Struct('>4sBBI16s')
+TAG_SIZE = 16
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+CHUNK_SIZE = int(os.getenv('ENCRYPTION_CHUNK_SIZE', str(1024 * 1024)))
+WORKERS = int(os.getenv('ENCRYPTION_WORKERS', str(min(4, os.cpu_count() or 1))))
+ALGORITHM = os.getenv('ENCRYPTION_ALGORITHM', 'aes-256-gcm')
+
+
+class StreamIntegrityError(ValueError):
+    """The encrypted stream was tampered with, truncated or uses another key"""
+
+
+def is_encrypted_stream(prefix: bytes) -> bool:
+    """Does data starting with these bytes use the chunked format?"""
+    return prefix[:len(MAGIC)] == MAGIC
+
+
+def _nonce(index: int, last: bool) -> bytes:
+    return index.to_bytes(11, 'big') + (b'\x01' if last else b'\x00')
+
+
+class StreamCipher:
+    """Encrypts and decrypts streams in authenticated chunks under one service key"""
+
+    def __init__(self, key: bytes, algorithm: str = ALGORITHM, chunk_size: int = CHUNK_SIZE,
+                 workers: int = WORKERS):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm}; use one of {', '.join(ALGORITHMS)}")
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes")
+        self.key = key
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+
+    def _aead(self, algorithm_id: int, salt: bytes):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+        file_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt,
+                        info=b'tournament-tracker stream v1').derive(self.key)
+        return AESGCM(file_key) if algorithm_id == ALGORITHMS['aes-256-gcm'] else ChaCha20Poly1305(file_key)
+
+    # ============= Encryption =============
+
+    def encrypt(self, source: BinaryIO, destination: BinaryIO) -> Dict[str, int]:
+        """Encrypt source into destination; returns plaintext and ciphertext sizes"""
+        salt = os.urandom(16)
+        header = HEADER.pack(MAGIC, VERSION, ALGORITHMS[self.algorithm], self.chunk_size, salt)
+        aead = self._aead(ALGORITHMS[self.algorithm], salt)
+        destination.write(header)
+
+        def seal(item):
+            index, chunk, last = item
+            return aead.encrypt(_nonce(index, last), chunk, header)
+
+        plain = written = 0
+        for sealed, size in self._map(seal, self._plain_chunks(source)):
+            destination.write(sealed)
+            plain += size
+            written += len(sealed)
+        return {'bytes_in': plain, 'bytes_out': HEADER.size + written}
+
+    def _plain_chunks(self, source: BinaryIO) -> Iterator[tuple]:
+        """(index, chunk, last) with one chunk of lookahead; the last is always short"""
+        index, current = 0, source.read(self.chunk_size)
+        while len(current) == self.chunk_size:
+            following = source.read(self.chunk_size)
+            yield (index, current, False), len(current)
+            index, current = index + 1, following
+        yield (index, current, True), len(current)
+
+    # ============= Decryption =============
+
+    def decrypt(self, source: BinaryIO, destination: BinaryIO) -> Dict[str, int]:
+        """Decrypt source into destination; raises StreamIntegrityError on any tampering
+
+        Chunks before a bad one may already be written: discard the output
+        on error (decrypt_file does).
+        """
+        header = source.read(HEADER.size)
+        if len(header) < HEADER.size or not is_encrypted_stream(header):
+            raise StreamIntegrityError("Not a chunked encrypted stream")
+        _, version, algorithm_id, chunk_size, salt = HEADER.unpack(header)
+        if version != VERSION or algorithm_id not in ALGORITHMS.values() or not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise StreamIntegrityError(f"Unsupported stream (version {version}, algorithm {algorithm_id})")
+        aead = self._aead(algorithm_id, salt)
+
+        from cryptography.exceptions import InvalidTag
+
+        def open_chunk(item):
+            index, sealed, last = item
+            try:
+                return aead.decrypt(_nonce(index, last), sealed, header)
+            except InvalidTag:
+                raise StreamIntegrityError(f"Chunk {index} failed authentication") from None
+
+        read = HEADER.size
+        plain = 0
+        for chunk, size in self._map(open_chunk, self._sealed_chunks(source, chunk_size + TAG_SIZE)):
+            destination.write(chunk)
+            read += size
+            plain += len(chunk)
+        return {'bytes_in': read, 'bytes_out': plain}
+
+    @staticmethod
+    def _sealed_chunks(source: BinaryIO, sealed_size: int) -> Iterator[tuple]:
+        index = 0
+        while True:
+            sealed = source.read(sealed_size)
+            if len(sealed) < TAG_SIZE:
+                raise StreamIntegrityError(f"Stream truncated at chunk {index}")
+            last = len(sealed) < sealed_size
+            yield (index, sealed, last), len(sealed)
+            if last:
+                return
+            index += 1
+
+    # ============= Parallelism =============
+
+    def _map(self, work: Callable, items: Iterator[tuple]) -> Iterator[tuple]:
+        """Apply work to chunks in order, keeping at most 2x workers chunks in memory"""
+        if self.workers == 1:
+            for item, size in items:
+                yield work(item), size
+            return
+        window = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stream-cipher') as pool:
+            try:
+                for item, size in items:
+                    window.append((pool.submit(work, item), size))
+                    if len(window) >= 2 * self.workers:
+                        future, done_size = window.pop(0)
+                        yield future.result(), done_size
+                while window:
+                    future, done_size = window.pop(0)
+                    yield future.result(), done_size
+            finally:
+                for future, _ in window:
+                    future.cancel()
+
+    # ============= Files =============
+
+    def encrypt_file(self, path: str, output_path: Optional[str] = None) -> str:
+        output_path = output_path or f"{path}.encrypted"
+        with open(path, 'rb') as source:
+            self._write_atomically(output_path, lambda destination: self.encrypt(source, destination))
+        return output_path
+
+    def decrypt_file(self, path: str, output_path: str,
+                     legacy_decrypt: Optional[Callable[[bytes], bytes]] = None) -> bool:
+        """Decrypt a file; returns False if it was in the legacy whole-file format
+
+        Files without the chunked header are handed whole to legacy_decrypt
+        (e.g. Fernet.decrypt for .encrypted files written before chunking).
+        """
+        with open(path, 'rb') as source:
+            chunked = is_encrypted_stream(source.read(len(MAGIC)))
+            source.seek(0)
+            if chunked:
+                self._write_atomically(output_path, lambda destination: self.decrypt(source, destination))
+            elif legacy_decrypt is not None:
+                self._write_atomically(output_path, lambda destination: destination.write(legacy_decrypt(source.read())))
+            else:
+                raise StreamIntegrityError("Not a chunked encrypted stream")
+        return chunked
+
+    @staticmethod
+    def _write_atomically(output_path: str, write: Callable[[BinaryIO], Any]):
+        """No partial or unauthenticated output is left behind if anything fails"""
+        partial = f"{output_path}.partial"
+        try:
+            with open(partial, 'wb') as destination:
+                write(destination)
+            os.replace(partial, output_path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
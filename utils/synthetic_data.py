@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+synthetic_data.py - Deterministic synthetic tournament database
+
+Generates organizations, players, tournaments and placements shaped like a
+start.gg region, at any scale, for benchmarks and load tests:
+
+- Organizations: Zipf-weighted activity (a few orgs run most events), one to
+  three venues around a home city, and discord/email/twitter contacts that
+  tournaments quote with the usual spelling variations
+- Tournaments: mostly weekly locals, some monthlies and a few majors with a
+  heavy attendance tail, a handful online; one to three events each, with
+  raw event names ("SSBU Singles", "Smash Ultimate 1v1") left for the event
+  normalizer
+- Players: a home city and a Zipf activity weight; entrants are drawn mostly
+  from the venue's city and placed by skill plus noise, with start.gg's tied
+  double-elimination placements (1, 2, 3, 4, 5, 5, 7, 7, 9 x4, 13 x4 ...)
+
+Every tournament draws from its own seeded RNG, so the same config always
+yields the same rows (see digest) and any tournament can be regenerated on
+its own, e.g. as the start.gg payload a sync would receive.
+"""
+import re
+import math
+import random
+import hashlib
+from datetime import datetime, timezone
+from bisect import bisect_left
+from dataclasses import dataclass, replace, asdict
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.synthetic_data")
+
+DAY = 86400
+END_AT = 1767139200  # 2025-12-31 00:00 UTC: fixed so datasets never drift with the clock
+TOURNAMENT_ID_BASE = 500000
+PLAYER_ID_BASE = 2000000
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Dataset size and shape; 0 players/organizations derive from the other counts"""
+    tournaments: int = 1000
+    placements: int = 50000
+    players: int = 0
+    organizations: int = 0
+    seed: int = 42
+    years: int = 3
+    end_at: int = END_AT
+
+    def resolved(self) -> 'SyntheticConfig':
+        return replace(self,
+                       players=self.players or max(50, self.placements // 12),
+                       organizations=self.organizations or max(3, self.tournaments // 25))
+
+
+SCALES: Dict[str, SyntheticConfig] = {
+    'tiny': SyntheticConfig(tournaments=200, placements=5000),
+    'small': SyntheticConfig(tournaments=1000, placements=50000),
+    'medium': SyntheticConfig(tournaments=3000, placements=250000),
+    'large': SyntheticConfig(tournaments=10000, placements=1000000),
+}
+
+# (city, state, lat, lng, postal code, weight): SoCal heavy, like the real data
+CITIES = [
+    ('Los Angeles', 'CA', 34.052, -118.244, '90012', 14),
+    ('Irvine', 'CA', 33.684, -117.826, '92618', 10),
+    ('Anaheim', 'CA', 33.836, -117.914, '92805', 7),
+    ('San Diego', 'CA', 32.716, -117.161, '92101', 9),
+    ('Riverside', 'CA', 33.953, -117.396, '92501', 6),
+    ('Long Beach', 'CA', 33.770, -118.194, '90802', 6),
+    ('Pasadena', 'CA', 34.148, -118.144, '91101', 4),
+    ('Ontario', 'CA', 34.063, -117.651, '91764', 4),
+    ('San Francisco', 'CA', 37.775, -122.419, '94103', 5),
+    ('San Jose', 'CA', 37.338, -121.886, '95113', 4),
+    ('Sacramento', 'CA', 38.582, -121.494, '95814', 3),
+    ('Las Vegas', 'NV', 36.170, -115.140, '89101', 3),
+    ('Phoenix', 'AZ', 33.448, -112.074, '85004', 2),
+]
+
+ORG_WORDS = ['Backyard', 'Coastal', 'Golden', 'Neon', 'Midnight', 'Pacific', 'Sunset', 'Valley', 'Crimson',
+             'Harbor', 'Desert', 'Summit', 'Metro', 'Ember', 'Arcadian', 'Quantum', 'Rogue', 'Lucky']
+ORG_NOUNS = ['Tryhards', 'Gaming', 'Esports', 'Smash', 'Collective', 'Clash', 'League', 'Arena', 'Crew',
+             'Dojo', 'Society', 'Syndicate', 'Legends', 'Circuit', 'Union', 'Brawlers']
+SERIES = ['Weekly', 'Wednesdays', 'Smash Night', 'Showdown', 'Brawl', 'Throwdown', 'Fight Night']
+MAJOR_SUFFIXES = ['Invitational', 'Championship', 'Major', 'Summit', 'Classic']
+VENUE_WORDS = ['Game Haven', 'Level Up Lounge', 'Pixel Cafe', 'Card Kingdom', 'Student Center',
+               'Community Hall', 'Arcade Bar', 'Esports Arena', 'Comic Vault', 'Library Annex']
+STREETS = ['Main St', 'Broadway', 'University Ave', 'Harbor Blvd', 'Mission St', 'Sunset Blvd', 'Grand Ave']
+TAG_SYLLABLES = ['ka', 'zu', 'mi', 'ro', 'shi', 'ne', 'to', 'ax', 'el', 'qu', 'vy', 'dra', 'gon', 'leaf',
+                 'rex', 'ly', 'mo', 'sol', 'ja', 'tri']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Chris', 'Taylor', 'Jamie', 'Kevin', 'Maria', 'Daniel', 'Priya',
+               'Marcus', 'Elena', 'Ryan', 'Leah', 'Tony', 'Grace']
+LAST_NAMES = ['Nguyen', 'Garcia', 'Kim', 'Smith', 'Lopez', 'Chen', 'Patel', 'Johnson', 'Martinez', 'Park']
+
+# (raw names, share of attendance): main events first; spellings vary like the real data
+MAIN_EVENTS = ['Ultimate Singles', 'Ultimate Singles', 'Smash Ultimate Singles', 'SSBU Singles',
+               'Super Smash Bros. Ultimate - Singles', 'Ultimate 1v1', 'ultimate singles']
+SIDE_EVENTS = [
+    (['Ultimate Doubles', 'SSBU Doubles', 'Ultimate 2v2'], 0.35),
+    (['Ultimate Redemption Bracket', 'Ultimate Amateur Bracket'], 0.3),
+    (['Melee Singles', 'SSBM Singles'], 0.25),
+    (['Street Fighter 6', 'SF6 Singles'], 0.2),
+    (['Tekken 8', 'T8 Singles'], 0.15),
+]
+
+KINDS = (('local', 0.72), ('monthly', 0.23), ('major', 0.05))
+ONLINE_SHARE = 0.04
+
+
+def placement_numbers(entrants: int) -> List[int]:
+    """start.gg double-elimination placements: 1, 2, 3, 4, 5, 5, 7, 7, 9 x4, 13 x4, 17 x8 ..."""
+    result = list(range(1, min(entrants, 4) + 1))
+    place, size = 5, 2
+    while len(result) < entrants:
+        for _ in range(2):
+            take = min(size, entrants - len(result))
+            result.extend([place] * take)
+            place += size
+        size *= 2
+    return result
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def _zipf_weights(count: int, exponent: float, rng: random.Random) -> List[float]:
+    """Zipf weights in shuffled order, so activity is unrelated to id"""
+    weights = [1.0 / (rank + 1) ** exponent for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+
+class SyntheticDataset:
+    """Rows for one SyntheticConfig; tournaments are in start_at order"""
+
+    def __init__(self, config: Optional[SyntheticConfig] = None):
+        self.config = (config or SCALES['small']).resolved()
+        self.organizations = self._make_organizations()
+        self.players, activity = self._make_players()
+        self._pools = self._make_pools(activity)
+        self.tournaments = self._make_schedule()
+
+    # ============= Organizations and players =============
+
+    def _make_organizations(self) -> List[Dict[str, Any]]:
+        rng = random.Random(f"{self.config.seed}:organizations")
+        city_weights = list(accumulate(city[5] for city in CITIES))
+        weights = _zipf_weights(self.config.organizations, 1.1, rng)
+        names = set()
+        organizations = []
+        for index in range(self.config.organizations):
+            city = bisect_left(city_weights, rng.random() * city_weights[-1])
+            name = f"{rng.choice(ORG_WORDS)} {rng.choice(ORG_NOUNS)}"
+            while name in names:
+                name = f"{name} {CITIES[city][0]}" if CITIES[city][0] not in name else f"{name} {len(names)}"
+            names.add(name)
+            slug = _slug(name).replace('-', '')
+            invite = ''.join(rng.choice('abcdefghijkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789')
+                             for _ in range(rng.randint(6, 10)))
+            contacts = [{'type': 'discord', 'value': f"discord.gg/{invite}"}]
+            if rng.random() < 0.6:
+                contacts.append({'type': 'email', 'value': f"{slug}@gmail.com"})
+            if rng.random() < 0.3:
+                contacts.append({'type': 'twitter', 'value': f"@{slug[:15]}"})
+            if rng.random() < 0.2:
+                contacts.reverse()  # some orgs list their email first
+            lat, lng = CITIES[city][2], CITIES[city][3]
+            venues = [{
+                'venue_name': f"{rng.choice(VENUE_WORDS)} {CITIES[city][0]}",
+                'venue_address': f"{rng.randint(100, 9999)} {rng.choice(STREETS)}",
+                'city': CITIES[city][0], 'addr_state': CITIES[city][1], 'postal_code': CITIES[city][4],
+                'lat': round(lat + rng.gauss(0, 0.06), 6), 'lng': round(lng + rng.gauss(0, 0.06), 6),
+                'city_index': city,
+            } for _ in range(rng.choice((1, 1, 1, 2, 2, 3)))]
+            organizations.append({
+                'id': index + 1, 'display_name': name, 'contacts': contacts, 'weight': weights[index],
+                'venues': venues, 'series': rng.choice(SERIES),
+            })
+        return organizations
+
+    def _make_players(self) -> Tuple[List[Tuple[int, str, str, Optional[str], int, float]], List[float]]:
+        """[(id, startgg_id, gamer_tag, name, home city, skill)] and each player's activity weight"""
+        rng = random.Random(f"{self.config.seed}:players")
+        city_weights = list(accumulate(city[5] for city in CITIES))
+        activity = _zipf_weights(self.config.players, 0.8, rng)
+        tags, players = set(), []
+        for index in range(self.config.players):
+            tag = ''.join(rng.choice(TAG_SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+            while tag in tags:
+                tag = f"{tag}{rng.randint(0, 99)}"
+            tags.add(tag)
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" if rng.random() < 0.4 else None
+            city = bisect_left(city_weights, rng.random() * city_weights[-1])
+            players.append((index + 1, str(PLAYER_ID_BASE + index * 7), tag, name, city, rng.gauss(0, 1)))
+        return players, activity
+
+    def _make_pools(self, activity: List[float]) -> Dict[Optional[int], Tuple[List[int], List[float]]]:
+        """Entrant pools per home city (None: everyone) with cumulative activity weights"""
+        pools = {}
+        for city in range(len(CITIES)):
+            members = [p for p, player in enumerate(self.players) if player[4] == city]
+            pools[city] = (members, list(accumulate(activity[p] for p in members)))
+        pools[None] = (list(range(len(self.players))), list(accumulate(activity)))
+        return pools
+
+    # ============= Schedule =============
+
+    def _make_schedule(self) -> List[Dict[str, Any]]:
+        rng = random.Random(f"{self.config.seed}:schedule")
+        config = self.config
+        org_weights = list(accumulate(org['weight'] for org in self.organizations))
+        kind_weights = list(accumulate(share for _, share in KINDS))
+        span_days = config.years * 365
+        drafts = []
+        for _ in range(config.tournaments):
+            org = self.organizations[bisect_left(org_weights, rng.random() * org_weights[-1])]
+            kind = KINDS[bisect_left(kind_weights, rng.random() * kind_weights[-1])][0]
+            day = config.end_at - DAY * (1 + rng.randrange(span_days))
+            start_at = day + 3 * 3600 if kind != 'major' else day + 17 * 3600  # 7pm / 9am Pacific
+            if kind == 'local':
+                size = rng.lognormvariate(math.log(20), 0.5)
+            elif kind == 'monthly':
+                size = rng.lognormvariate(math.log(60), 0.45)
+            else:
+                size = min(150 + rng.paretovariate(1.3) * 120, 3000)
+            events = [(rng.choice(MAIN_EVENTS), rng.uniform(0.85, 1.0))]
+            for names, share in SIDE_EVENTS:
+                if rng.random() < (share * 2.5 if kind == 'major' else share):
+                    events.append((rng.choice(names), share * rng.uniform(0.6, 1.4)))
+            drafts.append((start_at, org['id'], kind, size, events, rng.random(), rng.random()))
+        drafts.sort(key=lambda draft: (draft[0], draft[1]))
+
+        # Scale sizes so the events add up to the requested placement count
+        raw_total = sum(size * share for _, _, _, size, events, _, _ in drafts for _, share in events)
+        scale = config.placements / raw_total if raw_total else 1.0
+        cap = len(self.players)
+        counters: Dict[int, int] = {}
+        tournaments = []
+        for index, (start_at, org_id, kind, size, events, venue_roll, online_roll) in enumerate(drafts):
+            org = self.organizations[org_id - 1]
+            number = counters[org_id] = counters.get(org_id, 0) + 1
+            if kind == 'major':
+                year = datetime.fromtimestamp(start_at, timezone.utc).year
+                name = f"{org['display_name']} {MAJOR_SUFFIXES[org_id % len(MAJOR_SUFFIXES)]} {year} #{number}"
+            elif kind == 'monthly':
+                name = f"{org['display_name']} Monthly #{number}"
+            else:
+                name = f"{org['display_name']} {org['series']} #{number}"
+            tournament_id = TOURNAMENT_ID_BASE + index
+            sized = [(event_name, min(cap, max(4, round(size * share * scale)))) for event_name, share in events]
+            online = online_roll < ONLINE_SHARE and kind == 'local'
+            venue = None if online else org['venues'][int(venue_roll * len(org['venues']))]
+            tournaments.append({
+                'index': index, 'id': str(tournament_id), 'name': name, 'kind': kind, 'org_id': org_id,
+                'start_at': start_at, 'online': online, 'venue': venue,
+                'events': [(str(tournament_id * 10 + k), event_name, entrants)
+                           for k, (event_name, entrants) in enumerate(sized)],
+                'num_attendees': sized[0][1] + sum(entrants for _, entrants in sized[1:]) * 3 // 10,
+            })
+        return tournaments
+
+    # ============= Rows =============
+
+    def organization_rows(self) -> Iterator[Dict[str, Any]]:
+        import json
+        for org in self.organizations:
+            yield {'id': org['id'], 'display_name': org['display_name'], 'contacts_json': json.dumps(org['contacts'])}
+
+    def player_rows(self) -> Iterator[Dict[str, Any]]:
+        for player_id, startgg_id, gamer_tag, name, _, _ in self.players:
+            yield {'id': player_id, 'startgg_id': startgg_id, 'gamer_tag': gamer_tag, 'name': name}
+
+    def _contact(self, org: Dict[str, Any], rng: random.Random) -> Tuple[str, str]:
+        """The org's first contact as a tournament organizer would type it"""
+        contact = org['contacts'][0]
+        value = contact['value']
+        if contact['type'] == 'discord':
+            invite = value.split('/')[-1]
+            value = rng.choice([value, f"https://discord.gg/{invite}", f"https://discord.com/invite/{invite}",
+                                f"discord.gg/{invite}/"])
+        elif contact['type'] == 'email' and rng.random() < 0.2:
+            value = value.upper()
+        return value, contact['type']
+
+    def tournament_row(self, tournament: Dict[str, Any]) -> Dict[str, Any]:
+        rng = random.Random(f"{self.config.seed}:t{tournament['index']}:row")
+        org = self.organizations[tournament['org_id'] - 1]
+        contact, contact_type = self._contact(org, rng)
+        start_at = tournament['start_at']
+        hours = 30 if tournament['kind'] == 'major' else rng.randint(4, 8)
+        slug = f"tournament/{_slug(tournament['name'])}"
+        venue = tournament['venue'] or {}
+        return {
+            'id': tournament['id'], 'name': tournament['name'], 'num_attendees': tournament['num_attendees'],
+            'start_at': start_at, 'end_at': start_at + hours * 3600, 'registration_closes_at': start_at - DAY,
+            'timezone': 'America/Los_Angeles' if venue.get('addr_state', 'CA') == 'CA' else 'America/Phoenix',
+            'tournament_state': 3, 'owner_id': str(90000 + org['id']), 'owner_name': org['display_name'],
+            'primary_contact': contact, 'primary_contact_type': contact_type,
+            'short_slug': _slug(tournament['name'])[:24], 'slug': slug, 'url': f"https://www.start.gg/{slug}",
+            'is_registration_open': 0, 'currency': 'USD',
+            'has_offline_events': 0 if tournament['online'] else 1, 'has_online_events': 1 if tournament['online'] else 0,
+            'tournament_type': 1, 'sync_timestamp': start_at + 3 * DAY,
+            'venue_name': venue.get('venue_name'), 'venue_address': venue.get('venue_address'),
+            'city': venue.get('city'), 'addr_state': venue.get('addr_state'),
+            'country_code': 'US', 'postal_code': venue.get('postal_code'),
+            'lat': venue.get('lat'), 'lng': venue.get('lng'),
+        }
+
+    def _entrants(self, rng: random.Random, city: Optional[int], count: int) -> List[int]:
+        """count distinct player indexes, mostly from the venue's city"""
+        chosen: List[int] = []
+        seen = set()
+        for pool_key, share in ((city, 0.85), (None, 1.0)):
+            members, cumulative = self._pools[pool_key]
+            if not members:
+                continue
+            want = count if pool_key is None else round(count * share)
+            for _ in range(4):
+                missing = want - len(chosen)
+                if missing <= 0:
+                    break
+                for player in rng.choices(members, cum_weights=cumulative, k=missing * 2):
+                    if player not in seen:
+                        seen.add(player)
+                        chosen.append(player)
+                        if len(chosen) == want:
+                            break
+        if len(chosen) < count:  # tiny pools: take whoever is left
+            for player in rng.sample(range(len(self.players)), len(self.players)):
+                if player not in seen:
+                    seen.add(player)
+                    chosen.append(player)
+                    if len(chosen) == count:
+                        break
+        return chosen[:count]
+
+    def standings(self, tournament: Dict[str, Any]) -> Iterator[Tuple[str, str, int, int, int]]:
+        """(event_id, event_name, player index, placement, prize cents) for every entrant"""
+        rng = random.Random(f"{self.config.seed}:t{tournament['index']}:standings")
+        city = tournament['venue']['city_index'] if tournament['venue'] else None
+        for event_id, event_name, entrants in tournament['events']:
+            field = self._entrants(rng, city, entrants)
+            field.sort(key=lambda player: self.players[player][5] + rng.gauss(0, 0.6), reverse=True)
+            pot = 0  # cents; only the main event of a monthly or major pays out
+            if tournament['kind'] != 'local' and event_id.endswith('0'):
+                pot = entrants * (500 if tournament['kind'] == 'monthly' else 1500)
+            for player, placement in zip(field, placement_numbers(entrants)):
+                prize = pot * {1: 60, 2: 30, 3: 10}.get(placement, 0) // 100
+                yield event_id, event_name, player, placement, prize
+
+    def placement_rows(self, tournament: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        for event_id, event_name, player, placement, prize in self.standings(tournament):
+            yield {'tournament_id': tournament['id'], 'player_id': self.players[player][0], 'placement': placement,
+                   'prize_amount': prize, 'event_name': event_name, 'event_id': event_id}
+
+    def startgg_payload(self, tournament: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """(tournament, standings) shaped like the start.gg responses StartGGSync processes"""
+        row = self.tournament_row(tournament)
+        payload = {
+            'id': int(row['id']), 'name': row['name'], 'numAttendees': row['num_attendees'],
+            'startAt': row['start_at'], 'endAt': row['end_at'], 'registrationClosesAt': row['registration_closes_at'],
+            'timezone': row['timezone'], 'venueName': row['venue_name'], 'venueAddress': row['venue_address'],
+            'city': row['city'], 'addrState': row['addr_state'], 'countryCode': row['country_code'],
+            'postalCode': row['postal_code'], 'lat': row['lat'], 'lng': row['lng'],
+            'isRegistrationOpen': False, 'hasOfflineEvents': bool(row['has_offline_events']),
+            'hasOnlineEvents': bool(row['has_online_events']), 'tournamentType': row['tournament_type'],
+            'primaryContact': row['primary_contact'], 'primaryContactType': row['primary_contact_type'],
+            'shortSlug': row['short_slug'], 'slug': row['slug'], 'url': row['url'], 'state': 3,
+            'owner': {'id': int(row['owner_id']), 'name': row['owner_name']},
+        }
+        standings = []
+        for event_id, event_name, player, placement, _ in self.standings(tournament):
+            _, startgg_id, gamer_tag, name, _, _ = self.players[player]
+            standings.append({
+                'placement': placement, 'event_name': event_name, 'event_id': int(event_id),
+                'entrant': {'participants': [{'player': {'id': int(startgg_id), 'gamerTag': gamer_tag},
+                                              'user': {'name': name}}]},
+            })
+        return payload, standings
+
+    def holdout_payloads(self, count: int) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """start.gg payloads for the newest `count` tournaments (the ones populate(holdout=count) skips)"""
+        return [self.startgg_payload(tournament) for tournament in self.tournaments[len(self.tournaments) - count:]]
+
+    # ============= Loading =============
+
+    def populate(self, engine, holdout: int = 0, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Create the tables and bulk insert every row except the newest
+        `holdout` tournaments, then rebuild the attendance rollup.
+        Returns counts plus the dataset digest (sha256 over the rows in order).
+        """
+        import time
+        from database.tournament_models import Base, Organization, Player, Tournament, TournamentPlacement
+        from database.attendance_rollup import rebuild
+
+        start = time.perf_counter()
+        digest = hashlib.sha256(repr(asdict(self.config)).encode())
+        counts = {'organizations': 0, 'players': 0, 'tournaments': 0, 'placements': 0}
+        loaded = self.tournaments[:len(self.tournaments) - holdout]
+        Base.metadata.create_all(engine)
+
+        with engine.begin() as conn:
+            if engine.dialect.name == 'sqlite':
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+            def insert(table, key, rows):
+                batch = []
+                for row in rows:
+                    digest.update(repr(tuple(row.values())).encode())
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        conn.execute(table.insert(), batch)
+                        counts[key] += len(batch)
+                        batch = []
+                if batch:
+                    conn.execute(table.insert(), batch)
+                    counts[key] += len(batch)
+
+            insert(Organization.__table__, 'organizations', self.organization_rows())
+            insert(Player.__table__, 'players', self.player_rows())
+            insert(Tournament.__table__, 'tournaments', (self.tournament_row(t) for t in loaded))
+            insert(TournamentPlacement.__table__, 'placements',
+                   (row for t in loaded for row in self.placement_rows(t)))
+            counts['rollup_buckets'] = rebuild(conn)
+
+        return {**counts, 'holdout': holdout, 'digest': digest.hexdigest()[:16],
+                'seconds': round(time.perf_counter() - start, 2)}
+
+    def summary(self) -> Dict[str, Any]:
+        """Shape of the dataset without generating placements"""
+        kinds: Dict[str, int] = {}
+        for tournament in self.tournaments:
+            kinds[tournament['kind']] = kinds.get(tournament['kind'], 0) + 1
+        attendance = sorted(t['num_attendees'] for t in self.tournaments)
+        return {
+            'config': asdict(self.config),
+            'tournaments': len(self.tournaments),
+            'kinds': kinds,
+            'placements': sum(entrants for t in self.tournaments for _, _, entrants in t['events']),
+            'online': sum(1 for t in self.tournaments if t['online']),
+            'median_attendance': attendance[len(attendance) // 2] if attendance else 0,
+            'max_attendance': attendance[-1] if attendance else 0,
+        }
+
+
+def get_dataset(scale: str = 'small', seed: Optional[int] = None) -> SyntheticDataset:
+    """Dataset for a named scale (tiny, small, medium, large)"""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}' (choose from {', '.join(SCALES)})")
+    config = SCALES[scale] if seed is None else replace(SCALES[scale], seed=seed)
+    return SyntheticDataset(config)
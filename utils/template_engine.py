@@ -0,0 +1,125 @@
+"""
+template_engine.py - Compiled Jinja2 templates for HTMLRenderer and publishing
+
+Layouts live in templates/layouts/ and are compiled once per process; the
+compiled bytecode is kept in cache/templates (TEMPLATE_CACHE_DIR) so later
+processes skip parsing too. Theme stylesheets are rendered once per theme
+and reused by every page. stream() yields a large page in chunks instead of
+building one string.
+
+Jinja2 is optional for HTMLRenderer, which keeps its string builders for
+installs without it (`available()`); the publish pages require it.
+"""
+import os
+import hashlib
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.template_engine")
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_DIR = ROOT / 'templates' / 'layouts'
+TEMPLATE_CACHE_DIR = Path(os.getenv('TEMPLATE_CACHE_DIR', str(ROOT / 'cache' / 'templates')))
+
+# Template output pieces per streamed chunk (a table row is a handful of pieces)
+STREAM_BUFFER = int(os.getenv('TEMPLATE_STREAM_BUFFER', '2000'))
+
+
+def _thousands(value: Any) -> str:
+    return f"{value:,}" if isinstance(value, (int, float)) else str(value)
+
+
+def _fixed(value: Any, digits: int = 1) -> str:
+    return f"{value:.{digits}f}" if isinstance(value, (int, float)) else str(value)
+
+
+class TemplateEngine:
+    """One Jinja2 environment with a bytecode cache and per-theme stylesheets"""
+
+    def __init__(self, template_dir: Optional[Path] = None, cache_dir: Optional[Path] = None):
+        self.template_dir = Path(template_dir or TEMPLATE_DIR)
+        self.cache_dir = Path(cache_dir or TEMPLATE_CACHE_DIR)
+        self._environment = None
+        self._styles: Dict[tuple, str] = {}
+
+    @staticmethod
+    def available() -> bool:
+        """Is Jinja2 installed?"""
+        return importlib.util.find_spec('jinja2') is not None
+
+    @property
+    def environment(self):
+        """The Jinja2 environment, built on first use"""
+        if self._environment is None:
+            from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._environment = Environment(
+                loader=FileSystemLoader(str(self.template_dir)),
+                bytecode_cache=FileSystemBytecodeCache(str(self.cache_dir)),
+                autoescape=select_autoescape(['html']),
+                auto_reload=False,
+                trim_blocks=True,
+                lstrip_blocks=True,
+                keep_trailing_newline=True,
+            )
+            self._environment.filters['thousands'] = _thousands
+            self._environment.filters['fixed'] = _fixed
+        return self._environment
+
+    def precompile(self) -> List[str]:
+        """Compile every layout now (and fill the bytecode cache); returns their names"""
+        names = self.environment.list_templates()
+        for name in names:
+            self.environment.get_template(name)
+        return names
+
+    def template(self, name: str):
+        return self.environment.get_template(name)
+
+    def render(self, name: str, **context) -> str:
+        return self.template(name).render(**context)
+
+    def stream(self, name: str, buffer: int = STREAM_BUFFER, **context) -> Iterator[str]:
+        """Render in chunks of about `buffer` output pieces"""
+        stream = self.template(name).stream(**context)
+        stream.enable_buffering(buffer)
+        return iter(stream)
+
+    def macro(self, name: str, macro_name: str):
+        """A macro from a compiled layout (e.g. macros.html data_table)"""
+        return getattr(self.template(name).module, macro_name)
+
+    def fingerprint(self, name: str) -> str:
+        """sha256 of a template and every template it extends, includes or imports"""
+        from jinja2 import meta
+
+        digest, pending, seen = hashlib.sha256(), [name], set()
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            source = self.environment.loader.get_source(self.environment, current)[0]
+            digest.update(current.encode('utf-8') + b'\0' + source.encode('utf-8'))
+            pending.extend(ref for ref in meta.find_referenced_templates(self.environment.parse(source)) if ref)
+        return digest.hexdigest()
+
+    def theme_css(self, theme_name: str, theme: Dict[str, str]) -> str:
+        """The stylesheet for a theme, rendered once per theme configuration"""
+        key = (theme_name, tuple(sorted(theme.items())))
+        if key not in self._styles:
+            if self.available():
+                css = self.render('theme.css', theme=theme)
+            else:
+                css = (self.template_dir / 'theme.css').read_text(encoding='utf-8')
+                for name, value in theme.items():
+                    css = css.replace(f'{{{{ theme.{name} }}}}', value)
+            self._styles[key] = css
+        return self._styles[key]
+
+
+template_engine = TemplateEngine()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+tile_store.py - Offline XYZ basemap tiles in an MBTiles (SQLite) file
+
+Static heatmaps used to pull CartoDB tiles through contextily on every render.
+Renderers now read tiles through this store instead:
+- Tiles live in cache/basemaps/cartodb_positron.mbtiles (MBTiles 1.3 layout)
+- Missing tiles are fetched once and kept (read-through), unless offline
+- Tiles that cannot be had are painted as a plain background, so a render
+  never fails or waits on the network
+- ./go.py --prefetch-tiles fills a bounding box / zoom range ahead of time
+
+With the store filled (or BASEMAP_OFFLINE=1) renders are fully reproducible.
+"""
+
+import io
+import os
+import math
+import sqlite3
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+# CRITICAL: Enforce go.py execution - this module CANNOT be run directly
+from polymorphic_core.execution_guard import require_go_py
+require_go_py("utils.tile_store")
+
+from polymorphic_core import announcer
+import logging
+
+logger = logging.getLogger('tile_store')
+
+TILE_SIZE = 256
+# Same tiles as contextily's ctx.providers.CartoDB.Positron
+DEFAULT_TILE_URL = 'https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png'
+TILE_SUBDOMAINS = 'abcd'
+USER_AGENT = 'tournament-tracker-basemap/1.0'
+FETCH_TIMEOUT = 5.0
+
+DEFAULT_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache', 'basemaps', 'cartodb_positron.mbtiles'
+)
+
+# Positron land colour - used wherever a tile is missing
+PLAIN_BACKGROUND = (250, 250, 248)
+
+# west, south, east, north - the heatmaps' SoCal frame
+SOCAL_BOUNDS = (-119.0, 32.5, -116.0, 34.5)
+REGIONS = {'socal': SOCAL_BOUNDS}
+DEFAULT_PREFETCH_ZOOMS = (8, 11)
+
+Bounds = Tuple[float, float, float, float]
+
+
+# ============= TILE MATH (Web Mercator / XYZ) =============
+
+def lnglat_to_pixel(lng, lat, zoom: int):
+    """Global pixel coordinates at a zoom level (y grows southwards)"""
+    scale = TILE_SIZE * (2 ** zoom)
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = (np.asarray(lng) + 180.0) / 360.0 * scale
+    sin_lat = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def tiles_for_bounds(bounds: Bounds, zoom: int) -> Iterator[Tuple[int, int]]:
+    """(x, y) of every tile covering bounds at a zoom level"""
+    west, south, east, north = bounds
+    x0, y0 = lnglat_to_pixel(west, north, zoom)
+    x1, y1 = lnglat_to_pixel(east, south, zoom)
+    last = 2 ** zoom - 1
+    for x in range(max(int(x0 // TILE_SIZE), 0), min(int(math.ceil(x1 / TILE_SIZE)) - 1, last) + 1):
+        for y in range(max(int(y0 // TILE_SIZE), 0), min(int(math.ceil(y1 / TILE_SIZE)) - 1, last) + 1):
+            yield x, y
+
+
+def auto_zoom(bounds: Bounds) -> int:
+    """Zoom contextily would pick for these bounds (zoom='auto')"""
+    west, south, east, north = bounds
+    lng_span = max(east - west, 1e-9)
+    lat_span = max(north - south, 1e-9)
+    zoom = max(math.ceil(math.log2(360 * 2.0 / lng_span)),
+               math.ceil(math.log2(360 * 2.0 / lat_span)))
+    return int(min(max(zoom, 0), 19))
+
+
+# ============= STORE =============
+
+class MBTilesStore:
+    """
+    XYZ tiles in an MBTiles SQLite file (rows stored TMS-flipped, per the spec).
+
+    offline=True never touches the network: missing tiles stay missing.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, url: str = DEFAULT_TILE_URL,
+                 offline: bool = False):
+        self.path = path
+        self.url = url
+        self.offline = offline
+        self._network_failed = False
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+        """)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)",
+            [('name', 'basemap'), ('format', 'png'), ('type', 'baselayer'),
+             ('version', '1.3'), ('source', url)]
+        )
+        self._conn.commit()
+        self.stats = {'hits': 0, 'misses': 0, 'fetched': 0, 'fetch_errors': 0}
+
+    @staticmethod
+    def _tms_row(zoom: int, y: int) -> int:
+        return (2 ** zoom) - 1 - y
+
+    def get(self, zoom: int, x: int, y: int) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (zoom, x, self._tms_row(zoom, y))
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put_many(self, tiles: Iterable[Tuple[int, int, int, bytes]]):
+        rows = [(z, x, self._tms_row(z, y), sqlite3.Binary(data)) for z, x, y, data in tiles]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) "
+                "VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def put(self, zoom: int, x: int, y: int, data: bytes):
+        self.put_many([(zoom, x, y, data)])
+
+    def missing(self, bounds: Bounds, zoom: int) -> list:
+        wanted = list(tiles_for_bounds(bounds, zoom))
+        with self._lock:
+            present = set(self._conn.execute(
+                "SELECT tile_column, tile_row FROM tiles WHERE zoom_level=?", (zoom,)
+            ).fetchall())
+        return [(x, y) for x, y in wanted if (x, self._tms_row(zoom, y)) not in present]
+
+    def fetch(self, zoom: int, x: int, y: int) -> bytes:
+        """Download one tile from the upstream tile server"""
+        url = self.url.format(s=TILE_SUBDOMAINS[(x + y) % len(TILE_SUBDOMAINS)], z=zoom, x=x, y=y)
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            return response.read()
+
+    def tile(self, zoom: int, x: int, y: int) -> Optional[bytes]:
+        """Stored tile, fetched and kept on a miss unless offline"""
+        data = self.get(zoom, x, y)
+        if data is not None:
+            self.stats['hits'] += 1
+            return data
+        self.stats['misses'] += 1
+        if self.offline or self._network_failed:
+            return None
+        try:
+            data = self.fetch(zoom, x, y)
+        except Exception as e:
+            # One failure means no network for this render - don't wait on every tile
+            self._network_failed = True
+            self.stats['fetch_errors'] += 1
+            logger.warning(f"Tile fetch failed ({e}); using plain background for missing tiles")
+            return None
+        self.put(zoom, x, y, data)
+        self.stats['fetched'] += 1
+        return data
+
+    def prefetch(self, bounds: Bounds = SOCAL_BOUNDS, zooms: Sequence[int] = DEFAULT_PREFETCH_ZOOMS,
+                 workers: int = 4) -> Dict[str, int]:
+        """Download every missing tile for bounds over zooms (inclusive range)"""
+        zoom_levels = range(min(zooms), max(zooms) + 1)
+        result = {'requested': 0, 'present': 0, 'fetched': 0, 'failed': 0}
+        for zoom in zoom_levels:
+            total = sum(1 for _ in tiles_for_bounds(bounds, zoom))
+            todo = self.missing(bounds, zoom)
+            result['requested'] += total
+            result['present'] += total - len(todo)
+            if not todo:
+                continue
+
+            def download(tile):
+                try:
+                    return tile, self.fetch(zoom, *tile)
+                except Exception as e:
+                    logger.warning(f"Tile {zoom}/{tile[0]}/{tile[1]} failed: {e}")
+                    return tile, None
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                downloaded = list(pool.map(download, todo))
+            fetched = [(zoom, x, y, data) for (x, y), data in downloaded if data]
+            self.put_many(fetched)
+            result['fetched'] += len(fetched)
+            result['failed'] += len(todo) - len(fetched)
+        self._network_failed = False
+        return result
+
+    def count(self, zoom: Optional[int] = None) -> int:
+        with self._lock:
+            if zoom is None:
+                return self._conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM tiles WHERE zoom_level=?", (zoom,)).fetchone()[0]
+
+    def mosaic(self, bounds: Bounds, zoom: int,
+               background: Tuple[int, int, int] = PLAIN_BACKGROUND) -> Tuple[np.ndarray, int, int]:
+        """
+        RGB image covering bounds in plain lat/lng (equirectangular) space,
+        ready for imshow(extent=[west, east, south, north]).
+        Returns (image, tiles_drawn, tiles_missing).
+        """
+        from PIL import Image
+
+        west, south, east, north = bounds
+        tiles = list(tiles_for_bounds(bounds, zoom))
+        self._network_failed = False
+        tx0 = min(x for x, _ in tiles)
+        ty0 = min(y for _, y in tiles)
+        cols = max(x for x, _ in tiles) - tx0 + 1
+        rows = max(y for _, y in tiles) - ty0 + 1
+        canvas = np.empty((rows * TILE_SIZE, cols * TILE_SIZE, 3), dtype=np.uint8)
+        canvas[:] = background
+
+        drawn = missing = 0
+        for x, y in tiles:
+            data = self.tile(zoom, x, y)
+            if data is None:
+                missing += 1
+                continue
+            try:
+                img = np.asarray(Image.open(io.BytesIO(data)).convert('RGB'))
+            except Exception:
+                missing += 1
+                continue
+            oy, ox = (y - ty0) * TILE_SIZE, (x - tx0) * TILE_SIZE
+            canvas[oy:oy + img.shape[0], ox:ox + img.shape[1]] = img[:TILE_SIZE, :TILE_SIZE]
+            drawn += 1
+
+        # Crop to bounds; longitude is linear in both projections, latitude is
+        # resampled row by row from Mercator onto an even lat spacing
+        px0, py0 = lnglat_to_pixel(west, north, zoom)
+        px1, py1 = lnglat_to_pixel(east, south, zoom)
+        width = max(int(round(px1 - px0)), 1)
+        height = max(int(round(py1 - py0)), 1)
+        col_idx = np.clip((px0 + (np.arange(width) + 0.5) * (px1 - px0) / width
+                           - tx0 * TILE_SIZE).astype(np.int64), 0, canvas.shape[1] - 1)
+        lats = north - (np.arange(height) + 0.5) * (north - south) / height
+        _, py = lnglat_to_pixel(np.zeros(height), lats, zoom)
+        row_idx = np.clip((py - ty0 * TILE_SIZE).astype(np.int64), 0, canvas.shape[0] - 1)
+        return canvas[row_idx][:, col_idx], drawn, missing
+
+    def status(self) -> Dict:
+        return {'path': self.path, 'tiles': self.count(), 'offline': self.offline, **self.stats}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[MBTilesStore] = None
+
+
+def get_tile_store() -> MBTilesStore:
+    """Shared store (BASEMAP_MBTILES overrides the path, BASEMAP_OFFLINE=1 disables fetching)"""
+    global _store
+    if _store is None:
+        _store = MBTilesStore(
+            os.environ.get('BASEMAP_MBTILES', DEFAULT_STORE_PATH),
+            offline=os.environ.get('BASEMAP_OFFLINE', '').lower() in ('1', 'true', 'yes')
+        )
+    return _store
+
+
+def add_basemap(ax, bounds: Optional[Bounds] = None, zoom='auto', store: Optional[MBTilesStore] = None,
+                background: Tuple[int, int, int] = PLAIN_BACKGROUND, alpha: float = 1.0,
+                zorder: int = 0) -> bool:
+    """
+    Draw stored basemap tiles under a lat/lng matplotlib axis
+    (stand-in for ctx.add_basemap(ax, crs='EPSG:4326', source=CartoDB.Positron)).
+    Returns False when no tile was available and the plain background was used.
+    """
+    if bounds is None:
+        (west, east), (south, north) = ax.get_xlim(), ax.get_ylim()
+        bounds = (west, south, east, north)
+    store = store or get_tile_store()
+    zoom = auto_zoom(bounds) if zoom == 'auto' else int(zoom)
+
+    image, drawn, missing = store.mosaic(bounds, zoom, background)
+    west, south, east, north = bounds
+    ax.imshow(image, extent=[west, east, south, north], origin='upper',
+              aspect='auto', alpha=alpha, zorder=zorder, interpolation='bilinear')
+    ax.set_xlim(west, east)
+    ax.set_ylim(south, north)
+    if missing:
+        logger.info(f"Basemap z{zoom}: {drawn} tiles, {missing} missing (plain background)")
+    return drawn > 0
+
+
+def parse_prefetch_spec(spec: Optional[str]) -> Tuple[Bounds, Tuple[int, int]]:
+    """
+    'west,south,east,north:zmin-zmax', a region name ('socal', 'socal:9-12'),
+    or just 'zmin-zmax'. Defaults to the SoCal frame at zooms 8-11.
+    """
+    bounds, zooms = SOCAL_BOUNDS, DEFAULT_PREFETCH_ZOOMS
+    if not spec:
+        return bounds, zooms
+    box_part, _, zoom_part = str(spec).strip().partition(':')
+    if box_part.lower() in REGIONS:
+        bounds, box_part = REGIONS[box_part.lower()], ''
+    elif ',' not in box_part:
+        box_part, zoom_part = '', box_part
+    if box_part:
+        values = [float(v) for v in box_part.split(',')]
+        if len(values) != 4:
+            raise ValueError(f"Expected west,south,east,north - got {box_part}")
+        bounds = tuple(values)
+    if zoom_part:
+        low, _, high = zoom_part.partition('-')
+        zooms = (int(low), int(high or low))
+    return bounds, zooms
+
+
+def prefetch_tiles_handler(args=None):
+    """Handler for --prefetch-tiles switch"""
+    spec = getattr(args, 'prefetch_tiles', args)
+    try:
+        bounds, zooms = parse_prefetch_spec(spec if isinstance(spec, str) else None)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    store = get_tile_store()
+    print(f"🗺️ Prefetching basemap tiles for {bounds}, zoom {zooms[0]}-{zooms[1]} -> {store.path}")
+    result = store.prefetch(bounds, zooms)
+    print(f"✅ {result['fetched']} fetched, {result['present']} already stored, "
+          f"{result['failed']} failed ({store.count()} tiles total)")
+    return 0 if result['failed'] == 0 else 1
+
+
+announcer.announce(
+    "Basemap Tile Store",
+    [
+        "Offline XYZ basemap tiles in an MBTiles (SQLite) file",
+        "Read-through tile cache for static heatmap renders",
+        "Plain-background fallback for missing tiles",
+        "Prefetch a bounding box and zoom range with --prefetch-tiles"
+    ]
+)
+
+from utils.dynamic_switches import announce_switch
+
+announce_switch(
+    flag="--prefetch-tiles",
+    help="Prefetch basemap tiles into the offline store (west,south,east,north:zmin-zmax)",
+    handler=prefetch_tiles_handler,
+    action='store',
+    nargs='?',
+    const='socal'
+)
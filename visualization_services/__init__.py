@@ -37,6 +37,7 @@ announcer.announce(
         "Tournament location heatmap generation",
         "Player distribution heatmaps", 
         "Organization venue heatmaps",
+        "Versioned PNG/HTML render cache with ETag support",
         "Polymorphic ask/tell/do interface"
     ]
 )
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+async_capture_engine.py - Pooled async Playwright capture engine
+
+Backs WebScreenshotService:
+- One browser, a bounded pool of warm pages (desktop + mobile contexts)
+- Readiness conditions (load, fonts, optional selector, bounded network idle)
+  instead of fixed sleeps
+- Kept-open pages retained LRU with a hard cap
+- Batch capture of many URLs concurrently
+
+The engine runs its own event loop in a background thread so the sync
+ask/tell/do interface can call into it.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+DESKTOP_VIEWPORT = {'width': 1920, 'height': 1080}
+MOBILE_VIEWPORT = {'width': 375, 'height': 667}
+
+
+class AsyncCaptureEngine:
+    """Bounded pool of warm browser pages for concurrent screenshots"""
+
+    def __init__(self, pool_size: int = 4, max_open_pages: int = 8,
+                 navigation_timeout: float = 30.0):
+        self.pool_size = max(1, pool_size)
+        self.max_open_pages = max_open_pages
+        self.navigation_timeout = navigation_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: Dict[str, Any] = {}
+        self._idle: Dict[str, asyncio.Queue] = {}
+        self._created: Dict[str, int] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._browser_lock = asyncio.Lock()
+
+        # url -> page, least recently used first
+        self.open_pages: "OrderedDict[str, Any]" = OrderedDict()
+        self.stats = {'captures': 0, 'errors': 0, 'pages_created': 0,
+                      'pages_reused': 0, 'evicted_open_pages': 0}
+
+    # ============= LOOP / LIFECYCLE =============
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever,
+                                            name='capture-engine', daemon=True)
+            self._thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the engine loop from sync code"""
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    @property
+    def active(self) -> bool:
+        return self._browser is not None
+
+    async def _ensure_browser(self):
+        if self._browser:
+            return
+        async with self._browser_lock:
+            if not self._browser:
+                await self._launch()
+
+    async def _launch(self):
+        # Everything is built first and _browser assigned last: captures that
+        # see _browser set skip the lock and use the pool straight away
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(
+            headless=True,
+            args=['--no-sandbox', '--disable-setuid-sandbox']
+        )
+        contexts = {}
+        for profile, viewport in (('desktop', DESKTOP_VIEWPORT), ('mobile', MOBILE_VIEWPORT)):
+            contexts[profile] = await browser.new_context(viewport=viewport, device_scale_factor=1)
+        self._playwright = playwright
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._contexts = contexts
+        self._idle = {profile: asyncio.Queue() for profile in contexts}
+        self._created = {profile: 0 for profile in contexts}
+        self._browser = browser
+
+    async def warm(self, count: Optional[int] = None, profile: str = 'desktop') -> int:
+        """Open pages ahead of time so the first captures skip page creation"""
+        await self._ensure_browser()
+        count = min(count or self.pool_size, self.pool_size)
+        while self._created[profile] < count:
+            await self._idle[profile].put(await self._new_page(profile))
+        return self._idle[profile].qsize()
+
+    async def _new_page(self, profile: str):
+        page = await self._contexts[profile].new_page()
+        self._created[profile] += 1
+        self.stats['pages_created'] += 1
+        return page
+
+    async def _acquire_page(self, profile: str):
+        idle = self._idle[profile]
+        if not idle.empty():
+            self.stats['pages_reused'] += 1
+            return idle.get_nowait()
+        return await self._new_page(profile)
+
+    async def _release_page(self, profile: str, page):
+        if page.is_closed():
+            self._created[profile] -= 1
+            return
+        if self._idle[profile].qsize() >= self.pool_size:
+            await page.close()
+            self._created[profile] -= 1
+            return
+        try:
+            await page.goto('about:blank')
+        except Exception:
+            await page.close()
+            self._created[profile] -= 1
+            return
+        await self._idle[profile].put(page)
+
+    async def close(self):
+        # Unset _browser first so new captures relaunch rather than use a closing pool
+        browser, playwright = self._browser, self._playwright
+        self._browser = None
+        self._playwright = None
+        for page in list(self.open_pages.values()):
+            await page.close()
+        self.open_pages.clear()
+        if browser:
+            await browser.close()
+        if playwright:
+            await playwright.stop()
+        self._contexts = {}
+        self._idle = {}
+        self._created = {}
+
+    # ============= READINESS =============
+
+    async def _wait_until_ready(self, page, wait: float, wait_for_selector: Optional[str],
+                                wait_for_function: Optional[str]):
+        """
+        Wait for the page to be ready instead of sleeping a fixed amount.
+        `wait` bounds how long we give background requests to settle.
+        """
+        timeout_ms = self.navigation_timeout * 1000
+        if wait_for_selector:
+            await page.wait_for_selector(wait_for_selector, state='visible', timeout=timeout_ms)
+        if wait_for_function:
+            await page.wait_for_function(wait_for_function, timeout=timeout_ms)
+        # Web fonts change layout - wait for them explicitly
+        await page.evaluate("() => document.fonts ? document.fonts.ready.then(() => true) : true")
+        if wait and wait > 0:
+            try:
+                await page.wait_for_load_state('networkidle', timeout=wait * 1000)
+            except PlaywrightTimeoutError:
+                pass  # long-polling pages never go idle - capture what we have
+
+    # ============= CAPTURE =============
+
+    async def capture(self, url: str, fullpage: bool = False, mobile: bool = False,
+                      wait: float = 2, keep_open: bool = False,
+                      wait_for_selector: Optional[str] = None,
+                      wait_for_function: Optional[str] = None) -> Dict[str, Any]:
+        """Capture one URL using a pooled page"""
+        await self._ensure_browser()
+        profile = 'mobile' if mobile else 'desktop'
+        self.touch_open_page(url)  # capturing a kept-open URL counts as using it
+        async with self._slots:
+            page = await self._acquire_page(profile)
+            kept = False
+            try:
+                await page.goto(url, wait_until='load', timeout=self.navigation_timeout * 1000)
+                await self._wait_until_ready(page, wait, wait_for_selector, wait_for_function)
+                screenshot_bytes = await page.screenshot(full_page=fullpage)
+                title = await page.title()
+
+                if keep_open:
+                    await self._keep_open(url, page, profile)
+                    kept = True
+
+                self.stats['captures'] += 1
+                return {
+                    'url': url,
+                    'title': title,
+                    'viewport': page.viewport_size,
+                    'fullpage': fullpage,
+                    'mobile': mobile,
+                    'screenshot': screenshot_bytes,
+                    'timestamp': time.time()
+                }
+            except Exception as e:
+                self.stats['errors'] += 1
+                return {'error': str(e), 'url': url}
+            finally:
+                if not kept:
+                    await self._release_page(profile, page)
+
+    async def capture_many(self, urls: List[str], **options) -> List[Dict[str, Any]]:
+        """Capture many URLs concurrently (bounded by the pool size)"""
+        return list(await asyncio.gather(*(self.capture(url, **options) for url in urls)))
+
+    # ============= KEPT-OPEN PAGES =============
+
+    async def _keep_open(self, url: str, page, profile: str):
+        """Retain a page for later inspection; the least recently used is closed past the cap"""
+        previous = self.open_pages.pop(url, None)
+        if previous is not None and previous is not page:
+            await previous.close()
+        self.open_pages[url] = page
+        self._created[profile] -= 1  # no longer part of the pool
+        while len(self.open_pages) > self.max_open_pages:
+            _, evicted = self.open_pages.popitem(last=False)
+            await evicted.close()
+            self.stats['evicted_open_pages'] += 1
+
+    def touch_open_page(self, url: str):
+        """Mark a kept-open page as recently used so it is evicted last"""
+        if url in self.open_pages:
+            self.open_pages.move_to_end(url)
+
+    async def close_page(self, url: str) -> bool:
+        page = self.open_pages.pop(url, None)
+        if page is None:
+            return False
+        await page.close()
+        return True
+
+    async def close_all_pages(self) -> int:
+        count = len(self.open_pages)
+        for page in list(self.open_pages.values()):
+            await page.close()
+        self.open_pages.clear()
+        return count
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'pool_size': self.pool_size,
+            'idle_pages': {p: q.qsize() for p, q in self._idle.items()},
+            'max_open_pages': self.max_open_pages,
+            **self.stats
+        }
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+heatmap_cache.py - Versioned render cache for heatmap artifacts
+
+Finished PNGs and folium HTML are stored under a key derived from:
+- the artifact kind ('png' / 'html') and its render parameters (the "slot")
+- a data-version fingerprint (max tournament sync_timestamp + row count)
+
+When the fingerprint moves on, the last good artifact for the slot is served
+(marked stale) while the new one renders in the background. Concurrent
+requests for the same key share a single in-flight render.
+"""
+
+import os
+import json
+import time
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache', 'heatmaps'
+)
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'html': 'text/html',
+}
+
+
+@dataclass
+class HeatmapArtifact:
+    """One rendered heatmap"""
+    key: str
+    kind: str
+    version: str
+    body: bytes
+    created: float
+    stale: bool = False
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key[:32]}"'
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES.get(self.kind, 'application/octet-stream')
+
+
+class HeatmapArtifactCache:
+    """
+    Render cache keyed by (kind, params, data version).
+
+    version_fn() returns the current data fingerprint; it is re-read at most
+    every version_ttl seconds. renderers maps kind -> fn(params, output_path).
+    Renders run one at a time on a worker thread (matplotlib is not thread safe).
+    """
+
+    def __init__(self, version_fn: Callable[[], str], renderers: Dict[str, Callable[[Dict, str], Any]],
+                 cache_dir: str = DEFAULT_CACHE_DIR, version_ttl: float = 2.0, max_entries: int = 32):
+        self.version_fn = version_fn
+        self.renderers = renderers
+        self.cache_dir = cache_dir
+        self.version_ttl = version_ttl
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, HeatmapArtifact]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='heatmap-render')
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self.stats = {'hits': 0, 'disk_hits': 0, 'stale_served': 0,
+                      'renders': 0, 'joined_renders': 0, 'render_errors': 0}
+
+    # ============= KEYS =============
+
+    @staticmethod
+    def _slot(kind: str, params: Dict) -> str:
+        blob = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+    @staticmethod
+    def _key(slot: str, version: str) -> str:
+        return hashlib.sha256(f'{slot}:{version}'.encode()).hexdigest()
+
+    def _artifact_path(self, key: str, kind: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.{kind}')
+
+    def _pointer_path(self, slot: str) -> str:
+        return os.path.join(self.cache_dir, f'{slot}.latest.json')
+
+    def data_version(self, force: bool = False) -> str:
+        now = time.monotonic()
+        if force or self._version is None or now - self._version_checked >= self.version_ttl:
+            self._version = str(self.version_fn())
+            self._version_checked = now
+        return self._version
+
+    def invalidate(self):
+        """Re-read the data fingerprint on the next request"""
+        self._version_checked = 0.0
+
+    # ============= LOOKUP =============
+
+    def _remember(self, artifact: HeatmapArtifact):
+        with self._lock:
+            self._memory[artifact.key] = artifact
+            self._memory.move_to_end(artifact.key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, kind: str, version: str) -> Optional[HeatmapArtifact]:
+        with self._lock:
+            artifact = self._memory.get(key)
+            if artifact is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                return artifact
+        path = self._artifact_path(key, kind)
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        artifact = HeatmapArtifact(key, kind, version, body, os.path.getmtime(path))
+        self._remember(artifact)
+        self.stats['disk_hits'] += 1
+        return artifact
+
+    def _latest(self, slot: str, kind: str) -> Optional[HeatmapArtifact]:
+        """Last successfully rendered artifact for a slot, whatever its version"""
+        try:
+            with open(self._pointer_path(slot)) as f:
+                pointer = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return self._lookup(pointer['key'], kind, pointer['version'])
+
+    # ============= RENDER =============
+
+    def _render(self, kind: str, params: Dict, slot: str, key: str, version: str) -> HeatmapArtifact:
+        path = self._artifact_path(key, kind)
+        tmp_path = f'{path}.{os.getpid()}.tmp.{kind}'
+        try:
+            self.stats['renders'] += 1
+            result = self.renderers[kind](dict(params), tmp_path)
+            if isinstance(result, dict) and 'error' in result:
+                raise RuntimeError(result['error'])
+            if not os.path.exists(tmp_path):
+                raise RuntimeError(f'{kind} heatmap renderer produced no output')
+            os.replace(tmp_path, path)
+        except Exception:
+            self.stats['render_errors'] += 1
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with open(path, 'rb') as f:
+            artifact = HeatmapArtifact(key, kind, version, f.read(), time.time())
+        self._remember(artifact)
+        self._promote(slot, kind, key, version)
+        return artifact
+
+    def _promote(self, slot: str, kind: str, key: str, version: str):
+        """Point the slot at its new artifact and drop the one it replaces"""
+        pointer_path = self._pointer_path(slot)
+        try:
+            with open(pointer_path) as f:
+                previous = json.load(f).get('key')
+        except (OSError, ValueError):
+            previous = None
+        tmp = f'{pointer_path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'key': key, 'version': version}, f)
+        os.replace(tmp, pointer_path)
+        if previous and previous != key:
+            with self._lock:
+                self._memory.pop(previous, None)
+            try:
+                os.remove(self._artifact_path(previous, kind))
+            except OSError:
+                pass
+
+    def _submit(self, kind: str, params: Dict, slot: str, key: str, version: str) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats['joined_renders'] += 1
+                return future
+            if key in self._memory:
+                # Finished between the caller's lookup and now
+                future = Future()
+                future.set_result(self._memory[key])
+                return future
+            future = self._executor.submit(self._render, kind, params, slot, key, version)
+            self._in_flight[key] = future
+
+        def _done(_):
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        future.add_done_callback(_done)
+        return future
+
+    # ============= PUBLIC =============
+
+    def request(self, kind: str, params: Optional[Dict] = None):
+        """
+        (artifact, future) for the current data version.
+        artifact is the fresh render, a stale one while re-rendering, or None;
+        future is the pending render, or None when artifact is current.
+        """
+        if kind not in self.renderers:
+            raise ValueError(f'Unknown heatmap artifact kind: {kind}')
+        params = params or {}
+        slot = self._slot(kind, params)
+        version = self.data_version()
+        key = self._key(slot, version)
+
+        artifact = self._lookup(key, kind, version)
+        if artifact is not None:
+            return artifact, None
+
+        future = self._submit(kind, params, slot, key, version)
+        stale = self._latest(slot, kind)
+        if stale is not None:
+            self.stats['stale_served'] += 1
+            return replace(stale, stale=True), future
+        return None, future
+
+    def get(self, kind: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> HeatmapArtifact:
+        """Current artifact; blocks only when nothing (not even stale) is available"""
+        artifact, future = self.request(kind, params)
+        return artifact if artifact is not None else future.result(timeout)
+
+    async def get_async(self, kind: str, params: Optional[Dict] = None) -> HeatmapArtifact:
+        artifact, future = self.request(kind, params)
+        return artifact if artifact is not None else await asyncio.wrap_future(future)
+
+    def prefetch(self, kind: str, params: Optional[Dict] = None) -> Optional[Future]:
+        """Start a background render if the current version is not cached"""
+        return self.request(kind, params)[1]
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'data_version': self._version,
+                'cached_artifacts': len(self._memory),
+                'in_flight': len(self._in_flight),
+                'cache_dir': self.cache_dir,
+                **self.stats
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
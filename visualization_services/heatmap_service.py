@@ -7,6 +7,7 @@ This service:
 2. Gets raw data from database service (data layer)
 3. Processes data via math services (computation layer)  
 4. Renders via graphics services (presentation layer)
+5. Caches finished PNG/HTML artifacts per data version (heatmap_cache)
 
 The database service no longer needs to know about "heatmaps".
 """
@@ -33,13 +34,18 @@ class HeatmapService:
         self._database_service = None
         self._visualization_math = None
         self._graphics_service = None
+        self._artifact_cache = None
     
     def ask(self, query: str, data: Any = None, **kwargs) -> Any:
         """Process heatmap visualization requests"""
         query_lower = query.lower().strip()
         
+        # Render cache
+        if 'cache' in query_lower or 'data version' in query_lower:
+            return self._get_artifact_cache().status()
+        
         # Tournament heatmaps
-        if 'tournament' in query_lower and 'heatmap' in query_lower:
+        elif 'tournament' in query_lower and 'heatmap' in query_lower:
             if 'image' in query_lower or 'generate image' in query_lower:
                 return self._generate_tournament_heatmap_image(**kwargs)
             else:
@@ -104,9 +110,37 @@ class HeatmapService:
                 return self._generate_tournament_heatmap(**kwargs)  # Default
         elif 'process' in action_lower:
             return self._process_heatmap_data(data, **kwargs)
+        elif 'prefetch' in action_lower or 'warm' in action_lower:
+            kinds = [k for k in ('png', 'html') if k in action_lower] or ['png', 'html']
+            for kind in kinds:
+                self._get_artifact_cache().prefetch(kind, kwargs)
+            return f"Rendering {', '.join(kinds)} heatmaps in the background"
+        elif 'clear' in action_lower and 'cache' in action_lower:
+            self._get_artifact_cache().clear()
+            return "Heatmap artifact cache cleared"
+        elif 'invalidate' in action_lower:
+            self._get_artifact_cache().invalidate()
+            return "Heatmap data version will be re-read on the next request"
         else:
             return f"Unknown heatmap action: {action}"
     
+    # Cached artifacts
+    
+    def artifact(self, kind: str = 'html', **params):
+        """
+        Finished 'png' or 'html' heatmap for the current data version.
+        Serves the previous render (stale=True) while a new one is in flight.
+        """
+        return self._get_artifact_cache().get(kind, params)
+    
+    async def artifact_async(self, kind: str = 'html', **params):
+        """artifact() for aiohttp handlers - waits on the in-flight render"""
+        return await self._get_artifact_cache().get_async(kind, params)
+    
+    def has_data(self) -> bool:
+        """Any tournaments with coordinates to draw (the count is part of the cached data version)"""
+        return not self._get_artifact_cache().data_version().endswith(':0')
+    
     # Private methods - heatmap orchestration
     
     def _get_database_service(self):
@@ -133,6 +167,45 @@ class HeatmapService:
                 self._graphics_service = None
         return self._graphics_service
     
+    def _get_artifact_cache(self):
+        """Lazy-load the versioned render cache"""
+        if self._artifact_cache is None:
+            from visualization_services.heatmap_cache import HeatmapArtifactCache, DEFAULT_CACHE_DIR
+            self._artifact_cache = HeatmapArtifactCache(
+                version_fn=self._data_version,
+                renderers={'png': self._render_artifact, 'html': self._render_artifact},
+                cache_dir=os.environ.get('HEATMAP_CACHE_DIR', DEFAULT_CACHE_DIR)
+            )
+        return self._artifact_cache
+    
+    def _data_version(self) -> str:
+        """Fingerprint of the tournament location data: latest sync + row count"""
+        from sqlalchemy import func
+        from utils.database import read_session_scope
+        from database.tournament_models import Tournament
+        
+        with read_session_scope() as session:
+            latest_sync, count = session.query(
+                func.max(Tournament.sync_timestamp), func.count(Tournament.id)
+            ).filter(
+                Tournament.lat.isnot(None),
+                Tournament.lng.isnot(None)
+            ).one()
+        return f"{latest_sync or 0}:{count}"
+    
+    def _render_artifact(self, params: Dict, output_path: str):
+        """Render a tournament heatmap to output_path (.png static, .html folium)"""
+        heatmap_data = self._generate_tournament_heatmap(**params)
+        if not heatmap_data:
+            return {"error": "No heatmap data available"}
+        
+        graphics = self._get_graphics_service()
+        if not graphics:
+            return {"error": "Graphics service not available"}
+        
+        graphics.heatmap({'items': heatmap_data}, output_path, **params)
+        return output_path
+    
     def _generate_tournament_heatmap(self, **kwargs) -> List[tuple]:
         """
         Generate tournament heatmap by orchestrating services properly:
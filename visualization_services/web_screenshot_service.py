@@ -2,6 +2,8 @@
 """
 web_screenshot_service.py - Web page screenshot service with Bonjour announcements
 Provides screenshots of web pages using Playwright headless browser.
+Captures run on a pooled async engine (warm pages, readiness conditions,
+bounded kept-open pages, concurrent batches).
 Follows the polymorphic ask/tell/do pattern.
 """
 
@@ -9,10 +11,10 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from playwright.sync_api import sync_playwright
 from polymorphic_core import register_capability
+from visualization_services.async_capture_engine import AsyncCaptureEngine
 import base64
-from typing import Any, Optional, Dict, Union
+from typing import Any, Optional, Dict, List, Union
 from pathlib import Path
 import time
 import json
@@ -34,26 +36,23 @@ class WebScreenshotService:
     
     def __init__(self):
         if not self._initialized:
-            self.playwright = None
-            self.browser = None
-            self.context = None
+            self.engine = AsyncCaptureEngine(
+                pool_size=int(os.environ.get('SCREENSHOT_POOL_SIZE', '4')),
+                max_open_pages=int(os.environ.get('SCREENSHOT_MAX_OPEN_PAGES', '8'))
+            )
             self._initialized = True
             
             # Register as polymorphic capability
             register_capability('web_browser', lambda: self)
     
-    def _ensure_browser(self):
-        """Ensure browser is initialized"""
-        if not self.browser:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(
-                headless=True,
-                args=['--no-sandbox', '--disable-setuid-sandbox']
-            )
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                device_scale_factor=1
-            )
+    @property
+    def open_pages(self) -> Dict[str, Any]:
+        """Kept-open pages (LRU-bounded by the capture engine)"""
+        return self.engine.open_pages
+    
+    @property
+    def browser(self):
+        return self.engine._browser
     
     def ask(self, query: str, **kwargs) -> Any:
         """
@@ -63,29 +62,39 @@ class WebScreenshotService:
             ask('screenshot of https://example.com')
             ask('capture http://localhost:8081')
             ask('mobile screenshot of https://site.com')
+            ask('batch screenshot of http://localhost:8081/a http://localhost:8081/b')
             ask('browser status')
         """
         query_lower = query.lower().strip()
         
         # Check browser status
         if 'status' in query_lower:
-            open_pages = getattr(self, 'open_pages', {})
+            open_pages = self.open_pages
             return {
                 'browser_active': self.browser is not None,
                 'playwright_version': '1.55.0',
                 'browser_type': 'chromium',
                 'open_pages': list(open_pages.keys()),
-                'open_page_count': len(open_pages)
+                'open_page_count': len(open_pages),
+                'pool': self.engine.status()
             }
         
         # List open pages
         if 'open pages' in query_lower or 'list pages' in query_lower:
-            open_pages = getattr(self, 'open_pages', {})
+            open_pages = self.open_pages
             return {
                 'open_pages': list(open_pages.keys()),
                 'count': len(open_pages)
             }
         
+        # Batch screenshot requests
+        if 'batch' in query_lower and ('screenshot' in query_lower or 'capture' in query_lower):
+            urls = self._extract_urls(query)
+            if not urls:
+                return {'error': 'No URLs found in query'}
+            return self.capture_batch(urls, fullpage='full' in query_lower,
+                                      mobile='mobile' in query_lower, wait=kwargs.get('wait', 2))
+        
         # Screenshot requests
         if 'screenshot' in query_lower or 'capture' in query_lower:
             # Extract URL from query
@@ -98,7 +107,8 @@ class WebScreenshotService:
                 'fullpage': 'full' in query_lower or 'entire' in query_lower,
                 'mobile': 'mobile' in query_lower,
                 'wait': kwargs.get('wait', 2),  # Wait time after load
-                'keep_open': 'keep' in query_lower and 'open' in query_lower
+                'keep_open': 'keep' in query_lower and 'open' in query_lower,
+                'wait_for_selector': kwargs.get('wait_for_selector')
             }
             
             return self._capture_screenshot(url, **options)
@@ -188,24 +198,33 @@ class WebScreenshotService:
         if 'close' in action_lower and 'browser' in action_lower:
             return self._close_browser()
         
+        # Close all pages
+        if 'close all pages' in action_lower:
+            if self.open_pages:
+                count = self.engine.run(self.engine.close_all_pages())
+                return {'status': f'Closed {count} pages'}
+            return {'status': 'No pages were open'}
+        
         # Close specific page
         if 'close page' in action_lower:
             url = self._extract_url(action)
-            if url and hasattr(self, 'open_pages') and url in self.open_pages:
-                self.open_pages[url].close()
-                del self.open_pages[url]
+            if url and url in self.open_pages:
+                self.engine.run(self.engine.close_page(url))
                 return {'status': f'Closed page {url}'}
             return {'error': f'Page {url} not found in open pages'}
         
-        # Close all pages
-        if 'close all pages' in action_lower:
-            if hasattr(self, 'open_pages'):
-                count = len(self.open_pages)
-                for page in self.open_pages.values():
-                    page.close()
-                self.open_pages.clear()
-                return {'status': f'Closed {count} pages'}
-            return {'status': 'No pages were open'}
+        # Pre-open pages so the first captures are fast
+        if 'warm' in action_lower:
+            idle = self.engine.run(self.engine.warm())
+            return {'status': f'{idle} warm pages ready'}
+        
+        # Batch capture
+        if 'batch' in action_lower and ('capture' in action_lower or 'screenshot' in action_lower):
+            urls = self._extract_urls(action)
+            if not urls:
+                return {'error': 'No URLs found in action'}
+            return self.capture_batch(urls, fullpage='full' in action_lower,
+                                      mobile='mobile' in action_lower, wait=kwargs.get('wait', 2))
         
         # Capture screenshot
         if 'capture' in action_lower or 'screenshot' in action_lower:
@@ -218,7 +237,8 @@ class WebScreenshotService:
                 'fullpage': 'fullpage=true' in action_lower or 'full' in action_lower,
                 'mobile': 'mobile=true' in action_lower or 'mobile' in action_lower,
                 'wait': kwargs.get('wait', 2),
-                'keep_open': 'keep' in action_lower and 'open' in action_lower
+                'keep_open': 'keep' in action_lower and 'open' in action_lower,
+                'wait_for_selector': kwargs.get('wait_for_selector')
             }
             
             # Capture screenshot
@@ -259,67 +279,48 @@ class WebScreenshotService:
         
         return None
     
+    def _extract_urls(self, text: str) -> List[str]:
+        """Extract every URL from text (for batch captures)"""
+        import re
+        return re.findall(r'https?://[^\s<>"{}|\\^`\[\]]*', text)
+    
     def _capture_screenshot(self, url: str, fullpage: bool = False, 
-                          mobile: bool = False, wait: float = 2, keep_open: bool = False) -> Dict[str, Any]:
-        """Capture a screenshot of the given URL"""
+                          mobile: bool = False, wait: float = 2, keep_open: bool = False,
+                          wait_for_selector: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Capture a screenshot of the given URL on a pooled page.
+        `wait` is the most we give the network to go idle - not a fixed sleep.
+        """
         try:
-            self._ensure_browser()
-            
-            # Create page with mobile viewport if requested
-            if mobile:
-                page = self.context.new_page()
-                page.set_viewport_size({'width': 375, 'height': 667})
-            else:
-                page = self.context.new_page()
-            
-            # Navigate to URL
-            
-            page.goto(url, wait_until='networkidle', timeout=30000)
-            
-            # Wait for any dynamic content
-            time.sleep(wait)
-            
-            # Take screenshot
-            screenshot_bytes = page.screenshot(full_page=fullpage)
-            
-            # Get page info
-            title = page.title()
-            viewport = page.viewport_size
-            
-            # Only close page if not keeping it open
-            if not keep_open:
-                page.close()
-            else:
-                # Store reference to open page
-                if not hasattr(self, 'open_pages'):
-                    self.open_pages = {}
-                self.open_pages[url] = page
-            
-            result = {
-                'url': url,
-                'title': title,
-                'viewport': viewport,
-                'fullpage': fullpage,
-                'mobile': mobile,
-                'screenshot': screenshot_bytes,
-                'timestamp': time.time()
-            }
-            
-            return result
-            
+            return self.engine.run(self.engine.capture(
+                url, fullpage=fullpage, mobile=mobile, wait=wait,
+                keep_open=keep_open, wait_for_selector=wait_for_selector
+            ))
         except Exception as e:
             return {'error': str(e), 'url': url}
     
+    def capture_batch(self, urls: List[str], fullpage: bool = False, mobile: bool = False,
+                      wait: float = 2, wait_for_selector: Optional[str] = None) -> Dict[str, Any]:
+        """Capture many URLs concurrently (e.g. every local report page)"""
+        start = time.time()
+        try:
+            results = self.engine.run(self.engine.capture_many(
+                urls, fullpage=fullpage, mobile=mobile, wait=wait,
+                wait_for_selector=wait_for_selector
+            ))
+        except Exception as e:
+            return {'error': str(e), 'urls': urls}
+        return {
+            'results': results,
+            'count': len(results),
+            'errors': sum(1 for r in results if 'error' in r),
+            'elapsed': time.time() - start
+        }
+    
     def _close_browser(self) -> Dict[str, str]:
         """Close the browser and cleanup"""
-        if self.browser:
-            self.browser.close()
-            self.browser = None
-            self.context = None
-        
-        if self.playwright:
-            self.playwright.stop()
-            self.playwright = None
+        if self.engine.active:
+            self.engine.run(self.engine.close())
         
         return {'status': 'Browser closed'}
 